@@ -23,9 +23,17 @@ Repetições: cada modo roda ``--repetitions`` vezes com sementes distintas
 ``{output_dir}/{mode}/rep{k}/`` e o consolidado em
 ``{output_dir}/ablation_summary.json``.
 
+Política de ancoragem do modelo global (``ANCHOR_POLICY``, ver
+flower_fl/checkpoint.py): ``--anchor-policies`` roda os modos on-chain uma vez
+por política (every, every_k, on_improvement, final). ``every`` mantém o
+rótulo do modo; as demais entram como ``{mode}:{política}`` e a tabela final
+mostra o gás da run inteira e o número de âncoras de cada uma.
+
 Exemplo:
     python ablation_experiment.py --modes baseline,no_ipfs,full \\
         --clients 3 --rounds 15 --repetitions 3 --output-dir results/ablation_full
+    python ablation_experiment.py --modes no_ipfs --rounds 15 \\
+        --anchor-policies every,every_k,on_improvement,final --anchor-every-k 5
 """
 from __future__ import annotations
 
@@ -43,6 +51,8 @@ from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
+from flower_fl.checkpoint import POLICIES
+
 load_dotenv()  # garante JOB_ADDRS/JOB_ADDR/RPC_URL/IPFS_API_URL sem `source .env`
 
 PYTHON = sys.executable or "python3"
@@ -113,8 +123,11 @@ def _terminate(proc: Optional[subprocess.Popen], timeout: float = 10.0) -> None:
 
 
 def _make_base_env(mode: str, rounds: int, num_clients: int,
-                   metrics_file: Path, seed: int) -> Dict[str, str]:
+                   metrics_file: Path, seed: int,
+                   anchor_policy: str = "every", anchor_every_k: int = 5) -> Dict[str, str]:
     env = os.environ.copy()
+    env["ANCHOR_POLICY"] = anchor_policy
+    env["ANCHOR_EVERY_K"] = str(anchor_every_k)
     env["ROUNDS"] = str(rounds)
     env["MIN_CLIENTS"] = str(num_clients)
     env["NUM_NODES"] = str(num_clients)
@@ -158,10 +171,12 @@ def _run_mode(
     rep_dir: Path,
     seed: int,
     rep_label: str,
+    anchor_policy: str = "every",
+    anchor_every_k: int = 5,
 ) -> Path:
     """Executa UMA repetição de FL para o modo dado e devolve o caminho do JSON."""
     rep_dir.mkdir(parents=True, exist_ok=True)
-    log_dir = LOGS_DIR / mode / rep_label
+    log_dir = LOGS_DIR / rep_dir.parent.name / rep_label
 
     metrics_file = rep_dir / "server_metrics.json"
     baseline_target: Optional[Path] = None
@@ -172,11 +187,16 @@ def _run_mode(
         server_cmd = [PYTHON, "-m", "flower_fl.baseline_runner"]
         client_cmd = [PYTHON, "-m", "flower_fl.baseline_runner"]
         client_extra = {"BASELINE_AS_CLIENT": "1"}
+        client_keys = {}
     else:
-        env = _make_base_env(mode, rounds, num_clients, metrics_file, seed)
+        env = _make_base_env(mode, rounds, num_clients, metrics_file, seed,
+                             anchor_policy, anchor_every_k)
         server_cmd = [PYTHON, "-m", "flower_fl.server"]
         client_cmd = [PYTHON, "-m", "flower_fl.client"]
         client_extra = {}
+        # no_ipfs/full com ANCHOR_MODE=client: uma conta por NODE_ID (keypool).
+        from flower_fl.keypool import prepare_client_keys
+        client_keys = prepare_client_keys(num_clients, env)
 
     server_log = log_dir / "server.log"
     server = _spawn(server_cmd, env=env, log_path=server_log)
@@ -188,6 +208,7 @@ def _run_mode(
             c_env = env.copy()
             c_env["NODE_ID"] = str(i)
             c_env.update(client_extra)
+            c_env.update(client_keys.get(i, {}))
             clients.append(_spawn(
                 client_cmd, env=c_env,
                 log_path=log_dir / f"client_{i}.log",
@@ -214,7 +235,7 @@ def _run_mode(
 def _extract_stats(metrics_file: Path) -> Dict[str, float]:
     if not metrics_file.exists():
         print(f"  [WARN] {metrics_file} não encontrado — usando zeros")
-        return {"mean_round_time_s": 0.0, "total_gas_eth": 0.0, "final_accuracy": 0.0}
+        return {"mean_round_time_s": 0.0, "total_gas_eth": 0.0, "final_accuracy": 0.0, "anchor_txs": 0}
 
     with open(metrics_file) as f:
         data = json.load(f)
@@ -252,11 +273,18 @@ def _extract_stats(metrics_file: Path) -> Dict[str, float]:
     else:
         steady_gas = 0.0
 
+    # Txs de ancoragem do modelo global (uma por job em cada round ancorado).
+    anchors = sum(
+        1 for g in data.get("gas_breakdown", [])
+        if g.get("operation") in ("publish_global_model", "publish_checkpoint")
+    )
+
     return {
         "mean_round_time_s": mean_time,
         "total_gas_eth": total_gas,
         "steady_gas_per_round_eth": steady_gas,
         "final_accuracy": final_acc,
+        "anchor_txs": anchors,
     }
 
 
@@ -309,9 +337,12 @@ def _preflight(modes: List[str]) -> List[str]:
             problems.append(
                 f"modos {needs_onchain} precisam de JOB_ADDRS (JobContract deployado) no .env"
             )
+        sim = os.getenv("CHAIN_SIM", "false").strip().lower() == "true"
+        if sim and not Path(os.getenv("GAS_MODEL_FILE", "results/gas_model.json")).exists():
+            problems.append("CHAIN_SIM=true precisa do modelo de gas: rode scripts/calibrate_gas_model.py")
         if not rpc:
             problems.append(f"modos {needs_onchain} precisam de RPC_URL no .env")
-        elif not _rpc_ok(rpc):
+        elif not sim and not _rpc_ok(rpc):
             problems.append(
                 f"modos {needs_onchain} precisam do Hardhat acessível em RPC_URL={rpc} "
                 "(inicie o nó com `npx hardhat node`)"
@@ -328,15 +359,12 @@ def _preflight(modes: List[str]) -> List[str]:
 def _print_table(results: Dict[str, Dict]) -> None:
     headers = ["mode", "time/round (s)", "total_gas (ETH)",
                "steady_gas/round (ETH)", "final_acc"]
-    widths = [10, 20, 28, 28, 20]
+    widths = [24, 20, 28, 28, 20]
     print("  ".join(h.ljust(widths[i]) for i, h in enumerate(headers)))
     print("-" * (sum(widths) + 2 * (len(widths) - 1)))
-    for mode in MODES:
-        if mode not in results:
-            continue
-        s = results[mode]
+    for label, s in results.items():
         cells = [
-            mode,
+            label,
             f"{s['mean_round_time_s']:.2f} ± {s.get('std_round_time_s', 0.0):.2f}",
             f"{s['total_gas_eth']:.8f} ± {s.get('std_total_gas_eth', 0.0):.2e}",
             f"{s.get('steady_gas_per_round_eth', 0.0):.8f} ± "
@@ -346,6 +374,19 @@ def _print_table(results: Dict[str, Dict]) -> None:
         print("  ".join(c.ljust(widths[i]) for i, c in enumerate(cells)))
 
 
+def _print_policy_table(results: Dict[str, Dict], rounds: int) -> None:
+    """Gás da run inteira por política de ancoragem (modos on-chain)."""
+    rows = [(label, s) for label, s in results.items() if s.get("use_onchain")]
+    if not rows:
+        return
+    print(f"\n Gás por run de {rounds} rounds, por política de ancoragem:")
+    for label, s in rows:
+        print(f"  {label:<24} policy={s['anchor_policy']:<15} "
+              f"anchors={s.get('anchor_txs', 0.0):5.1f}  "
+              f"gas/run={s['total_gas_eth']:.8f} ETH  "
+              f"acc={s['final_accuracy']:.4f}")
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description=__doc__,
@@ -363,7 +404,27 @@ def main() -> int:
         "--modes", type=str, default=",".join(MODES),
         help="Modos a executar, separados por vírgula. Default: baseline,no_ipfs,full.",
     )
+    parser.add_argument(
+        "--anchor-policies", type=str, default="every",
+        help=f"Políticas de ancoragem do modelo global ({', '.join(POLICIES)}), "
+             "separadas por vírgula; só afetam os modos on-chain. Default: every.",
+    )
+    parser.add_argument("--anchor-every-k", type=int, default=5,
+                        help="K da política every_k. Default: 5.")
+    parser.add_argument("--chain-snapshot", action="store_true",
+                        help="Nó local: cria/financia o job uma vez, tira um evm_snapshot e "
+                             "reverte antes de cada repetição on-chain (flower_fl/chain_state.py).")
+    parser.add_argument("--sim-chain", action="store_true",
+                        help="CHAIN_SIM=true: gas/latência das txs do modelo calibrado "
+                             "(flower_fl/gas_model.py), sem minerar.")
     args = parser.parse_args()
+    if args.sim_chain:
+        os.environ["CHAIN_SIM"] = "true"  # _make_base_env copia os.environ
+
+    policies = [p.strip() for p in args.anchor_policies.split(",") if p.strip()]
+    for p in policies:
+        if p not in POLICIES:
+            parser.error(f"política desconhecida: {p} (válidas: {POLICIES})")
 
     requested = [m.strip() for m in args.modes.split(",") if m.strip()]
     for m in requested:
@@ -407,20 +468,42 @@ def main() -> int:
         f"reps={args.repetitions}  seeds={seeds}  modes={requested}"
     )
 
+    runs = [
+        (mode, policy)
+        for mode in requested
+        for policy in (policies if MODE_FLAGS[mode][1] else ["every"])
+    ]
+    from flower_fl.dataset_cache import prepare_for_clients
+    prepare_for_clients()
+
+    chain_state = None
+    onchain_modes = [m for m in requested if MODE_FLAGS[m][1]]
+    if args.chain_snapshot and onchain_modes and not args.sim_chain:
+        from flower_fl.chain_state import prepare_chain_state
+        chain_state = prepare_chain_state(
+            args.clients, args.rounds,
+            _make_base_env(onchain_modes[0], args.rounds, args.clients, Path(os.devnull), seeds[0]),
+        )
+
     results: Dict[str, Dict] = {}
-    for mode in requested:
+    for mode, policy in runs:
         use_ipfs, use_onchain = MODE_FLAGS[mode]
+        label = mode if policy == "every" else f"{mode}:{policy}"
         _print_header(
-            f" >> mode={mode}  (USE_IPFS={use_ipfs}, USE_ONCHAIN={use_onchain})"
+            f" >> mode={mode}  (USE_IPFS={use_ipfs}, USE_ONCHAIN={use_onchain}, "
+            f"ANCHOR_POLICY={policy})"
         )
         per_rep: List[Dict] = []
         for k in range(args.repetitions):
             seed = seeds[k]
             rep_label = f"rep{k + 1}"
-            rep_dir = output_dir / mode / rep_label
+            rep_dir = output_dir / label.replace(":", "_") / rep_label
             print(f"   - {rep_label} (seed={seed}) ...")
+            if chain_state is not None and use_onchain:
+                print(f"     evm_revert: {chain_state.revert():.1f}ms")
             metrics_path = _run_mode(
-                mode, args.clients, args.rounds, rep_dir, seed, rep_label
+                mode, args.clients, args.rounds, rep_dir, seed, rep_label,
+                policy, args.anchor_every_k,
             )
             stats = _extract_stats(metrics_path)
             stats["seed"] = seed
@@ -436,7 +519,8 @@ def main() -> int:
         g_mean, g_std = _mean_std([r["total_gas_eth"] for r in per_rep])
         gs_mean, gs_std = _mean_std([r.get("steady_gas_per_round_eth", 0.0) for r in per_rep])
         a_mean, a_std = _mean_std([r["final_accuracy"] for r in per_rep])
-        results[mode] = {
+        n_mean, _ = _mean_std([float(r.get("anchor_txs", 0)) for r in per_rep])
+        results[label] = {
             # As médias mantêm os nomes legados (compat. com plot_ablation).
             "mean_round_time_s": t_mean, "std_round_time_s": t_std,
             "total_gas_eth": g_mean, "std_total_gas_eth": g_std,
@@ -447,6 +531,8 @@ def main() -> int:
             "seeds": seeds,
             "use_ipfs": use_ipfs,
             "use_onchain": use_onchain,
+            "anchor_policy": policy,
+            "anchor_txs": n_mean,
             "per_rep": per_rep,
         }
 
@@ -457,6 +543,10 @@ def main() -> int:
             "repetitions": args.repetitions,
             "seeds": seeds,
             "modes": requested,
+            "anchor_policies": policies,
+            "anchor_every_k": args.anchor_every_k,
+            "chain_snapshot": chain_state.stats() if chain_state is not None else None,
+            "chain": "sim" if args.sim_chain else "real",
             "started": started,
             "finished": datetime.now().isoformat(),
         },
@@ -470,6 +560,8 @@ def main() -> int:
     _print_header(" ABLATION SUMMARY  (mean ± std)")
     print(f" salvo em: {summary_path}\n")
     _print_table(results)
+    if policies != ["every"]:
+        _print_policy_table(results, args.rounds)
 
     # BUG 1 — verificação explícita: no_ipfs deve ter gás real (> 0), distinto
     # do baseline (0), isolando o custo da camada on-chain.
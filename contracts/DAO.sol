@@ -1,16 +1,25 @@
 // SPDX-License-Identifier: UNLICENSED
 pragma solidity ^0.8.20;
 
+import "@openzeppelin/contracts/proxy/Clones.sol";
 import "@openzeppelin/contracts/utils/Address.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 import "./DataTypes.sol";
 import "./Requester.sol";
 import "./Trainer.sol";
 import "./JobContract.sol";
 
 event OfferMade(uint256 indexed offerId, address indexed requester, address indexed trainer);
+// Conteúdo dos campos grandes da oferta; o storage (Trainer, JobContract)
+// guarda só payloadHash = keccak256(abi.encode(description, encryptedMetadata)).
+event OfferPayload(uint256 indexed offerId, bytes32 payloadHash, string description, bytes encryptedMetadata);
 event JobContractCreated(address indexed job, uint256 indexed offerId, address indexed requester, address trainer);
+event TrainerRegistered(address indexed owner, address trainerContract);
+event TrainerTagsChanged(address indexed owner, bytes32[] tagHashes);
+
+contract DAO is ITrainerIndex {
+    using SafeCast for uint256;
 
-contract DAO {
     mapping(address => address) public trainers;
     address[] public registeredTrainers;
 
@@ -19,11 +28,35 @@ contract DAO {
 
     mapping(address => JobContract) jobContracts;
 
+    // Implementações únicas; Trainer, Requester e JobContract são clones
+    // EIP-1167 (proxies mínimos) inicializados na mesma tx.
+    address public immutable trainerImplementation;
+    address public immutable requesterImplementation;
+    address public immutable jobImplementation;
+
     // Monotonic offer id. Replaces the deprecated OpenZeppelin `Counters`
     // library (removed in OZ v5; this repo still pins v4.9.6). A plain uint256
     // with `unchecked { ++UID; }` is cheaper and avoids the dependency.
     uint256 private UID;
 
+    // Índices de matching, mantidos por registerTrainer e Trainer.setTags
+    // (via onTrainerTagsChanged). Chave = dono (wallet) do trainer.
+    uint256 private constant RATING_BUCKET_WIDTH = 10;
+    uint256 private constant MAX_RATING_BUCKET   = 10;
+
+    mapping(bytes32 => address[]) private trainersByTag;
+    mapping(bytes32 => mapping(address => uint256)) private tagSlot;   // posição + 1 em trainersByTag
+    mapping(uint256 => address[]) private trainersByRatingBucket;
+    mapping(address => int) private indexedRating;
+    mapping(address => bytes32) private indexedCpuHash;
+    mapping(address => bytes32) private indexedProcessorHash;
+
+    constructor() {
+        trainerImplementation   = address(new Trainer());
+        requesterImplementation = address(new Requester());
+        jobImplementation       = address(new JobContract());
+    }
+
     function nextID() private returns(uint256) {
        uint256 ID = UID;
        unchecked { ++UID; }
@@ -34,17 +67,43 @@ contract DAO {
         require(
             !isTrainer(msg.sender), "Trainer already registered"
         );
-        Trainer newTrainer = new Trainer(payable(msg.sender), _description, _specification);
+        Trainer newTrainer = Trainer(payable(Clones.clone(trainerImplementation)));
+        newTrainer.initialize(payable(msg.sender), _description, _specification);
         trainers[msg.sender] =  address(newTrainer);
         registeredTrainers.push(msg.sender);
+
+        int trainerRating = newTrainer.rating();
+        indexedRating[msg.sender] = trainerRating;
+        trainersByRatingBucket[ratingBucket(trainerRating)].push(msg.sender);
+        indexedCpuHash[msg.sender] = keccak256(bytes(_specification.cpu));
+        indexedProcessorHash[msg.sender] = keccak256(bytes(_specification.processor));
+
+        emit TrainerRegistered(msg.sender, address(newTrainer));
         return address(newTrainer);
     }
 
+    /// @notice Chamado pelo contrato Trainer em setTags para atualizar o índice tag -> trainers.
+    function onTrainerTagsChanged(address owner, bytes32[] calldata removed, bytes32[] calldata added) external {
+        require(trainers[owner] == msg.sender && msg.sender != address(0), "Only trainer contract");
+        for (uint256 i = 0; i < removed.length; i++) {
+            unindexTag(removed[i], owner);
+        }
+        for (uint256 i = 0; i < added.length; i++) {
+            indexTag(added[i], owner);
+        }
+        emit TrainerTagsChanged(owner, added);
+    }
+
+    function trainersCount() external view returns (uint256) {
+        return registeredTrainers.length;
+    }
+
     function registerRequester ( ) external returns(address){
         require(
             !isRequester(msg.sender), "Requester already registered"
         );
-        Requester newRequester = new Requester(payable(msg.sender));
+        Requester newRequester = Requester(payable(Clones.clone(requesterImplementation)));
+        newRequester.initialize(payable(msg.sender));
         requesters[msg.sender] =  address(newRequester);
         registeredRequesters.push(msg.sender);
         return address(newRequester);
@@ -52,6 +111,196 @@ contract DAO {
 
     /// @notice Returns up to `Requirements.canditatesToReturn` trainers matching
     ///         the given requirements.
+    /// @dev Usa os índices em vez de varrer `registeredTrainers`: percorre só a
+    ///      menor lista candidata — a tag exigida com menos trainers ou, sem
+    ///      tags, os buckets de rating >= minRating — e confere o resto em O(1)
+    ///      por candidato (tagSlot / indexedRating / hashes de spec), sem
+    ///      chamadas externas nem re-hash de tags. Mesmo critério de
+    ///      `matchTrainersScan`; a ordem dos resultados segue a do índice.
+    function matchTrainers (DataTypes.JobRequirements memory Requirements) external view returns(address  [] memory) {
+        address [] memory candidates = new address[](Requirements.canditatesToReturn);
+        bytes32[] memory required = new bytes32[](Requirements.tags.length);
+        for (uint256 i = 0; i < required.length; i++) {
+            required[i] = keccak256(bytes(Requirements.tags[i]));
+        }
+
+        uint256 candidatesCount = 0;
+        if (required.length > 0) {
+            bytes32 smallest = required[0];
+            for (uint256 i = 1; i < required.length; i++) {
+                if (trainersByTag[required[i]].length < trainersByTag[smallest].length) {
+                    smallest = required[i];
+                }
+            }
+            candidatesCount = scanPool(trainersByTag[smallest], Requirements, required, candidates, candidatesCount);
+        } else if (Requirements.minRating > 0) {
+            for (
+                uint256 bucket = ratingBucket(int(Requirements.minRating));
+                bucket <= MAX_RATING_BUCKET && candidatesCount < candidates.length;
+                bucket++
+            ) {
+                candidatesCount = scanPool(trainersByRatingBucket[bucket], Requirements, required, candidates, candidatesCount);
+            }
+        } else {
+            candidatesCount = scanPool(registeredTrainers, Requirements, required, candidates, candidatesCount);
+        }
+        return candidates;
+    }
+
+    /// @notice Matching paginado sobre `registeredTrainers`: examina no máximo
+    ///         `maxScan` trainers a partir de `cursor` (custo limitado por
+    ///         chamada) e devolve os matches encontrados e o próximo cursor.
+    ///         `nextCursor == trainersCount()` indica fim do registro.
+    /// @dev Mesmo critério de `matchTrainers` (checagens O(1) pelos índices);
+    ///      `registeredTrainers` só cresce, então o cursor é estável entre chamadas.
+    function matchTrainersFrom(
+        DataTypes.JobRequirements memory Requirements,
+        uint256 cursor,
+        uint256 maxScan
+    ) external view returns (address[] memory matches, uint256 nextCursor) {
+        bytes32[] memory required = new bytes32[](Requirements.tags.length);
+        for (uint256 i = 0; i < required.length; i++) {
+            required[i] = keccak256(bytes(Requirements.tags[i]));
+        }
+        bytes32 descHash = bytes(Requirements.description).length > 0
+            ? keccak256(bytes(Requirements.description))
+            : bytes32(0);
+
+        uint256 total = registeredTrainers.length;
+        uint256 end = cursor >= total || maxScan > total - cursor ? total : cursor + maxScan;
+        address[] memory found = new address[](Requirements.canditatesToReturn);
+        uint256 count = 0;
+        nextCursor = cursor < end ? cursor : end;
+        while (nextCursor < end && count < found.length) {
+            address trainerAddr = registeredTrainers[nextCursor];
+            if (isIndexedMatch(trainerAddr, Requirements.minRating, required, descHash)) {
+                found[count] = trainerAddr;
+                count = count + 1;
+            }
+            nextCursor = nextCursor + 1;
+        }
+        matches = new address[](count);
+        for (uint256 i = 0; i < count; i++) {
+            matches[i] = found[i];
+        }
+    }
+
+    /// @notice Trainers `[offset, offset+limit)` do registro com seus contratos, mais o total.
+    function getTrainersRange(uint256 offset, uint256 limit)
+        external view returns (address[] memory owners, address[] memory contracts, uint256 total)
+    {
+        total = registeredTrainers.length;
+        (owners, contracts) = registryRange(registeredTrainers, trainers, offset, limit);
+    }
+
+    /// @notice Requesters `[offset, offset+limit)` do registro com seus contratos, mais o total.
+    function getRequestersRange(uint256 offset, uint256 limit)
+        external view returns (address[] memory owners, address[] memory contracts, uint256 total)
+    {
+        total = registeredRequesters.length;
+        (owners, contracts) = registryRange(registeredRequesters, requesters, offset, limit);
+    }
+
+    function requestersCount() external view returns (uint256) {
+        return registeredRequesters.length;
+    }
+
+    function registryRange(
+        address[] storage registry,
+        mapping(address => address) storage byOwner,
+        uint256 offset,
+        uint256 limit
+    ) internal view returns (address[] memory owners, address[] memory contracts) {
+        uint256 total = registry.length;
+        uint256 start = offset > total ? total : offset;
+        uint256 end = limit > total - start ? total : start + limit;
+        owners = new address[](end - start);
+        contracts = new address[](end - start);
+        for (uint256 i = start; i < end; i++) {
+            owners[i - start] = registry[i];
+            contracts[i - start] = byOwner[registry[i]];
+        }
+    }
+
+    function scanPool(
+        address[] storage pool,
+        DataTypes.JobRequirements memory Requirements,
+        bytes32[] memory required,
+        address[] memory candidates,
+        uint256 candidatesCount
+    ) internal view returns (uint256) {
+        bytes32 descHash = bytes(Requirements.description).length > 0
+            ? keccak256(bytes(Requirements.description))
+            : bytes32(0);
+        for (uint256 i = 0; i < pool.length && candidatesCount < candidates.length; i++) {
+            address trainerAddr = pool[i];
+            if (isIndexedMatch(trainerAddr, Requirements.minRating, required, descHash)) {
+                candidates[candidatesCount] = trainerAddr;
+                candidatesCount = candidatesCount + 1;
+            }
+        }
+        return candidatesCount;
+    }
+
+    function isIndexedMatch(
+        address trainerAddr,
+        uint256 minRating,
+        bytes32[] memory required,
+        bytes32 descHash
+    ) internal view returns (bool) {
+        if (minRating > 0 && indexedRating[trainerAddr] < int(minRating)) {
+            return false;
+        }
+        for (uint256 i = 0; i < required.length; i++) {
+            if (tagSlot[required[i]][trainerAddr] == 0) {
+                return false;
+            }
+        }
+        if (
+            descHash != bytes32(0) &&
+            descHash != indexedCpuHash[trainerAddr] &&
+            descHash != indexedProcessorHash[trainerAddr]
+        ) {
+            return false;
+        }
+        return true;
+    }
+
+    function ratingBucket(int rating) internal pure returns (uint256) {
+        if (rating <= 0) {
+            return 0;
+        }
+        uint256 bucket = uint256(rating) / RATING_BUCKET_WIDTH;
+        return bucket > MAX_RATING_BUCKET ? MAX_RATING_BUCKET : bucket;
+    }
+
+    function indexTag(bytes32 tagHash, address trainerAddr) internal {
+        if (tagSlot[tagHash][trainerAddr] != 0) {
+            return;
+        }
+        trainersByTag[tagHash].push(trainerAddr);
+        tagSlot[tagHash][trainerAddr] = trainersByTag[tagHash].length;
+    }
+
+    function unindexTag(bytes32 tagHash, address trainerAddr) internal {
+        uint256 slot = tagSlot[tagHash][trainerAddr];
+        if (slot == 0) {
+            return;
+        }
+        address[] storage pool = trainersByTag[tagHash];
+        address last = pool[pool.length - 1];
+        pool[slot - 1] = last;
+        tagSlot[tagHash][last] = slot;
+        pool.pop();
+        delete tagSlot[tagHash][trainerAddr];
+    }
+
+    function trainersWithTag(string calldata tag) external view returns (uint256) {
+        return trainersByTag[keccak256(bytes(tag))].length;
+    }
+
+    /// @notice Caminho legado (varredura linear), mantido para comparação em
+    ///         scripts/load_test_matching.ts. Use `matchTrainers`.
     /// @dev SCALABILITY NOTE: this performs a linear O(n) scan over
     ///      `registeredTrainers`, and for each candidate calls `isMatch`, which
     ///      itself loops over the required tags — so the worst case is
@@ -62,7 +311,7 @@ contract DAO {
     ///      results/matching_load_test.json). For thousands of trainers this is
     ///      the dominant matching-phase bottleneck; an indexed/off-chain index
     ///      would be required to scale.
-    function matchTrainers (DataTypes.JobRequirements memory Requirements) external view returns(address  [] memory) {
+    function matchTrainersScan (DataTypes.JobRequirements memory Requirements) external view returns(address  [] memory) {
         address [] memory candidates = new address[](Requirements.canditatesToReturn);
         uint256 candidatesCount = 0;
         uint256 i = 0;
@@ -120,7 +369,7 @@ contract DAO {
     }
 
     function MakeOffer(
-        string memory description,
+        string calldata description,
         bytes32 modelCIDHash,
         bytes32 serverEndpointHash,
         bytes calldata encryptedMetadata,
@@ -134,20 +383,37 @@ contract DAO {
 
         (address trainerWallet, Trainer trainer) = resolveTrainer(trainerCandidate);
 
+        // description/encryptedMetadata não são copiados para storage em
+        // nenhum contrato: só o hash, e o conteúdo vai no evento OfferPayload.
         DataTypes.Offer memory offer;
         offer.ID              = nextID();
-        offer.description     = description;
         offer.modelCIDHash    = modelCIDHash;
         offer.serverEndpointHash = serverEndpointHash;
-        offer.encryptedMetadata = encryptedMetadata;
-        offer.valueByUpdate   = valueByUpdate;
-        offer.numberOfUpdates = numberOfUpdates;
+        offer.payloadHash     = offerPayloadHash(description, encryptedMetadata);
+        offer.valueByUpdate   = valueByUpdate.toUint96();
+        offer.numberOfUpdates = numberOfUpdates.toUint64();
         offer.offerMaker      = msg.sender;
         offer.trainer         = trainerWallet;
 
         trainer.newOffer(offer);
 
         emit OfferMade(offer.ID, msg.sender, trainerWallet);
+        emitOfferPayload(offer.ID, offer.payloadHash, description, encryptedMetadata);
+    }
+
+    function offerPayloadHash(string calldata description, bytes calldata encryptedMetadata) internal pure returns (bytes32) {
+        return keccak256(abi.encode(description, encryptedMetadata));
+    }
+
+    // Em função própria: os quatro campos dinâmicos de calldata somados aos
+    // parâmetros de MakeOffer estourariam a pilha.
+    function emitOfferPayload(
+        uint256 offerId,
+        bytes32 payloadHash,
+        string calldata description,
+        bytes calldata encryptedMetadata
+    ) internal {
+        emit OfferPayload(offerId, payloadHash, description, encryptedMetadata);
     }
 
     function getPendingOffers() external view returns(uint256 [] memory) {
@@ -158,6 +424,15 @@ contract DAO {
         return trainer.getPendingOffers(); // Agora retorna uint256[]
     }
 
+    /// @notice Versão paginada de getPendingOffers (custo limitado por `limit`).
+    function getPendingOffersPage(uint256 offset, uint256 limit) external view returns (uint256[] memory ids, uint256 total) {
+        require(
+            isTrainer(msg.sender), "Just registered trainners can check pending offer"
+        );
+        Trainer trainer = Trainer(payable(trainers[msg.sender]));
+        return trainer.getPendingOffersPage(offset, limit);
+    }
+
     function AcceptOffer(uint256 offerID) external {
         require(
             isTrainer(msg.sender), "Just registered trainners can accept an offer"
@@ -168,9 +443,12 @@ contract DAO {
         DataTypes.Offer memory offer = trainer.acceptOffer(offerID);
         if (offer.offerMaker != address(0)) {
             Requester offerMaker = Requester(payable(requesters[offer.offerMaker])); // Correção de casting
-            JobContract newContract = new JobContract(offer);
+            JobContract newContract = JobContract(Clones.clone(jobImplementation));
 
+            // Emitido antes do initialize (que loga `Initialized`): o
+            // JobContractCreated continua sendo o primeiro log da tx.
             emit JobContractCreated(address(newContract), offer.ID, offer.offerMaker, offer.trainer);
+            newContract.initialize(offer);
             offerMaker.newContract(newContract);
             trainer.newContract(newContract);
 
@@ -212,6 +490,34 @@ contract DAO {
         job.releaseToTrainer(recipient);
     }
 
+    /// @notice `releaseJobPayment` de vários jobs numa só tx. Jobs sem saldo
+    ///         liberado (`availableAmount() == 0`) ou com depósito insuficiente
+    ///         para ele (saldo/`lockedAmount()` abaixo de `availableAmount()`,
+    ///         p.ex. updates gravados antes do `signJobContract` do offerMaker)
+    ///         são pulados em vez de reverter o lote; job desconhecido ou sem
+    ///         permissão reverte tudo. Cada `releaseToTrainer` continua
+    ///         `nonReentrant` no seu job e emite o seu `PayoutReleased`.
+    /// @return released quantos jobs pagaram
+    /// @return total    soma paga (wei)
+    function releaseJobPayments(address[] calldata addrContracts, address payable recipient)
+        external
+        returns (uint256 released, uint256 total)
+    {
+        for (uint256 i = 0; i < addrContracts.length; i++) {
+            require(isJob(addrContracts[i]), "Job Contract not found");
+            JobContract job = jobContracts[addrContracts[i]];
+            require(
+                msg.sender == job.offerMakerAddr() || msg.sender == job.trainerAddr(),
+                "Unauthorized release"
+            );
+            uint256 amount = job.availableAmount();
+            if (amount > 0 && amount <= job.lockedAmount() && amount <= addrContracts[i].balance) {
+                total += job.releaseToTrainer(recipient);
+                released++;
+            }
+        }
+    }
+
     function publishGlobalModel(address addrContract, bytes32 cidHash, bytes calldata encryptedCid) external {
         require(isJob(addrContract), "Job Contract not found");
         JobContract job = jobContracts[addrContract];
@@ -240,6 +546,21 @@ contract DAO {
         job.recordClientUpdate(cidHash, encryptedCid);
     }
 
+    function recordClientUpdateBatch(
+        address addrContract,
+        bytes32 merkleRoot,
+        uint256 batchSize,
+        bytes calldata encryptedPointer
+    ) external {
+        require(isJob(addrContract), "Job Contract not found");
+        JobContract job = jobContracts[addrContract];
+        require(
+            msg.sender == job.trainerAddr() || msg.sender == job.offerMakerAddr(),
+            "Unauthorized reporter"
+        );
+        job.recordClientUpdateBatch(merkleRoot, batchSize, encryptedPointer);
+    }
+
     function isTrainer(address trainer) internal view returns (bool){
         return (trainers[trainer] != address(0));
     }
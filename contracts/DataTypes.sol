@@ -43,16 +43,21 @@ library DataTypes {
         string cpu;
     }
 
+    /// @notice Oferta como fica em storage (Trainer.pendingOffers) e como é
+    ///         repassada ao JobContract. Os campos grandes — `description` e
+    ///         `encryptedMetadata` (pode ter KB) — entram só pelo compromisso
+    ///         `payloadHash = keccak256(abi.encode(description, encryptedMetadata))`;
+    ///         o conteúdo vai no evento OfferPayload de DAO.MakeOffer.
+    ///         Empacotada em 6 slots (papéis dividem slot com os valores).
     struct Offer {
         uint256 ID;
-        string description;
         bytes32 modelCIDHash;
         bytes32 serverEndpointHash;
-        bytes encryptedMetadata;
-        uint256 valueByUpdate;
-        uint256 numberOfUpdates;
+        bytes32 payloadHash;
         address offerMaker;
+        uint96 valueByUpdate;
         address trainer;
+        uint64 numberOfUpdates;
     }
 
     struct JobRequirements {
@@ -1,32 +1,58 @@
 // SPDX-License-Identifier: UNLICENSED
 pragma solidity ^0.8.20;
 
+import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 import "@openzeppelin/contracts/security/ReentrancyGuard.sol";
+import "@openzeppelin/contracts/utils/cryptography/MerkleProof.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 
 import "./DataTypes.sol";
 
-contract JobContract is ReentrancyGuard {
-    string private description;
-    uint256 private valueByUpdate;
-    uint256 private numberOfUpdates;
-    uint256 private updatesDone;
-
-    bytes32 public initialModelHash;
-    bytes32 public initialServerEndpointHash;
-    bytes public initialMetadata;
-
-    bytes32 public latestModelHash;
+contract JobContract is Initializable, ReentrancyGuard {
+    using SafeCast for uint256;
 
+    // Layout empacotado. recordClientUpdate roda a cada round para cada
+    // cliente: tudo que ele lê/escreve (contadores, Status, saldo liberado)
+    // fica no mesmo slot, e cada endereço de papel divide slot com um valor.
+    // Os slots 0 e 1 são das bases: Initializable (_initialized |
+    // _initializing) e ReentrancyGuard (_status, uint256).
+    //   slot 2: updatesDone | numberOfUpdates | Status | storeUpdateHashes | available
+    //   slot 3: offerMaker | valueByUpdate
+    //   slot 4: trainer    | locked
+    //   slot 5: DAOManager | offerId
+    uint64 private updatesDone;
+    uint64 private numberOfUpdates;
     DataTypes.Status public Status;
+    bool public storeUpdateHashes;
+    uint112 private available;
+
     address public offerMaker;
+    uint96 private valueByUpdate;
+
     address public trainer;
+    uint96 private locked;
+
     address public DAOManager;
+    uint96 public offerId;
 
-    uint256 public lockedAmount;
-    uint256 public availableAmount;
+    bytes32 public latestModelHash;
+    bytes32 public initialModelHash;
+    bytes32 public initialServerEndpointHash;
+    // keccak256(abi.encode(description, encryptedMetadata)) da oferta; o
+    // conteúdo está no evento OfferPayload(offerId, ...) do DAO.
+    bytes32 public offerPayloadHash;
 
     bytes32[] public clientUpdateHashes;
+    // Checagem de duplicata: continua um slot novo por hash distinto (~22k de
+    // gas). Não há estrutura exata mais barata para chaves bytes32 arbitrárias
+    // (um bitmap indexado pelo hash também cai num slot novo por update, e um
+    // bitmap truncado rejeitaria updates legítimos por colisão); o ganho do
+    // modo só-eventos (storeUpdateHashes = false) vem de não crescer
+    // `clientUpdateHashes`.
     mapping(bytes32 => bool) public receivedUpdate;
+    // Contas de clientes autorizadas pelo offerMaker a ancorar updates (uma
+    // por NODE_ID, ver flower_fl/keypool.py), além dos três papéis fixos.
+    mapping(address => bool) public isReporter;
 
     event FundsLocked(uint256 amount);
     event ClientUpdateRecorded(
@@ -36,61 +62,176 @@ contract JobContract is ReentrancyGuard {
         uint256 escrowedAmount,
         bytes encryptedPointer
     );
+    event ClientUpdateBatchRecorded(
+        bytes32 indexed merkleRoot,
+        address indexed caller,
+        uint256 batchSize,
+        uint256 updatesDone,
+        uint256 escrowedAmount,
+        bytes encryptedPointer
+    );
     event GlobalModelUpdated(bytes32 indexed modelHash, uint256 updatesDone, bytes encryptedPointer);
     event PayoutReleased(address indexed to, uint256 value);
+    event ReportersUpdated(address[] reporters, bool enabled);
 
     modifier onlyDAO {
         require(msg.sender == DAOManager, "Only DAO");
         _;
     }
 
+    // offerMaker primeiro: é o signer usual do servidor e o slot já é lido
+    // para valueByUpdate em seguida.
     modifier onlyAuthorizedReporter {
         require(
-            msg.sender == DAOManager || msg.sender == offerMaker || msg.sender == trainer,
+            msg.sender == offerMaker || msg.sender == trainer || msg.sender == DAOManager,
+            "Not authorized"
+        );
+        _;
+    }
+
+    // Só recordClientUpdate: um reporter (chave de cliente) ancora o próprio
+    // update, mas não publica o modelo global nem credita lotes. O mapping só
+    // é consultado quando o caller não é um dos três papéis fixos.
+    modifier onlyParticipantOrReporter {
+        require(
+            msg.sender == offerMaker || msg.sender == trainer || msg.sender == DAOManager
+                || isReporter[msg.sender],
             "Not authorized"
         );
         _;
     }
 
-    constructor(DataTypes.Offer memory offer) {
+    // Implementação dos clones EIP-1167 criados pelo DAO; não é inicializável.
+    // (Num clone o ReentrancyGuard começa com _status = 0, tratado como livre.)
+    constructor() {
+        _disableInitializers();
+    }
+
+    function initialize(DataTypes.Offer calldata offer) external initializer {
         DAOManager = msg.sender;
+        offerId = offer.ID.toUint96();
         offerMaker = offer.offerMaker;
         trainer = offer.trainer;
-        description = offer.description;
         valueByUpdate = offer.valueByUpdate;
         numberOfUpdates = offer.numberOfUpdates;
         initialModelHash = offer.modelCIDHash;
         initialServerEndpointHash = offer.serverEndpointHash;
-        initialMetadata = offer.encryptedMetadata;
-        updatesDone = 0;
-        lockedAmount = 0;
-        availableAmount = 0;
+        offerPayloadHash = offer.payloadHash;
+        storeUpdateHashes = true;
         Status = DataTypes.Status.WaitingSignatures;
     }
 
     function totalAmount() public view returns (uint256) {
-        return (valueByUpdate * numberOfUpdates);
+        return uint256(valueByUpdate) * numberOfUpdates;
+    }
+
+    function lockedAmount() public view returns (uint256) {
+        return locked;
+    }
+
+    function availableAmount() public view returns (uint256) {
+        return available;
+    }
+
+    /// @notice Com `false`, os hashes de update ficam só nos eventos
+    ///         (ClientUpdateRecorded / ClientUpdateBatchRecorded) e
+    ///         `clientUpdateHashes` não cresce; a checagem de duplicata continua
+    ///         via `receivedUpdate`. Só o offerMaker, antes do primeiro update.
+    function setStoreUpdateHashes(bool enabled) external {
+        require(msg.sender == offerMaker, "Only offer maker");
+        require(updatesDone == 0, "Updates already recorded");
+        storeUpdateHashes = enabled;
+    }
+
+    /// @notice Autoriza (ou revoga) contas de clientes a chamar
+    ///         recordClientUpdate. recordClientUpdateBatch e publishGlobalModel
+    ///         continuam restritos a offerMaker, trainer e DAO. Só o offerMaker.
+    function setReporters(address[] calldata reporters, bool enabled) external {
+        require(msg.sender == offerMaker, "Only offer maker");
+        for (uint256 i = 0; i < reporters.length; i++) {
+            isReporter[reporters[i]] = enabled;
+        }
+        emit ReportersUpdated(reporters, enabled);
+    }
+
+    function remainingUpdates() external view returns (uint256) {
+        return numberOfUpdates - updatesDone;
     }
 
     function deposit() external payable onlyDAO {
-        lockedAmount += msg.value;
-        require(lockedAmount <= totalAmount(), "Deposit exceeds contract value");
+        uint256 newLocked = uint256(locked) + msg.value;
+        require(newLocked <= totalAmount(), "Deposit exceeds contract value");
+        locked = newLocked.toUint96();
         emit FundsLocked(msg.value);
     }
 
-    function recordClientUpdate(bytes32 cidHash, bytes calldata encryptedCid) external onlyAuthorizedReporter {
+    function recordClientUpdate(bytes32 cidHash, bytes calldata encryptedCid) external onlyParticipantOrReporter {
         require(!receivedUpdate[cidHash], "Update already recorded");
-        require(updatesDone < numberOfUpdates, "All updates completed");
+        uint64 done = updatesDone;
+        require(done < numberOfUpdates, "All updates completed");
 
         receivedUpdate[cidHash] = true;
-        clientUpdateHashes.push(cidHash);
-        updatesDone += 1;
-        availableAmount += valueByUpdate;
-        if (updatesDone == numberOfUpdates) {
+        if (storeUpdateHashes) {
+            clientUpdateHashes.push(cidHash);
+        }
+        done += 1;
+        uint256 newAvailable = uint256(available) + valueByUpdate;
+        updatesDone = done;
+        available = newAvailable.toUint112();
+        if (done == numberOfUpdates) {
             Status = DataTypes.Status.Fulfilled;
         }
 
-        emit ClientUpdateRecorded(cidHash, msg.sender, updatesDone, availableAmount, encryptedCid);
+        emit ClientUpdateRecorded(cidHash, msg.sender, done, newAvailable, encryptedCid);
+    }
+
+    /// @notice Ancora UMA raiz de Merkle cobrindo `batchSize` updates de clientes
+    ///         do mesmo round, creditando `updatesDone` pelo tamanho do lote.
+    /// @dev Folha = keccak256(abi.encodePacked(cidHash)), com cidHash =
+    ///      keccak256(cid); pares ordenados (MerkleProof do OpenZeppelin). Só a
+    ///      raiz vai para `receivedUpdate`/`clientUpdateHashes`; os ponteiros
+    ///      individuais viajam em `encryptedPointer` (ver flower_fl/merkle.py).
+    ///      O contrato não vê as folhas: a checagem de duplicata vale só para a
+    ///      raiz, e um cidHash já creditado (avulso ou em outro lote) é creditado
+    ///      de novo se entrar numa raiz nova. Deduplicar as folhas é papel de
+    ///      quem monta o lote (o servidor em flower_fl/server.py faz isso).
+    function recordClientUpdateBatch(
+        bytes32 merkleRoot,
+        uint256 batchSize,
+        bytes calldata encryptedPointer
+    ) external onlyAuthorizedReporter {
+        require(batchSize > 0, "Empty batch");
+        require(!receivedUpdate[merkleRoot], "Update already recorded");
+        uint256 done = updatesDone;
+        require(done < numberOfUpdates, "All updates completed");
+        require(done + batchSize <= numberOfUpdates, "Batch exceeds remaining updates");
+
+        receivedUpdate[merkleRoot] = true;
+        if (storeUpdateHashes) {
+            clientUpdateHashes.push(merkleRoot);
+        }
+        done += batchSize;
+        uint256 newAvailable = uint256(available) + uint256(valueByUpdate) * batchSize;
+        updatesDone = uint64(done);
+        available = newAvailable.toUint112();
+        if (done == numberOfUpdates) {
+            Status = DataTypes.Status.Fulfilled;
+        }
+
+        emit ClientUpdateBatchRecorded(merkleRoot, msg.sender, batchSize, done, newAvailable, encryptedPointer);
+    }
+
+    /// @notice Verifica a prova de inclusão de um update (cidHash) em um lote
+    ///         previamente ancorado por `recordClientUpdateBatch`.
+    function verifyBatchedUpdate(
+        bytes32 merkleRoot,
+        bytes32 cidHash,
+        bytes32[] calldata proof
+    ) external view returns (bool) {
+        if (!receivedUpdate[merkleRoot]) {
+            return false;
+        }
+        return MerkleProof.verifyCalldata(proof, merkleRoot, keccak256(abi.encodePacked(cidHash)));
     }
 
     function publishGlobalModel(bytes32 cidHash, bytes calldata encryptedCid) external onlyAuthorizedReporter {
@@ -103,12 +244,12 @@ contract JobContract is ReentrancyGuard {
             recipient = payable(trainer);
         }
 
-        uint256 amount = availableAmount;
+        uint256 amount = available;
         require(amount > 0, "No funds available");
         require(amount <= address(this).balance, "Insufficient balance");
 
-        availableAmount = 0;
-        lockedAmount -= amount;
+        available = 0;
+        locked = (uint256(locked) - amount).toUint96();
 
         (bool ok, ) = recipient.call{value: amount}("");
         require(ok, "Transfer failed");
@@ -152,8 +293,4 @@ contract JobContract is ReentrancyGuard {
     function getInitialServerEndpointHash() public view returns (bytes32) {
         return initialServerEndpointHash;
     }
-
-    function getInitialMetadata() external view returns (bytes memory) {
-        return initialMetadata;
-    }
 }
\ No newline at end of file
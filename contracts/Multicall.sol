@@ -0,0 +1,32 @@
+// SPDX-License-Identifier: UNLICENSED
+pragma solidity ^0.8.20;
+
+/// @notice Agrega várias chamadas view (em contratos quaisquer) num único
+///         `eth_call` — subconjunto do Multicall3 usado por flower_fl/multicall.py.
+/// @dev As chamadas são `staticcall` feitas PELO Multicall: getters que dependem
+///      de `msg.sender` (ex.: DAO.getPendingOffers) não funcionam por aqui.
+contract Multicall {
+    struct Call {
+        address target;
+        bool allowFailure;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    function aggregate(Call[] calldata calls) external view returns (Result[] memory results) {
+        results = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (bool ok, bytes memory ret) = calls[i].target.staticcall(calls[i].callData);
+            require(ok || calls[i].allowFailure, "Multicall: call failed");
+            results[i] = Result(ok, ret);
+        }
+    }
+
+    function getBlockNumber() external view returns (uint256) {
+        return block.number;
+    }
+}
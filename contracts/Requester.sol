@@ -1,12 +1,13 @@
 // SPDX-License-Identifier: UNLICENSED
 pragma solidity ^0.8.20;
 
+import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 import "@openzeppelin/contracts/utils/Counters.sol";
 
 import "./DataTypes.sol";
 import "./JobContract.sol";
 
-contract Requester {
+contract Requester is Initializable {
     address public owner;
     address public DAOManager;
     DataTypes.Evaluation[]  public  evaluations;
@@ -27,7 +28,12 @@ contract Requester {
       _;
     }
 
-    constructor(address payable ownerAddress) {
+    // Implementação dos clones EIP-1167 criados pelo DAO; não é inicializável.
+    constructor() {
+        _disableInitializers();
+    }
+
+    function initialize(address payable ownerAddress) external initializer {
         DAOManager    = msg.sender;
         owner         = ownerAddress;
     }
@@ -1,18 +1,31 @@
 // SPDX-License-Identifier: UNLICENSED
 pragma solidity ^0.8.20;
+import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
+
 import "./DataTypes.sol";
 import "./JobContract.sol";
 
-contract Trainer {
+/// @notice Gancho do DAO para manter os índices de matching (tag-hash -> trainers).
+interface ITrainerIndex {
+    function onTrainerTagsChanged(address owner, bytes32[] calldata removed, bytes32[] calldata added) external;
+}
+
+contract Trainer is Initializable {
     string   public      description;
     string[] public      tags;
+    // keccak256 de cada tag, pré-calculado em setTags (o matching não re-hasheia strings).
+    bytes32[] public     tagHashes;
     int      public      rating;
     DataTypes.Evaluation[]  public  evaluations;
     DataTypes.Specification public  specification;
     string public dataPreviewCID;
 
     uint256[] internal pendingOffersIDs;
+    // Só campos de tamanho fixo (6 slots): description/encryptedMetadata
+    // ficam no evento OfferPayload do DAO, aqui só o hash deles.
     mapping(uint256 => DataTypes.Offer) private pendingOffers;
+    // posição + 1 de cada oferta em pendingOffersIDs (0 = ausente): remoção O(1).
+    mapping(uint256 => uint256) private pendingOfferSlot;
 
     address[] internal jobsAddress;
     mapping(address => JobContract) private jobContracts;
@@ -20,7 +33,12 @@ contract Trainer {
     address public owner;
     address public DAO;
 
-    constructor(address payable ownerAddress, string memory _description, DataTypes.Specification memory _specification) {
+    // Implementação dos clones EIP-1167 criados pelo DAO; não é inicializável.
+    constructor() {
+        _disableInitializers();
+    }
+
+    function initialize(address payable ownerAddress, string memory _description, DataTypes.Specification memory _specification) external initializer {
         DAO    = msg.sender;
         owner         = ownerAddress;
         description   = _description;
@@ -43,10 +61,21 @@ contract Trainer {
     }
 
     function setTags (string[] memory  _tags) external onlyOwner {
+        bytes32[] memory removed = tagHashes;
+        bytes32[] memory added = new bytes32[](_tags.length);
+        for (uint256 i = 0; i < _tags.length; i++) {
+            added[i] = keccak256(bytes(_tags[i]));
+        }
         tags = _tags;
+        tagHashes = added;
+        ITrainerIndex(DAO).onTrainerTagsChanged(owner, removed, added);
+    }
+
+    function getTagHashes() external view returns (bytes32[] memory) {
+        return tagHashes;
     }
 
-    function newOffer(DataTypes.Offer memory offer) external onlyDAO {
+    function newOffer(DataTypes.Offer calldata offer) external onlyDAO {
         insertOffer(offer);
     }
 
@@ -67,6 +96,25 @@ contract Trainer {
     return pendingOffersIDs;
     }
 
+    /// @notice Página [offset, offset+limit) dos IDs pendentes, mais o total.
+    /// @dev A remoção é swap-and-pop: aceitar ofertas entre duas páginas move
+    ///      a última oferta para a posição liberada.
+    function getPendingOffersPage(uint256 offset, uint256 limit) external view onlyDAO returns (uint256[] memory ids, uint256 total) {
+        total = pendingOffersIDs.length;
+        if (offset >= total) {
+            return (new uint256[](0), total);
+        }
+        uint256 end = limit > total - offset ? total : offset + limit;
+        ids = new uint256[](end - offset);
+        for (uint256 i = offset; i < end; i++) {
+            ids[i - offset] = pendingOffersIDs[i];
+        }
+    }
+
+    function getPendingOffersCount() external view returns (uint256) {
+        return pendingOffersIDs.length;
+    }
+
     function containsOffer(uint256 offerID) public view returns (bool){
         return (pendingOffers[offerID].trainer != address(0));
     }
@@ -81,9 +129,10 @@ contract Trainer {
     }
 
     //FUNÇÕES AUXILIARES
-    function insertOffer(DataTypes.Offer memory offer) internal {
+    function insertOffer(DataTypes.Offer calldata offer) internal {
         pendingOffers[offer.ID] = offer;
         pendingOffersIDs.push(offer.ID);
+        pendingOfferSlot[offer.ID] = pendingOffersIDs.length;
         // console.log("insertOffer:" , offer.ID, " Count pending offers =", pendingOffersIDs.length); // Removido
     }
 
@@ -94,20 +143,15 @@ contract Trainer {
     }
 
     function deleteOffer(uint256 offerID) internal {
-        uint256 idxOffer = 0;
-        bool    bFound   = false;
-        while ((idxOffer < pendingOffersIDs.length) && (!bFound)){
-            if (pendingOffersIDs[idxOffer] == offerID) {
-                bFound = true;
-                break;
-            }
-            idxOffer++;
-        }
-
-        if (bFound) {
-            pendingOffersIDs[idxOffer] = pendingOffersIDs[pendingOffersIDs.length-1];
-            pendingOffersIDs.pop();
-            delete pendingOffers[offerID];
+        uint256 slot = pendingOfferSlot[offerID];
+        if (slot == 0) {
+            return;
         }
+        uint256 lastID = pendingOffersIDs[pendingOffersIDs.length - 1];
+        pendingOffersIDs[slot - 1] = lastID;
+        pendingOfferSlot[lastID] = slot;
+        pendingOffersIDs.pop();
+        delete pendingOfferSlot[offerID];
+        delete pendingOffers[offerID];
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,140 @@
+"""Ancoragem de cliente sem esperar o receipt (ANCHOR_ASYNC=true).
+
+Com ANCHOR_MODE=client, ``MNISTClient.fit`` esperava o receipt de
+``recordClientUpdate`` antes de devolver os pesos ao Flower: o tempo de
+confirmação entrava no caminho crítico de todo round. `AsyncAnchorer`
+separa as duas metades:
+
+- `submit` (thread do fit) assina e envia a tx e devolve o hash na hora;
+- uma thread de confirmação espera os receipts, na ordem de envio, e guarda
+  latência (envio -> receipt), gas e falhas;
+- `drain` entrega o que já foi confirmado — o cliente reporta nas métricas
+  do round seguinte — e `flush` espera as pendentes (último round e saída).
+
+Nonces: a conta é de um só cliente (keypool; `signer` é obrigatório — com a
+PRIVATE_KEY compartilhada cada processo reservaria os mesmos nonces, e o
+cliente usa o envio síncrono) e só a thread do fit envia, então o nonce é
+reservado localmente (``pending`` na primeira tx, +1 a cada envio) e as txs de rounds consecutivos entram em ordem mesmo que a anterior ainda não
+tenha minerado. Se um envio falhar ou um receipt não chegar no prazo (tx
+descartada), o contador é relido do nó antes do próximo envio, para não
+deixar buracos de nonce travando as txs seguintes. Uma tx revertida consome o
+nonce normalmente e só é contada como falha.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+
+class AnchorResult(NamedTuple):
+    round: int
+    tx_hash: str
+    status: int            # 1 ok, 0 revertida, -1 sem receipt (timeout/erro)
+    gas_used: int
+    gas_eth: float
+    latency_s: float       # envio -> receipt
+    error: str
+
+
+class AsyncAnchorer:
+    def __init__(self, job_addr: str, signer, *, receipt_timeout: float = 120.0):
+        if signer is None:
+            raise ValueError("AsyncAnchorer exige a conta própria do cliente (CLIENT_PRIVATE_KEY)")
+        from . import onchain_job  # import tardio: exige RPC_URL/PRIVATE_KEY/JOB_ABI_PATH
+
+        self._oj = onchain_job
+        self.job_addr = job_addr
+        self.signer = signer
+        self.address = signer.address
+        self.receipt_timeout = receipt_timeout
+        self._nonce: Optional[int] = None
+        self._pending = 0
+        self._done: List[AnchorResult] = []
+        self._cond = threading.Condition()
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="anchor-confirm", daemon=True)
+        self._thread.start()
+
+    def submit(self, server_round: int, content_ref: str) -> str:
+        """Envia o recordClientUpdate do round e devolve o hash sem esperar."""
+        with self._cond:
+            if self._nonce is None:
+                self._nonce = self._oj.pending_nonce(self.address)
+            nonce = self._nonce
+        try:
+            tx_hash = self._oj.job_submit_update(self.job_addr, content_ref, signer=self.signer, nonce=nonce)
+        except Exception:
+            with self._cond:
+                self._nonce = None
+            raise
+        with self._cond:
+            if self._nonce == nonce:
+                self._nonce = nonce + 1
+            self._pending += 1
+        self._queue.put((int(server_round), tx_hash, time.time()))
+        return tx_hash
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            server_round, tx_hash, sent_at = item
+            try:
+                r = self._oj.job_wait(tx_hash, self.receipt_timeout)
+                result = AnchorResult(server_round, tx_hash, int(r["status"]), int(r["gasUsed"]),
+                                      float(r["gasETH"]), time.time() - sent_at, "")
+            except Exception as e:
+                result = AnchorResult(server_round, tx_hash, -1, 0, 0.0, time.time() - sent_at, str(e))
+            with self._cond:
+                if result.status == -1:
+                    self._nonce = None  # tx pode ter sido descartada: reler do nó
+                self._done.append(result)
+                self._pending -= 1
+                self._cond.notify_all()
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return self._pending
+
+    def drain(self) -> List[AnchorResult]:
+        """Resultados confirmados desde o último `drain` (não bloqueia)."""
+        with self._cond:
+            done, self._done = self._done, []
+        return done
+
+    def flush(self, timeout: Optional[float] = None) -> List[AnchorResult]:
+        """Espera as txs pendentes (até `timeout`) e devolve `drain()`."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending == 0, timeout)
+        return self.drain()
+
+    def close(self, timeout: Optional[float] = None) -> List[AnchorResult]:
+        results = self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+        return results
+
+
+def summarize(results: List[AnchorResult], pending: int = 0) -> Dict[str, object]:
+    """Métricas escalares (aceitas pelo Flower) de um lote de confirmações."""
+    ok = [r for r in results if r.status == 1]
+    failed = [r for r in results if r.status != 1]
+    out: Dict[str, object] = {
+        "anchor_confirmed": len(ok),
+        "anchor_failed": len(failed),
+        "anchor_pending": int(pending),
+        "anchor_gas_used": int(sum(r.gas_used for r in results)),
+        "anchor_gas_eth": float(sum(r.gas_eth for r in results)),
+    }
+    if results:
+        out["anchor_confirm_latency_s"] = float(max(r.latency_s for r in results))
+        out["anchor_confirmed_rounds"] = ",".join(str(r.round) for r in ok)
+        out["anchor_confirmed_tx"] = ",".join(r.tx_hash for r in ok)
+    if failed:
+        out["anchor_failed_rounds"] = ",".join(str(r.round) for r in failed)
+        out["anchor_error"] = failed[-1].error or f"tx revertida: {failed[-1].tx_hash}"
+    return out
@@ -34,6 +34,7 @@ import flwr as fl
 from .models import MNISTNet  # noqa: F401  (mantido para paralelo com server.py)
 from .datasets import load_mnist  # noqa: F401
 from .client import MNISTClient
+from .prefetch import BatchPrefetcher
 
 
 ROUNDS = int(os.getenv("ROUNDS", "3"))
@@ -257,10 +258,9 @@ class BaselineClient(MNISTClient):
         print(f"[BaselineClient {self.node_id}] Rodada {server_round}: "
               f"treinando ({agg_label})...")
 
+        batches = BatchPrefetcher(self.trainloader, prepare=self._prepare_batch)
         for _ in range(epochs):
-            for images, labels in self.trainloader:
-                images, labels = images.to(self.device), labels.to(self.device)
-                images, labels = self._apply_attack(images, labels)
+            for images, labels in batches:
                 optimizer.zero_grad()
                 outputs = self.model(images)
                 loss = criterion(outputs, labels)
@@ -296,6 +296,7 @@ class BaselineClient(MNISTClient):
             "train_samples": int(total_samples),
             "epochs": int(epochs),
             "node_id": int(self.node_id),
+            **batches.stats(),
         }
         # Hook adicionado no Sprint 3 para refletir o estado de ataque do cliente
         # nas métricas, sem alterar a lógica de agregação.
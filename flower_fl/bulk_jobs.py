@@ -0,0 +1,168 @@
+"""Criação de jobs em massa: M pares requester/trainer em paralelo.
+
+`deploy_job` cria um job por vez, esperando o receipt de cada passo. Aqui
+cada job tem o seu par de contas (novas, financiadas pela PRIVATE_KEY do
+.env) e os passos andam em ondas: todas as txs de uma onda são enviadas sem
+esperar receipts — nonces reservados em memória por `onchain_dao.SIGNERS`,
+inclusive as M×2 transferências de financiamento, todas da mesma conta — e
+só então a onda é aguardada:
+
+  fund -> register (requester + trainer) -> MakeOffer -> AcceptOffer -> sign (os dois)
+
+Com ``--mode sequential`` o mesmo fluxo roda job a job, um receipt por
+passo (a referência); ``--mode both`` mede os dois. Relata jobs/minuto.
+
+Saída: results/bulk_job_creation.json
+
+Uso (com ``npx hardhat node`` e o DAO implantado):
+  python -m flower_fl.bulk_jobs --jobs 50 --mode both
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from eth_account import Account
+
+from . import onchain_dao, onchain_job
+from .onchain_dao import DAO, SIGNERS, _submit, _submit_tx, _wait, w3
+from .onchain_dao import extract_job_address_from_logs, extract_offer_id_from_logs
+
+VALUE_BY_UPDATE_WEI = w3.to_wei(0.001, "ether")
+NUMBER_OF_UPDATES = 3
+SPEC = ("Processador Exemplo", "16GB", "8 Cores")
+STATUS_SIGNED = 4  # DataTypes.Status.Signed
+
+
+def _new_pairs(m: int) -> List[Dict[str, object]]:
+    pairs = []
+    for _ in range(m):
+        requester = SIGNERS.add(Account.create().key)
+        trainer = SIGNERS.add(Account.create().key)
+        pairs.append({"requester": requester, "trainer": trainer})
+    return pairs
+
+
+def _wave(label: str, submits: List[Callable[[], str]]) -> List[Dict]:
+    """Envia todas as txs da onda e só depois espera os receipts."""
+    hashes = [submit() for submit in submits]
+    receipts = [_wait(h) for h in hashes]
+    failed = [r["hash"] for r in receipts if r["status"] != 1]
+    if failed:
+        raise RuntimeError(f"{label}: {len(failed)} txs revertidas (ex.: {failed[0]})")
+    return receipts
+
+
+def _offer(pair: Dict, i: int):
+    return DAO.functions.MakeOffer(
+        f"bulk job {i}",
+        onchain_dao.keccak(text=f"bulk-model-{i}"),
+        onchain_dao.keccak(text="0.0.0.0:8080"),
+        b"",
+        VALUE_BY_UPDATE_WEI,
+        NUMBER_OF_UPDATES,
+        pair["trainer"].address,
+    )
+
+
+def create_concurrent(pairs: List[Dict], fund_wei: int) -> List[str]:
+    _wave("fund", [
+        (lambda a=p[role].address: _submit_tx({"to": a, "value": fund_wei, "gas": 21_000}))
+        for p in pairs for role in ("requester", "trainer")
+    ])
+    _wave("register", [
+        f for p in pairs for f in (
+            lambda p=p: _submit(DAO.functions.registerRequester(), signer=p["requester"]),
+            lambda p=p: _submit(DAO.functions.registerTrainer("Treinador bulk", SPEC), signer=p["trainer"]),
+        )
+    ])
+    offers = _wave("MakeOffer", [
+        (lambda p=p, i=i: _submit(_offer(p, i), signer=p["requester"])) for i, p in enumerate(pairs)
+    ])
+    offer_ids = [extract_offer_id_from_logs(r["logs"]) for r in offers]
+    accepts = _wave("AcceptOffer", [
+        (lambda p=p, o=o: _submit(DAO.functions.AcceptOffer(int(o)), signer=p["trainer"]))
+        for p, o in zip(pairs, offer_ids)
+    ])
+    jobs = [extract_job_address_from_logs(r["logs"]) for r in accepts]
+    total = VALUE_BY_UPDATE_WEI * NUMBER_OF_UPDATES
+    _wave("sign", [
+        f for p, job in zip(pairs, jobs) for f in (
+            lambda p=p, job=job: _submit(DAO.functions.signJobContract(job), total, signer=p["requester"]),
+            lambda p=p, job=job: _submit(DAO.functions.signJobContract(job), signer=p["trainer"]),
+        )
+    ])
+    return jobs
+
+
+def create_sequential(pairs: List[Dict], fund_wei: int) -> List[str]:
+    jobs = []
+    total = VALUE_BY_UPDATE_WEI * NUMBER_OF_UPDATES
+    for i, p in enumerate(pairs):
+        requester, trainer = p["requester"], p["trainer"]
+        for a in (requester.address, trainer.address):
+            _wait(_submit_tx({"to": a, "value": fund_wei, "gas": 21_000}))
+        onchain_dao.register_requester(signer=requester)
+        onchain_dao.register_trainer("Treinador bulk", SPEC, signer=trainer)
+        r_offer = onchain_dao._send(_offer(p, i), signer=requester)
+        r_accept = onchain_dao.accept_offer(extract_offer_id_from_logs(r_offer["logs"]), signer=trainer)
+        job = extract_job_address_from_logs(r_accept["logs"])
+        onchain_dao.sign_job_contract(job, total, signer=requester)
+        onchain_dao.sign_job_contract(job, 0, signer=trainer)
+        jobs.append(job)
+    return jobs
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Criação de jobs em massa (pares requester/trainer)")
+    p.add_argument("--jobs", type=int, default=20)
+    p.add_argument("--mode", choices=("concurrent", "sequential", "both"), default="both")
+    p.add_argument("--fund-eth", type=float, default=0.05, help="ETH enviado a cada conta nova")
+    p.add_argument("--output", type=Path, default=Path("results/bulk_job_creation.json"))
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    fund_wei = w3.to_wei(args.fund_eth, "ether")
+    modes = ("sequential", "concurrent") if args.mode == "both" else (args.mode,)
+    rows = []
+    for mode in modes:
+        pairs = _new_pairs(args.jobs)
+        t0 = time.perf_counter()
+        jobs = (create_concurrent if mode == "concurrent" else create_sequential)(pairs, fund_wei)
+        elapsed = time.perf_counter() - t0
+        missing = sum(1 for j in jobs if not j)
+        snapshot = onchain_job.jobs_status_snapshot([j for j in jobs if j])
+        rows.append({
+            "mode": mode,
+            "n_jobs": len(jobs),
+            "missing_job_address": missing,
+            "signed": sum(1 for row in snapshot if row["Status"] == STATUS_SIGNED),
+            "time_s": elapsed,
+            "jobs_per_min": 60.0 * len(jobs) / elapsed if elapsed > 0 else 0.0,
+            "job_addresses": jobs,
+        })
+        print(f"{mode:<10} {len(jobs)} jobs em {elapsed:7.2f}s -> {rows[-1]['jobs_per_min']:8.1f} jobs/min")
+
+    if len(rows) == 2 and rows[0]["jobs_per_min"] > 0:
+        rows[1]["speedup_vs_sequential"] = rows[1]["jobs_per_min"] / rows[0]["jobs_per_min"]
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        "timestamp": datetime.now().isoformat(),
+        "rpc_url": onchain_dao.RPC_URL,
+        "dao_address": DAO.address,
+        "funder": onchain_dao.acct.address,
+        "results": rows,
+    }, indent=2))
+    print(f"\nJSON: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,250 @@
+"""Cliente de chain compartilhado: um Web3 por RPC, contratos em cache e espera de receipts.
+
+``onchain_dao`` e ``onchain_job`` criavam cada um o seu
+``Web3(HTTPProvider(...))`` no import (cada um com o pool padrão do requests,
+10 conexões), ``onchain_job._job`` remontava o contrato a cada chamada e
+``wait_for_transaction_receipt`` fazia polling (0,1 s entre tentativas).
+Aqui:
+
+- `get_web3(rpc_url)` devolve um Web3 único por (URL, timeout), com uma
+  ``requests.Session`` própria: pool de ``RPC_POOL_SIZE`` conexões keep-alive
+  e retentativa só em falha de CONEXÃO (o POST nunca chegou ao nó, então
+  reenviar um ``eth_sendRawTransaction`` é seguro). `http_session(url)` expõe
+  a mesma sessão para POSTs crus (lote JSON-RPC da multicall);
+- `contract(w3, address, abi)` guarda o objeto de contrato por
+  (Web3, endereço, ABI); `encode_call(fn)` monta a calldata de uma chamada
+  com ele;
+- `wait_for_receipt(tx_hash)` espera o receipt conforme ``RECEIPT_WAIT``:
+
+  ========  ===========================================================
+  ``poll``  ``wait_for_transaction_receipt`` com ``RECEIPT_POLL_S``
+  ``ws``    assinatura ``newHeads`` num WebSocket (``RPC_WS_URL``, ou o
+            RPC_URL com ws://): a cada bloco novo, só os hashes pendentes
+            que estão nele têm o receipt buscado
+  ``auto``  ``ws`` se RPC_WS_URL estiver definido, senão ``poll`` (default)
+  ========  ===========================================================
+
+  Se o WebSocket cair (ou o pacote ``websockets`` >= 11 faltar), as esperas
+  em curso e as seguintes voltam para polling.
+
+    from flower_fl.chain import contract, get_web3, wait_for_receipt
+    w3 = get_web3()
+    rc = wait_for_receipt(w3.eth.send_raw_transaction(raw).hex())
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+RECEIPT_MODES = ("auto", "poll", "ws")
+
+_lock = threading.Lock()
+_SESSIONS: Dict[str, requests.Session] = {}
+_WEB3: Dict[Tuple[str, float], Web3] = {}
+_CONTRACTS: Dict[Tuple[int, str, int], Tuple[Any, Any]] = {}
+_WAITERS: Dict[int, "ReceiptWaiter"] = {}
+
+
+def _pool_size() -> int:
+    return int(os.getenv("RPC_POOL_SIZE", "32"))
+
+
+def http_session(rpc_url: str) -> requests.Session:
+    """Sessão HTTP (pool keep-alive) compartilhada por todos os clientes de `rpc_url`."""
+    with _lock:
+        session = _SESSIONS.get(rpc_url)
+        if session is None:
+            size = _pool_size()
+            retry = Retry(total=2, connect=2, read=0, status=0, other=0,
+                          backoff_factor=0.05, allowed_methods=None)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=size, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSIONS[rpc_url] = session
+        return session
+
+
+def get_web3(rpc_url: Optional[str] = None, *, timeout: float = 60) -> Web3:
+    """Web3 compartilhado para `rpc_url` (default: RPC_URL do ambiente)."""
+    rpc_url = rpc_url or os.getenv("RPC_URL")
+    assert rpc_url, "Defina RPC_URL no .env"
+    key = (rpc_url, float(timeout))
+    w3 = _WEB3.get(key)
+    if w3 is None:
+        provider = Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": timeout}, session=http_session(rpc_url))
+        w3 = _WEB3.setdefault(key, Web3(provider))
+    return w3
+
+
+def contract(w3: Web3, address: str, abi: List[Dict[str, Any]]):
+    """Objeto de contrato em cache por (Web3, endereço, ABI)."""
+    address = Web3.to_checksum_address(address)
+    key = (id(w3), address, id(abi))
+    cached = _CONTRACTS.get(key)
+    if cached is not None and cached[0] is abi:
+        return cached[1]
+    c = w3.eth.contract(address=address, abi=abi)
+    _CONTRACTS[key] = (abi, c)  # guarda o ABI: o id() não é reaproveitado
+    return c
+
+
+def encode_call(fn) -> str:
+    """Calldata (hex) de ``contract.functions.f(args)``, sem RPC.
+
+    Usa o ``encodeABI`` público do contrato (em cache) em vez do
+    ``ContractFunction._encode_transaction_data`` privado do web3.
+    """
+    c = contract(fn.w3, fn.address, fn.contract_abi)
+    return c.encodeABI(fn_name=fn.fn_name, args=fn.args, kwargs=fn.kwargs)
+
+
+def _ws_url(w3: Web3) -> str:
+    explicit = os.getenv("RPC_WS_URL", "").strip()
+    if explicit:
+        return explicit
+    http = getattr(w3.provider, "endpoint_uri", "") or ""
+    return "ws" + http[4:] if http.startswith("http") else ""
+
+
+class ReceiptWaiter:
+    """Espera receipts por polling ou por ``newHeads`` num WebSocket."""
+
+    def __init__(self, w3: Web3, mode: str = "auto", *, ws_url: Optional[str] = None,
+                 poll_latency: float = 0.1):
+        if mode not in RECEIPT_MODES:
+            raise ValueError(f"RECEIPT_WAIT inválido: {mode!r} (use {', '.join(RECEIPT_MODES)})")
+        self.w3 = w3
+        self.poll_latency = poll_latency
+        self.ws_url = ws_url or _ws_url(w3)
+        if mode == "auto":
+            mode = "ws" if os.getenv("RPC_WS_URL", "").strip() else "poll"
+        self.mode = mode
+        self._pending: Dict[str, Tuple[threading.Event, list]] = {}
+        self._plock = threading.Lock()
+        self._ws_alive = False
+        self._ws_error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+        if mode == "ws":
+            self._start_ws()
+
+    # ----------------------------------------------------------- WebSocket
+    def _start_ws(self) -> None:
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_ws, args=(ready,), name="newHeads", daemon=True)
+        self._thread.start()
+        ready.wait(10)
+        if not self._ws_alive:
+            print(f"[chain] newHeads indisponível em {self.ws_url} ({self._ws_error}); usando polling")
+
+    def _run_ws(self, ready: threading.Event) -> None:
+        try:
+            from websockets.sync.client import connect
+
+            with connect(self.ws_url, max_size=None, open_timeout=10) as ws:
+                ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]}))
+                reply = json.loads(ws.recv(timeout=10))
+                if reply.get("error"):
+                    raise RuntimeError(reply["error"])
+                self._ws_alive = True
+                ready.set()
+                for message in ws:
+                    msg = json.loads(message)
+                    if msg.get("method") == "eth_subscription":
+                        self._on_head(msg["params"]["result"])
+        except Exception as e:
+            self._ws_error = e
+        finally:
+            self._ws_alive = False
+            ready.set()
+            with self._plock:
+                waiters = list(self._pending.values())
+            for event, _ in waiters:
+                event.set()  # acorda quem espera: cai para polling
+
+    def _on_head(self, head: Dict[str, Any]) -> None:
+        with self._plock:
+            if not self._pending:
+                return
+        block = self.w3.eth.get_block(head["hash"])
+        mined = {h.hex() if isinstance(h, bytes) else str(h) for h in block["transactions"]}
+        mined = {h.lower() if h.startswith("0x") else "0x" + h.lower() for h in mined}
+        with self._plock:
+            hits = [h for h in self._pending if h in mined]
+        for h in hits:
+            self._resolve(h, self.w3.eth.get_transaction_receipt(h))
+
+    def _resolve(self, tx_hash: str, receipt) -> None:
+        with self._plock:
+            entry = self._pending.pop(tx_hash, None)
+        if entry is not None:
+            entry[1].append(receipt)
+            entry[0].set()
+
+    def _receipt_now(self, tx_hash: str):
+        try:
+            return self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+
+    @property
+    def ws_connected(self) -> bool:
+        return self._ws_alive
+
+    # -------------------------------------------------------------- espera
+    def wait(self, tx_hash: Any, timeout: float = 120):
+        tx_hash = tx_hash.hex() if isinstance(tx_hash, bytes) else str(tx_hash)
+        tx_hash = tx_hash.lower() if tx_hash.startswith("0x") else "0x" + tx_hash.lower()
+        if self.mode != "ws" or not self._ws_alive:
+            return self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout,
+                                                            poll_latency=self.poll_latency)
+        deadline = time.monotonic() + timeout
+        event, box = threading.Event(), []
+        with self._plock:
+            self._pending[tx_hash] = (event, box)
+        # Registrado antes de consultar: um bloco que chegue entre as duas
+        # coisas é visto por uma delas.
+        receipt = self._receipt_now(tx_hash)
+        if receipt is not None:
+            self._resolve(tx_hash, receipt)
+        event.wait(max(0.0, deadline - time.monotonic()))
+        with self._plock:
+            self._pending.pop(tx_hash, None)
+        if box:
+            return box[0]
+        remaining = deadline - time.monotonic()
+        if not self._ws_alive and remaining > 0:
+            return self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=remaining,
+                                                            poll_latency=self.poll_latency)
+        receipt = self._receipt_now(tx_hash)
+        if receipt is not None:
+            return receipt
+        raise TimeExhausted(f"Receipt de {tx_hash} não chegou em {timeout}s")
+
+
+def receipt_waiter(w3: Optional[Web3] = None) -> ReceiptWaiter:
+    """`ReceiptWaiter` compartilhado do Web3 (modo/intervalo do ambiente)."""
+    w3 = w3 or get_web3()
+    with _lock:
+        waiter = _WAITERS.get(id(w3))
+        if waiter is None or waiter.w3 is not w3:
+            waiter = ReceiptWaiter(
+                w3,
+                os.getenv("RECEIPT_WAIT", "auto").strip().lower(),
+                poll_latency=float(os.getenv("RECEIPT_POLL_S", "0.1")),
+            )
+            _WAITERS[id(w3)] = waiter
+        return waiter
+
+
+def wait_for_receipt(tx_hash: Any, timeout: float = 120, w3: Optional[Web3] = None):
+    return receipt_waiter(w3).wait(tx_hash, timeout)
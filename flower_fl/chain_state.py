@@ -0,0 +1,167 @@
+"""Estado de chain reaproveitado entre repetições (``evm_snapshot`` / ``evm_revert``).
+
+Numa série de repetições os drivers (multi_run, ablation, e2e_scaling) ou
+reusavam o mesmo job — que acumula updates, hashes e saldo de run em run até
+``All updates completed`` — ou pagavam de novo o deploy (deploy_job: registro,
+oferta, aceite, depósito, assinaturas) e o financiamento/autorização das
+contas de cliente (keypool). Num nó local (Hardhat, Anvil) dá para fazer o
+setup uma vez só:
+
+1. `ChainStateManager.setup` garante um job com capacidade para UMA
+   repetição (``num_clients * rounds`` updates; reusa o JOB_ADDR atual se ele
+   ainda aceitar isso, senão roda ``python -m flower_fl.deploy_job`` com
+   ``JOB_NUMBER_OF_UPDATES``), provisiona o pool de chaves para o maior N e
+   tira um ``evm_snapshot``;
+2. `revert` antes de cada repetição volta a chain a esse estado (job vazio,
+   contas financiadas e autorizadas, nonces iguais) em milissegundos.
+
+No Hardhat um snapshot só pode ser revertido uma vez, então `revert` tira um
+novo logo em seguida. As txs de uma repetição somem no revert seguinte: quem
+precisa dos receipts (gas do e2e_scaling) lê antes de reverter — o indexer
+(flower_fl/indexer.py) já trata o revert como reorg. Server e clientes são
+processos novos a cada repetição, sem nonce em cache; no processo do driver,
+`revert` esquece os contadores de ``onchain_dao.SIGNERS``.
+
+    state = prepare_chain_state(max(clients), rounds)
+    for rep in ...:
+        if state is not None:
+            state.revert()
+        run_full(...)
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from .chain import get_web3
+
+# web3_clientVersion dos nós com evm_snapshot/evm_revert.
+SNAPSHOT_CLIENTS = ("hardhatnetwork", "anvil", "ganache")
+
+
+class ChainStateError(RuntimeError):
+    pass
+
+
+class ChainStateManager:
+    def __init__(self, w3=None):
+        self.w3 = w3 or get_web3()
+        self.snapshot_id: Optional[str] = None
+        self.job_addr: Optional[str] = None
+        self.deployed = False
+        self.setup_s = 0.0
+        self.revert_ms: List[float] = []
+
+    def _rpc(self, method: str, params: Optional[list] = None) -> Any:
+        resp = self.w3.provider.make_request(method, params or [])
+        if resp.get("error"):
+            raise ChainStateError(f"{method}: {resp['error']}")
+        return resp.get("result")
+
+    @property
+    def supported(self) -> bool:
+        try:
+            version = str(self._rpc("web3_clientVersion")).lower()
+        except Exception:
+            return False
+        return any(name in version for name in SNAPSHOT_CLIENTS)
+
+    # ----------------------------------------------------------------- setup
+    def deploy_job(self, number_of_updates: int) -> str:
+        """Roda deploy_job com `number_of_updates` e carrega o JOB_ADDR novo em os.environ."""
+        from dotenv import dotenv_values, find_dotenv
+
+        env = os.environ.copy()
+        env["JOB_NUMBER_OF_UPDATES"] = str(number_of_updates)
+        result = subprocess.run([sys.executable, "-m", "flower_fl.deploy_job"],
+                                env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise ChainStateError(f"deploy_job falhou:\n{result.stdout}\n{result.stderr}")
+        values = dotenv_values(find_dotenv(usecwd=True))
+        job_addr = (values.get("JOB_ADDR") or "").strip()
+        if not job_addr or job_addr == os.getenv("JOB_ADDR", "").strip():
+            raise ChainStateError(f"deploy_job não escreveu um JOB_ADDR novo no .env:\n{result.stdout}")
+        # Os drivers copiam os.environ para server/clientes.
+        for key in ("JOB_ADDR", "JOB_ADDRS", "PRIVATE_KEY"):
+            if values.get(key):
+                os.environ[key] = values[key]
+        self.deployed = True
+        return job_addr
+
+    def _job_capacity(self, job_addr: str) -> int:
+        from . import onchain_job  # import tardio: exige RPC_URL/PRIVATE_KEY/JOB_ABI_PATH
+
+        try:
+            return onchain_job.job_remaining_updates(job_addr)
+        except Exception:
+            return -1  # job de outra versão do contrato / de outro nó
+
+    def setup(
+        self,
+        num_clients: int,
+        rounds: int,
+        env: Optional[Mapping[str, str]] = None,
+    ) -> str:
+        """Job com capacidade para uma repetição + pool de chaves, e o snapshot base."""
+        t0 = time.perf_counter()
+        needed = num_clients * rounds
+        job_addr = os.getenv("JOB_ADDR", "").strip()
+        if not job_addr or self._job_capacity(job_addr) < needed:
+            print(f"[chain_state] criando job com {needed} updates (deploy_job)...")
+            job_addr = self.deploy_job(needed)
+        self.job_addr = job_addr
+
+        from .keypool import prepare_client_keys
+        prepare_client_keys(num_clients, {**(os.environ if env is None else env), "JOB_ADDR": job_addr})
+
+        self.snapshot_id = self._rpc("evm_snapshot")
+        self.setup_s = time.perf_counter() - t0
+        print(f"[chain_state] snapshot {self.snapshot_id} (job {job_addr}, "
+              f"setup {self.setup_s:.2f}s)")
+        return self.snapshot_id
+
+    # ---------------------------------------------------------------- revert
+    def revert(self) -> float:
+        """Volta ao snapshot base e tira outro (devolve o tempo em ms)."""
+        if self.snapshot_id is None:
+            raise ChainStateError("revert sem snapshot: chame setup() antes")
+        t0 = time.perf_counter()
+        if not self._rpc("evm_revert", [self.snapshot_id]):
+            raise ChainStateError(f"evm_revert({self.snapshot_id}) recusado pelo nó")
+        self.snapshot_id = self._rpc("evm_snapshot")
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.revert_ms.append(ms)
+
+        onchain_dao = sys.modules.get(f"{__package__}.onchain_dao")
+        if onchain_dao is not None:
+            for address in onchain_dao.SIGNERS.addresses() + [onchain_dao.acct.address]:
+                onchain_dao.SIGNERS.release_nonce(address)
+        return ms
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "job_addr": self.job_addr,
+            "job_deployed": self.deployed,
+            "setup_s": self.setup_s,
+            "reverts": len(self.revert_ms),
+            "revert_ms_mean": sum(self.revert_ms) / len(self.revert_ms) if self.revert_ms else 0.0,
+            "revert_ms_max": max(self.revert_ms, default=0.0),
+        }
+
+
+def prepare_chain_state(
+    num_clients: int,
+    rounds: int,
+    env: Optional[Mapping[str, str]] = None,
+) -> Optional[ChainStateManager]:
+    """`ChainStateManager` pronto (setup feito), ou ``None`` se o nó não tiver snapshots."""
+    state = ChainStateManager()
+    if not state.supported:
+        print("[chain_state] nó sem evm_snapshot/evm_revert (não é Hardhat/Anvil local): "
+              "repetições seguem sem snapshot")
+        return None
+    state.setup(num_clients, rounds, env)
+    return state
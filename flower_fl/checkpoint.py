@@ -0,0 +1,201 @@
+"""Política de ancoragem do modelo global e acumulador de Merkle dos rounds.
+
+Nos modos ``no_ipfs`` / ``full`` o servidor pagava um ``publishGlobalModel``
+por job a cada round. Com ``ANCHOR_POLICY`` ele ancora só em checkpoints:
+
+===================  =====================================================
+``every``            todo round (default; comportamento anterior: o storage
+                     guarda ``keccak(ref)`` do modelo do round)
+``every_k``          a cada ``ANCHOR_EVERY_K`` rounds
+``on_improvement``   quando a acurácia agregada supera a melhor até então
+``final``            só no último round
+===================  =====================================================
+
+Fora de ``every``, o último round sempre ancora. Entre âncoras o servidor
+acumula o modelo de cada round (inclusive o round 0, o inicial) em
+`ModelAccumulator`; o checkpoint publica a raiz de Merkle de TODOS os rounds
+até ali como ``cidHash`` (``latestModelHash``), e o ``encryptedPointer`` do
+evento GlobalModelUpdated leva os refs desde a âncora anterior
+(`cid_codec.encode_pointer_list`). Concatenando os eventos em ordem, qualquer
+leitor reconstrói a lista completa — o índice na lista é o round.
+
+Folha do round r = keccak256(keccak256(abi.encode(r, keccak256(ref)))): o
+round entra no hash (a árvore de pares ordenados não fixa posições) e o
+duplo hash segue `merkle.update_leaf` / ``MerkleProof`` do OpenZeppelin.
+
+    acc.add(r, ref); root = acc.root()
+    verify_round(r, ref, acc.proof(r), root)
+    verify_round_onchain(job_addr, r, ref)
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from eth_utils import keccak
+
+from .merkle import build_layers, merkle_proof, verify_proof
+
+POLICIES = ("every", "every_k", "on_improvement", "final")
+
+
+def round_leaf(server_round: int, content_ref: str) -> bytes:
+    """Folha do modelo global do round `server_round`."""
+    return keccak(keccak(int(server_round).to_bytes(32, "big") + keccak(text=content_ref)))
+
+
+class AnchorPolicy:
+    def __init__(self, name: str = "every", total_rounds: int = 0, every_k: int = 1):
+        name = name.strip().lower()
+        if name not in POLICIES:
+            raise ValueError(f"ANCHOR_POLICY inválida: {name!r} (use {', '.join(POLICIES)})")
+        if every_k < 1:
+            raise ValueError("ANCHOR_EVERY_K deve ser >= 1")
+        self.name = name
+        self.total_rounds = total_rounds
+        self.every_k = every_k
+        self._best: Optional[float] = None
+
+    @classmethod
+    def from_env(cls, total_rounds: int) -> "AnchorPolicy":
+        return cls(
+            os.getenv("ANCHOR_POLICY", "every"),
+            total_rounds,
+            int(os.getenv("ANCHOR_EVERY_K", "5")),
+        )
+
+    @property
+    def accumulates(self) -> bool:
+        """``every`` mantém o formato antigo (um keccak(ref) por round)."""
+        return self.name != "every"
+
+    def should_anchor(self, server_round: int, accuracy: Optional[float] = None) -> bool:
+        improved = accuracy is not None and (self._best is None or accuracy > self._best)
+        if improved:
+            self._best = accuracy
+        if self.name == "every":
+            return True
+        if server_round >= self.total_rounds > 0:
+            return True
+        if server_round == 0:
+            return False
+        if self.name == "every_k":
+            return server_round % self.every_k == 0
+        if self.name == "on_improvement":
+            return improved
+        return False
+
+    def __repr__(self) -> str:
+        k = f", k={self.every_k}" if self.name == "every_k" else ""
+        return f"AnchorPolicy({self.name}{k})"
+
+
+class ModelAccumulator:
+    """Refs dos modelos globais, um por round (0, 1, 2, ...), e as âncoras feitas."""
+
+    def __init__(self):
+        self.refs: List[str] = []
+        self.anchors: List[Dict[str, Any]] = []
+        self._anchored = 0
+
+    def add(self, server_round: int, content_ref: str) -> None:
+        """Registra o modelo do round; rounds pulados (sem agregado) repetem o
+        ref anterior, já que o modelo global não mudou neles."""
+        if server_round < len(self.refs) or (server_round > 0 and not self.refs):
+            raise ValueError(f"round {server_round} fora de ordem (esperado {len(self.refs)})")
+        while len(self.refs) < server_round:
+            self.refs.append(self.refs[-1])
+        self.refs.append(content_ref)
+
+    def leaves(self, size: Optional[int] = None) -> List[bytes]:
+        refs = self.refs if size is None else self.refs[:size]
+        return [round_leaf(r, ref) for r, ref in enumerate(refs)]
+
+    def root(self, size: Optional[int] = None) -> bytes:
+        return build_layers(self.leaves(size))[-1][0]
+
+    def proof(self, server_round: int, size: Optional[int] = None) -> List[bytes]:
+        """Prova do round contra a raiz dos primeiros `size` rounds (default: todos)."""
+        return merkle_proof(build_layers(self.leaves(size)), server_round)
+
+    def pending_refs(self) -> List[str]:
+        """Refs ainda não publicados num checkpoint (payload do próximo evento)."""
+        return self.refs[self._anchored:]
+
+    def mark_anchored(self, server_round: int, root: bytes, tx_hashes: Sequence[str]) -> Dict[str, Any]:
+        record = {
+            "round": server_round,
+            "size": len(self.refs),
+            "root": "0x" + root.hex(),
+            "tx_hashes": list(tx_hashes),
+        }
+        self.anchors.append(record)
+        self._anchored = len(self.refs)
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"refs": list(self.refs), "anchors": list(self.anchors)}
+
+
+def verify_round(server_round: int, content_ref: str, proof: Sequence[bytes], root: bytes) -> bool:
+    """O modelo `content_ref` é o do round `server_round` sob a raiz `root`?"""
+    return verify_proof(round_leaf(server_round, content_ref), proof, bytes(root))
+
+
+def verify_round_in_metrics(metrics: Dict[str, Any], server_round: int, content_ref: str) -> bool:
+    """Verifica contra a última âncora registrada em server_metrics.json (``checkpoints``)."""
+    data = metrics.get("checkpoints") or {}
+    anchors = data.get("anchors") or []
+    refs = data.get("refs") or []
+    if not anchors or server_round >= anchors[-1]["size"]:
+        return False
+    acc = ModelAccumulator()
+    for r, ref in enumerate(refs):
+        acc.add(r, ref)
+    size = anchors[-1]["size"]
+    root = bytes.fromhex(anchors[-1]["root"][2:])
+    return verify_round(server_round, content_ref, acc.proof(server_round, size), root)
+
+
+def onchain_anchored_refs(job_addr: str, from_block: int = 0) -> List[str]:
+    """Lista completa de refs reconstruída dos eventos GlobalModelUpdated do job.
+
+    Um job reusado por várias runs acumula os eventos de todas: passe em
+    `from_block` o bloco em que a run começou.
+    """
+    from . import onchain_job  # import tardio: exige RPC_URL/PRIVATE_KEY/JOB_ABI_PATH
+    from .cid_codec import decode_pointer_list
+    from .events import EventRegistry
+
+    job = onchain_job._job(job_addr)
+    registry = EventRegistry(onchain_job.ABI, names=("GlobalModelUpdated",), address=job.address)
+    logs = onchain_job.w3.eth.get_logs({
+        "fromBlock": from_block,
+        "toBlock": "latest",
+        "address": job.address,
+        "topics": [registry.topics()],
+    })
+    refs: List[str] = []
+    for ev in registry.decode_logs(logs):
+        refs.extend(decode_pointer_list(ev.args["encryptedPointer"]))
+    return refs
+
+
+def verify_round_onchain(job_addr: str, server_round: int, content_ref: str, from_block: int = 0) -> bool:
+    """Prova o modelo do round contra o ``latestModelHash`` ancorado no job.
+
+    Reconstrói a árvore a partir dos eventos (sem confiar no servidor), confere
+    que a raiz bate com o storage e que o round está nela com `content_ref`.
+    """
+    from . import onchain_job
+
+    refs = onchain_anchored_refs(job_addr, from_block)
+    if server_round >= len(refs) or refs[server_round] != content_ref:
+        return False
+    acc = ModelAccumulator()
+    for r, ref in enumerate(refs):
+        acc.add(r, ref)
+    root = bytes(onchain_job._job(job_addr).functions.latestModelHash().call())
+    if acc.root() != root:
+        return False
+    return verify_round(server_round, content_ref, acc.proof(server_round), root)
@@ -0,0 +1,182 @@
+"""Codec binário compacto para os ponteiros ancorados on-chain.
+
+`job_update_global`/`job_send_update` colocam o ponteiro recuperável no
+payload `encryptedPointer` dos eventos GlobalModelUpdated /
+ClientUpdateRecorded. Em UTF-8 isso custa 46 (CIDv0), 59 (CIDv1 base32) ou
+71 bytes (``sha256:<hex>``) de calldata por tx; o formato compacto abaixo
+guarda só o binário do CID/digest:
+
+============  ===========================================  =======
+tag (1º byte)  conteúdo                                      bytes
+============  ===========================================  =======
+``0x00``      ``sha256:<hex>`` → digest cru                    33
+``0x12``      CIDv0 (``Qm…``) → multihash (0x12 0x20 + 32)    34
+``0x01``      CIDv1 (``b…`` base32) → CID binário              36
+``0xff``      qualquer outra string, UTF-8                  1 + n
+============  ===========================================  =======
+
+Os tags não colidem com o primeiro caractere dos ponteiros UTF-8 legados
+(``Q``, ``b``, ``s``), então `decode_pointer` lê os dois formatos — logs
+antigos continuam decodificáveis. O hash ancorado em storage
+(``keccak(text=cid)``) não muda com a codificação.
+
+Lotes (ClientUpdateBatchRecorded) usam `encode_pointer_list`: ``0xfe`` seguido
+de ``[len:1][ponteiro compacto]`` por ref, na ordem das folhas.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, List, Sequence
+
+# "utf8" (legado, default) | "compact"
+POINTER_ENCODING = os.getenv("POINTER_ENCODING", "utf8").strip().lower()
+
+_TAG_SHA256 = 0x00
+_TAG_CIDV1 = 0x01
+_TAG_CIDV0 = 0x12
+_TAG_LIST = 0xFE
+_TAG_UTF8 = 0xFF
+
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {c: i for i, c in enumerate(_B58_ALPHABET)}
+_B32_ALPHABET = "abcdefghijklmnopqrstuvwxyz234567"
+_B32_INDEX = {c: i for i, c in enumerate(_B32_ALPHABET)}
+
+
+def _b58decode(text: str) -> bytes:
+    num = 0
+    for ch in text:
+        num = num * 58 + _B58_INDEX[ch]
+    raw = num.to_bytes((num.bit_length() + 7) // 8, "big") if num else b""
+    pad = len(text) - len(text.lstrip("1"))
+    return b"\x00" * pad + raw
+
+
+def _b58encode(data: bytes) -> str:
+    num = int.from_bytes(data, "big")
+    out = []
+    while num:
+        num, rem = divmod(num, 58)
+        out.append(_B58_ALPHABET[rem])
+    pad = len(data) - len(data.lstrip(b"\x00"))
+    return "1" * pad + "".join(reversed(out))
+
+
+def _b32decode(text: str) -> bytes:
+    bits = 0
+    acc = 0
+    out = bytearray()
+    for ch in text:
+        acc = (acc << 5) | _B32_INDEX[ch]
+        bits += 5
+        if bits >= 8:
+            bits -= 8
+            out.append((acc >> bits) & 0xFF)
+    return bytes(out)
+
+
+def _b32encode(data: bytes) -> str:
+    bits = 0
+    acc = 0
+    out = []
+    for byte in data:
+        acc = (acc << 8) | byte
+        bits += 8
+        while bits >= 5:
+            bits -= 5
+            out.append(_B32_ALPHABET[(acc >> bits) & 0x1F])
+    if bits:
+        out.append(_B32_ALPHABET[(acc << (5 - bits)) & 0x1F])
+    return "".join(out)
+
+
+def encode_compact(ref: str) -> bytes:
+    """Codifica um CID/ref de conteúdo no formato binário compacto."""
+    try:
+        if ref.startswith("sha256:") and len(ref) == 71:
+            return bytes([_TAG_SHA256]) + bytes.fromhex(ref[7:])
+        if ref.startswith("Qm") and len(ref) == 46:
+            mh = _b58decode(ref)
+            if len(mh) == 34 and mh[0] == 0x12 and mh[1] == 0x20:
+                return mh
+        if ref.startswith("b") and ref[1:] and ref[1:] == ref[1:].lower():
+            cid = _b32decode(ref[1:])
+            if cid and cid[0] == _TAG_CIDV1 and _b32encode(cid) == ref[1:]:
+                return cid
+    except (KeyError, ValueError):
+        pass
+    return bytes([_TAG_UTF8]) + ref.encode("utf-8")
+
+
+def decode_compact(payload: bytes) -> str:
+    """Inverso de `encode_compact`."""
+    if not payload:
+        raise ValueError("Ponteiro vazio")
+    tag = payload[0]
+    if tag == _TAG_SHA256:
+        return "sha256:" + payload[1:].hex()
+    if tag == _TAG_CIDV0:
+        return _b58encode(payload)
+    if tag == _TAG_CIDV1:
+        return "b" + _b32encode(payload)
+    if tag == _TAG_UTF8:
+        return payload[1:].decode("utf-8")
+    raise ValueError(f"Tag de ponteiro desconhecida: 0x{tag:02x}")
+
+
+def encode_pointer(ref: str, encoding: str | None = None) -> bytes:
+    """Payload on-chain de um ponteiro, conforme POINTER_ENCODING."""
+    if (encoding or POINTER_ENCODING) == "compact":
+        return encode_compact(ref)
+    return ref.encode("utf-8")
+
+
+def decode_pointer(payload: bytes) -> str:
+    """Decodifica um `encryptedPointer` compacto OU UTF-8 legado."""
+    payload = bytes(payload)
+    if payload and payload[0] in (_TAG_SHA256, _TAG_CIDV0, _TAG_CIDV1, _TAG_UTF8):
+        return decode_compact(payload)
+    return payload.decode("utf-8")
+
+
+def encode_pointer_list(refs: Sequence[str], encoding: str | None = None) -> bytes:
+    """Payload de um lote de refs (ordem das folhas da árvore de Merkle)."""
+    if (encoding or POINTER_ENCODING) != "compact":
+        return "\n".join(refs).encode("utf-8")
+    out = bytearray([_TAG_LIST])
+    for ref in refs:
+        item = encode_compact(ref)
+        if len(item) > 0xFF:
+            raise ValueError(f"Ponteiro longo demais para o formato de lote: {ref[:32]}...")
+        out.append(len(item))
+        out += item
+    return bytes(out)
+
+
+def decode_pointer_list(payload: bytes) -> List[str]:
+    """Inverso de `encode_pointer_list` (aceita também o formato UTF-8 legado)."""
+    payload = bytes(payload)
+    if not payload:
+        return []
+    if payload[0] != _TAG_LIST:
+        return payload.decode("utf-8").split("\n")
+    refs: List[str] = []
+    pos = 1
+    while pos < len(payload):
+        size = payload[pos]
+        refs.append(decode_compact(payload[pos + 1:pos + 1 + size]))
+        pos += 1 + size
+    return refs
+
+
+def decode_event_pointers(event: Any) -> List[str]:
+    """Ponteiros de um evento decodificado (web3 `process_log`/`get_logs`).
+
+    Aceita GlobalModelUpdated / ClientUpdateRecorded (um ponteiro) e
+    ClientUpdateBatchRecorded (lista, na ordem das folhas).
+    """
+    args = event["args"]
+    payload = args["encryptedPointer"]
+    if event["event"] == "ClientUpdateBatchRecorded":
+        return decode_pointer_list(payload)
+    return [decode_pointer(payload)]
@@ -7,9 +7,10 @@ import time
 import numpy as np
 
 from .models import get_model
-from .datasets import load_mnist, load_dataset
+from .datasets import dataset_mode, load_dataset
 from .ipfs import ipfs_get_numpy, ipfs_add_numpy, content_hash_numpy
-from .utils import USE_IPFS, USE_ONCHAIN
+from .prefetch import BatchPrefetcher
+from .utils import ANCHOR_ASYNC, ANCHOR_MODE, ROUNDS, USE_IPFS, USE_ONCHAIN
 # NOTE: `.onchain_job` (web3 + asserts on RPC_URL/PRIVATE_KEY/JOB_ABI_PATH) is
 # imported lazily inside fit() so that baseline / no_ipfs clients that do not
 # anchor on-chain run without an RPC endpoint or a deployed contract.
@@ -17,6 +18,14 @@ from .utils import USE_IPFS, USE_ONCHAIN
 # USE_IPFS / USE_ONCHAIN são INDEPENDENTES (ver ablação): `no_ipfs` usa
 # USE_IPFS=false + USE_ONCHAIN=true — os pesos vão pelo protocolo Flower e um
 # hash de conteúdo do update é ancorado on-chain.
+#
+# ANCHOR_ASYNC=true (com ANCHOR_MODE=client): o fit só assina e envia a tx; a
+# confirmação chega nas métricas do round seguinte (ver anchor_async.py).
+# Exige signer próprio (CLIENT_PRIVATE_KEY): sem ele, os N clientes reservariam
+# os mesmos nonces da PRIVATE_KEY compartilhada, e o fit volta ao envio síncrono.
+#
+# ANCHOR_MODE=batch: o cliente NÃO envia tx; reporta `content_ref` nas métricas
+# e o servidor ancora uma raiz de Merkle por round (ver flower_fl/merkle.py).
 
 JOB_ADDR = os.getenv("JOB_ADDR")
 # A ancoragem on-chain (modos no_ipfs/full) exige um JobContract deployado.
@@ -45,6 +54,9 @@ class MNISTClient(fl.client.NumPyClient):
         print(f"[Cliente {node_id}] Modelo={MODEL_NAME}  Dataset={DATASET_NAME}")
         if MALICIOUS:
             print(f"[Cliente {node_id}] ⚠ MODO MALICIOSO ATIVO: {ATTACK_TYPE} (prob={ATTACK_PROB})")
+        # RNG próprio do ataque noise: com PREFETCH_BATCHES>0 ele roda na thread
+        # do prefetch, e o gerador global do torch é o do Dropout no treino.
+        self._attack_gen = torch.Generator().manual_seed(int(os.getenv("SEED", "42")) * 1000 + int(node_id))
         self.trainloader, self.testloader = load_dataset(
             DATASET_NAME, node_id, num_nodes, alpha=ALPHA,
         )
@@ -52,12 +64,29 @@ class MNISTClient(fl.client.NumPyClient):
         print(f"[Cliente {node_id}] Treino: {len(self.trainloader.dataset)} amostras")
         print(f"[Cliente {node_id}] Teste:  {len(self.testloader.dataset)} amostras")
 
+        # ANCHOR_MODE=batch: ref do último update enviado, para conferir a prova
+        # de inclusão que o servidor devolve no config do round seguinte.
+        self._last_content_ref = None
+
+        # Conta própria do cliente (CLIENT_PRIVATE_KEY, ver keypool.py); None =
+        # PRIVATE_KEY compartilhada.
+        from .keypool import client_account_from_env
+        self._signer = client_account_from_env()
+        if self._signer is not None:
+            print(f"[Cliente {node_id}] Signer próprio: {self._signer.address}")
+        # ANCHOR_ASYNC: criado no primeiro fit que ancorar.
+        self._anchorer = None
+        self._anchor_async = ANCHOR_ASYNC and self._signer is not None
+        if USE_ONCHAIN and ANCHOR_ASYNC and ANCHOR_MODE != "batch" and self._signer is None:
+            print(f"[Cliente {node_id}] ⚠ ANCHOR_ASYNC sem CLIENT_PRIVATE_KEY: a PRIVATE_KEY "
+                  f"é compartilhada entre clientes (nonces concorrentes) — usando envio síncrono")
+
     def _apply_attack(self, images, labels):
         """Envenena (images, labels) localmente quando MALICIOUS=true.
 
         Tipos suportados:
           - label_flip: labels = (num_classes - 1) - labels
-          - noise:      images = torch.randn_like(images)
+          - noise:      images ~ N(0, 1) (gerador próprio, `_attack_gen`)
           - zero:       images = torch.zeros_like(images)
         Retorna o par sem alteração se não estiver em modo malicioso, se a
         amostra (Bernoulli ATTACK_PROB) não for selecionada, ou se o tipo for
@@ -73,7 +102,8 @@ class MNISTClient(fl.client.NumPyClient):
             labels = (num_classes - 1) - labels
             return images, labels
         if ATTACK_TYPE == "noise":
-            return torch.randn_like(images), labels
+            noise = torch.randn(images.shape, generator=self._attack_gen, dtype=images.dtype)
+            return noise.to(images.device), labels
         if ATTACK_TYPE == "zero":
             return torch.zeros_like(images), labels
         if ATTACK_TYPE == "scaling":
@@ -84,6 +114,11 @@ class MNISTClient(fl.client.NumPyClient):
             print(f"[Cliente {self.node_id}] ⚠ ATTACK_TYPE desconhecido: '{ATTACK_TYPE}' — ignorando ataque")
         return images, labels
 
+    def _prepare_batch(self, images, labels):
+        """Batch pronto para o passo de treino (device + ataque); roda na thread do prefetch."""
+        images, labels = images.to(self.device), labels.to(self.device)
+        return self._apply_attack(images, labels)
+
     def get_parameters(self, config):
         if "cid_global" in config:
             if not USE_IPFS:
@@ -100,7 +135,27 @@ class MNISTClient(fl.client.NumPyClient):
         state_dict = {k: torch.tensor(v) for k, v in params_dict}
         self.model.load_state_dict(state_dict, strict=True)
 
+    def _check_update_proof(self, config):
+        """Confere a prova de Merkle do update anterior (ANCHOR_MODE=batch).
+
+        Retorna 1/0 (prova válida/inválida) ou None se o config não trouxe
+        prova (round 1, modo client ou cliente não incluído no lote).
+        """
+        if "update_proof_root" not in config or self._last_content_ref is None:
+            return None
+        from .merkle import decode_proof, update_leaf, verify_proof
+        root = bytes.fromhex(str(config["update_proof_root"])[2:])
+        proof = decode_proof(str(config.get("update_proof", "")))
+        ok = verify_proof(update_leaf(self._last_content_ref), proof, root)
+        print(
+            f"[Cliente {self.node_id}] Prova de inclusão do round "
+            f"{config.get('update_proof_round', '?')}: {'OK' if ok else 'INVÁLIDA'} "
+            f"(root={str(config['update_proof_root'])[:18]}...)"
+        )
+        return int(ok)
+
     def fit(self, parameters, config):
+        proof_ok = self._check_update_proof(config)
         initial_global_params = [np.array(p, copy=True) for p in parameters]
         # Tempo de download/sincronização do modelo global para o cliente.
         _download_t0 = time.time()
@@ -128,11 +183,11 @@ class MNISTClient(fl.client.NumPyClient):
 
         print(f"[Cliente {self.node_id}] Rodada {server_round}: Iniciando treino...")
 
+        # PREFETCH_BATCHES>0: os próximos batches (indexação, normalização,
+        # ataque) são montados numa thread enquanto o atual treina.
+        batches = BatchPrefetcher(self.trainloader, prepare=self._prepare_batch)
         for _ in range(epochs):
-            for images, labels in self.trainloader:
-                images, labels = images.to(self.device), labels.to(self.device)
-                images, labels = self._apply_attack(images, labels)
-
+            for images, labels in batches:
                 optimizer.zero_grad()
                 outputs = self.model(images)
                 loss = criterion(outputs, labels)
@@ -170,6 +225,7 @@ class MNISTClient(fl.client.NumPyClient):
                 )
         cid_up = None
         tx_hash = None
+        anchor_ok = None
         upload_ipfs_time_s = 0.0
         blockchain_tx_time_s = 0.0
 
@@ -189,15 +245,37 @@ class MNISTClient(fl.client.NumPyClient):
             content_ref = content_hash_numpy(updated_params)
 
         # Camada de ANCORAGEM (on-chain) — opcional (USE_ONCHAIN).
-        if USE_ONCHAIN:
+        if USE_ONCHAIN and ANCHOR_MODE == "batch":
+            self._last_content_ref = content_ref
+            print(f"[Cliente {self.node_id}] Ancoragem em lote: ref entregue ao servidor")
+        elif USE_ONCHAIN and self._anchor_async:
+            try:
+                if self._anchorer is None:
+                    from .anchor_async import AsyncAnchorer  # import tardio
+                    self._anchorer = AsyncAnchorer(
+                        JOB_ADDR, self._signer,
+                        receipt_timeout=float(os.getenv("ANCHOR_RECEIPT_TIMEOUT_S", "120")),
+                    )
+                _tx_t0 = time.time()
+                tx_hash = self._anchorer.submit(
+                    server_round if isinstance(server_round, int) else 0, content_ref,
+                )
+                blockchain_tx_time_s = time.time() - _tx_t0  # só assinatura + envio
+                print(f"[Cliente {self.node_id}] Update enviado on-chain: tx={tx_hash} (confirmação em 2º plano)")
+            except Exception as e:
+                anchor_ok = 0
+                print(f"[Cliente {self.node_id}] ERRO na blockchain: {e}")
+        elif USE_ONCHAIN:
             try:
                 from .onchain_job import job_send_update  # import tardio
                 _tx_t0 = time.time()
-                r = job_send_update(JOB_ADDR, content_ref)
+                r = job_send_update(JOB_ADDR, content_ref, signer=self._signer)
                 blockchain_tx_time_s = time.time() - _tx_t0
                 tx_hash = r.get("hash")
-                print(f"[Cliente {self.node_id}] Update ancorado on-chain: tx={tx_hash}")
+                anchor_ok = int(r.get("status", 1) == 1)
+                print(f"[Cliente {self.node_id}] Update ancorado on-chain: tx={tx_hash} ok={anchor_ok}")
             except Exception as e:
+                anchor_ok = 0
                 print(f"[Cliente {self.node_id}] ERRO na blockchain: {e}")
         else:
             print(f"[Cliente {self.node_id}] Sem on-chain: update via protocolo Flower")
@@ -216,6 +294,9 @@ class MNISTClient(fl.client.NumPyClient):
                 download_time_s + train_time + upload_ipfs_time_s + blockchain_tx_time_s
             ),
             "train_samples": int(total_samples),
+            "samples_per_s": float(total_samples / train_time) if train_time > 0 else 0.0,
+            "dataset_mode": dataset_mode(),
+            **batches.stats(),
             "epochs": int(epochs),
             "node_id": int(self.node_id),
             "is_malicious": int(MALICIOUS),
@@ -226,10 +307,40 @@ class MNISTClient(fl.client.NumPyClient):
             metrics["cid"] = cid_up
         if tx_hash is not None:
             metrics["tx_hash"] = str(tx_hash)
+        if anchor_ok is not None:
+            metrics["anchor_ok"] = anchor_ok
+        if USE_ONCHAIN and ANCHOR_MODE == "batch" and content_ref is not None:
+            metrics["content_ref"] = content_ref
+        if proof_ok is not None:
+            metrics["anchor_proof_ok"] = proof_ok
+        if self._anchorer is not None:
+            # Confirmações dos rounds anteriores; no último round espera as
+            # pendentes para que todas cheguem ao servidor.
+            from .anchor_async import summarize
+            if isinstance(server_round, int) and server_round >= ROUNDS:
+                confirmed = self._anchorer.flush(self._anchorer.receipt_timeout)
+            else:
+                confirmed = self._anchorer.drain()
+            metrics.update(summarize(confirmed, self._anchorer.pending))
 
         return updated_params, len(self.trainloader.dataset), metrics
 
+    def close_anchoring(self):
+        """Flush final do ANCHOR_ASYNC: confirma o que ficou pendente e loga."""
+        if self._anchorer is None:
+            return
+        from .anchor_async import summarize
+        results = self._anchorer.close(self._anchorer.receipt_timeout)
+        if results or self._anchorer.pending:
+            print(f"[Cliente {self.node_id}] Confirmações finais: {summarize(results, self._anchorer.pending)}")
+
     def evaluate(self, parameters, config):
+        # Último round em ANCHOR_MODE=batch: a prova do lote chega aqui, pois
+        # não há próximo fit; ``proof_only`` = só conferir, sem avaliar.
+        proof_ok = self._check_update_proof(config)
+        proof_metrics = {} if proof_ok is None else {"anchor_proof_ok": proof_ok}
+        if config.get("proof_only"):
+            return 0.0, 0, {"node_id": int(self.node_id), **proof_metrics}
         self.set_parameters(parameters)
         self.model.eval()
         self.model.to(self.device)
@@ -250,6 +361,7 @@ class MNISTClient(fl.client.NumPyClient):
         return float(loss), len(self.testloader.dataset), {
             "accuracy": float(accuracy),
             "node_id": int(self.node_id),
+            **proof_metrics,
         }
 
 
@@ -269,6 +381,9 @@ if __name__ == "__main__":
     print(f" CLIENTE {NODE_ID}/{NUM_NODES - 1}")
     print(f"{'=' * 70}\n")
 
-    client = MNISTClient(node_id=NODE_ID, num_nodes=NUM_NODES).to_client()
+    numpy_client = MNISTClient(node_id=NODE_ID, num_nodes=NUM_NODES)
     time.sleep(2)  # pequeno delay para garantir que o servidor esteja pronto
-    fl.client.start_client(server_address="0.0.0.0:8080", client=client)
+    try:
+        fl.client.start_client(server_address="0.0.0.0:8080", client=numpy_client.to_client())
+    finally:
+        numpy_client.close_anchoring()
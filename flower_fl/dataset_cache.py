@@ -0,0 +1,131 @@
+"""Cache uint8 mapeado em memória dos datasets, compartilhado pelos clientes do host.
+
+Cada processo de cliente fazia ``datasets.MNIST(download=True)`` /
+``datasets.CIFAR10(...)``: lia e decodificava o conjunto de treino inteiro
+(60k/50k imagens) para a sua própria memória só para tirar um ``Subset`` —
+com N=32 clientes, 32 cópias e 32 parses no startup. Aqui:
+
+1. `build_cache(name)` (uma vez por host; os drivers chamam
+   `prepare_for_clients` antes de subir os clientes) grava, por split,
+   ``{name}_{split}_x.npy`` (imagens uint8 N×C×H×W contíguas) e
+   ``{name}_{split}_y.npy`` (labels int64) em ``DATASET_CACHE_DIR``;
+2. `open_cache(name, split)` abre o ``.npy`` com ``mmap_mode="r"``: o cliente
+   só toca as páginas da sua partição, que ficam no page cache do SO e são
+   compartilhadas entre processos (nenhuma cópia privada do dataset).
+
+A normalização (uint8 -> float) é feita por batch em
+`datasets.MmapBatchLoader` (DATASET_MODE=mmap).
+
+    python -m flower_fl.dataset_cache mnist cifar10
+"""
+from __future__ import annotations
+
+import argparse
+import fcntl
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+SPLITS = ("train", "test")
+DATASETS = ("mnist", "cifar10")
+
+
+def cache_dir(path: Optional[str] = None) -> Path:
+    return Path(path or os.getenv("DATASET_CACHE_DIR", "data/cache"))
+
+
+def cache_paths(name: str, split: str, directory: Optional[str] = None) -> Tuple[Path, Path]:
+    base = cache_dir(directory)
+    return base / f"{name}_{split}_x.npy", base / f"{name}_{split}_y.npy"
+
+
+def _torchvision_split(name: str, split: str, root: str):
+    from torchvision import datasets
+
+    cls = {"mnist": datasets.MNIST, "cifar10": datasets.CIFAR10}.get(name)
+    if cls is None:
+        raise ValueError(f"Dataset '{name}' não suportado. Use 'mnist' ou 'cifar10'.")
+    return cls(root, train=(split == "train"), download=True)
+
+
+def _write_npy(path: Path, array: np.ndarray) -> None:
+    # Arquivo temporário + rename: quem abre o cache nunca vê um .npy pela metade.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=array.dtype, shape=array.shape)
+    out[...] = array
+    out.flush()
+    del out
+    os.replace(tmp, path)
+
+
+def build_cache(name: str, root: str = "./data", directory: Optional[str] = None,
+                force: bool = False) -> Dict[str, Dict[str, float]]:
+    """Grava o cache de `name` (train e test); devolve tempo e tamanho por split."""
+    from .datasets import _labels, _uint8_nchw
+
+    cache_dir(directory).mkdir(parents=True, exist_ok=True)
+    stats: Dict[str, Dict[str, float]] = {}
+    for split in SPLITS:
+        x_path, y_path = cache_paths(name, split, directory)
+        if x_path.exists() and y_path.exists() and not force:
+            continue
+        t0 = time.perf_counter()
+        ds = _torchvision_split(name, split, root)
+        images = _uint8_nchw(ds).contiguous().numpy()
+        _write_npy(y_path, _labels(ds).numpy())
+        _write_npy(x_path, images)
+        stats[split] = {"seconds": time.perf_counter() - t0, "bytes": float(images.nbytes)}
+        print(f"[dataset_cache] {name}/{split}: {images.shape} uint8 -> {x_path} "
+              f"({images.nbytes / 1e6:.1f} MB, {stats[split]['seconds']:.1f}s)")
+    return stats
+
+
+def ensure_cache(name: str, root: str = "./data", directory: Optional[str] = None) -> None:
+    """`build_cache` sob lock de arquivo: processos concorrentes montam o cache uma vez só."""
+    name = name.lower()
+    if all(p.exists() for split in SPLITS for p in cache_paths(name, split, directory)):
+        return
+    cache_dir(directory).mkdir(parents=True, exist_ok=True)
+    with open(cache_dir(directory) / f".{name}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            build_cache(name, root, directory)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def open_cache(name: str, split: str, directory: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(imagens uint8 N×C×H×W em mmap somente leitura, labels int64) de `split`."""
+    ensure_cache(name, directory=directory)
+    x_path, y_path = cache_paths(name.lower(), split, directory)
+    return np.load(x_path, mmap_mode="r"), np.load(y_path, mmap_mode="r")
+
+
+def prepare_for_clients(name: Optional[str] = None) -> None:
+    """Chamado pelos drivers antes de subir os clientes: com DATASET_MODE=mmap,
+    monta o cache de `name` (default DATASET) aqui, e não no 1º cliente."""
+    if os.getenv("DATASET_MODE", "loader").strip().lower() != "mmap":
+        return
+    name = (name or os.getenv("DATASET", "mnist")).lower()
+    t0 = time.perf_counter()
+    ensure_cache(name)
+    print(f"[dataset_cache] cache {name} pronto em {cache_dir()} ({time.perf_counter() - t0:.1f}s)")
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Pré-processa datasets num cache uint8 mapeável (DATASET_MODE=mmap)")
+    p.add_argument("datasets", nargs="*", default=["mnist"], choices=DATASETS)
+    p.add_argument("--root", type=str, default="./data")
+    p.add_argument("--cache-dir", type=str, default=None)
+    p.add_argument("--force", action="store_true", help="Regrava mesmo se o cache existir.")
+    args = p.parse_args()
+    for name in args.datasets:
+        build_cache(name, args.root, args.cache_dir, force=args.force)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,200 @@
+import math
 import os
 import torch
 import numpy as np
 from torchvision import datasets, transforms
 
+from .partition import contiguous_range, partition_scheme
+from .partition import node_indices as partition_node_indices
 
-# SEED de módulo (usado por load_cifar10 para o particionamento Dirichlet).
+
+# SEED de módulo (semente do plano de particionamento Dirichlet, ver partition.py).
 SEED = int(os.getenv("SEED", "42"))
 
+# DATASET_MODE:
+#   loader — Subset + ToTensor/Normalize por amostra num DataLoader (original);
+#   tensor — a partição é decodificada UMA vez num tensor contíguo já
+#            normalizado e os batches saem de `TensorBatchLoader` (índices
+#            embaralhados por permutação, sem Python por amostra);
+#   mmap   — a partição é lida do cache uint8 compartilhado do host
+#            (dataset_cache.py) e normalizada por batch (`MmapBatchLoader`).
+DATASET_MODES = ("loader", "tensor", "mmap")
+BATCH_SIZE = 32
+
+MNIST_MEAN, MNIST_STD = (0.1307,), (0.3081,)
+CIFAR10_MEAN, CIFAR10_STD = (0.4914, 0.4822, 0.4465), (0.2470, 0.2435, 0.2616)
+
+
+def dataset_mode(mode=None) -> str:
+    mode = (mode or os.getenv("DATASET_MODE", "loader")).strip().lower()
+    if mode not in DATASET_MODES:
+        raise ValueError(f"DATASET_MODE inválido: {mode!r} (use {', '.join(DATASET_MODES)})")
+    return mode
+
+
+def normalize_uint8(images, mean, std) -> torch.Tensor:
+    """uint8 NCHW -> float32 normalizado; igual a ToTensor + Normalize, em lote."""
+    images = torch.as_tensor(images)
+    out = images.to(torch.float32).div_(255.0)
+    m = torch.tensor(mean, dtype=torch.float32).view(1, -1, 1, 1)
+    s = torch.tensor(std, dtype=torch.float32).view(1, -1, 1, 1)
+    return out.sub_(m).div_(s).contiguous()
+
+
+def _uint8_nchw(ds, indices=None) -> torch.Tensor:
+    """Imagens cruas (uint8, NCHW) de um dataset do torchvision, sem PIL."""
+    data = torch.as_tensor(ds.data)  # MNIST: tensor; CIFAR-10: ndarray
+    if indices is not None:
+        data = data.index_select(0, torch.as_tensor(np.asarray(indices, dtype=np.int64)))
+    if data.dim() == 3:  # MNIST: N×H×W
+        return data.unsqueeze(1)
+    return data.permute(0, 3, 1, 2)  # CIFAR-10: N×H×W×C
+
+
+def _labels(ds, indices=None) -> torch.Tensor:
+    targets = torch.as_tensor(np.asarray(ds.targets), dtype=torch.int64)
+    if indices is not None:
+        targets = targets.index_select(0, torch.as_tensor(np.asarray(indices, dtype=np.int64)))
+    return targets
+
+
+class TensorBatchLoader:
+    """Batches de tensores já normalizados, na interface usada pelo cliente.
+
+    Itera ``(images, labels)`` como o DataLoader e expõe ``dataset`` (para
+    ``len(loader.dataset)``). Com ``shuffle``, cada época usa um
+    ``torch.randperm`` (RNG global do torch, como o DataLoader) e cada batch é
+    um ``index_select`` — uma operação por batch, não por amostra.
+    """
+
+    def __init__(self, images: torch.Tensor, labels: torch.Tensor,
+                 batch_size: int = BATCH_SIZE, shuffle: bool = False):
+        self.images = images.contiguous()
+        self.labels = labels
+        self.dataset = torch.utils.data.TensorDataset(self.images, self.labels)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+
+    def __len__(self) -> int:
+        return math.ceil(len(self.labels) / self.batch_size)
+
+    def _batch(self, idx: torch.Tensor):
+        return self.images.index_select(0, idx), self.labels.index_select(0, idx)
+
+    def _range(self, start: int, end: int):
+        return self.images[start:end], self.labels[start:end]
+
+    def __iter__(self):
+        # A permutação é sorteada já no iter(), não no 1º batch: com o prefetch
+        # (prefetch.py) ela sai da thread do treino, na mesma ordem de RNG.
+        order = torch.randperm(len(self.labels)) if self.shuffle else None
+        return self._batches(order)
+
+    def _batches(self, order):
+        n = len(self.labels)
+        if order is not None:
+            for start in range(0, n, self.batch_size):
+                yield self._batch(order[start:start + self.batch_size])
+        else:
+            for start in range(0, n, self.batch_size):
+                yield self._range(start, min(start + self.batch_size, n))
+
+
+class _MmapPartition(torch.utils.data.Dataset):
+    """Visão amostra a amostra de um `MmapBatchLoader` (para ``len(loader.dataset)``)."""
+
+    def __init__(self, loader: "MmapBatchLoader"):
+        self.loader = loader
+
+    def __len__(self) -> int:
+        return len(self.loader.labels)
+
+    def __getitem__(self, i: int):
+        images, labels = self.loader._range(i, i + 1)
+        return images[0], labels[0]
+
+
+class MmapBatchLoader(TensorBatchLoader):
+    """Como `TensorBatchLoader`, mas sobre o cache uint8 em mmap (dataset_cache.py).
+
+    `images` é o array mapeado inteiro (ou só a fatia da partição, se ela for
+    contígua) e `rows` as linhas da partição nele (``None`` = todas). Cada
+    batch lê só as suas linhas (em ordem crescente, para localidade) e as
+    normaliza na hora; nada do dataset é copiado para memória privada além
+    dos labels da partição.
+    """
 
-def load_mnist(node_id, num_nodes=3):
+    def __init__(self, images: np.ndarray, labels: np.ndarray, mean, std, rows=None,
+                 batch_size: int = BATCH_SIZE, shuffle: bool = False):
+        if rows is not None:
+            rows = np.sort(np.asarray(rows, dtype=np.int64))
+            labels = labels[rows]
+        self.images = images
+        self.rows = rows
+        self.labels = torch.from_numpy(np.array(labels, dtype=np.int64))
+        self.mean, self.std = mean, std
+        self.dataset = _MmapPartition(self)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+
+    def _batch(self, idx: torch.Tensor):
+        pos = np.sort(idx.numpy())
+        rows = pos if self.rows is None else self.rows[pos]
+        images = normalize_uint8(np.take(self.images, rows, axis=0), self.mean, self.std)
+        return images, self.labels[torch.from_numpy(pos)]
+
+    def _range(self, start: int, end: int):
+        if self.rows is None:
+            raw = np.array(self.images[start:end])
+        else:
+            raw = np.take(self.images, self.rows[start:end], axis=0)
+        return normalize_uint8(raw, self.mean, self.std), self.labels[start:end]
+
+
+def _tensor_loaders(train_dataset, test_dataset, indices, mean, std):
+    trainloader = TensorBatchLoader(
+        normalize_uint8(_uint8_nchw(train_dataset, indices), mean, std),
+        _labels(train_dataset, indices),
+        shuffle=True,
+    )
+    testloader = TensorBatchLoader(
+        normalize_uint8(_uint8_nchw(test_dataset), mean, std),
+        _labels(test_dataset),
+    )
+    return trainloader, testloader
+
+
+def _mmap_loaders(name, mean, std, rows=None, start=None, end=None):
+    """Loaders sobre o cache do host; partição por `rows` ou pela faixa [start, end)."""
+    from .dataset_cache import open_cache
+
+    x, y = open_cache(name, "train")
+    if start is not None:
+        x, y = x[start:end], y[start:end]
+    trainloader = MmapBatchLoader(x, y, mean, std, rows=rows, shuffle=True)
+    x_test, y_test = open_cache(name, "test")
+    testloader = MmapBatchLoader(x_test, y_test, mean, std)
+    return trainloader, testloader
+
+
+def _node_partition(name, node_id, num_nodes, alpha, targets):
+    """(start, end, rows) da partição do nó: faixa contígua, ou `rows` do plano
+    Dirichlet em cache (partition.py), conforme PARTITION."""
+    if partition_scheme(name) == "contiguous":
+        start_idx, end_idx = contiguous_range(node_id, num_nodes, len(targets))
+        return start_idx, end_idx, None
+    return None, None, partition_node_indices(name, node_id, num_nodes, alpha, SEED,
+                                              targets=np.asarray(targets))
+
+
+def _describe(name, node_id, alpha, start_idx, end_idx, rows, mode):
+    if rows is None:
+        print(f"[Dataset] Node {node_id}: índices {start_idx}-{end_idx} ({end_idx - start_idx} amostras, {mode})")
+    else:
+        print(f"[Dataset] Node {node_id}: {len(rows)} amostras {name} (Dirichlet α={alpha}, {mode})")
+
+
+def load_mnist(node_id, num_nodes=3, mode=None, alpha: float = 0.5):
     # Seed opcional para reprodutibilidade entre repetições do multi_run.
     seed_env = os.getenv("SEED")
     if seed_env is not None:
@@ -19,9 +205,17 @@ def load_mnist(node_id, num_nodes=3):
         except ValueError:
             pass
 
+    mode = dataset_mode(mode)
+    if mode == "mmap":
+        from .dataset_cache import open_cache
+        start_idx, end_idx, rows = _node_partition("mnist", node_id, num_nodes, alpha,
+                                                   open_cache("mnist", "train")[1])
+        _describe("MNIST", node_id, alpha, start_idx, end_idx, rows, mode)
+        return _mmap_loaders("mnist", MNIST_MEAN, MNIST_STD, rows=rows, start=start_idx, end=end_idx)
+
     transform = transforms.Compose([
         transforms.ToTensor(),
-        transforms.Normalize((0.1307,), (0.3081,))
+        transforms.Normalize(MNIST_MEAN, MNIST_STD)
     ])
 
     # Download dataset
@@ -32,28 +226,21 @@ def load_mnist(node_id, num_nodes=3):
         './data', train=False, download=True, transform=transform
     )
 
-    total_train = len(train_dataset)  # 60000
-    partition_size = total_train // num_nodes
-
-    start_idx = node_id * partition_size
-    end_idx = start_idx + partition_size
-
-    # Último node pega o resto
-    if node_id == num_nodes - 1:
-        end_idx = total_train
+    start_idx, end_idx, rows = _node_partition("mnist", node_id, num_nodes, alpha, train_dataset.targets)
+    _describe("MNIST", node_id, alpha, start_idx, end_idx, rows, mode)
+    if rows is None:
+        rows = np.arange(start_idx, end_idx)
+    if mode == "tensor":
+        return _tensor_loaders(train_dataset, test_dataset, rows, MNIST_MEAN, MNIST_STD)
 
     # Criar subset
-    train_subset = torch.utils.data.Subset(
-        train_dataset,
-        list(range(start_idx, end_idx))
-    )
-
-    print(f"[Dataset] Node {node_id}: índices {start_idx}-{end_idx} ({len(train_subset)} amostras)")
+    train_subset = torch.utils.data.Subset(train_dataset, rows.tolist())
 
-    # DataLoaders SEM workers (evita fork)
+    # DataLoaders SEM workers (evita fork); a sobreposição com o treino vem do
+    # prefetch em thread (prefetch.py, PREFETCH_BATCHES)
     trainloader = torch.utils.data.DataLoader(
         train_subset,
-        batch_size=32,
+        batch_size=BATCH_SIZE,
         shuffle=True,
         num_workers=0,
         pin_memory=False
@@ -61,7 +248,7 @@ def load_mnist(node_id, num_nodes=3):
 
     testloader = torch.utils.data.DataLoader(
         test_dataset,
-        batch_size=32,
+        batch_size=BATCH_SIZE,
         shuffle=False,
         num_workers=0,
         pin_memory=False
@@ -70,7 +257,7 @@ def load_mnist(node_id, num_nodes=3):
     return trainloader, testloader
 
 
-def load_cifar10(node_id: int, num_nodes: int, alpha: float = 0.5):
+def load_cifar10(node_id: int, num_nodes: int, alpha: float = 0.5, mode=None):
     """Carrega CIFAR-10 com particionamento não-IID via Dirichlet(α).
 
     Para cada classe c em {0..9}, amostra proporções
@@ -81,16 +268,23 @@ def load_cifar10(node_id: int, num_nodes: int, alpha: float = 0.5):
     - α pequeno (ex.: 0.1) ⇒ partições altamente não-IID (cada nó concentra
       poucas classes).
     - α grande (ex.: 100.0) ⇒ partições aproximadamente IID.
+
+    `mode` (default DATASET_MODE) escolhe DataLoader, `TensorBatchLoader` ou
+    `MmapBatchLoader`.
     """
     np.random.seed(SEED)
     torch.manual_seed(SEED)
+    mode = dataset_mode(mode)
+    if mode == "mmap":
+        from .dataset_cache import open_cache
+        start_idx, end_idx, rows = _node_partition("cifar10", node_id, num_nodes, alpha,
+                                                   open_cache("cifar10", "train")[1])
+        _describe("CIFAR-10", node_id, alpha, start_idx, end_idx, rows, mode)
+        return _mmap_loaders("cifar10", CIFAR10_MEAN, CIFAR10_STD, rows=rows, start=start_idx, end=end_idx)
 
     transform = transforms.Compose([
         transforms.ToTensor(),
-        transforms.Normalize(
-            (0.4914, 0.4822, 0.4465),
-            (0.2470, 0.2435, 0.2616),
-        ),
+        transforms.Normalize(CIFAR10_MEAN, CIFAR10_STD),
     ])
 
     train_dataset = datasets.CIFAR10(
@@ -100,37 +294,24 @@ def load_cifar10(node_id: int, num_nodes: int, alpha: float = 0.5):
         './data', train=False, download=True, transform=transform
     )
 
-    targets = np.array(train_dataset.targets)
-    num_classes = 10
-
-    # Para cada classe, dividir índices entre os nós segundo Dirichlet(α).
-    node_indices = [[] for _ in range(num_nodes)]
-    for c in range(num_classes):
-        idx_c = np.where(targets == c)[0]
-        np.random.shuffle(idx_c)
-
-        proportions = np.random.dirichlet([alpha] * num_nodes)
-        # Cumulativo → pontos de corte
-        cuts = (np.cumsum(proportions) * len(idx_c)).astype(int)[:-1]
-        splits = np.split(idx_c, cuts)
-        for n, split in enumerate(splits):
-            node_indices[n].extend(split.tolist())
-
-    my_indices = node_indices[node_id]
-    train_subset = torch.utils.data.Subset(train_dataset, my_indices)
-
-    print(f"[Dataset] Node {node_id}: {len(train_subset)} amostras CIFAR-10 (α={alpha})")
+    # Plano Dirichlet(α) em cache, calculado uma vez para todos os nós.
+    start_idx, end_idx, rows = _node_partition("cifar10", node_id, num_nodes, alpha, train_dataset.targets)
+    _describe("CIFAR-10", node_id, alpha, start_idx, end_idx, rows, mode)
+    my_indices = np.arange(start_idx, end_idx) if rows is None else rows
+    if mode == "tensor":
+        return _tensor_loaders(train_dataset, test_dataset, my_indices, CIFAR10_MEAN, CIFAR10_STD)
 
+    train_subset = torch.utils.data.Subset(train_dataset, my_indices.tolist())
     trainloader = torch.utils.data.DataLoader(
         train_subset,
-        batch_size=32,
+        batch_size=BATCH_SIZE,
         shuffle=True,
         num_workers=0,
         pin_memory=False,
     )
     testloader = torch.utils.data.DataLoader(
         test_dataset,
-        batch_size=32,
+        batch_size=BATCH_SIZE,
         shuffle=False,
         num_workers=0,
         pin_memory=False,
@@ -142,7 +323,7 @@ def load_dataset(name: str, node_id: int, num_nodes: int, **kwargs):
     """Dispatcher: seleciona o loader pelo nome ('mnist' | 'cifar10')."""
     key = (name or "").lower()
     if key == "mnist":
-        return load_mnist(node_id, num_nodes)
+        return load_mnist(node_id, num_nodes, mode=kwargs.get("mode"), alpha=kwargs.get("alpha", 0.5))
     if key == "cifar10":
-        return load_cifar10(node_id, num_nodes, alpha=kwargs.get("alpha", 0.5))
+        return load_cifar10(node_id, num_nodes, alpha=kwargs.get("alpha", 0.5), mode=kwargs.get("mode"))
     raise ValueError(f"Dataset '{name}' não suportado. Use 'mnist' ou 'cifar10'.")
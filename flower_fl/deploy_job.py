@@ -3,7 +3,6 @@ import os
 import json
 from pathlib import Path
 from dotenv import find_dotenv, set_key
-from eth_account import Account
 
 try:
     from . import onchain_dao
@@ -19,10 +18,10 @@ from .onchain_dao import (
     accept_offer,
     sign_job_contract,
     w3,
-    get_requester_contract,
-    get_trainer_contract,
+    get_participant_contracts,
     ZERO_ADDRESS,
     extract_offer_id_from_logs,
+    extract_job_address_from_logs,
 )
 
 # --- Endereços do seu 'npx hardhat node' ---
@@ -32,34 +31,21 @@ KEY_REQUESTER = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2f
 ADDR_TRAINER = "0x70997970c51812dc3a010c7d01b50e0d17dc79c8"
 KEY_TRAINER = "0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d"
 
-JOB_VALUE_WEI = w3.to_wei(0.003, "ether")
-acct = Account.from_key(os.getenv("PRIVATE_KEY"))
+VALUE_BY_UPDATE_WEI = w3.to_wei(0.001, "ether")
+# Capacidade do job (recordClientUpdate reverte depois disso): com o pool de
+# chaves cada cliente ancora por rodada, então N clientes x R rodadas.
+NUMBER_OF_UPDATES = int(os.getenv("JOB_NUMBER_OF_UPDATES", "3"))
+JOB_VALUE_WEI = VALUE_BY_UPDATE_WEI * NUMBER_OF_UPDATES
 
-
-def switch_env_user(private_key):
-    env_file = find_dotenv()
-    if not env_file:
-        print("!!! ERRO: Arquivo .env não encontrado.")
-        return False
-
-    print(f"\n... Trocando usuário no .env para a chave: {private_key[:10]}...")
-    set_key(env_file, "PRIVATE_KEY", private_key)
-    os.environ["PRIVATE_KEY"] = private_key
-
-    global acct
-    acct = Account.from_key(private_key)
-    onchain_dao.acct = acct
-
-    print(f"... Usuário trocado. Endereço ativo: {acct.address}")
-    return True
+# Os dois papéis ficam no registro em memória de onchain_dao; cada chamada
+# recebe o signer explicitamente (o .env só é tocado no fim, para a FASE 3).
+REQUESTER = onchain_dao.SIGNERS.add(KEY_REQUESTER)
+TRAINER = onchain_dao.SIGNERS.add(KEY_TRAINER)
 
 
 def parse_logs_for_job_address(logs):
-    if logs:
-        job_addr_raw = logs[0]['topics'][1].hex()
-        job_addr = "0x" + job_addr_raw[-40:]
-        return w3.to_checksum_address(job_addr)
-    return None
+    # JobContractCreated pelo topic0 (não depende da posição do log no receipt).
+    return extract_job_address_from_logs(logs)
 
 
 def run_all_phases():
@@ -76,42 +62,43 @@ def run_all_phases():
             "tx_hash": receipt["hash"],
         })
 
+    # Contratos já registrados das duas contas, numa só leitura (Multicall).
+    participants = get_participant_contracts([ADDR_REQUESTER, ADDR_TRAINER])
+
     # --- Parte 1: Registro do Requisitante ---
-    if not switch_env_user(KEY_REQUESTER): return
-    print(f"\n--- Parte 1: Ações do Requisitante ({acct.address}) ---")
+    print(f"\n--- Parte 1: Ações do Requisitante ({REQUESTER.address}) ---")
     print("1. Registrando Requisitante...")
-    requester_contract = get_requester_contract(acct.address)
+    requester_contract = participants[w3.to_checksum_address(ADDR_REQUESTER)][0]
     if requester_contract and requester_contract != ZERO_ADDRESS:
         print(f"   -> Requisitante já registrado. Contrato: {requester_contract}")
     else:
-        r_requester = register_requester()
+        r_requester = register_requester(signer=REQUESTER)
         _record("registerRequester", "requester", r_requester)
         print(f"   -> Tx: {r_requester['hash']}")
 
     # --- Parte 2: Registro do Treinador ---
-    if not switch_env_user(KEY_TRAINER): return
-    print(f"\n--- Parte 2: Ações do Treinador ({acct.address}) ---")
+    print(f"\n--- Parte 2: Ações do Treinador ({TRAINER.address}) ---")
     print("2. Registrando Treinador...")
     spec = ("Processador Exemplo", "16GB", "8 Cores")
-    trainer_contract = get_trainer_contract(acct.address)
+    trainer_contract = participants[w3.to_checksum_address(ADDR_TRAINER)][1]
     if trainer_contract and trainer_contract != ZERO_ADDRESS:
         print(f"   -> Treinador já registrado. Contrato: {trainer_contract}")
     else:
-        r_trainer = register_trainer("Treinador de IA", spec)
+        r_trainer = register_trainer("Treinador de IA", spec, signer=TRAINER)
         _record("registerTrainer", "trainer", r_trainer)
         print(f"   -> Tx: {r_trainer['hash']}")
 
     # --- Parte 3: Oferta do Requisitante ---
-    if not switch_env_user(KEY_REQUESTER): return
-    print(f"\n--- Parte 3: Ações do Requisitante ({acct.address}) ---")
+    print(f"\n--- Parte 3: Ações do Requisitante ({REQUESTER.address}) ---")
     print(f"3. Fazendo oferta para o Treinador (AGORA REGISTRADO) ({ADDR_TRAINER})...")
     r_offer = make_offer(
         description="Treinamento de modelo de imagem",
         model_cid="bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi",
-        value_by_update_wei=w3.to_wei(0.001, "ether"),
-        number_of_updates=3,
+        value_by_update_wei=VALUE_BY_UPDATE_WEI,
+        number_of_updates=NUMBER_OF_UPDATES,
         trainer_addr=ADDR_TRAINER,
-        server_endpoint="0.0.0.0:8080"
+        server_endpoint="0.0.0.0:8080",
+        signer=REQUESTER,
     )
     _record("MakeOffer", "requester", r_offer)
     print(f"   -> Tx: {r_offer['hash']}")
@@ -125,10 +112,9 @@ def run_all_phases():
         return
     print(f"   -> offerId = {offer_id}")
 
-    if not switch_env_user(KEY_TRAINER): return
-    print(f"\n--- Parte 4: Ações do Treinador ({acct.address}) ---")
+    print(f"\n--- Parte 4: Ações do Treinador ({TRAINER.address}) ---")
     print(f"5. Aceitando oferta {offer_id}...")
-    r_accept = accept_offer(int(offer_id))
+    r_accept = accept_offer(int(offer_id), signer=TRAINER)
     _record("AcceptOffer", "trainer", r_accept)
     print(f"   -> Tx: {r_accept['hash']}")
 
@@ -138,17 +124,21 @@ def run_all_phases():
         return
     print(f"   -> JobContract criado em: {job_address}")
 
-    if not switch_env_user(KEY_REQUESTER): return
-    print(f"\n--- Parte 5: Financiamento do Job ({acct.address}) ---")
+    print(f"\n--- Parte 5: Financiamento do Job ({REQUESTER.address}) ---")
     print(f"6. Assinando e depositando {w3.from_wei(JOB_VALUE_WEI, 'ether')} ETH no Job...")
-    r_sign_requester = sign_job_contract(job_address, total_amount_wei=JOB_VALUE_WEI)
+    r_sign_requester = sign_job_contract(job_address, total_amount_wei=JOB_VALUE_WEI, signer=REQUESTER)
     _record("signJobContract+fund", "requester", r_sign_requester)
     print(f"   -> Tx: {r_sign_requester['hash']}")
 
-    if not switch_env_user(KEY_TRAINER): return
-    print(f"\n--- Parte 6: Assinatura final do Job ({acct.address}) ---")
+    if os.getenv("STORE_UPDATE_HASHES", "true").strip().lower() == "false":
+        from . import onchain_job
+        print("   -> STORE_UPDATE_HASHES=false: hashes de update só nos eventos")
+        r_events_only = onchain_job.job_set_store_update_hashes(job_address, False, signer=REQUESTER)
+        _record("setStoreUpdateHashes", "requester", r_events_only)
+
+    print(f"\n--- Parte 6: Assinatura final do Job ({TRAINER.address}) ---")
     print(f"7. Treinador assinando o Job...")
-    r_sign_trainer = sign_job_contract(job_address, total_amount_wei=0)
+    r_sign_trainer = sign_job_contract(job_address, total_amount_wei=0, signer=TRAINER)
     _record("signJobContract", "trainer", r_sign_trainer)
     print(f"   -> Tx: {r_sign_trainer['hash']}")
 
@@ -170,9 +160,14 @@ def run_all_phases():
         print(f"\n Gas breakdown do marketplace salvo em: {out}")
 
     env_file = find_dotenv()
+    if not env_file:
+        print("!!! ERRO: Arquivo .env não encontrado; exporte JOB_ADDR manualmente.")
+        return
     set_key(env_file, "JOB_ADDRS", job_address)
     set_key(env_file, "JOB_ADDR", job_address)
-    switch_env_user(KEY_REQUESTER)
+    # Server/cliente (FASE 3) agem como o requisitante.
+    if os.getenv("PRIVATE_KEY", "").lower() != KEY_REQUESTER.lower():
+        set_key(env_file, "PRIVATE_KEY", KEY_REQUESTER)
 
     print("\n.env atualizado. Pronto para a FASE 3.")
     print("No Terminal 2, rode: python -m flower_fl.server")
@@ -0,0 +1,223 @@
+"""Decodificação de logs por topic0, com o registro montado uma vez a partir do ABI.
+
+Decodificar com ``contract.events[nome]().process_log(log)`` exige saber de
+antemão qual evento é o log; sem isso, o caminho antigo
+(``onchain_dao.extract_offer_id_from_logs``) recriava um contrato por evento
+do ABI a cada chamada e tentava todos contra todos os logs, engolindo as
+exceções. `EventRegistry` indexa cada evento do ABI pelo seu topic0
+(keccak da assinatura) e guarda os tipos indexados / de ``data`` já
+separados, então cada log vai direto ao seu decodificador — ou é ignorado,
+se o topic0 não for conhecido.
+
+- `decode` / `decode_logs` devolvem `DecodedEvent` (nome, args, endereço,
+  tx, bloco, logIndex) — a forma usada pelo indexer e pelo TrainerIndex;
+- `records` devolve registros tipados (`OfferMade`, `JobContractCreated`)
+  para os eventos do marketplace e `DecodedEvent` para os demais;
+- `decode_receipts` aceita vários receipts (ondas de txs, ver bulk_jobs) e
+  devolve os eventos de todos, em ordem.
+
+    reg = EventRegistry(DAO_ABI, address=DAO.address)
+    [job.job for job in reg.records(receipt["logs"]) if isinstance(job, JobContractCreated)]
+
+Argumentos indexados de tipo dinâmico (string, bytes, arrays) só existem no
+log como hash; vêm como os 32 bytes do tópico.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from eth_abi import decode as abi_decode
+from eth_abi.grammar import parse as parse_abi_type
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+from eth_utils.abi import collapse_if_tuple
+
+
+class DecodedEvent(NamedTuple):
+    event: str
+    args: Dict[str, Any]
+    address: str
+    tx_hash: str
+    block_number: int
+    log_index: int
+
+
+class OfferMade(NamedTuple):
+    offer_id: int
+    requester: str
+    trainer: str
+    address: str
+    tx_hash: str
+    block_number: int
+    log_index: int
+
+
+class JobContractCreated(NamedTuple):
+    job: str
+    offer_id: int
+    requester: str
+    trainer: str
+    address: str
+    tx_hash: str
+    block_number: int
+    log_index: int
+
+
+def _offer_made(ev: DecodedEvent) -> OfferMade:
+    a = ev.args
+    return OfferMade(a["offerId"], a["requester"], a["trainer"], *ev[2:])
+
+
+def _job_created(ev: DecodedEvent) -> JobContractCreated:
+    a = ev.args
+    return JobContractCreated(a["job"], a["offerId"], a["requester"], a["trainer"], *ev[2:])
+
+
+RECORD_TYPES = {
+    "OfferMade": _offer_made,
+    "JobContractCreated": _job_created,
+}
+
+Record = Union[OfferMade, JobContractCreated, DecodedEvent]
+
+
+def _as_bytes(value: Any) -> bytes:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    text = str(value)
+    return bytes.fromhex(text[2:] if text.startswith("0x") else text)
+
+
+def _as_hex(value: Any) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    text = str(value)
+    return text if text.startswith("0x") else "0x" + text
+
+
+@lru_cache(maxsize=65536)
+def _checksum(raw: bytes | str) -> str:
+    """Checksum EIP-55 (keccak) com cache: os mesmos endereços se repetem muito nos logs."""
+    return to_checksum_address(raw)
+
+
+def _topic_decoder(abi_type: str):
+    """Decodificador de um argumento indexado (atalhos para os tipos comuns)."""
+    if abi_type == "address":
+        return lambda topic: _checksum(topic[12:])
+    if abi_type.startswith("uint"):
+        return lambda topic: int.from_bytes(topic, "big")
+    if abi_type == "bytes32":
+        return bytes
+    if abi_type == "bool":
+        return lambda topic: topic[-1] == 1
+    if parse_abi_type(abi_type).is_dynamic:
+        return bytes  # só o hash vai para o tópico
+    return lambda topic: abi_decode([abi_type], topic)[0]
+
+
+class _EventDecoder:
+    __slots__ = ("name", "topic_fields", "data_names", "data_types", "data_addresses")
+
+    def __init__(self, item: Dict[str, Any]):
+        self.name = item["name"]
+        inputs = item.get("inputs", [])
+        self.topic_fields: List[Tuple[str, Any]] = [
+            (i["name"], _topic_decoder(collapse_if_tuple(i))) for i in inputs if i.get("indexed")
+        ]
+        data = [i for i in inputs if not i.get("indexed")]
+        self.data_names = [i["name"] for i in data]
+        self.data_types = [collapse_if_tuple(i) for i in data]
+        self.data_addresses = [k for k, t in enumerate(self.data_types) if t == "address"]
+
+    def args(self, topics: Sequence[Any], data: Any) -> Dict[str, Any]:
+        if len(topics) != len(self.topic_fields) + 1:
+            raise ValueError(f"{self.name}: {len(topics) - 1} tópicos, esperado {len(self.topic_fields)}")
+        out = {name: dec(_as_bytes(t)) for (name, dec), t in zip(self.topic_fields, topics[1:])}
+        if self.data_types:
+            values = list(abi_decode(self.data_types, _as_bytes(data)))
+            for k in self.data_addresses:
+                values[k] = _checksum(values[k])
+            out.update(zip(self.data_names, values))
+        return out
+
+
+class EventRegistry:
+    """Mapa topic0 -> decodificador, montado uma vez a partir de um ABI.
+
+    `names` restringe aos eventos listados; com `address`, logs de outros
+    contratos são ignorados (útil para receipts que também trazem logs dos
+    JobContracts criados na mesma tx).
+    """
+
+    def __init__(
+        self,
+        abi: Iterable[Dict[str, Any]],
+        *,
+        names: Optional[Sequence[str]] = None,
+        address: Optional[str] = None,
+    ):
+        self.address = address.lower() if address else None
+        self._decoders: Dict[bytes, _EventDecoder] = {}
+        for item in abi:
+            if item.get("type") != "event" or item.get("anonymous"):
+                continue
+            if names is not None and item["name"] not in names:
+                continue
+            self._decoders[bytes(event_abi_to_log_topic(item))] = _EventDecoder(item)
+
+    def topics(self) -> List[str]:
+        """topic0 (hex) de todos os eventos, para filtros de ``eth_getLogs``."""
+        return ["0x" + t.hex() for t in self._decoders]
+
+    def event_names(self) -> List[str]:
+        return [d.name for d in self._decoders.values()]
+
+    def decode(self, log: Dict[str, Any]) -> Optional[DecodedEvent]:
+        """Decodifica `log`, ou ``None`` se o topic0/endereço não for deste registro."""
+        topics = log.get("topics") or ()
+        if not topics:
+            return None
+        decoder = self._decoders.get(_as_bytes(topics[0]))
+        if decoder is None:
+            return None
+        address = log.get("address", "")
+        if self.address is not None and str(address).lower() != self.address:
+            return None
+        return DecodedEvent(
+            decoder.name,
+            decoder.args(topics, log.get("data", b"")),
+            _checksum(address) if address else "",
+            _as_hex(log.get("transactionHash", b"")).lower(),
+            int(log.get("blockNumber") or 0),
+            int(log.get("logIndex") or 0),
+        )
+
+    def decode_logs(self, logs: Iterable[Dict[str, Any]]) -> List[DecodedEvent]:
+        out = []
+        for log in logs:
+            ev = self.decode(log)
+            if ev is not None:
+                out.append(ev)
+        return out
+
+    def records(self, logs: Iterable[Dict[str, Any]]) -> List[Record]:
+        """Como `decode_logs`, com registros tipados para OfferMade/JobContractCreated."""
+        out: List[Record] = []
+        for ev in self.decode_logs(logs):
+            typed = RECORD_TYPES.get(ev.event)
+            out.append(typed(ev) if typed else ev)
+        return out
+
+    def decode_receipts(self, receipts: Iterable[Dict[str, Any]]) -> List[Record]:
+        """`records` dos logs de vários receipts (ex.: uma onda de txs), em ordem."""
+        out: List[Record] = []
+        for receipt in receipts:
+            out.extend(self.records(receipt.get("logs") or ()))
+        return out
+
+    def __contains__(self, topic0: Any) -> bool:
+        return _as_bytes(topic0) in self._decoders
+
+    def __len__(self) -> int:
+        return len(self._decoders)
@@ -0,0 +1,319 @@
+"""Modelo analítico de gas e chain simulada (CHAIN_SIM=true).
+
+O gas de cada ancoragem é determinístico para um dado tamanho de payload
+(ver ``gas_breakdown`` e marketplace_gas_breakdown.json), mas os modos
+``no_ipfs`` / ``full`` mineravam toda tx só para contar gas. Aqui:
+
+- `GasModel` ajusta, por operação (nome da função do contrato) e por estado
+  do storage, ``gas = a + b * bytes_de_calldata``. ``cold`` é a primeira
+  escrita do job (``latestModelHash`` / ``available`` de zero para não-zero:
+  SSTORE de 20k em vez de 2.9k); o resto é ``warm``. A calibração
+  (scripts/calibrate_gas_model.py) mede cada operação no nó local para vários
+  tamanhos de payload e grava ``GAS_MODEL_FILE`` com os coeficientes, o preço
+  do gas e as latências (envio -> receipt) observadas;
+- `SimChain` substitui o envio em ``onchain_job._broadcast`` / ``_wait``:
+  devolve um hash sintético, gas do modelo, ``gasETH`` ao preço calibrado (ou
+  ``SIM_GAS_PRICE_GWEI``) e espera uma latência sorteada de ``SIM_LATENCY``:
+
+  ======================  ==================================================
+  ``model``               reamostra as latências da calibração (default)
+  ``0``                   sem espera
+  ``const:S``             S segundos
+  ``uniform:LO,HI``       uniforme em [LO, HI]
+  ``normal:MEAN,STD``     normal truncada em 0
+  ``lognormal:MED,SIGMA`` lognormal com mediana MED
+  ======================  ==================================================
+
+Estado ``cold`` na simulação: o servidor é um processo só, então a primeira
+publicação / o primeiro lote de cada job é ``cold``. Os clientes são
+processos separados; só o NODE_ID 0 conta o seu primeiro update como ``cold``
+(num job novo exatamente um update paga a escrita inicial).
+
+Com ``SIM_CHAIN_LEDGER`` cada tx simulada vira uma linha JSON (hash,
+operação, bytes, gas, gasETH, latência) — o e2e_scaling soma o gas das txs
+dos clientes a partir dele, como faria com os receipts.
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from eth_utils import keccak
+
+DEFAULT_MODEL_FILE = "results/gas_model.json"
+
+
+def calldata_bytes(fn) -> int:
+    """Bytes de calldata da chamada, sem o seletor."""
+    from .chain import encode_call  # import tardio: o modelo em si não precisa de web3
+    data = encode_call(fn)
+    data = data[2:] if data.startswith("0x") else data
+    return max(0, len(data) // 2 - 4)
+
+
+# ---------------------------------------------------------------------------
+# Modelo
+# ---------------------------------------------------------------------------
+def _fit_line(points: Sequence[Tuple[float, float]]) -> Tuple[float, float]:
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    sxx = sum((x - mx) ** 2 for x in xs)
+    if sxx == 0:
+        return my, 0.0
+    slope = sum((x - mx) * (y - my) for x, y in points) / sxx
+    return my - slope * mx, slope
+
+
+class GasModel:
+    """``gas = intercept + slope * calldata_bytes`` por (operação, cold|warm)."""
+
+    def __init__(
+        self,
+        coefficients: Dict[str, Dict[str, Dict[str, float]]],
+        gas_price_wei: int,
+        latencies_s: Optional[List[float]] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ):
+        self.coefficients = coefficients
+        self.gas_price_wei = int(gas_price_wei)
+        self.latencies_s = list(latencies_s or [])
+        self.meta = dict(meta or {})
+
+    @classmethod
+    def fit(cls, samples: Iterable[Dict[str, Any]], **meta) -> "GasModel":
+        """Ajusta a partir de amostras {operation, cold, calldata_bytes, gas_used,
+        gas_price_wei, latency_s} (ver scripts/calibrate_gas_model.py)."""
+        samples = list(samples)
+        if not samples:
+            raise ValueError("calibração sem amostras")
+        groups: Dict[Tuple[str, str], List[Tuple[float, float]]] = {}
+        for s in samples:
+            state = "cold" if s["cold"] else "warm"
+            groups.setdefault((s["operation"], state), []).append(
+                (float(s["calldata_bytes"]), float(s["gas_used"]))
+            )
+        coefficients: Dict[str, Dict[str, Dict[str, float]]] = {}
+        # warm antes de cold ("cold" < "warm" na ordem alfabética): um job novo
+        # por calibração dá uma amostra cold só, que herda a inclinação warm.
+        for (op, state), points in sorted(groups.items(), key=lambda kv: (kv[0][0], kv[0][1] == "cold")):
+            a, b = _fit_line(points)
+            warm = coefficients.get(op, {}).get("warm")
+            if state == "cold" and warm is not None and len({x for x, _ in points}) == 1:
+                b = warm["slope"]
+                a = sum(y - b * x for x, y in points) / len(points)
+            residuals = [y - (a + b * x) for x, y in points]
+            coefficients.setdefault(op, {})[state] = {
+                "intercept": a,
+                "slope": b,
+                "n": len(points),
+                "max_abs_residual": max(abs(r) for r in residuals),
+            }
+        prices = sorted(int(s["gas_price_wei"]) for s in samples)
+        latencies = [float(s["latency_s"]) for s in samples if s.get("latency_s") is not None]
+        return cls(coefficients, prices[len(prices) // 2], latencies, meta)
+
+    def predict(self, operation: str, nbytes: int, cold: bool = False) -> int:
+        states = self.coefficients.get(operation)
+        if not states:
+            raise KeyError(f"operação {operation!r} não calibrada (rode scripts/calibrate_gas_model.py)")
+        # Sem amostra do estado pedido, usa o outro (cold só existe uma vez por job).
+        c = states.get("cold" if cold else "warm") or next(iter(states.values()))
+        return int(round(c["intercept"] + c["slope"] * nbytes))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "coefficients": self.coefficients,
+            "gas_price_wei": self.gas_price_wei,
+            "latencies_s": self.latencies_s,
+            "meta": self.meta,
+        }
+
+    def save(self, path: str | os.PathLike[str]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> "GasModel":
+        d = json.loads(Path(path).read_text())
+        return cls(d["coefficients"], d["gas_price_wei"], d.get("latencies_s"), d.get("meta"))
+
+
+def validate(model: GasModel, samples: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Erro do modelo contra amostras medidas, por operação."""
+    out: Dict[str, Dict[str, float]] = {}
+    rows: Dict[str, List[Tuple[int, int]]] = {}
+    for s in samples:
+        predicted = model.predict(s["operation"], int(s["calldata_bytes"]), bool(s["cold"]))
+        rows.setdefault(s["operation"], []).append((predicted, int(s["gas_used"])))
+    for op, pairs in sorted(rows.items()):
+        errors = [p - m for p, m in pairs]
+        rel = [abs(p - m) / m for p, m in pairs if m]
+        out[op] = {
+            "n": len(pairs),
+            "measured_gas_total": sum(m for _, m in pairs),
+            "modeled_gas_total": sum(p for p, _ in pairs),
+            "mean_abs_error_gas": sum(abs(e) for e in errors) / len(errors),
+            "max_abs_error_gas": max(abs(e) for e in errors),
+            "max_rel_error": max(rel, default=0.0),
+        }
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Latência
+# ---------------------------------------------------------------------------
+class LatencySampler:
+    def __init__(self, spec: str = "model", observed: Optional[List[float]] = None,
+                 rng: Optional[random.Random] = None):
+        self.spec = spec.strip().lower() or "model"
+        self.observed = list(observed or [])
+        self.rng = rng or random.Random()
+        kind, _, args = self.spec.partition(":")
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a.strip()]
+        expected = {"model": 0, "0": 0, "const": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(self.args) != expected[kind]:
+            raise ValueError(f"SIM_LATENCY inválido: {spec!r}")
+
+    def sample(self) -> float:
+        k, a = self.kind, self.args
+        if k == "model":
+            return self.rng.choice(self.observed) if self.observed else 0.0
+        if k == "const":
+            return a[0]
+        if k == "uniform":
+            return self.rng.uniform(a[0], a[1])
+        if k == "normal":
+            return max(0.0, self.rng.gauss(a[0], a[1]))
+        if k == "lognormal":
+            return a[0] * self.rng.lognormvariate(0.0, a[1])
+        return 0.0
+
+
+# ---------------------------------------------------------------------------
+# Chain simulada
+# ---------------------------------------------------------------------------
+# Operações que escrevem o slot "frio" do job na primeira vez.
+_COLD_GROUP = {
+    "publishGlobalModel": "publish",
+    "recordClientUpdate": "update",
+    "recordClientUpdateBatch": "update",
+}
+
+
+class SimChain:
+    def __init__(
+        self,
+        model: GasModel,
+        latency: LatencySampler,
+        *,
+        gas_price_wei: Optional[int] = None,
+        ledger: Optional[str] = None,
+        node_id: Optional[str] = None,
+    ):
+        self.model = model
+        self.latency = latency
+        self.gas_price_wei = int(gas_price_wei or model.gas_price_wei)
+        self.ledger = Path(ledger) if ledger else None
+        # Clientes: só o NODE_ID 0 paga a escrita inicial (ver docstring).
+        self.cold_updates = node_id in (None, "", "0")
+        self._warm: set = set()
+        self._nonces: Dict[str, int] = {}
+        self._receipts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def _is_cold(self, job: str, operation: str) -> bool:
+        group = _COLD_GROUP.get(operation)
+        if group is None:
+            return False
+        key = (job.lower(), group)
+        if key in self._warm:
+            return False
+        self._warm.add(key)
+        return group != "update" or self.cold_updates
+
+    def pending_nonce(self, address: str) -> int:
+        with self._lock:
+            return self._nonces.get(address, 0)
+
+    def broadcast(self, fn, sender: str, nonce: Optional[int] = None) -> str:
+        nbytes = calldata_bytes(fn)
+        with self._lock:
+            cold = self._is_cold(fn.address, fn.fn_name)
+            self._seq += 1
+            self._nonces[sender] = max(self._nonces.get(sender, 0), (nonce or 0)) + 1
+            tx_hash = "0x" + keccak(f"{os.getpid()}:{sender}:{self._seq}:{time.time_ns()}".encode()).hex()
+        gas_used = self.model.predict(fn.fn_name, nbytes, cold)
+        receipt = {
+            "hash": tx_hash,
+            "gasUsed": gas_used,
+            "gasETH": gas_used * self.gas_price_wei / 1e18,
+            "status": 1,
+            "due": time.monotonic() + self.latency.sample(),
+        }
+        with self._lock:
+            self._receipts[tx_hash] = receipt
+        if self.ledger is not None:
+            line = json.dumps({
+                "hash": tx_hash, "operation": fn.fn_name, "cold": cold, "calldata_bytes": nbytes,
+                "gas_used": gas_used, "gas_eth": receipt["gasETH"],
+            })
+            with open(self.ledger, "a") as f:
+                f.write(line + "\n")
+        return tx_hash
+
+    def wait(self, tx_hash: str, timeout: float = 120) -> Dict[str, Any]:
+        with self._lock:
+            receipt = self._receipts.pop(tx_hash, None)
+        if receipt is None:
+            raise KeyError(f"tx simulada desconhecida: {tx_hash}")
+        delay = receipt["due"] - time.monotonic()
+        if delay > 0:
+            time.sleep(min(delay, timeout))
+        return {k: receipt[k] for k in ("hash", "gasUsed", "gasETH", "status")}
+
+
+def sim_chain_from_env() -> Optional[SimChain]:
+    """`SimChain` se CHAIN_SIM=true, senão ``None``."""
+    if os.getenv("CHAIN_SIM", "false").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    path = os.getenv("GAS_MODEL_FILE", DEFAULT_MODEL_FILE)
+    if not Path(path).exists():
+        raise FileNotFoundError(f"CHAIN_SIM=true sem modelo em {path}: rode scripts/calibrate_gas_model.py")
+    model = GasModel.load(path)
+    price_gwei = os.getenv("SIM_GAS_PRICE_GWEI", "").strip()
+    seed = os.getenv("SEED", "").strip()
+    return SimChain(
+        model,
+        LatencySampler(os.getenv("SIM_LATENCY", "model"), model.latencies_s,
+                       random.Random(f"{seed}:{os.getenv('NODE_ID', 'server')}" if seed else None)),
+        gas_price_wei=int(float(price_gwei) * 1e9) if price_gwei else None,
+        ledger=os.getenv("SIM_CHAIN_LEDGER", "").strip() or None,
+        node_id=os.getenv("NODE_ID"),
+    )
+
+
+def ledger_gas(path: str | os.PathLike[str], tx_hashes: Iterable[str]) -> Tuple[int, float, int]:
+    """(gas_used, gas_eth, ausentes) das txs simuladas registradas no ledger."""
+    wanted = {h.lower() for h in tx_hashes}
+    found: Dict[str, Tuple[int, float]] = {}
+    if Path(path).exists():
+        with open(path) as f:
+            for line in f:
+                rec = json.loads(line)
+                if rec["hash"] in wanted:
+                    found[rec["hash"]] = (int(rec["gas_used"]), float(rec["gas_eth"]))
+    return (
+        sum(g for g, _ in found.values()),
+        sum(e for _, e in found.values()),
+        len(wanted) - len(found),
+    )
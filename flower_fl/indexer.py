@@ -0,0 +1,601 @@
+"""Indexador local (SQLite) dos eventos do DAO e dos JobContracts.
+
+Segue, por faixa de blocos, os logs ``OfferMade`` / ``JobContractCreated``
+(DAO) e ``ClientUpdateRecorded`` / ``ClientUpdateBatchRecorded`` /
+``GlobalModelUpdated`` / ``PayoutReleased`` (de cada JobContract criado pelo
+DAO ou informado explicitamente), gravando-os num banco SQLite indexado junto
+com o gas (receipt) de cada tx que emitiu um evento.
+
+- Incremental: o cursor (último bloco indexado) fica na tabela ``meta``; cada
+  ``sync()`` continua de onde parou.
+- Reorgs: o hash de cada bloco indexado é guardado; antes de avançar, os
+  últimos ``reorg_depth`` blocos são conferidos contra o nó e, em caso de
+  divergência (reorg, ``evm_revert`` ou nó Hardhat reiniciado), tudo acima do
+  último bloco comum é apagado e reindexado.
+- Rounds: cada ``GlobalModelUpdated`` publica os modelos de 1+ rounds — um
+  com ``ANCHOR_POLICY=every``, a lista de refs desde o checkpoint anterior
+  nas demais políticas (checkpoint.py) — e a tabela ``model_rounds`` guarda
+  um modelo por round (o índice na lista concatenada é o round; o inicial é
+  o 0), como `checkpoint.onchain_anchored_refs`. O evento recebe o round do
+  último modelo que cobre e ``content_hash`` = keccak(ref) desse modelo (a
+  raiz de Merkle do checkpoint vai em ``model_rounds.anchor_root``). Updates
+  de clientes entram com o round em andamento (o primeiro ainda não
+  publicado) e, quando o checkpoint chega, os do trecho são redistribuídos
+  pelos rounds que ele cobre: o i-ésimo update de cada caller vai para o
+  round ``i * rounds // n_updates`` do trecho (um por round com chave por
+  cliente; N por round com a chave compartilhada).
+
+Consulta (ver `EventIndex`):
+    idx = EventIndex("results/events.sqlite")
+    idx.pointers(job, rounds=(3, 7))          # CIDs ancorados nos rounds 3–7
+    idx.models(job, rounds=(3, 7))            # modelo global de cada round 3–7
+    idx.gas_for_txs(tx_hashes)                # (gas_used, gas_eth, missing)
+    idx.gas_lookup(tx_hashes)                 # idem, com a lista das tx ausentes
+
+CLI:
+    python -m flower_fl.indexer sync [--follow]
+    python -m flower_fl.indexer query --job 0x... --rounds 3-7
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from eth_utils import keccak
+from web3 import Web3
+
+from .cid_codec import decode_pointer, decode_pointer_list
+from .events import DecodedEvent, EventRegistry
+
+DEFAULT_DB = os.getenv("EVENT_INDEX_DB", "results/events.sqlite")
+
+DAO_EVENTS = ("OfferMade", "JobContractCreated")
+JOB_EVENTS = (
+    "ClientUpdateRecorded",
+    "ClientUpdateBatchRecorded",
+    "GlobalModelUpdated",
+    "PayoutReleased",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    number INTEGER PRIMARY KEY,
+    hash   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS offers (
+    offer_id  INTEGER PRIMARY KEY,
+    requester TEXT NOT NULL,
+    trainer   TEXT NOT NULL,
+    block     INTEGER NOT NULL,
+    tx_hash   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    address   TEXT PRIMARY KEY,
+    offer_id  INTEGER,
+    requester TEXT,
+    trainer   TEXT,
+    block     INTEGER NOT NULL,
+    tx_hash   TEXT
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    block        INTEGER NOT NULL,
+    log_index    INTEGER NOT NULL,
+    job          TEXT NOT NULL,
+    kind         TEXT NOT NULL,
+    round        INTEGER,
+    tx_hash      TEXT NOT NULL,
+    content_hash TEXT,
+    pointer      TEXT,
+    pointer_raw  TEXT,
+    caller       TEXT,
+    updates_done INTEGER,
+    batch_size   INTEGER,
+    amount_wei   TEXT,
+    PRIMARY KEY (block, log_index)
+);
+CREATE INDEX IF NOT EXISTS ix_job_events_job_round ON job_events (job, round, kind);
+CREATE TABLE IF NOT EXISTS model_rounds (
+    job         TEXT NOT NULL,
+    round       INTEGER NOT NULL,
+    ref         TEXT,
+    model_hash  TEXT,
+    anchor_root TEXT,
+    block       INTEGER NOT NULL,
+    log_index   INTEGER NOT NULL,
+    tx_hash     TEXT NOT NULL,
+    PRIMARY KEY (job, round)
+);
+CREATE INDEX IF NOT EXISTS ix_job_events_tx ON job_events (tx_hash);
+CREATE TABLE IF NOT EXISTS txs (
+    tx_hash             TEXT PRIMARY KEY,
+    block               INTEGER NOT NULL,
+    sender              TEXT,
+    gas_used            INTEGER NOT NULL,
+    effective_gas_price TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_txs_block ON txs (block);
+"""
+
+
+def _hex(value: Any) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    text = value.hex() if hasattr(value, "hex") and not isinstance(value, str) else str(value)
+    return text if text.startswith("0x") else "0x" + text
+
+
+def _connect(db_path: str | os.PathLike[str]) -> sqlite3.Connection:
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class EventIndex:
+    """API de consulta (somente leitura) sobre o banco do indexador."""
+
+    def __init__(self, db_path: str | os.PathLike[str] = DEFAULT_DB):
+        self.db_path = str(db_path)
+        self.conn = _connect(db_path)
+
+    def cursor_block(self) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+        return int(row["value"]) if row else -1
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        return [dict(r) for r in self.conn.execute("SELECT * FROM jobs ORDER BY block")]
+
+    def offers(self) -> List[Dict[str, Any]]:
+        return [dict(r) for r in self.conn.execute("SELECT * FROM offers ORDER BY offer_id")]
+
+    def pointers(
+        self,
+        job: str,
+        rounds: Optional[Tuple[int, int]] = None,
+        kinds: Sequence[str] = ("GlobalModelUpdated", "ClientUpdateRecorded", "ClientUpdateBatchRecorded"),
+    ) -> List[Dict[str, Any]]:
+        """Ponteiros ancorados para `job` (opcionalmente só nos rounds [a, b]).
+
+        Um checkpoint (GlobalModelUpdated com vários modelos) aparece no round
+        do último modelo que cobre; para o modelo de cada round use `models`.
+        """
+        sql = (
+            "SELECT round, kind, block, tx_hash, content_hash, pointer, pointer_raw, "
+            "caller, updates_done, batch_size FROM job_events "
+            f"WHERE job = ? AND kind IN ({','.join('?' * len(kinds))})"
+        )
+        params: List[Any] = [Web3.to_checksum_address(job), *kinds]
+        if rounds is not None:
+            sql += " AND round BETWEEN ? AND ?"
+            params.extend(rounds)
+        sql += " ORDER BY block, log_index"
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+    def models(self, job: str, rounds: Optional[Tuple[int, int]] = None) -> List[Dict[str, Any]]:
+        """Modelo global de cada round de `job` (ref, keccak(ref), raiz do checkpoint, tx)."""
+        sql = "SELECT round, ref, model_hash, anchor_root, block, tx_hash FROM model_rounds WHERE job = ?"
+        params: List[Any] = [Web3.to_checksum_address(job)]
+        if rounds is not None:
+            sql += " AND round BETWEEN ? AND ?"
+            params.extend(rounds)
+        return [dict(r) for r in self.conn.execute(sql + " ORDER BY round", params)]
+
+    def payouts(self, job: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT job, block, tx_hash, caller AS recipient, amount_wei FROM job_events WHERE kind = 'PayoutReleased'"
+        params: List[Any] = []
+        if job:
+            sql += " AND job = ?"
+            params.append(Web3.to_checksum_address(job))
+        return [dict(r) for r in self.conn.execute(sql + " ORDER BY block, log_index", params)]
+
+    def gas_for_txs(self, tx_hashes: Iterable[str]) -> Tuple[int, float, int]:
+        """Mesma tupla de `_sum_gas_from_receipts`: (gas_used, gas_eth, missing)."""
+        gas_used, gas_eth, missing = self.gas_lookup(tx_hashes)
+        return gas_used, gas_eth, len(missing)
+
+    def gas_lookup(self, tx_hashes: Iterable[str]) -> Tuple[int, float, List[str]]:
+        """Como `gas_for_txs`, mas devolve as tx ausentes do índice (na ordem dada)."""
+        hashes = list(tx_hashes)
+        keys = [_hex(h).lower() for h in hashes]
+        gas_used_total = 0
+        gas_eth_total = 0.0
+        found = set()
+        for chunk_start in range(0, len(keys), 500):
+            chunk = keys[chunk_start:chunk_start + 500]
+            rows = self.conn.execute(
+                f"SELECT tx_hash, gas_used, effective_gas_price FROM txs "
+                f"WHERE tx_hash IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for r in rows:
+                found.add(r["tx_hash"])
+                gas_used_total += int(r["gas_used"])
+                gas_eth_total += int(r["gas_used"]) * int(r["effective_gas_price"]) / 1e18
+        missing = [h for h, k in zip(hashes, keys) if k not in found]
+        return gas_used_total, gas_eth_total, missing
+
+    def job_gas(self, job: str) -> Tuple[int, float]:
+        """Gas total das txs que emitiram eventos de `job`."""
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(gas_used), 0) AS g, "
+            "COALESCE(SUM(gas_used * CAST(effective_gas_price AS REAL)), 0) AS w "
+            "FROM txs WHERE tx_hash IN (SELECT DISTINCT tx_hash FROM job_events WHERE job = ?)",
+            (Web3.to_checksum_address(job),),
+        ).fetchone()
+        return int(row["g"]), float(row["w"]) / 1e18
+
+
+class EventIndexer(EventIndex):
+    """Sincroniza o banco com a chain (incremental, com tratamento de reorg)."""
+
+    def __init__(
+        self,
+        w3: Web3,
+        dao_address: str,
+        dao_abi: list,
+        job_abi: list,
+        db_path: str | os.PathLike[str] = DEFAULT_DB,
+        *,
+        extra_jobs: Sequence[str] = (),
+        start_block: int = 0,
+        chunk_size: int = 2000,
+        reorg_depth: int = 64,
+        confirmations: int = 0,
+    ):
+        super().__init__(db_path)
+        self.w3 = w3
+        self.dao_address = Web3.to_checksum_address(dao_address)
+        self.start_block = start_block
+        self.chunk_size = chunk_size
+        self.reorg_depth = reorg_depth
+        self.confirmations = confirmations
+
+        self._dao_events = EventRegistry(dao_abi, names=DAO_EVENTS, address=self.dao_address)
+        self._job_events = EventRegistry(job_abi, names=JOB_EVENTS)
+
+        for addr in extra_jobs:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO jobs (address, block) VALUES (?, ?)",
+                (Web3.to_checksum_address(addr), start_block),
+            )
+        # Banco de antes da tabela model_rounds: os rounds gravados contavam
+        # eventos, não modelos; reindexa do início.
+        legacy = self.conn.execute(
+            "SELECT 1 FROM job_events WHERE kind = 'GlobalModelUpdated' "
+            "AND NOT EXISTS (SELECT 1 FROM model_rounds) LIMIT 1"
+        ).fetchone()
+        if legacy:
+            self._rollback_to(self.start_block - 1)
+        self.conn.commit()
+
+    # ----------------------------------------------------------------- cursor
+    def _set_cursor(self, block: int) -> None:
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('cursor', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (str(block),),
+        )
+
+    def _remember_block(self, number: int, block_hash: Optional[str] = None) -> None:
+        if block_hash is None:
+            block_hash = _hex(self.w3.eth.get_block(number)["hash"])
+        self.conn.execute(
+            "INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)", (number, block_hash)
+        )
+
+    def _rollback_to(self, block: int) -> None:
+        for table in ("job_events", "model_rounds", "offers", "txs", "blocks"):
+            column = "number" if table == "blocks" else "block"
+            self.conn.execute(f"DELETE FROM {table} WHERE {column} > ?", (block,))
+        # Jobs informados via extra_jobs ficam (não vieram de um evento).
+        self.conn.execute("DELETE FROM jobs WHERE block > ? AND tx_hash IS NOT NULL", (block,))
+        self._set_cursor(block)
+
+    def _check_reorg(self) -> Optional[int]:
+        """Confere os últimos blocos indexados; devolve o bloco do rollback, se houve."""
+        rows = self.conn.execute(
+            "SELECT number, hash FROM blocks ORDER BY number DESC LIMIT ?", (self.reorg_depth,)
+        ).fetchall()
+        if not rows:
+            return None
+        for r in rows:
+            try:
+                chain_hash = _hex(self.w3.eth.get_block(r["number"])["hash"])
+            except Exception:
+                chain_hash = None
+            if chain_hash == r["hash"]:
+                if r["number"] == rows[0]["number"]:
+                    return None
+                self._rollback_to(r["number"])
+                self.conn.commit()
+                return r["number"]
+        # Nenhum bloco comum na janela (ex.: nó Hardhat reiniciado): recomeça.
+        self._rollback_to(self.start_block - 1)
+        self.conn.commit()
+        return self.start_block - 1
+
+    # ------------------------------------------------------------------- sync
+    def sync(self, to_block: Optional[int] = None) -> Dict[str, int]:
+        """Indexa até `to_block` (default: head - confirmations)."""
+        rolled_back = self._check_reorg()
+        head = self.w3.eth.block_number - self.confirmations
+        target = head if to_block is None else min(to_block, head)
+        cursor = max(self.cursor_block(), self.start_block - 1)
+        stats = {"from_block": cursor + 1, "to_block": target, "events": 0, "txs": 0}
+        if rolled_back is not None:
+            stats["rolled_back_to"] = rolled_back
+
+        while cursor < target:
+            end = min(cursor + self.chunk_size, target)
+            events, txs = self._index_range(cursor + 1, end)
+            stats["events"] += events
+            stats["txs"] += txs
+            self._remember_block(end)
+            self._set_cursor(end)
+            self.conn.commit()
+            cursor = end
+        return stats
+
+    def _index_range(self, start: int, end: int) -> Tuple[int, int]:
+        dao_logs = self.w3.eth.get_logs({
+            "fromBlock": start,
+            "toBlock": end,
+            "address": self.dao_address,
+            "topics": [self._dao_events.topics()],
+        })
+        touched: Dict[str, int] = {}
+        block_hashes: Dict[int, str] = {}
+        n_events = 0
+        for log in dao_logs:
+            ev = self._dao_events.decode(log)
+            if ev is None:
+                continue
+            args = ev.args
+            tx_hash = ev.tx_hash
+            if ev.event == "OfferMade":
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO offers VALUES (?, ?, ?, ?, ?)",
+                    (int(args["offerId"]), args["requester"], args["trainer"], log["blockNumber"], tx_hash),
+                )
+            else:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?)",
+                    (Web3.to_checksum_address(args["job"]), int(args["offerId"]),
+                     args["requester"], args["trainer"], log["blockNumber"], tx_hash),
+                )
+            touched[tx_hash] = log["blockNumber"]
+            block_hashes[log["blockNumber"]] = _hex(log["blockHash"])
+            n_events += 1
+
+        jobs = [r["address"] for r in self.conn.execute("SELECT address FROM jobs")]
+        job_logs = []
+        for i in range(0, len(jobs), 100):
+            job_logs.extend(self.w3.eth.get_logs({
+                "fromBlock": start,
+                "toBlock": end,
+                "address": jobs[i:i + 100],
+                "topics": [self._job_events.topics()],
+            }))
+        job_logs.sort(key=lambda lg: (lg["blockNumber"], lg["logIndex"]))
+
+        for log in job_logs:
+            ev = self._job_events.decode(log)
+            if ev is None:
+                continue
+            self._insert_job_event(ev, log)
+            tx_hash = ev.tx_hash
+            touched[tx_hash] = log["blockNumber"]
+            block_hashes[log["blockNumber"]] = _hex(log["blockHash"])
+            n_events += 1
+
+        for tx_hash, block in touched.items():
+            rcpt = self.w3.eth.get_transaction_receipt(tx_hash)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO txs VALUES (?, ?, ?, ?, ?)",
+                (tx_hash, block, rcpt.get("from"), int(rcpt["gasUsed"]),
+                 str(int(rcpt.get("effectiveGasPrice", 0) or 0))),
+            )
+        for number, block_hash in block_hashes.items():
+            self._remember_block(number, block_hash)
+        return n_events, len(touched)
+
+    def _published_rounds(self, job: str) -> int:
+        """Nº de rounds com modelo global já publicado (= próximo round)."""
+        row = self.conn.execute("SELECT COUNT(*) AS n FROM model_rounds WHERE job = ?", (job,)).fetchone()
+        return int(row["n"])
+
+    def _assign_update_rounds(self, job: str, rounds: Sequence[int], block: int, log_index: int) -> None:
+        """Redistribui os updates de clientes desde o GlobalModelUpdated anterior
+        pelos `rounds` que o checkpoint em (block, log_index) cobre."""
+        if not rounds:
+            return
+        prev = self.conn.execute(
+            "SELECT block, log_index FROM job_events WHERE job = ? AND kind = 'GlobalModelUpdated' "
+            "ORDER BY block DESC, log_index DESC LIMIT 1",
+            (job,),
+        ).fetchone()
+        prev_pos = (prev["block"], prev["log_index"]) if prev else (-1, -1)
+        rows = self.conn.execute(
+            "SELECT block, log_index, caller FROM job_events WHERE job = ? "
+            "AND kind IN ('ClientUpdateRecorded', 'ClientUpdateBatchRecorded') "
+            "AND (block > ? OR (block = ? AND log_index > ?)) "
+            "AND (block < ? OR (block = ? AND log_index < ?)) "
+            "ORDER BY block, log_index",
+            (job, prev_pos[0], prev_pos[0], prev_pos[1], block, block, log_index),
+        ).fetchall()
+        by_caller: Dict[str, List[sqlite3.Row]] = {}
+        for r in rows:
+            by_caller.setdefault(r["caller"], []).append(r)
+        for updates in by_caller.values():
+            n = len(updates)
+            self.conn.executemany(
+                "UPDATE job_events SET round = ? WHERE block = ? AND log_index = ?",
+                [(rounds[i * len(rounds) // n], r["block"], r["log_index"]) for i, r in enumerate(updates)],
+            )
+
+    def _insert_model_rounds(self, job: str, args, log, tx_hash: str) -> Tuple[int, Optional[str], Optional[str]]:
+        """Grava os modelos publicados por um GlobalModelUpdated; devolve
+        (nº de modelos, ponteiro, keccak(ref) do último)."""
+        raw = bytes(args["encryptedPointer"])
+        model_hash = _hex(args["modelHash"])
+        try:
+            # Lista compacta (0xfe) ou UTF-8 separado por "\n"; um ponteiro
+            # compacto isolado (política every) é uma lista de 1.
+            refs = decode_pointer_list(raw) if raw[:1] == b"\xfe" else decode_pointer(raw).split("\n")
+        except (UnicodeDecodeError, ValueError):
+            refs = [None]  # payload cifrado / formato desconhecido: um modelo
+        ref_hashes = [_hex(keccak(text=ref)) if ref is not None else None for ref in refs]
+        # Com ANCHOR_POLICY=every o modelHash é keccak(ref); num checkpoint é a
+        # raiz de Merkle (mesmo com um ref só na lista).
+        checkpoint = ref_hashes[-1] is not None and ref_hashes[-1] != model_hash
+        first = self._published_rounds(job)
+        rows = [
+            (job, first + i, ref, ref_hash if checkpoint else model_hash,
+             model_hash if checkpoint else None, log["blockNumber"], log["logIndex"], tx_hash)
+            for i, (ref, ref_hash) in enumerate(zip(refs, ref_hashes))
+        ]
+        self.conn.executemany("INSERT OR REPLACE INTO model_rounds VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        pointer = "\n".join(refs) if None not in refs else None
+        return len(refs), pointer, rows[-1][3]
+
+    def _insert_job_event(self, ev: DecodedEvent, log) -> None:
+        kind = ev.event
+        args = ev.args
+        job = Web3.to_checksum_address(log["address"])
+        published = self._published_rounds(job)
+        row: Dict[str, Any] = {
+            "block": log["blockNumber"],
+            "log_index": log["logIndex"],
+            "job": job,
+            "kind": kind,
+            # Updates de clientes: round em andamento (o primeiro sem modelo
+            # publicado; o round 0 é o modelo inicial), corrigido quando o
+            # checkpoint que cobre o trecho chegar.
+            "round": max(published, 1),
+            "tx_hash": _hex(log["transactionHash"]).lower(),
+        }
+        if kind == "PayoutReleased":
+            row.update(caller=args["to"], amount_wei=str(int(args["value"])))
+        elif kind == "GlobalModelUpdated":
+            count, pointer, content_hash = self._insert_model_rounds(job, args, log, row["tx_hash"])
+            self._assign_update_rounds(
+                job, range(max(published, 1), published + count), log["blockNumber"], log["logIndex"],
+            )
+            row.update(
+                round=published + count - 1,
+                content_hash=content_hash,
+                pointer=pointer,
+                pointer_raw=_hex(bytes(args["encryptedPointer"])),
+                updates_done=int(args["updatesDone"]),
+                batch_size=count,
+            )
+        else:
+            raw = bytes(args["encryptedPointer"])
+            try:
+                pointer = (
+                    "\n".join(decode_pointer_list(raw))
+                    if kind == "ClientUpdateBatchRecorded" else decode_pointer(raw)
+                )
+            except (UnicodeDecodeError, ValueError):
+                pointer = None  # payload cifrado / formato desconhecido
+            row.update(
+                content_hash=_hex(args.get("updateHash") or args.get("merkleRoot")),
+                pointer=pointer,
+                pointer_raw=_hex(raw),
+                caller=args.get("caller"),
+                updates_done=int(args["updatesDone"]),
+                batch_size=int(args.get("batchSize", 1)),
+            )
+        cols = ", ".join(row)
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO job_events ({cols}) VALUES ({', '.join('?' * len(row))})",
+            list(row.values()),
+        )
+
+    def follow(self, interval_s: float = 2.0) -> None:
+        """Laço de sincronização contínua (Ctrl+C para sair)."""
+        while True:
+            stats = self.sync()
+            if stats["events"] or "rolled_back_to" in stats:
+                print(f"[Indexer] {stats}")
+            time.sleep(interval_s)
+
+
+def _load_abi(path: str) -> list:
+    data = json.loads(Path(path).read_text())
+    return data["abi"] if isinstance(data, dict) and "abi" in data else data
+
+
+def indexer_from_env(db_path: str | os.PathLike[str] = DEFAULT_DB, **kwargs) -> EventIndexer:
+    """Monta um `EventIndexer` a partir do .env (RPC_URL, *_ABI_PATH, DAO_ADDRESS)."""
+    from dotenv import load_dotenv
+    from .chain import get_web3
+    from .deployments import resolve_address
+
+    load_dotenv()
+    rpc_url = os.getenv("RPC_URL")
+    dao_abi_path = os.getenv("DAO_ABI_PATH")
+    job_abi_path = os.getenv("JOB_ABI_PATH")
+    assert rpc_url and dao_abi_path and job_abi_path, "Defina RPC_URL, DAO_ABI_PATH e JOB_ABI_PATH no .env"
+
+    w3 = get_web3(rpc_url)
+    dao_address = resolve_address(
+        os.getenv("DAO_ADDRESS"),
+        w3,
+        name="dao",
+        deployments_dir=os.getenv("DEPLOYMENTS_DIR", "deployments"),
+        ignition_dir=os.getenv("IGNITION_DIR", "ignition/deployments"),
+    )
+    kwargs.setdefault(
+        "extra_jobs",
+        [x.strip() for x in os.getenv("JOB_ADDRS", "").split(",") if x.strip()],
+    )
+    return EventIndexer(w3, dao_address, _load_abi(dao_abi_path), _load_abi(job_abi_path), db_path, **kwargs)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Indexador SQLite de eventos DAO/JobContract")
+    p.add_argument("--db", default=DEFAULT_DB)
+    sub = p.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("sync", help="indexa até o head (ou segue a chain com --follow)")
+    s.add_argument("--follow", action="store_true")
+    s.add_argument("--interval", type=float, default=2.0)
+    q = sub.add_parser("query", help="ponteiros ancorados de um job")
+    q.add_argument("--job", required=True)
+    q.add_argument("--rounds", default=None, help="faixa de rounds, ex.: 3-7")
+    args = p.parse_args()
+
+    if args.cmd == "sync":
+        indexer = indexer_from_env(args.db)
+        if args.follow:
+            indexer.follow(args.interval)
+        t0 = time.perf_counter()
+        stats = indexer.sync()
+        print(f"[Indexer] {stats} em {time.perf_counter() - t0:.3f}s")
+        return 0
+
+    rounds = None
+    if args.rounds:
+        a, _, b = args.rounds.partition("-")
+        rounds = (int(a), int(b or a))
+    t0 = time.perf_counter()
+    rows = EventIndex(args.db).pointers(args.job, rounds=rounds)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    for r in rows:
+        print(f"round={r['round']:>3} {r['kind']:<26} tx={r['tx_hash'][:12]}... {r['pointer']}")
+    print(f"{len(rows)} eventos em {elapsed_ms:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
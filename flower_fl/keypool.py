@@ -0,0 +1,156 @@
+"""Pool de chaves por cliente: cada NODE_ID ancora com a sua própria conta.
+
+Todos os processos de cliente herdavam a mesma PRIVATE_KEY, e
+`onchain_job._send` lê o nonce ``pending`` logo antes de enviar: clientes
+concorrentes colidiam ("nonce too low" / replacement underpriced) e o erro
+era engolido em ``fit``. Com o pool, o driver (multi_run, e2e_scaling,
+ablation, run.py) chama `prepare_client_keys` antes de subir os clientes:
+
+1. escolhe uma chave por NODE_ID — ``CLIENT_PRIVATE_KEYS`` (lista separada
+   por vírgula), ou derivada de ``CLIENT_KEY_MNEMONIC`` (no Hardhat local,
+   chain 31337, o mnemonic padrão do nó) no caminho
+   ``m/44'/60'/0'/0/{CLIENT_KEY_OFFSET + node_id}``;
+2. financia (a partir da PRIVATE_KEY) as contas com saldo abaixo de
+   ``CLIENT_KEY_MIN_ETH``;
+3. autoriza as contas no JobContract (``setReporters``, tx do offerMaker);
+
+e devolve o env extra de cada cliente (``CLIENT_PRIVATE_KEY``), que o
+cliente usa como signer em `onchain_job.job_send_update`. Sem pool (flag
+desligada, sem on-chain, CHAIN_SIM=true, ANCHOR_MODE=batch ou rede sem
+chaves configuradas) devolve ``{}`` e tudo segue com a PRIVATE_KEY
+compartilhada.
+"""
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Mapping, Optional
+
+from eth_account import Account
+from eth_utils import to_hex
+
+from .chain import wait_for_receipt
+
+HARDHAT_CHAIN_ID = 31337
+HARDHAT_MNEMONIC = "test test test test test test test test test test test junk"
+# Contas 0 e 1 do Hardhat são requester/trainer em deploy_job; o pool começa
+# depois delas para não disputar nonces com o servidor.
+DEFAULT_OFFSET = 10
+
+
+def _truthy(value: Optional[str], default: bool) -> bool:
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def client_keys(
+    num_clients: int,
+    chain_id: int,
+    env: Optional[Mapping[str, str]] = None,
+) -> List[str]:
+    """Uma chave privada (hex) por NODE_ID, ou ``[]`` se a rede não tiver pool."""
+    env = os.environ if env is None else env
+    explicit = [k.strip() for k in (env.get("CLIENT_PRIVATE_KEYS") or "").split(",") if k.strip()]
+    if explicit:
+        if len(explicit) < num_clients:
+            raise ValueError(
+                f"CLIENT_PRIVATE_KEYS tem {len(explicit)} chaves, são necessárias {num_clients}"
+            )
+        return explicit[:num_clients]
+
+    mnemonic = (env.get("CLIENT_KEY_MNEMONIC") or "").strip()
+    if not mnemonic and chain_id == HARDHAT_CHAIN_ID:
+        mnemonic = HARDHAT_MNEMONIC
+    if not mnemonic:
+        return []
+    offset = int(env.get("CLIENT_KEY_OFFSET") or DEFAULT_OFFSET)
+    Account.enable_unaudited_hdwallet_features()
+    return [
+        to_hex(Account.from_mnemonic(mnemonic, account_path=f"m/44'/60'/0'/0/{offset + i}").key)
+        for i in range(num_clients)
+    ]
+
+
+def client_account_from_env():
+    """Conta do cliente (CLIENT_PRIVATE_KEY) ou ``None`` para usar a PRIVATE_KEY."""
+    key = os.getenv("CLIENT_PRIVATE_KEY", "").strip()
+    return Account.from_key(key) if key else None
+
+
+def _fund(w3, funder, addresses: List[str], min_wei: int, amount_wei: int) -> int:
+    """Transfere `amount_wei` a quem tiver menos de `min_wei` (nonces em sequência)."""
+    needy = [a for a in addresses if w3.eth.get_balance(a) < min_wei]
+    if not needy:
+        return 0
+    nonce = w3.eth.get_transaction_count(funder.address, "pending")
+    gas_price = w3.eth.gas_price
+    chain_id = w3.eth.chain_id
+    last = None
+    for k, address in enumerate(needy):
+        tx = {
+            "to": address,
+            "value": amount_wei,
+            "gas": 21_000,
+            "nonce": nonce + k,
+            "maxFeePerGas": gas_price * 2,
+            "maxPriorityFeePerGas": min(gas_price, w3.to_wei("2", "gwei")) or 1,
+            "chainId": chain_id,
+        }
+        last = w3.eth.send_raw_transaction(funder.sign_transaction(tx).rawTransaction)
+    wait_for_receipt(last, w3=w3)
+    return len(needy)
+
+
+def prepare_client_keys(
+    num_clients: int,
+    env: Optional[Mapping[str, str]] = None,
+) -> Dict[int, Dict[str, str]]:
+    """Provisiona o pool para `num_clients` e devolve ``{node_id: env extra}``.
+
+    `env` é o ambiente que será passado aos clientes (default: os.environ);
+    dele saem USE_ONCHAIN, ANCHOR_MODE, JOB_ADDR e as variáveis CLIENT_KEY_*.
+    Como os clientes fazem ``load_dotenv()`` (sem override), o que faltar em
+    `env` vem do .env — inclusive o JOB_ADDR recém-escrito por deploy_job.
+    """
+    from dotenv import dotenv_values, find_dotenv
+
+    env = {**dotenv_values(find_dotenv(usecwd=True)), **(os.environ if env is None else env)}
+    if not _truthy(env.get("CLIENT_KEY_POOL"), True):
+        return {}
+    if _truthy(env.get("CHAIN_SIM"), False):
+        return {}  # chain simulada (gas_model.py): nenhuma tx real
+    if not _truthy(env.get("USE_ONCHAIN"), True) or (env.get("ANCHOR_MODE") or "client").strip().lower() == "batch":
+        return {}
+    job_addr = (env.get("JOB_ADDR") or "").strip()
+    if not job_addr:
+        return {}
+
+    from . import onchain_job  # import tardio: exige RPC_URL/PRIVATE_KEY/JOB_ABI_PATH
+
+    w3 = onchain_job.w3
+    keys = client_keys(num_clients, w3.eth.chain_id, env)
+    if not keys:
+        print("[keypool] Sem CLIENT_PRIVATE_KEYS/CLIENT_KEY_MNEMONIC nesta rede: "
+              "clientes usam a PRIVATE_KEY compartilhada")
+        return {}
+    addresses = [Account.from_key(k).address for k in keys]
+
+    min_wei = w3.to_wei(float(env.get("CLIENT_KEY_MIN_ETH") or "0.05"), "ether")
+    fund_wei = w3.to_wei(float(env.get("CLIENT_KEY_FUND_ETH") or "0.5"), "ether")
+    funded = _fund(w3, onchain_job.acct, addresses, min_wei, fund_wei)
+
+    flags = onchain_job.job_reporter_flags(job_addr, addresses)
+    missing = [a for a, ok in flags.items() if not ok]
+    if missing:
+        try:
+            ok = onchain_job.job_set_reporters(job_addr, missing, True).get("status") == 1
+        except Exception as e:  # revert na estimativa de gas
+            print(f"[keypool] {e}")
+            ok = False
+        if not ok:
+            print(f"[keypool] setReporters falhou (PRIVATE_KEY é o offerMaker de {job_addr}?): "
+                  "clientes usam a PRIVATE_KEY compartilhada")
+            return {}
+    print(f"[keypool] {len(keys)} contas de cliente prontas "
+          f"({funded} financiadas, {len(missing)} autorizadas agora)")
+    return {i: {"CLIENT_PRIVATE_KEY": k} for i, k in enumerate(keys)}
@@ -33,6 +33,8 @@ def run_experiment():
     clients = []
     client_logs = []
     num_clients = 3
+    from .keypool import prepare_client_keys
+    client_keys = prepare_client_keys(num_clients)
     for i in range(num_clients):
         print(f"Iniciando cliente {i}...")
         log_file = open(f"client_{i}.log", "w")
@@ -40,7 +42,7 @@ def run_experiment():
             ["python", "-m", "flower_fl.client"],
             stdout=log_file,
             stderr=subprocess.STDOUT,
-            env={**os.environ, "NODE_ID": str(i), "NUM_NODES": str(num_clients)},
+            env={**os.environ, "NODE_ID": str(i), "NUM_NODES": str(num_clients), **client_keys.get(i, {})},
         )
         clients.append(client)
         client_logs.append(log_file)
@@ -0,0 +1,76 @@
+"""Árvore de Merkle para ancoragem em lote dos updates de clientes.
+
+Compatível com ``MerkleProof`` do OpenZeppelin (usado por
+``JobContract.verifyBatchedUpdate``):
+
+- folha   = keccak256(keccak256(content_ref)) — o hash interno é o mesmo
+  ``cidHash`` que ``job_send_update`` ancora no modo por-cliente; o segundo
+  hash evita que um nó interno (64 bytes) seja apresentado como folha;
+- nó pai  = keccak256(min(a, b) || max(a, b)) (pares ordenados, sem índice
+  de posição na prova);
+- nível ímpar: o último nó sobe sem par (não é duplicado).
+
+A ordem das folhas é a ordem de ``content_refs``; o servidor publica essa
+lista no ``encryptedPointer`` do evento ``ClientUpdateBatchRecorded`` para que
+qualquer leitor reconstrua a árvore.
+"""
+from __future__ import annotations
+
+from typing import List, Sequence
+
+from eth_utils import keccak
+
+
+def update_leaf(content_ref: str) -> bytes:
+    """Folha de um update: keccak256(abi.encodePacked(keccak256(ref)))."""
+    return keccak(keccak(text=content_ref))
+
+
+def _hash_pair(a: bytes, b: bytes) -> bytes:
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+def build_layers(leaves: Sequence[bytes]) -> List[List[bytes]]:
+    """Todos os níveis da árvore, das folhas (índice 0) até a raiz."""
+    if not leaves:
+        raise ValueError("Árvore de Merkle exige ao menos uma folha")
+    layers = [list(leaves)]
+    while len(layers[-1]) > 1:
+        level = layers[-1]
+        nxt = [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        layers.append(nxt)
+    return layers
+
+
+def merkle_root(leaves: Sequence[bytes]) -> bytes:
+    return build_layers(leaves)[-1][0]
+
+
+def merkle_proof(layers: List[List[bytes]], index: int) -> List[bytes]:
+    """Prova de inclusão (irmãos, da folha para a raiz) da folha ``index``."""
+    proof: List[bytes] = []
+    for level in layers[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof: Sequence[bytes], root: bytes) -> bool:
+    """Equivalente off-chain de ``MerkleProof.verify``."""
+    computed = leaf
+    for node in proof:
+        computed = _hash_pair(computed, node)
+    return computed == root
+
+
+def encode_proof(proof: Sequence[bytes]) -> str:
+    """Serializa uma prova como ``0x..,0x..`` (config do Flower só aceita escalares)."""
+    return ",".join("0x" + p.hex() for p in proof)
+
+
+def decode_proof(text: str) -> List[bytes]:
+    return [bytes.fromhex(p[2:] if p.startswith("0x") else p) for p in text.split(",") if p]
@@ -0,0 +1,278 @@
+"""Leituras em massa de estado on-chain: Multicall com fallback JSON-RPC em lote.
+
+Monitorar muitos jobs custava um ``eth_call`` por getter por contrato
+(``latestModelHash``, ``Status``, ``lockedAmount``, ``availableAmount`` × N
+JobContracts). `Multicall.call` recebe funções de contrato web3 já montadas
+(``contract.functions.getter(args)``), de contratos quaisquer, e:
+
+1. se houver um ``contracts/Multicall.sol`` implantado (MULTICALL_ADDRESS ou
+   ``deployments/multicall-<chainId>.json``, escrito por scripts/deploy-dao.ts),
+   agrega tudo em ``aggregate()`` — um ``eth_call`` por ``chunk_size`` chamadas,
+   todas no mesmo bloco;
+2. senão, manda os ``eth_call`` num único POST JSON-RPC em lote, fixados no
+   mesmo número de bloco;
+3. se o nó não aceitar lote, cai para chamadas individuais.
+
+Os retornos são decodificados com o ABI de cada função: um valor por saída
+simples, tupla quando há várias; ``None`` quando a chamada reverte e
+``allow_failure=True``.
+
+    from flower_fl.multicall import multicall_from_env
+    mc = multicall_from_env(w3)
+    status, locked = mc.call([job.functions.Status(), job.functions.lockedAmount()])
+
+Obs.: no caminho Multicall o ``msg.sender`` das chamadas é o próprio contrato
+Multicall — getters que dependem do chamador (``DAO.getPendingOffers``) devem
+continuar usando ``.call({"from": ...})``.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from eth_utils.abi import collapse_if_tuple
+from web3 import Web3
+
+from .chain import encode_call, http_session
+from .deployments import _read_json
+
+DEFAULT_CHUNK_SIZE = 300
+
+MULTICALL_ABI = [
+    {
+        "type": "function",
+        "name": "aggregate",
+        "stateMutability": "view",
+        "inputs": [{
+            "name": "calls",
+            "type": "tuple[]",
+            "components": [
+                {"name": "target", "type": "address"},
+                {"name": "allowFailure", "type": "bool"},
+                {"name": "callData", "type": "bytes"},
+            ],
+        }],
+        "outputs": [{
+            "name": "results",
+            "type": "tuple[]",
+            "components": [
+                {"name": "success", "type": "bool"},
+                {"name": "returnData", "type": "bytes"},
+            ],
+        }],
+    },
+    {
+        "type": "function",
+        "name": "getBlockNumber",
+        "stateMutability": "view",
+        "inputs": [],
+        "outputs": [{"name": "", "type": "uint256"}],
+    },
+]
+
+
+class MulticallError(RuntimeError):
+    """Chamada revertida com ``allow_failure=False``."""
+
+
+def _output_types(fn) -> List[str]:
+    return [collapse_if_tuple(o) for o in fn.abi.get("outputs", [])]
+
+
+def _to_bytes(data: Any) -> bytes:
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    text = str(data)
+    return bytes.fromhex(text[2:] if text.startswith("0x") else text)
+
+
+def resolve_multicall_address(
+    w3: Web3,
+    explicit: Optional[str] = None,
+    *,
+    deployments_dir: str | os.PathLike[str] | None = None,
+    ignition_dir: str | os.PathLike[str] | None = None,
+) -> Optional[str]:
+    """Endereço do Multicall implantado, ou ``None`` (usa o fallback em lote).
+
+    Só aceita um arquivo/chave que nomeie o Multicall (`_discover_multicall`)
+    e confirma com um ``getBlockNumber()``: um endereço com código que não é
+    o Multicall (p.ex. o DAO) faria todo ``aggregate()`` reverter sem cair no
+    fallback.
+    """
+    explicit = explicit or os.getenv("MULTICALL_ADDRESS")
+    if explicit and Web3.is_address(explicit) and int(explicit, 16) != 0:
+        address = Web3.to_checksum_address(explicit)
+    else:
+        address = _discover_multicall(
+            w3.eth.chain_id,
+            Path(deployments_dir or os.getenv("DEPLOYMENTS_DIR", "deployments")),
+            Path(ignition_dir or os.getenv("IGNITION_DIR", "ignition/deployments")),
+        )
+    if not address or len(w3.eth.get_code(address)) == 0:
+        return None
+    try:
+        w3.eth.contract(address=address, abi=MULTICALL_ABI).functions.getBlockNumber().call()
+    except Exception:
+        print(f"[multicall] {address} não responde a getBlockNumber(); usando JSON-RPC em lote")
+        return None
+    return address
+
+
+def _discover_multicall(chain_id: int, deployments_dir: Path, ignition_dir: Path) -> Optional[str]:
+    """``deployments/multicall[-<chainId>].json`` (scripts/deploy-dao.ts) ou uma
+    entrada ``*Multicall*`` do ``deployed_addresses.json`` do Ignition.
+
+    Não usa `deployments.discover_contract_address`: o fallback dela pega o
+    primeiro endereço do arquivo do Ignition, que é o do DAO.
+    """
+    for path in (deployments_dir / f"multicall-{chain_id}.json", deployments_dir / "multicall.json"):
+        payload = _read_json(path)
+        if payload:
+            addr = payload.get("multicall") or payload.get("address")
+            if isinstance(addr, str) and Web3.is_address(addr):
+                return Web3.to_checksum_address(addr)
+    ignition_base = ignition_dir / f"chain-{chain_id}"
+    if ignition_base.exists():
+        for path in sorted(ignition_base.rglob("deployed_addresses.json")):
+            for key, addr in (_read_json(path) or {}).items():
+                if "multicall" in key.split("#")[-1].lower() and isinstance(addr, str) and Web3.is_address(addr):
+                    return Web3.to_checksum_address(addr)
+    return None
+
+
+class Multicall:
+    def __init__(
+        self,
+        w3: Web3,
+        address: Optional[str] = None,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        timeout_s: float = 60.0,
+    ):
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address) if address else None
+        self.chunk_size = max(1, int(chunk_size))
+        self.timeout_s = timeout_s
+        self._contract = (
+            w3.eth.contract(address=self.address, abi=MULTICALL_ABI) if self.address else None
+        )
+        self._json_rpc_batch = True
+
+    @property
+    def mode(self) -> str:
+        return "multicall" if self._contract is not None else "jsonrpc_batch"
+
+    def call(
+        self,
+        calls: Sequence[Any],
+        *,
+        allow_failure: bool = True,
+        block: int | str = "latest",
+    ) -> List[Any]:
+        """Executa as funções de contrato e devolve os retornos decodificados, na ordem."""
+        if not calls:
+            return []
+        targets = [Web3.to_checksum_address(fn.address) for fn in calls]
+        datas = [encode_call(fn) for fn in calls]
+        if block == "latest":
+            block = self.w3.eth.block_number  # snapshot consistente entre lotes
+        if self._contract is not None:
+            raw = self._aggregate(targets, datas, block)
+        else:
+            raw = self._batch_eth_call(targets, datas, block)
+
+        out: List[Any] = []
+        for fn, (ok, data) in zip(calls, raw):
+            if not ok:
+                if not allow_failure:
+                    raise MulticallError(f"{fn.fn_name} reverteu em {fn.address}")
+                out.append(None)
+                continue
+            values = self.w3.codec.decode(_output_types(fn), _to_bytes(data))
+            out.append(values[0] if len(values) == 1 else tuple(values))
+        return out
+
+    def call_many(
+        self,
+        calls: Dict[str, Any],
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Como `call`, mas com chaves nomeadas (``{"status": fn, ...}``)."""
+        keys = list(calls)
+        return dict(zip(keys, self.call([calls[k] for k in keys], **kwargs)))
+
+    # --- caminhos de execução -------------------------------------------------
+
+    def _aggregate(self, targets: List[str], datas: List[str], block) -> List[tuple]:
+        raw: List[tuple] = []
+        for i in range(0, len(targets), self.chunk_size):
+            batch = [
+                (t, True, _to_bytes(d))
+                for t, d in zip(targets[i:i + self.chunk_size], datas[i:i + self.chunk_size])
+            ]
+            results = self._contract.functions.aggregate(batch).call(block_identifier=block)
+            raw.extend((bool(ok), data) for ok, data in results)
+        return raw
+
+    def _batch_eth_call(self, targets: List[str], datas: List[str], block) -> List[tuple]:
+        block_tag = hex(block) if isinstance(block, int) else block
+        url = getattr(self.w3.provider, "endpoint_uri", None)
+        raw: List[tuple] = []
+        for i in range(0, len(targets), self.chunk_size):
+            chunk = list(zip(targets[i:i + self.chunk_size], datas[i:i + self.chunk_size]))
+            body = None
+            if self._json_rpc_batch and url:
+                payload = [
+                    {"jsonrpc": "2.0", "id": j, "method": "eth_call",
+                     "params": [{"to": t, "data": d}, block_tag]}
+                    for j, (t, d) in enumerate(chunk)
+                ]
+                resp = http_session(url).post(url, json=payload, timeout=self.timeout_s)
+                resp.raise_for_status()
+                body = resp.json()
+                if not isinstance(body, list):
+                    self._json_rpc_batch = False  # nó sem suporte a lote
+                    body = None
+            if body is None:
+                raw.extend(self._single_calls(chunk, block))
+                continue
+            by_id = {item.get("id"): item for item in body if isinstance(item, dict)}
+            for j in range(len(chunk)):
+                item = by_id.get(j, {})
+                ok = "result" in item and item.get("error") is None
+                raw.append((ok, item.get("result") if ok else b""))
+        return raw
+
+    def _single_calls(self, chunk, block) -> List[tuple]:
+        out: List[tuple] = []
+        for target, data in chunk:
+            try:
+                out.append((True, self.w3.eth.call({"to": target, "data": data}, block)))
+            except Exception:
+                out.append((False, b""))
+        return out
+
+
+def multicall_from_env(w3: Web3, **kwargs) -> Multicall:
+    """`Multicall` com o endereço do .env/deployments (ou modo lote JSON-RPC)."""
+    return Multicall(w3, resolve_multicall_address(w3), **kwargs)
+
+
+JOB_STATUS_GETTERS = ("Status", "latestModelHash", "lockedAmount", "availableAmount")
+
+
+def job_status_snapshot(mc: Multicall, jobs: Sequence[Any], **kwargs) -> List[Dict[str, Any]]:
+    """Estado de vários JobContracts (objetos web3) numa só rodada de leitura."""
+    calls = [getattr(job.functions, name)() for job in jobs for name in JOB_STATUS_GETTERS]
+    values = mc.call(calls, **kwargs)
+    width = len(JOB_STATUS_GETTERS)
+    snapshot: List[Dict[str, Any]] = []
+    for i, job in enumerate(jobs):
+        row: Dict[str, Any] = {"address": job.address}
+        row.update(zip(JOB_STATUS_GETTERS, values[i * width:(i + 1) * width]))
+        if isinstance(row.get("latestModelHash"), (bytes, bytearray)):
+            row["latestModelHash"] = "0x" + bytes(row["latestModelHash"]).hex()
+        snapshot.append(row)
+    return snapshot
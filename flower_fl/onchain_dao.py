@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-import json, os
+import json, os, threading
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 from web3 import Web3
 from eth_account import Account
+from eth_abi import encode as abi_encode
 from eth_utils import keccak
 
+from .chain import contract, encode_call, get_web3, wait_for_receipt
 from .deployments import resolve_address
+from .events import EventRegistry, JobContractCreated, OfferMade
+from .multicall import multicall_from_env
 
 load_dotenv()
 
@@ -21,7 +25,7 @@ IGNITION_DIR = os.getenv("IGNITION_DIR", "ignition/deployments")
 assert RPC_URL and PRIVATE_KEY, "Defina RPC_URL e PRIVATE_KEY no .env"
 assert DAO_ABI_PATH, "Defina DAO_ABI_PATH no .env"
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL, request_kwargs={"timeout": 60}))
+w3 = get_web3(RPC_URL)
 acct = Account.from_key(PRIVATE_KEY)
 
 
@@ -40,59 +44,171 @@ DAO_ADDRESS = resolve_address(
     ignition_dir=IGNITION_DIR,
 )
 
-DAO = w3.eth.contract(
-    address=Web3.to_checksum_address(DAO_ADDRESS),
-    abi=DAO_ABI,
-)
+DAO = contract(w3, DAO_ADDRESS, DAO_ABI)
 
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
 
-def _send(fn, value_wei: int = 0) -> Dict[str, Any]:
-    nonce = w3.eth.get_transaction_count(acct.address)
-    base = fn.build_transaction({
-        "from": acct.address,
-        "nonce": nonce,
-        "value": value_wei,
-    })
-    gas = w3.eth.estimate_gas(base)
-    gas_price = w3.eth.gas_price
-    max_priority = min(gas_price // 10 or 1, w3.to_wei("2", "gwei"))
-    tx = {
-        **base,
-        "gas": int(gas * 120 // 100 + 1),
-        "maxFeePerGas": gas_price + max_priority,
-        "maxPriorityFeePerGas": max_priority,
-        "chainId": w3.eth.chain_id,
-    }
-    signed = acct.sign_transaction(tx)
-    tx_hash = w3.eth.send_raw_transaction(signed.rawTransaction)
-    rcpt = w3.eth.wait_for_transaction_receipt(tx_hash)
+class SignerRegistry:
+    """Contas locais em memória, escolhidas por chamada (sem reescrever o .env).
+
+    Cada função de escrita aceita ``signer=`` — uma conta (`LocalAccount`), o
+    endereço de uma conta registrada aqui, ou ``None`` para o `acct` do módulo
+    (PRIVATE_KEY). Os nonces são reservados localmente: o próximo nonce de um
+    endereço é o maior entre o contador do nó (``pending``) e o último
+    reservado, então várias txs do mesmo signer podem ser enviadas em
+    sequência sem esperar receipts (pipeline) e sem colidir com txs enviadas
+    por fora deste registro.
+    """
+
+    def __init__(self):
+        self._accounts: Dict[str, Any] = {}
+        self._next_nonce: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, private_key) -> Any:
+        account = Account.from_key(private_key)
+        self._accounts[account.address] = account
+        return account
+
+    def get(self, signer=None) -> Any:
+        if signer is None:
+            return acct
+        if not isinstance(signer, str):
+            return signer
+        address = Web3.to_checksum_address(signer)
+        if address not in self._accounts:
+            raise KeyError(f"Signer {address} não registrado (use SIGNERS.add(private_key))")
+        return self._accounts[address]
+
+    def addresses(self) -> List[str]:
+        return list(self._accounts)
+
+    def reserve_nonce(self, address: str) -> int:
+        on_chain = w3.eth.get_transaction_count(address, "pending")
+        with self._lock:
+            nonce = max(on_chain, self._next_nonce.get(address, 0))
+            self._next_nonce[address] = nonce + 1
+        return nonce
+
+    def release_nonce(self, address: str) -> None:
+        """Esquece o contador local (ex.: tx rejeitada antes de entrar no mempool)."""
+        with self._lock:
+            self._next_nonce.pop(address, None)
+
+    def __contains__(self, address: str) -> bool:
+        return Web3.to_checksum_address(address) in self._accounts
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+
+SIGNERS = SignerRegistry()
+
+
+def _submit_tx(tx: Dict[str, Any], signer=None) -> str:
+    """Completa nonce/gas/taxas, assina e envia `tx`; devolve o hash sem esperar."""
+    account = SIGNERS.get(signer)
+    tx = {**tx, "from": account.address, "nonce": SIGNERS.reserve_nonce(account.address)}
+    try:
+        if "gas" not in tx:
+            tx["gas"] = int(w3.eth.estimate_gas(tx) * 120 // 100 + 1)
+        gas_price = w3.eth.gas_price
+        max_priority = min(gas_price // 10 or 1, w3.to_wei("2", "gwei"))
+        tx.update({
+            "maxFeePerGas": gas_price + max_priority,
+            "maxPriorityFeePerGas": max_priority,
+            "chainId": w3.eth.chain_id,
+        })
+        signed = account.sign_transaction(tx)
+        return w3.eth.send_raw_transaction(signed.rawTransaction).hex()
+    except Exception:
+        SIGNERS.release_nonce(account.address)
+        raise
+
+
+def _submit(fn, value_wei: int = 0, *, signer=None, gas: Optional[int] = None) -> str:
+    tx = {"to": fn.address, "data": encode_call(fn), "value": value_wei}
+    if gas:
+        tx["gas"] = gas
+    return _submit_tx(tx, signer=signer)
+
+
+def _wait(tx_hash: str) -> Dict[str, Any]:
+    rcpt = wait_for_receipt(tx_hash, w3=w3)
     return {
-        "hash": tx_hash.hex(),
+        "hash": tx_hash,
         "gasUsed": rcpt.gasUsed,
         "gasETH": rcpt.gasUsed * rcpt.effectiveGasPrice / 1e18,
+        "status": rcpt.status,
         "logs": rcpt.logs,
     }
 
 
+def _send(fn, value_wei: int = 0, *, signer=None) -> Dict[str, Any]:
+    return _wait(_submit(fn, value_wei, signer=signer))
+
+
 # --- DAO calls (mantidos) ---
 
-def register_requester():
-    return _send(DAO.functions.registerRequester())
+def register_requester(signer=None):
+    return _send(DAO.functions.registerRequester(), signer=signer)
 
 
-def register_trainer(description: str, specification: Tuple):
-    return _send(DAO.functions.registerTrainer(description, specification))
+def register_trainer(description: str, specification: Tuple, signer=None):
+    return _send(DAO.functions.registerTrainer(description, specification), signer=signer)
 
 
 def match_trainers(job_requirements: Tuple) -> List[str]:
     return DAO.functions.matchTrainers(job_requirements).call()
 
 
+MATCH_SCAN_PAGE = int(os.getenv("MATCH_SCAN_PAGE", "500"))
+
+
+def iter_matching_trainers(job_requirements: Tuple, scan_page: int | None = None) -> Iterator[str]:
+    """Todos os trainers que casam com `job_requirements`, em streaming.
+
+    Usa `matchTrainersFrom(req, cursor, maxScan)`: cada `eth_call` examina no
+    máximo `scan_page` trainers (gas limitado mesmo com registros enormes) e
+    devolve o próximo cursor, então nenhum prefixo é re-varrido. O campo
+    `canditatesToReturn` da tupla é ignorado (o gerador devolve todos).
+    """
+    description, value_by_update, min_rating, tags, _limit = job_requirements
+    page = max(1, scan_page or MATCH_SCAN_PAGE)
+    req = (description, value_by_update, min_rating, list(tags), page)
+    cursor = 0
+    total = DAO.functions.trainersCount().call()
+    while cursor < total:
+        matches, cursor = DAO.functions.matchTrainersFrom(req, cursor, page).call()
+        yield from matches
+        if cursor >= total:
+            total = DAO.functions.trainersCount().call()  # registros novos durante a iteração
+
+
+def _iter_registry(fn_name: str, page_size: int) -> Iterator[Tuple[str, str]]:
+    offset = 0
+    while True:
+        owners, contracts, total = getattr(DAO.functions, fn_name)(offset, page_size).call()
+        yield from zip(owners, contracts)
+        offset += len(owners)
+        if not owners or offset >= total:
+            break
+
+
+def iter_trainers(page_size: int = 500) -> Iterator[Tuple[str, str]]:
+    """(owner, contrato Trainer) de todo o registro, em páginas de `page_size`."""
+    return _iter_registry("getTrainersRange", page_size)
+
+
+def iter_requesters(page_size: int = 500) -> Iterator[Tuple[str, str]]:
+    """(owner, contrato Requester) de todo o registro, em páginas de `page_size`."""
+    return _iter_registry("getRequestersRange", page_size)
+
+
 def make_offer(description: str, model_cid: str, value_by_update_wei: int,
                number_of_updates: int, trainer_addr: str, server_endpoint: str,
-               encrypted_metadata: bytes = b""):
+               encrypted_metadata: bytes = b"", signer=None):
     model_hash = keccak(text=model_cid)
     endpoint_hash = keccak(text=server_endpoint)
     fn = DAO.functions.MakeOffer(
@@ -104,44 +220,132 @@ def make_offer(description: str, model_cid: str, value_by_update_wei: int,
         number_of_updates,
         Web3.to_checksum_address(trainer_addr),
     )
-    return _send(fn)
+    return _send(fn, signer=signer)
 
 
-def get_pending_offer_ids_for(trainer_owner_addr: str | None = None):
-    """IDs de ofertas pendentes do trainer = signer atual (msg.sender).
+PENDING_OFFERS_PAGE_SIZE = int(os.getenv("PENDING_OFFERS_PAGE_SIZE", "500"))
 
-    `DAO.sol` expõe `getPendingOffers()` (sem argumento; usa `msg.sender` e
-    exige `isTrainer(msg.sender)`), não `getPendingOfferIdsFor(addr)`. A
-    consulta é portanto sempre relativa ao `acct` ativo (PRIVATE_KEY).
-    `trainer_owner_addr` é mantido por compatibilidade; se informado, deve
-    coincidir com o signer atual.
+
+def get_pending_offer_ids_for(trainer_owner_addr: str | None = None, page_size: int | None = None):
+    """IDs de ofertas pendentes de um trainer.
+
+    `DAO.sol` expõe `getPendingOffersPage(offset, limit)` (usa `msg.sender` e
+    exige `isTrainer(msg.sender)`), não `getPendingOfferIdsFor(addr)`. Como é
+    um `eth_call`, basta usar o trainer como `from`: `trainer_owner_addr`
+    (qualquer endereço, registrado ou não em SIGNERS) ou, sem ele, o `acct`
+    ativo (PRIVATE_KEY).
+
+    Os IDs são lidos em páginas de `page_size` (default
+    PENDING_OFFERS_PAGE_SIZE), então o custo por `eth_call` não cresce com o
+    backlog do trainer. Todas as páginas leem o MESMO bloco: com páginas em
+    "latest", uma oferta aceita entre duas chamadas (swap-and-pop) moveria o
+    último ID para uma posição já lida e ele sumiria da lista.
     """
-    if (
-        trainer_owner_addr
-        and Web3.to_checksum_address(trainer_owner_addr) != acct.address
-    ):
-        raise ValueError(
-            "getPendingOffers() usa msg.sender — para consultar outro trainer "
-            "troque o signer (PRIVATE_KEY)."
+    caller = Web3.to_checksum_address(trainer_owner_addr) if trainer_owner_addr else acct.address
+    size = max(1, page_size or PENDING_OFFERS_PAGE_SIZE)
+    block = w3.eth.block_number
+    ids: List[int] = []
+    offset = 0
+    while True:
+        page, total = DAO.functions.getPendingOffersPage(offset, size).call(
+            {"from": caller}, block_identifier=block,
         )
-    return DAO.functions.getPendingOffers().call({"from": acct.address})
+        ids.extend(int(i) for i in page)
+        offset += size
+        if offset >= total or not page:
+            break
+    return ids
+
+
+def accept_offer(offer_id: int, signer=None):
+    return _send(DAO.functions.AcceptOffer(int(offer_id)), signer=signer)
+
+
+def sign_job_contract(job_addr: str, total_amount_wei: int = 0, signer=None):
+    return _send(
+        DAO.functions.signJobContract(Web3.to_checksum_address(job_addr)),
+        value_wei=total_amount_wei,
+        signer=signer,
+    )
+
+
+def release_job_payment(job_addr: str, recipient: str | None = None, signer=None):
+    """Libera o ``availableAmount`` de um job (recipient ``None`` = o trainer)."""
+    to = Web3.to_checksum_address(recipient or ZERO_ADDRESS)
+    return _send(DAO.functions.releaseJobPayment(Web3.to_checksum_address(job_addr), to), signer=signer)
 
 
-def accept_offer(offer_id: int):
-    return _send(DAO.functions.AcceptOffer(int(offer_id)))
+PAYOUT_BATCH_SIZE = int(os.getenv("PAYOUT_BATCH_SIZE", "100"))
+PAYOUT_RELEASED_TOPIC = "0x" + keccak(text="PayoutReleased(address,uint256)").hex()
 
 
-def sign_job_contract(job_addr: str, total_amount_wei: int = 0):
-    return _send(DAO.functions.signJobContract(Web3.to_checksum_address(job_addr)), value_wei=total_amount_wei)
+def release_job_payments(job_addrs, recipient: str | None = None, signer=None,
+                         batch_size: int | None = None) -> Dict[str, Any]:
+    """`release_job_payment` de vários jobs via `DAO.releaseJobPayments`.
 
+    Um lote por tx, até `batch_size` jobs (default PAYOUT_BATCH_SIZE); as txs
+    dos lotes saem em pipeline e os receipts são esperados no fim. Jobs sem
+    saldo liberado (ou sem depósito que o cubra) são pulados pelo contrato.
+    Devolve ``payouts`` ({job: wei}, lidos dos ``PayoutReleased``), o gas
+    somado e os receipts de cada lote.
+    """
+    jobs = [Web3.to_checksum_address(a) for a in job_addrs]
+    size = max(1, batch_size or PAYOUT_BATCH_SIZE)
+    to = Web3.to_checksum_address(recipient or ZERO_ADDRESS)
+    hashes = [
+        _submit(DAO.functions.releaseJobPayments(jobs[i:i + size], to), signer=signer)
+        for i in range(0, len(jobs), size)
+    ]
+    receipts = [_wait(h) for h in hashes]
+    payouts: Dict[str, int] = {}
+    for r in receipts:
+        for log in r["logs"]:
+            topics = log["topics"]
+            if topics and "0x" + bytes(topics[0]).hex() == PAYOUT_RELEASED_TOPIC:
+                job = Web3.to_checksum_address(log["address"])
+                payouts[job] = payouts.get(job, 0) + int.from_bytes(bytes(log["data"]), "big")
+    return {
+        "payouts": payouts,
+        "gasUsed": sum(r["gasUsed"] for r in receipts),
+        "gasETH": sum(r["gasETH"] for r in receipts),
+        "status": int(all(r["status"] == 1 for r in receipts)),
+        "receipts": receipts,
+    }
 
-def get_offer_details(offer_id: int):
-    """Detalhes de uma oferta pendente do signer atual.
+
+def get_offer_details(offer_id: int, signer=None):
+    """Detalhes de uma oferta pendente do trainer `signer` (default: `acct`).
 
     `DAO.sol` expõe `getOfferDetails(uint256)` (usa `msg.sender`), não
-    `getOfferDetailsFor(address, uint256)`.
+    `getOfferDetailsFor(address, uint256)`. O struct só tem campos de tamanho
+    fixo: descrição e metadados vêm de `get_offer_payload` (``payloadHash``).
+    """
+    caller = SIGNERS.get(signer).address if not isinstance(signer, str) else Web3.to_checksum_address(signer)
+    return DAO.functions.getOfferDetails(int(offer_id)).call({"from": caller})
+
+
+def offer_payload_hash(description: str, encrypted_metadata: bytes = b"") -> bytes:
+    """``keccak256(abi.encode(description, encryptedMetadata))``, como em `DAO.MakeOffer`."""
+    return keccak(abi_encode(["string", "bytes"], [description, bytes(encrypted_metadata)]))
+
+
+def get_offer_payload(offer_id: int, from_block: int | str = 0) -> Tuple[str, bytes]:
+    """(descrição, metadados cifrados) da oferta, lidos do evento OfferPayload.
+
+    Desde que as ofertas guardam só o compromisso ``payloadHash``, o conteúdo
+    existe apenas no log de `MakeOffer`. O log é conferido contra o hash.
     """
-    return DAO.functions.getOfferDetails(int(offer_id)).call({"from": acct.address})
+    logs = w3.eth.get_logs({
+        "address": DAO.address,
+        "fromBlock": from_block,
+        "toBlock": "latest",
+        "topics": [OFFER_PAYLOAD_TOPIC, "0x" + int(offer_id).to_bytes(32, "big").hex()],
+    })
+    for ev in DAO_LOGS.decode_logs(logs):
+        a = ev.args
+        if offer_payload_hash(a["description"], a["encryptedMetadata"]) == bytes(a["payloadHash"]):
+            return a["description"], bytes(a["encryptedMetadata"])
+    raise LookupError(f"OfferPayload da oferta {offer_id} não encontrado (ou hash divergente)")
 
 
 def get_requester_contract(account: str) -> str:
@@ -152,66 +356,50 @@ def get_trainer_contract(account: str) -> str:
     return DAO.functions.trainers(Web3.to_checksum_address(account)).call()
 
 
-def _find_event_abi_by_name_prefix(prefix: str):
-    pref = prefix.lower()
-    for item in DAO_ABI:
-        if item.get("type") == "event" and item.get("name", "").lower().startswith(pref):
-            return item
-    return None
+_MULTICALL = None
+
+
+def get_participant_contracts(accounts) -> Dict[str, Tuple[str, str]]:
+    """{conta: (contrato Requester, contrato Trainer)} numa só rodada de leitura.
+
+    Equivale a `get_requester_contract` + `get_trainer_contract` por conta,
+    agregados via Multicall (ou lote JSON-RPC). Não registrado = ZERO_ADDRESS.
+    """
+    global _MULTICALL
+    if _MULTICALL is None:
+        _MULTICALL = multicall_from_env(w3)
+    accounts = [Web3.to_checksum_address(a) for a in accounts]
+    calls = []
+    for a in accounts:
+        calls.append(DAO.functions.requesters(a))
+        calls.append(DAO.functions.trainers(a))
+    values = _MULTICALL.call(calls, allow_failure=False)
+    return {a: (values[2 * i], values[2 * i + 1]) for i, a in enumerate(accounts)}
+
 
+# Decodificação de logs do DAO: registro topic0 -> decodificador, montado uma
+# vez (ver events.py). Logs de outros contratos na mesma tx são ignorados.
+DAO_LOGS = EventRegistry(DAO_ABI, address=DAO.address)
+OFFER_PAYLOAD_TOPIC = "0x" + keccak(text="OfferPayload(uint256,bytes32,string,bytes)").hex()
 
-def _iter_event_decoders_from_abi(abi):
-    """Cria decoders para TODOS os eventos do ABI."""
-    decoders = []
-    for item in abi:
-        if item.get("type") == "event":
-            tmp = w3.eth.contract(abi=[item])
-            decoders.append(tmp.events[item["name"]])
-    return decoders
+
+def extract_offers_from_logs(logs) -> List[OfferMade]:
+    """Todos os OfferMade de `logs` (um receipt ou a concatenação de vários)."""
+    return [r for r in DAO_LOGS.records(logs) if isinstance(r, OfferMade)]
+
+
+def extract_jobs_from_logs(logs) -> List[JobContractCreated]:
+    """Todos os JobContractCreated de `logs` (um receipt ou a concatenação de vários)."""
+    return [r for r in DAO_LOGS.records(logs) if isinstance(r, JobContractCreated)]
 
 
 def extract_offer_id_from_logs(logs) -> int | None:
-    """
-    Tenta decodificar o ID de oferta a partir de qualquer evento emitido pelo DAO
-    na tx de MakeOffer. Heurísticas:
-      1) usar campos chamados 'id', 'offerId', 'offerID', 'offer_id';
-      2) se não achar, pegar o primeiro inteiro não-negativo dos args;
-      3) se ainda não achar, tentar tópicos não-endereço como uint.
-    """
+    """ID da (primeira) oferta criada, a partir do evento OfferMade de MakeOffer."""
+    offers = extract_offers_from_logs(logs)
+    return offers[0].offer_id if offers else None
+
 
-    decoders = _iter_event_decoders_from_abi(DAO.abi)
-
-    for log in logs:
-        if log.get("address", "").lower() != DAO.address.lower():
-            continue
-        for dec in decoders:
-            try:
-                ev = dec().process_log(log)
-                args = ev["args"]
-                for key in ("id", "offerId", "offerID", "offer_id"):
-                    if key in args and isinstance(args[key], int) and args[key] >= 0:
-                        return int(args[key])
-                for k, v in args.items():
-                    if isinstance(v, int) and v >= 0:
-                        return int(v)
-            except Exception:
-                pass
-
-    from eth_utils import big_endian_to_int
-    ZERO_ADDR_TOPIC_PREFIX = "0x000000000000000000000000"
-
-    for log in logs:
-        if log.get("address", "").lower() != DAO.address.lower():
-            continue
-        topics = [t.hex() if hasattr(t, "hex") else str(t) for t in log.get("topics", [])]
-        for t in topics[1:]:
-            if t.startswith(ZERO_ADDR_TOPIC_PREFIX) and len(t) == 66:
-                continue
-            try:
-                val = big_endian_to_int(bytes.fromhex(t[2:]))
-                if val >= 0:
-                    return int(val)
-            except Exception:
-                pass
-
-    return None
+def extract_job_address_from_logs(logs) -> str | None:
+    """Endereço do JobContract a partir do evento JobContractCreated de AcceptOffer."""
+    jobs = extract_jobs_from_logs(logs)
+    return jobs[0].job if jobs else None
@@ -6,6 +6,11 @@ from web3 import Web3
 from eth_account import Account
 from eth_utils import keccak
 
+from .chain import contract, get_web3, wait_for_receipt
+from .cid_codec import encode_pointer, encode_pointer_list
+from .gas_model import sim_chain_from_env
+from .multicall import job_status_snapshot, multicall_from_env
+
 load_dotenv()
 RPC_URL = os.getenv("RPC_URL")
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
@@ -13,8 +18,11 @@ JOB_ABI_PATH = os.getenv("JOB_ABI_PATH")
 
 assert RPC_URL and PRIVATE_KEY and JOB_ABI_PATH, "Configure RPC_URL, PRIVATE_KEY e JOB_ABI_PATH no .env"
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL, request_kwargs={"timeout": 60}))
+w3 = get_web3(RPC_URL)
 acct = Account.from_key(PRIVATE_KEY)
+# CHAIN_SIM=true: as escritas não vão ao nó; gas e latência vêm do modelo
+# calibrado (gas_model.py). Leituras (remainingUpdates etc.) continuam reais.
+SIM = sim_chain_from_env()
 
 
 def _load_abi(path: str):
@@ -26,13 +34,22 @@ ABI = _load_abi(JOB_ABI_PATH)
 
 
 def _job(addr: str):
-    return w3.eth.contract(address=Web3.to_checksum_address(addr), abi=ABI)
+    return contract(w3, addr, ABI)
+
 
+def _broadcast(fn, value_wei: int = 0, signer=None, nonce: int | None = None) -> str:
+    """Assina e envia a tx sem esperar o receipt; devolve o hash (hex).
 
-def _send(fn, value_wei: int = 0) -> Dict[str, Any]:
-    nonce = w3.eth.get_transaction_count(acct.address)
+    `nonce` explícito permite encadear txs da mesma conta antes de as
+    anteriores minerarem (ver anchor_async); sem ele, lê o nonce da conta.
+    """
+    account = signer or acct
+    if SIM is not None:
+        return SIM.broadcast(fn, account.address, nonce)
+    if nonce is None:
+        nonce = w3.eth.get_transaction_count(account.address)
     base_tx = fn.build_transaction({
-        "from": acct.address,
+        "from": account.address,
         "nonce": nonce,
         "value": value_wei,
     })
@@ -46,29 +63,146 @@ def _send(fn, value_wei: int = 0) -> Dict[str, Any]:
         "maxPriorityFeePerGas": max_priority,
         "chainId": w3.eth.chain_id,
     }
-    signed = acct.sign_transaction(tx)
-    txh = w3.eth.send_raw_transaction(signed.rawTransaction)
-    rc = w3.eth.wait_for_transaction_receipt(txh)
-    return {"hash": txh.hex(), "gasUsed": rc.gasUsed, "gasETH": rc.gasUsed * rc.effectiveGasPrice / 1e18}
+    signed = account.sign_transaction(tx)
+    return w3.eth.send_raw_transaction(signed.rawTransaction).hex()
+
+
+def _wait(tx_hash: str, timeout: float = 120) -> Dict[str, Any]:
+    if SIM is not None:
+        return SIM.wait(tx_hash, timeout)
+    rc = wait_for_receipt(tx_hash, timeout, w3)
+    return {
+        "hash": tx_hash,
+        "gasUsed": rc.gasUsed,
+        "gasETH": rc.gasUsed * rc.effectiveGasPrice / 1e18,
+        "status": rc.status,
+    }
+
+
+def _send(fn, value_wei: int = 0, signer=None) -> Dict[str, Any]:
+    return _wait(_broadcast(fn, value_wei, signer))
 
 
 def job_update_global(job_addr: str, cid: str, encrypted: bytes | None = None):
     # Armazenamento continua barato: latestModelHash = keccak(cid) (32 bytes,
     # tamper-evidence). O ponteiro recuperável (CID no full / sha256:... no
-    # no_ipfs) viaja no log do evento GlobalModelUpdated via `encryptedCid`.
+    # no_ipfs) viaja no log do evento GlobalModelUpdated via `encryptedCid`,
+    # em UTF-8 ou no formato binário compacto (POINTER_ENCODING, ver cid_codec).
     job = _job(job_addr)
     cid_hash = keccak(text=cid)
-    payload = encrypted if encrypted is not None else cid.encode("utf-8")
+    payload = encrypted if encrypted is not None else encode_pointer(cid)
     return _send(job.functions.publishGlobalModel(cid_hash, payload))
 
 
-def job_send_update(job_addr: str, cid: str, encrypted: bytes | None = None):
+def job_publish_checkpoint(job_addr: str, root: bytes, refs: list[str]):
+    """Ancora a raiz do acumulador de modelos globais (checkpoint.py).
+
+    ``latestModelHash`` passa a ser a raiz de Merkle de todos os rounds até
+    aqui; o evento leva os refs desde o checkpoint anterior.
+    """
+    payload = encode_pointer_list(refs)
+    return _send(_job(job_addr).functions.publishGlobalModel(bytes(root), payload))
+
+
+def job_send_update(job_addr: str, cid: str, encrypted: bytes | None = None, signer=None):
     # Idem publishGlobalModel: o ponteiro recuperável vai no evento
     # ClientUpdateRecorded (`encryptedCid`); o storage guarda só keccak(cid).
+    # `signer`: a conta do cliente (keypool) em vez da PRIVATE_KEY compartilhada.
     job = _job(job_addr)
     cid_hash = keccak(text=cid)
-    payload = encrypted if encrypted is not None else cid.encode("utf-8")
-    return _send(job.functions.recordClientUpdate(cid_hash, payload))
+    payload = encrypted if encrypted is not None else encode_pointer(cid)
+    return _send(job.functions.recordClientUpdate(cid_hash, payload), signer=signer)
+
+
+def job_submit_update(
+    job_addr: str,
+    cid: str,
+    encrypted: bytes | None = None,
+    signer=None,
+    nonce: int | None = None,
+) -> str:
+    """Como `job_send_update`, mas só envia: devolve o hash sem esperar o receipt."""
+    job = _job(job_addr)
+    payload = encrypted if encrypted is not None else encode_pointer(cid)
+    return _broadcast(job.functions.recordClientUpdate(keccak(text=cid), payload), signer=signer, nonce=nonce)
+
+
+def pending_nonce(address: str) -> int:
+    """Próximo nonce da conta, contando as txs ainda no mempool."""
+    if SIM is not None:
+        return SIM.pending_nonce(address)
+    return w3.eth.get_transaction_count(address, "pending")
+
+
+def job_wait(tx_hash: str, timeout: float = 120) -> Dict[str, Any]:
+    """Receipt de uma tx enviada por `job_submit_update` (hash, gasUsed, gasETH, status)."""
+    return _wait(tx_hash, timeout)
+
+
+def job_send_update_batch(job_addr: str, content_refs: list[str], encrypted: bytes | None = None):
+    """Ancora os updates de um round inteiro em UMA tx (raiz de Merkle).
+
+    Substitui N chamadas de `job_send_update` por uma `recordClientUpdateBatch`
+    que credita `updatesDone` pelo tamanho do lote. O ponteiro recuperável é a
+    lista de refs na ordem das folhas (uma por linha), para que leitores do
+    evento ClientUpdateBatchRecorded reconstruam a árvore e as provas
+    (`cid_codec.decode_pointer_list` lê os dois formatos).
+    """
+    from .merkle import build_layers, update_leaf  # import tardio (só modo batch)
+    job = _job(job_addr)
+    layers = build_layers([update_leaf(ref) for ref in content_refs])
+    root = layers[-1][0]
+    payload = encrypted if encrypted is not None else encode_pointer_list(content_refs)
+    r = _send(job.functions.recordClientUpdateBatch(root, len(content_refs), payload))
+    r["merkleRoot"] = "0x" + root.hex()
+    r["layers"] = layers
+    return r
+
+
+def job_set_store_update_hashes(job_addr: str, enabled: bool, signer=None):
+    """Liga/desliga `clientUpdateHashes` em storage (só offerMaker, antes do 1º update).
+
+    Com `False` os hashes ficam apenas nos eventos ClientUpdateRecorded /
+    ClientUpdateBatchRecorded (o indexer e o cid_codec já os leem de lá).
+    """
+    return _send(_job(job_addr).functions.setStoreUpdateHashes(bool(enabled)), signer=signer)
+
+
+def job_set_reporters(job_addr: str, reporters: list[str], enabled: bool = True, signer=None):
+    """Autoriza (ou revoga) contas de clientes como reporters (só offerMaker)."""
+    addrs = [Web3.to_checksum_address(a) for a in reporters]
+    return _send(_job(job_addr).functions.setReporters(addrs, bool(enabled)), signer=signer)
+
+
+def job_remaining_updates(job_addr: str) -> int:
+    return int(_job(job_addr).functions.remainingUpdates().call())
+
+
+_MULTICALL = None
+
+
+def _multicall():
+    global _MULTICALL
+    if _MULTICALL is None:
+        _MULTICALL = multicall_from_env(w3)
+    return _MULTICALL
+
+
+def job_reporter_flags(job_addr: str, accounts: list[str]) -> Dict[str, bool]:
+    """{conta: isReporter} numa só rodada de leitura."""
+    job = _job(job_addr)
+    addrs = [Web3.to_checksum_address(a) for a in accounts]
+    values = _multicall().call([job.functions.isReporter(a) for a in addrs], allow_failure=False)
+    return dict(zip(addrs, (bool(v) for v in values)))
+
+
+def jobs_status_snapshot(job_addrs: list[str]) -> list[Dict[str, Any]]:
+    """Status/latestModelHash/lockedAmount/availableAmount de vários jobs.
+
+    Uma rodada de leitura (Multicall ou lote JSON-RPC, ver multicall.py) em
+    vez de 4 `eth_call` por JobContract.
+    """
+    return job_status_snapshot(_multicall(), [_job(a) for a in job_addrs])
 
 
 def get_gas_price_gwei() -> float:
@@ -0,0 +1,223 @@
+"""Planos de particionamento (Dirichlet / faixas contíguas) calculados uma vez e em cache.
+
+`load_cifar10` fazia cada cliente recalcular o split Dirichlet de TODOS os nós,
+classe a classe (``np.random.shuffle``, ``np.split`` e ``.extend(...tolist())``
+em listas Python), só para ficar com a própria fatia; o MNIST só tinha faixas
+contíguas (IID). Aqui:
+
+- `dirichlet_plan(targets, num_nodes, alpha, seed)` monta o plano inteiro com
+  operações de array: um ``RandomState(seed)`` na MESMA sequência de sorteios
+  do código antigo (shuffle + dirichlet por classe), ``np.repeat`` para o dono
+  de cada amostra e um ``argsort`` estável para agrupar por nó — mesmas
+  partições, na mesma ordem, que o loop antigo;
+- o plano vai para ``PARTITION_CACHE_DIR`` (default ``data/cache/partitions``)
+  como dois ``.npy`` — ``indices`` (int32, nós concatenados) e ``offsets``
+  (num_nodes + 1) — e um ``.json`` com as estatísticas, chaveado por
+  (dataset, esquema, num_nodes, alpha, seed);
+- `node_indices(...)` lê ``offsets`` e só a fatia do nó de ``indices``
+  (``mmap_mode="r"``): O(partição própria);
+- `prepare_plan(...)` é chamado pelos drivers antes de subir os clientes.
+
+Esquemas (``PARTITION``): ``dirichlet``, ``contiguous`` ou ``auto`` (default:
+contíguo no MNIST, Dirichlet no CIFAR-10, como antes). O contíguo não precisa
+de arquivo.
+
+    python -m flower_fl.partition --dataset cifar10 --num-nodes 32 --alpha 0.1
+"""
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+SCHEMES = ("auto", "contiguous", "dirichlet")
+NUM_CLASSES = 10
+
+
+def partition_scheme(dataset: str, scheme: Optional[str] = None) -> str:
+    scheme = (scheme or os.getenv("PARTITION", "auto")).strip().lower()
+    if scheme not in SCHEMES:
+        raise ValueError(f"PARTITION inválido: {scheme!r} (use {', '.join(SCHEMES)})")
+    if scheme == "auto":
+        return "dirichlet" if dataset.lower() == "cifar10" else "contiguous"
+    return scheme
+
+
+def contiguous_range(node_id: int, num_nodes: int, total: int) -> Tuple[int, int]:
+    partition_size = total // num_nodes
+    start_idx = node_id * partition_size
+    end_idx = start_idx + partition_size
+    # Último node pega o resto
+    if node_id == num_nodes - 1:
+        end_idx = total
+    return start_idx, end_idx
+
+
+def dirichlet_plan(targets: np.ndarray, num_nodes: int, alpha: float, seed: int,
+                   num_classes: int = NUM_CLASSES) -> Tuple[np.ndarray, np.ndarray]:
+    """(indices, offsets): os índices do nó n são ``indices[offsets[n]:offsets[n + 1]]``.
+
+    Para cada classe c, proporções ``p_c ~ Dirichlet([alpha] * num_nodes)``
+    cortam as amostras (embaralhadas) de c entre os nós.
+    """
+    rng = np.random.RandomState(seed)
+    targets = np.asarray(targets)
+    order, owner = [], []
+    for c in range(num_classes):
+        idx_c = np.flatnonzero(targets == c)
+        rng.shuffle(idx_c)
+        proportions = rng.dirichlet([alpha] * num_nodes)
+        # Cumulativo → pontos de corte
+        cuts = (np.cumsum(proportions) * len(idx_c)).astype(int)[:-1]
+        counts = np.diff(np.concatenate(([0], cuts, [len(idx_c)])))
+        order.append(idx_c)
+        owner.append(np.repeat(np.arange(num_nodes, dtype=np.int32), counts))
+    order_all = np.concatenate(order)
+    owner_all = np.concatenate(owner)
+    # Estável: dentro de cada nó, classe a classe na ordem embaralhada.
+    by_node = np.argsort(owner_all, kind="stable")
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owner_all, minlength=num_nodes), out=offsets[1:])
+    return order_all[by_node].astype(np.int32), offsets
+
+
+def plan_stats(targets: np.ndarray, indices: np.ndarray, offsets: np.ndarray,
+               num_classes: int = NUM_CLASSES) -> Dict[str, Any]:
+    """Tamanho e histograma de classes por nó, e resumos."""
+    num_nodes = len(offsets) - 1
+    sizes = np.diff(offsets)
+    node_of = np.repeat(np.arange(num_nodes), sizes)
+    labels = np.asarray(targets)[indices]
+    hist = np.zeros((num_nodes, num_classes), dtype=np.int64)
+    np.add.at(hist, (node_of, labels), 1)
+    present = (hist > 0).sum(axis=1)
+    p = hist / np.maximum(sizes[:, None], 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+    return {
+        "num_nodes": int(num_nodes),
+        "samples": int(sizes.sum()),
+        "size_min": int(sizes.min()),
+        "size_max": int(sizes.max()),
+        "size_mean": float(sizes.mean()),
+        "size_std": float(sizes.std()),
+        "empty_nodes": int((sizes == 0).sum()),
+        "classes_per_node_mean": float(present.mean()),
+        "classes_per_node_min": int(present.min()),
+        "label_entropy_bits_mean": float(entropy.mean()),
+        "sizes": sizes.tolist(),
+        "class_counts": hist.tolist(),
+    }
+
+
+# ------------------------------------------------------------------ cache
+def plan_dir(path: Optional[str] = None) -> Path:
+    return Path(path or os.getenv("PARTITION_CACHE_DIR", "data/cache/partitions"))
+
+
+def _plan_paths(dataset: str, num_nodes: int, alpha: float, seed: int,
+                directory: Optional[str] = None) -> Tuple[Path, Path, Path]:
+    stem = plan_dir(directory) / f"{dataset.lower()}_dirichlet_n{num_nodes}_a{alpha:g}_s{seed}"
+    return (stem.with_name(stem.name + "_indices.npy"),
+            stem.with_name(stem.name + "_offsets.npy"),
+            stem.with_name(stem.name + ".json"))
+
+
+def train_targets(dataset: str) -> np.ndarray:
+    """Labels do treino: do cache uint8 (dataset_cache.py) se existir, senão do torchvision."""
+    from .dataset_cache import cache_paths, _torchvision_split
+
+    _, y_path = cache_paths(dataset.lower(), "train")
+    if y_path.exists():
+        return np.load(y_path)
+    return np.asarray(_torchvision_split(dataset.lower(), "train", "./data").targets)
+
+
+def _save(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def prepare_plan(dataset: str, num_nodes: int, alpha: float, seed: int,
+                 directory: Optional[str] = None, targets: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Garante o plano Dirichlet em cache (calcula sob lock se faltar) e devolve as estatísticas."""
+    idx_path, off_path, stats_path = _plan_paths(dataset, num_nodes, alpha, seed, directory)
+    if stats_path.exists():
+        return json.loads(stats_path.read_text())
+    plan_dir(directory).mkdir(parents=True, exist_ok=True)
+    with open(stats_path.with_suffix(".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if stats_path.exists():  # outro processo calculou enquanto esperávamos
+                return json.loads(stats_path.read_text())
+            targets = train_targets(dataset) if targets is None else np.asarray(targets)
+            indices, offsets = dirichlet_plan(targets, num_nodes, alpha, seed)
+            stats = {
+                "dataset": dataset.lower(), "scheme": "dirichlet",
+                "alpha": alpha, "seed": seed,
+                **plan_stats(targets, indices, offsets),
+            }
+            _save(idx_path, indices)
+            _save(off_path, offsets)
+            # O .json por último: a existência dele marca o plano como completo.
+            tmp = stats_path.with_name(f".{stats_path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(stats))
+            os.replace(tmp, stats_path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    print(f"[partition] plano {dataset} N={num_nodes} α={alpha:g} seed={seed}: "
+          f"tamanhos {stats['size_min']}-{stats['size_max']}, "
+          f"{stats['classes_per_node_mean']:.1f} classes/nó -> {stats_path}")
+    return stats
+
+
+def node_indices(dataset: str, node_id: int, num_nodes: int, alpha: float, seed: int,
+                 directory: Optional[str] = None, targets: Optional[np.ndarray] = None) -> np.ndarray:
+    """Índices (int64) do nó `node_id` no plano Dirichlet em cache.
+
+    `targets` só é usado se o plano ainda não existir (evita reler os labels).
+    """
+    idx_path, off_path, stats_path = _plan_paths(dataset, num_nodes, alpha, seed, directory)
+    if not stats_path.exists():
+        prepare_plan(dataset, num_nodes, alpha, seed, directory, targets)
+    offsets = np.load(off_path)
+    indices = np.load(idx_path, mmap_mode="r")
+    return np.array(indices[offsets[node_id]:offsets[node_id + 1]], dtype=np.int64)
+
+
+def prepare_for_clients(dataset: Optional[str], num_nodes: int, seed: int,
+                        alpha: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Drivers: plano calculado antes de subir os clientes (``None`` se o esquema for contíguo)."""
+    dataset = (dataset or os.getenv("DATASET", "mnist")).lower()
+    if partition_scheme(dataset) != "dirichlet":
+        return None
+    alpha = float(os.getenv("DIRICHLET_ALPHA", "0.5")) if alpha is None else alpha
+    return prepare_plan(dataset, num_nodes, alpha, seed)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Plano de partição Dirichlet em cache + estatísticas")
+    p.add_argument("--dataset", type=str, default=os.getenv("DATASET", "cifar10"))
+    p.add_argument("--num-nodes", type=int, required=True)
+    p.add_argument("--alpha", type=float, default=float(os.getenv("DIRICHLET_ALPHA", "0.5")))
+    p.add_argument("--seed", type=int, default=int(os.getenv("SEED", "42")))
+    p.add_argument("--per-node", action="store_true", help="Imprime tamanho e classes de cada nó.")
+    args = p.parse_args()
+    stats = prepare_plan(args.dataset, args.num_nodes, args.alpha, args.seed)
+    summary = {k: v for k, v in stats.items() if k not in ("sizes", "class_counts")}
+    print(json.dumps(summary, indent=2))
+    if args.per_node:
+        for n, (size, counts) in enumerate(zip(stats["sizes"], stats["class_counts"])):
+            print(f"  nó {n:>3}: {size:>6} amostras  {counts}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
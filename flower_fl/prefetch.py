@@ -0,0 +1,134 @@
+"""Prefetch de batches numa thread (sem fork) para o treino do cliente.
+
+Os DataLoaders rodam com ``num_workers=0`` de propósito (workers fazem fork,
+e o gRPC do Flower roda com GRPC_ENABLE_FORK_SUPPORT / poll), então montar o
+batch (indexação, normalização, `MNISTClient._apply_attack`) e treinar nele
+eram estritamente seriais. `BatchPrefetcher` roda o loader e a preparação de
+cada batch numa thread produtora, até ``depth`` batches à frente do batch em
+treino; as operações do torch soltam o GIL, então as duas coisas se
+sobrepõem.
+
+Uma só thread produtora consome o loader e chama `prepare` em ordem, então a
+sequência de sorteios do `random` (ataques) e dos batches é a mesma do
+caminho serial. O gerador GLOBAL do torch fica só com a thread do treino
+(Dropout): o ``iter()`` e o primeiro batch da época — onde o DataLoader e o
+`TensorBatchLoader` sorteiam a permutação — são tirados nela, e o ataque
+noise usa um ``torch.Generator`` próprio do cliente. ``depth=0`` é o caminho
+serial, com a mesma medição.
+
+Cada iteração mede o tempo que o treino ficou ESPERANDO o próximo batch
+(``wait_s``): com o prefetch cobrindo a preparação, ele tende a zero.
+
+    batches = BatchPrefetcher(trainloader, depth=prefetch_depth(), prepare=fn)
+    for images, labels in batches:
+        ...
+    batches.stats()  # {"data_wait_s": ..., "data_wait_ms_mean": ..., ...}
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+_END = object()
+
+
+def prefetch_depth() -> int:
+    """Profundidade da fila (``PREFETCH_BATCHES``, default 0 = serial), lida a cada fit."""
+    return max(0, int(os.getenv("PREFETCH_BATCHES", "0")))
+
+
+class _Failure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class BatchPrefetcher:
+    """Itera `loader` (uma época) com até `depth` batches preparados à frente."""
+
+    def __init__(self, loader, depth: Optional[int] = None,
+                 prepare: Optional[Callable[..., Any]] = None):
+        self.loader = loader
+        self.depth = prefetch_depth() if depth is None else max(0, int(depth))
+        self.prepare = prepare
+        self.wait_s: List[float] = []
+
+    def _prepared(self, batch):
+        return self.prepare(*batch) if self.prepare is not None else batch
+
+    def __iter__(self):
+        if self.depth == 0:
+            return self._serial()
+        return self._threaded()
+
+    def _serial(self):
+        it = iter(self.loader)
+        while True:
+            t0 = time.perf_counter()
+            try:
+                batch = self._prepared(next(it))
+            except StopIteration:
+                return
+            self.wait_s.append(time.perf_counter() - t0)
+            yield batch
+
+    def _threaded(self):
+        q: "queue.Queue[Any]" = queue.Queue(maxsize=self.depth)
+        stop = threading.Event()
+        # Na thread do treino: a permutação da época (RNG global do torch) é
+        # sorteada no iter() ou no 1º next() (RandomSampler do DataLoader).
+        it = iter(self.loader)
+        t0 = time.perf_counter()
+        first = next(it, _END)
+        first_wait = time.perf_counter() - t0
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce() -> None:
+            try:
+                if first is not _END:
+                    if not put(self._prepared(first)):
+                        return
+                    for batch in it:
+                        if not put(self._prepared(batch)):
+                            return
+                put(_END)
+            except BaseException as e:  # repassado ao consumidor
+                put(_Failure(e))
+
+        worker = threading.Thread(target=produce, name="batch-prefetch", daemon=True)
+        worker.start()
+        try:
+            while True:
+                t0 = time.perf_counter()
+                item = q.get()
+                if item is _END:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.exc
+                self.wait_s.append(time.perf_counter() - t0 + first_wait)
+                first_wait = 0.0
+                yield item
+        finally:
+            # Saída antecipada (break/exceção no treino): libera o produtor.
+            stop.set()
+            worker.join()
+
+    def stats(self) -> Dict[str, float]:
+        n = len(self.wait_s)
+        total = sum(self.wait_s)
+        return {
+            "prefetch_depth": self.depth,
+            "data_wait_s": total,
+            "data_wait_ms_mean": total / n * 1000.0 if n else 0.0,
+            "data_wait_ms_max": max(self.wait_s, default=0.0) * 1000.0,
+        }
@@ -0,0 +1,131 @@
+"""Coleta concorrente de receipts via JSON-RPC em lote (asyncio + aiohttp).
+
+`_sum_gas_from_receipts` (scripts/e2e_scaling_experiment.py) fazia um
+``eth_getTransactionReceipt`` síncrono por tx; com 32 clientes × rounds ×
+repetições isso vira milhares de round-trips sequenciais. Aqui os hashes são
+de-duplicados, agrupados em requisições batch (um POST com até
+``batch_size`` chamadas) e enviados com no máximo ``concurrency`` POSTs em
+voo. Falhas de transporte e receipts ``null`` (tx ainda pendente) são
+re-tentadas com backoff; se o nó não aceitar batch, cai para chamadas
+individuais (também concorrentes).
+
+    from flower_fl.receipts import sum_gas
+    gas_used, gas_eth, missing = sum_gas(rpc_url, tx_hashes)
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 3
+
+
+def _norm(tx_hash: Any) -> str:
+    text = tx_hash.hex() if hasattr(tx_hash, "hex") and not isinstance(tx_hash, str) else str(tx_hash)
+    text = text.lower()
+    return text if text.startswith("0x") else "0x" + text
+
+
+async def _post(session: aiohttp.ClientSession, url: str, payload: Any) -> Any:
+    async with session.post(url, json=payload) as resp:
+        resp.raise_for_status()
+        return await resp.json(content_type=None)
+
+
+async def _fetch_batch(
+    session: aiohttp.ClientSession,
+    url: str,
+    hashes: List[str],
+    sem: asyncio.Semaphore,
+    use_batch: bool,
+) -> Dict[str, Optional[dict]]:
+    calls = [
+        {"jsonrpc": "2.0", "id": i, "method": "eth_getTransactionReceipt", "params": [h]}
+        for i, h in enumerate(hashes)
+    ]
+    async with sem:
+        if use_batch:
+            body = await _post(session, url, calls)
+            if not isinstance(body, list):
+                raise TypeError("nó não aceitou requisição JSON-RPC em lote")
+        else:
+            body = await asyncio.gather(*(_post(session, url, c) for c in calls))
+    by_id = {item.get("id"): item.get("result") for item in body if isinstance(item, dict)}
+    return {h: by_id.get(i) for i, h in enumerate(hashes)}
+
+
+async def fetch_receipts_async(
+    url: str,
+    tx_hashes: Iterable[Any],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    timeout_s: float = 60.0,
+) -> Dict[str, Optional[dict]]:
+    """Receipts (dict JSON cru) por hash normalizado; ``None`` = não encontrado."""
+    pending = list(dict.fromkeys(_norm(h) for h in tx_hashes))
+    results: Dict[str, Optional[dict]] = {h: None for h in pending}
+    sem = asyncio.Semaphore(max(1, concurrency))
+    use_batch = batch_size > 1
+    timeout = aiohttp.ClientTimeout(total=timeout_s)
+    connector = aiohttp.TCPConnector(limit=max(1, concurrency))
+
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            size = batch_size if use_batch else 1
+            chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+            outcomes = await asyncio.gather(
+                *(_fetch_batch(session, url, c, sem, use_batch) for c in chunks),
+                return_exceptions=True,
+            )
+            retry: List[str] = []
+            for chunk, outcome in zip(chunks, outcomes):
+                if isinstance(outcome, TypeError) and use_batch:
+                    use_batch = False  # sem suporte a batch: refaz individualmente
+                    retry.extend(chunk)
+                    continue
+                if isinstance(outcome, BaseException):
+                    retry.extend(chunk)
+                    continue
+                for h, rcpt in outcome.items():
+                    if rcpt is None:
+                        retry.append(h)
+                    else:
+                        results[h] = rcpt
+            pending = retry
+            if pending and attempt < retries:
+                await asyncio.sleep(0.25 * (2 ** attempt))
+    return results
+
+
+def fetch_receipts(url: str, tx_hashes: Iterable[Any], **kwargs) -> Dict[str, Optional[dict]]:
+    """Versão síncrona de `fetch_receipts_async`."""
+    return asyncio.run(fetch_receipts_async(url, tx_hashes, **kwargs))
+
+
+def sum_gas(url: str, tx_hashes: Iterable[Any], **kwargs) -> Tuple[int, float, int]:
+    """(gas_used_total, gas_eth_total, missing), como `_sum_gas_from_receipts`.
+
+    Hashes repetidos contam uma vez só (mesma de-duplicação de
+    `_collect_tx_hashes`).
+    """
+    receipts = fetch_receipts(url, tx_hashes, **kwargs)
+    gas_used_total = 0
+    gas_eth_total = 0.0
+    missing = 0
+    for rcpt in receipts.values():
+        if rcpt is None:
+            missing += 1
+            continue
+        gas_used = int(rcpt["gasUsed"], 16)
+        eff = int(rcpt.get("effectiveGasPrice") or "0x0", 16)
+        gas_used_total += gas_used
+        gas_eth_total += (gas_used * eff) / 1e18
+    return gas_used_total, gas_eth_total, missing
@@ -10,10 +10,11 @@ from datetime import datetime
 from pathlib import Path
 
 import flwr as fl
-from flwr.common import parameters_to_ndarrays
+from flwr.common import EvaluateIns, FitIns, parameters_to_ndarrays
 
+from .checkpoint import AnchorPolicy, ModelAccumulator
 from .models import MNISTNet, get_model
-from .utils import ROUNDS, USE_IPFS, USE_ONCHAIN
+from .utils import ANCHOR_MODE, ROUNDS, USE_IPFS, USE_ONCHAIN
 
 # NOTE: `onchain_job` (web3) and `ipfs` (Pinata/requests) are imported lazily
 # inside the publish paths below. This lets the baseline / no_ipfs runs import
@@ -92,6 +93,7 @@ class MetricsCollector:
         blockchain_tx_time_s=None,
         publish_global_model_time_s=None,
         round_total_time_s=None,
+        update_batch=None,
     ):
         round_data = {
             "round": round_num,
@@ -131,6 +133,17 @@ class MetricsCollector:
         if aggregated_metrics is not None:
             round_data["aggregated_metrics"] = aggregated_metrics
 
+        # ANCHOR_MODE=batch: tx única com a raiz de Merkle dos updates do round
+        # (gás pago pelo servidor; no modo client esse gás fica nos clientes e
+        # também não entra em total_gas_eth).
+        if update_batch is not None:
+            round_data["update_batch_tx_hash"] = update_batch["tx_hash"]
+            round_data["update_batch_gas_eth"] = update_batch["gas_eth"]
+            round_data["update_batch_gas_used"] = update_batch["gas_used"]
+            round_data["update_batch_root"] = update_batch["root"]
+            round_data["update_batch_size"] = update_batch["size"]
+            round_data["update_batch_latency_s"] = update_batch["latency_s"]
+
         self.metrics["rounds"].append(round_data)
         self.metrics["total_gas_eth"] += gas_fee
 
@@ -219,6 +232,17 @@ class BlockchainFLStrategy(fl.server.strategy.FedAvg):
         self.latest_cid = None
         self.current_global_ndarrays = None
         self._matching_time_by_round = {}
+        # ANCHOR_MODE=batch: client_proxy.cid -> prova de inclusão a entregar no
+        # config do próximo fit daquele cliente (no último round, num evaluate).
+        self._pending_proofs = {}
+        # Refs já creditados em lotes anteriores: o contrato só vê a raiz e não
+        # barra folha repetida, então a deduplicação fica aqui.
+        self._batched_refs = set()
+        # ANCHOR_POLICY (checkpoint.py): quando ancorar o modelo global e o
+        # acumulador de Merkle que a âncora publica fora do modo `every`.
+        self.anchor_policy = AnchorPolicy.from_env(ROUNDS)
+        self.checkpoints = ModelAccumulator()
+        print(f"[Âncora] política={self.anchor_policy}")
         self._initialize_global_model()
         if NORM_DETECTOR_MODE not in {"upper", "both"}:
             print(f"[WARN] NORM_DETECTOR_MODE inválido: {NORM_DETECTOR_MODE!r}; usando 'both'")
@@ -270,23 +294,15 @@ class BlockchainFLStrategy(fl.server.strategy.FedAvg):
 
             # [3/3] Camada de ANCORAGEM (on-chain) — opcional (USE_ONCHAIN).
             if USE_ONCHAIN:
-                from .onchain_job import job_update_global
                 print("[3/3] Registrando on-chain...")
-                for idx, addr in enumerate(JOB_ADDRS, 1):
-                    _t0 = time.time()
-                    result = job_update_global(addr, content_ref)
-                    _lat = time.time() - _t0
+                sent = self._anchor_global_model(0, content_ref)
+                if not sent:
+                    self.metrics.log_round(0, 0.0, self.latest_cid, None, 0, 0, tx_latency_s=None)
+                for idx, (addr, (result, _lat)) in enumerate(zip(JOB_ADDRS, sent), 1):
                     print(f" ✓ Job {idx}: {addr[:10]}...")
                     print(f"   Tx: {result['hash']}")
                     print(f"   Gas: {result['gasETH']:.8f} ETH  Lat: {_lat:.3f}s")
 
-                    self.metrics.metrics["gas_breakdown"].append({
-                        "round": 0,
-                        "operation": "publish_global_model",
-                        "gas_eth": result["gasETH"],
-                        "tx_hash": result["hash"],
-                    })
-
                     self.metrics.log_round(
                         0,
                         result["gasETH"],
@@ -305,20 +321,185 @@ class BlockchainFLStrategy(fl.server.strategy.FedAvg):
             print(f"\n ERRO: {e}")
             sys.exit(1)
 
+    # -------------------------
+    # Ancoragem do modelo global (ANCHOR_POLICY)
+    # -------------------------
+    def _anchor_global_model(self, server_round, content_ref, accuracy=None):
+        """Acumula o modelo do round e, se a política mandar, ancora em todos os jobs.
+
+        Devolve ``[(result, latência), ...]`` por job — vazio se o round só
+        entrou no acumulador.
+        """
+        from .onchain_job import job_publish_checkpoint, job_update_global
+
+        policy = self.anchor_policy
+        if policy.accumulates:
+            self.checkpoints.add(server_round, content_ref)
+        if not policy.should_anchor(server_round, accuracy):
+            print(f"[Âncora] round {server_round} acumulado ({len(self.checkpoints.refs)} rounds, "
+                  f"política={policy.name})")
+            return []
+
+        root = self.checkpoints.root() if policy.accumulates else None
+        sent = []
+        for addr in JOB_ADDRS:
+            _t0 = time.time()
+            if root is None:
+                result = job_update_global(addr, content_ref)
+            else:
+                result = job_publish_checkpoint(addr, root, self.checkpoints.pending_refs())
+            sent.append((result, time.time() - _t0))
+            self.metrics.metrics["gas_breakdown"].append({
+                "round": server_round,
+                "operation": "publish_global_model" if root is None else "publish_checkpoint",
+                "gas_eth": result["gasETH"],
+                "tx_hash": result["hash"],
+            })
+        if root is not None:
+            record = self.checkpoints.mark_anchored(server_round, root, [r["hash"] for r, _ in sent])
+            self.metrics.metrics["checkpoints"] = self.checkpoints.to_dict()
+            print(f"[Âncora] checkpoint round {server_round}: raiz {record['root'][:18]}... "
+                  f"cobre {record['size']} rounds")
+        return sent
+
     # -------------------------
     # Injeta CID global nos clientes
     # -------------------------
     def configure_fit(self, server_round, parameters, client_manager):
         _match_t0 = time.time()
         instructions = super().configure_fit(server_round, parameters, client_manager)
-        for _, fit_ins in instructions:
+        for i, (client, fit_ins) in enumerate(instructions):
             if USE_IPFS and self.latest_cid is not None:
                 fit_ins.config.setdefault("cid_global", self.latest_cid)
             fit_ins.config.setdefault("epochs", 1)
             fit_ins.config.setdefault("server_round", server_round)
+            # O FedAvg compartilha um único FitIns entre os clientes; a prova é
+            # por cliente, então cada um recebe uma cópia do config.
+            proof = self._pending_proofs.pop(client.cid, None)
+            if proof is not None:
+                instructions[i] = (client, FitIns(fit_ins.parameters, {**fit_ins.config, **proof}))
         self._matching_time_by_round[server_round] = time.time() - _match_t0
         return instructions
 
+    # -------------------------
+    # Provas do último lote (ANCHOR_MODE=batch)
+    # -------------------------
+    def configure_evaluate(self, server_round, parameters, client_manager):
+        """No último round não há próximo fit para levar as provas do lote: elas
+        vão no config do evaluate (``proof_only`` para quem não avaliaria)."""
+        instructions = super().configure_evaluate(server_round, parameters, client_manager)
+        if server_round < ROUNDS or not self._pending_proofs:
+            return instructions
+        proofs, self._pending_proofs = self._pending_proofs, {}
+        for i, (client, evaluate_ins) in enumerate(instructions):
+            proof = proofs.pop(client.cid, None)
+            if proof is not None:
+                instructions[i] = (client, EvaluateIns(evaluate_ins.parameters, {**evaluate_ins.config, **proof}))
+        available = client_manager.all()
+        for cid, proof in proofs.items():
+            if cid in available:
+                instructions.append((available[cid], EvaluateIns(parameters, {**proof, "proof_only": True})))
+        return instructions
+
+    def aggregate_evaluate(self, server_round, results, failures):
+        checks = {
+            int(res.metrics.get("node_id", -1)): int(res.metrics["anchor_proof_ok"])
+            for _, res in results
+            if "anchor_proof_ok" in res.metrics
+        }
+        if checks:
+            self.metrics.metrics["final_update_proofs"] = {
+                "round": int(server_round),
+                "verified": sum(checks.values()),
+                "total": len(checks),
+                "by_node": {str(k): v for k, v in sorted(checks.items())},
+            }
+            print(f"[Lote] Provas do round {server_round} conferidas pelos clientes: "
+                  f"{sum(checks.values())}/{len(checks)}")
+        evaluated = [(client, res) for client, res in results if res.num_examples > 0]
+        if not evaluated:
+            return None, {}
+        return super().aggregate_evaluate(server_round, evaluated, failures)
+
+    # -------------------------
+    # Ancoragem em lote (ANCHOR_MODE=batch)
+    # -------------------------
+    def _anchor_update_batch(self, server_round, results, client_metrics):
+        """Ancora os refs dos clientes do round numa única raiz de Merkle.
+
+        As folhas seguem a ordem de `node_id` (determinística entre rounds). Refs
+        já creditados (em lotes anteriores ou repetidos no mesmo round) ficam de
+        fora da árvore: `recordClientUpdateBatch` não confere folhas. As provas
+        ficam nas métricas do round e são entregues a cada cliente no config do
+        próximo fit (no último round, no do evaluate). Retorna o resumo do lote
+        ou None.
+        """
+        from .merkle import encode_proof, merkle_proof
+        from .onchain_job import job_send_update_batch
+
+        entries = [
+            (client, entry)
+            for (client, _), entry in zip(results, client_metrics)
+            if entry.get("content_ref")
+        ]
+        if not entries:
+            print(f"[Lote] Round {server_round}: nenhum content_ref reportado — nada a ancorar")
+            return None
+        entries.sort(key=lambda ce: int(ce[1].get("node_id", ce[1]["client_index"])))
+        fresh, seen = [], set()
+        for client, entry in entries:
+            ref = str(entry["content_ref"])
+            if ref in self._batched_refs or ref in seen:
+                entry["anchor_skipped"] = "duplicate"
+                print(f"[Lote] Round {server_round}: ref repetido do nó {entry.get('node_id', '?')} "
+                      f"fora do lote ({ref[:18]}...)")
+                continue
+            seen.add(ref)
+            fresh.append((client, entry))
+        entries = fresh
+        if not entries:
+            print(f"[Lote] Round {server_round}: só refs já creditados — nada a ancorar")
+            return None
+        refs = [str(entry["content_ref"]) for _, entry in entries]
+
+        summary = None
+        for idx, addr in enumerate(JOB_ADDRS, 1):
+            _t0 = time.time()
+            result = job_send_update_batch(addr, refs)
+            _lat = time.time() - _t0
+            self.metrics.metrics["gas_breakdown"].append({
+                "round": server_round,
+                "operation": "record_client_update_batch",
+                "batch_size": len(refs),
+                "gas_eth": result["gasETH"],
+                "tx_hash": result["hash"],
+            })
+            print(f" ✓ Lote {len(refs)} updates -> job {addr[:10]}... root={result['merkleRoot'][:18]}... "
+                  f"gas={result['gasUsed']} lat={_lat:.3f}s")
+            if idx == 1:
+                summary = {
+                    "tx_hash": result["hash"],
+                    "gas_eth": result["gasETH"],
+                    "gas_used": int(result["gasUsed"]),
+                    "root": result["merkleRoot"],
+                    "size": len(refs),
+                    "latency_s": _lat,
+                    "layers": result["layers"],
+                }
+        self._batched_refs.update(refs)
+
+        for leaf_idx, (client, entry) in enumerate(entries):
+            proof = encode_proof(merkle_proof(summary["layers"], leaf_idx))
+            entry["merkle_root"] = summary["root"]
+            entry["merkle_proof"] = proof
+            self._pending_proofs[client.cid] = {
+                "update_proof_root": summary["root"],
+                "update_proof": proof,
+                "update_proof_round": server_round,
+            }
+        del summary["layers"]
+        return summary
+
     # -------------------------
     # Agregação + salvamento de métricas
     # -------------------------
@@ -447,6 +628,17 @@ class BlockchainFLStrategy(fl.server.strategy.FedAvg):
         round_stage_times["upload_ipfs_time_s"] = _max_client_metric("upload_ipfs_time_s")
         round_stage_times["blockchain_tx_time_s"] = _max_client_metric("blockchain_tx_time_s")
 
+        # Ancoragem em lote: uma tx do servidor substitui as N dos clientes, e
+        # sua latência passa a ser o tempo de blockchain do round.
+        update_batch = None
+        if USE_ONCHAIN and ANCHOR_MODE == "batch":
+            try:
+                update_batch = self._anchor_update_batch(server_round, results, client_metrics)
+            except Exception as e:
+                print(f"[Lote] ERRO ao ancorar lote do round {server_round}: {e}")
+            if update_batch is not None:
+                round_stage_times["blockchain_tx_time_s"] = float(update_batch["latency_s"])
+
         # 3. Agregar parâmetros (FedAvg pleno — não removemos clientes flagged).
         # aggregate_time_s mede SOMENTE a agregação FedAvg server-side (~0.01s),
         # não o treino dos clientes (ver Tarefa 1.2).
@@ -463,6 +655,13 @@ class BlockchainFLStrategy(fl.server.strategy.FedAvg):
 
         if aggregated_parameters is None:
             print(" Nenhum parâmetro agregado")
+            # O modelo global não muda: o acumulador repete o ref anterior no
+            # round, e o checkpoint da política (p.ex. o do último round) sai.
+            if USE_ONCHAIN and self.anchor_policy.accumulates and self.checkpoints.refs:
+                try:
+                    self._anchor_global_model(server_round, self.checkpoints.refs[-1])
+                except Exception as e:
+                    print(f"[Âncora] ERRO no round {server_round} sem agregado: {e}")
             return None, {}
 
         # 3. Salvar modelo, ancorar on-chain, salvar métricas
@@ -494,23 +693,12 @@ class BlockchainFLStrategy(fl.server.strategy.FedAvg):
             round_tx = None
             round_lat = None
             if USE_ONCHAIN:
-                from .onchain_job import job_update_global
                 print(f"[2/2] Registrando on-chain...")
-                for idx, addr in enumerate(JOB_ADDRS, 1):
-                    _t0 = time.time()
-                    result = job_update_global(addr, content_ref)
-                    _lat = time.time() - _t0
-
-                    self.metrics.metrics["gas_breakdown"].append({
-                        "round": server_round,
-                        "operation": "publish_global_model",
-                        "gas_eth": result["gasETH"],
-                        "tx_hash": result["hash"],
-                    })
-                    if idx == 1:  # gás do round = primeira ancoragem
-                        round_gas_eth = result["gasETH"]
-                        round_tx = result["hash"]
-                        round_lat = _lat
+                sent = self._anchor_global_model(server_round, content_ref, accuracy)
+                if sent:  # gás do round = primeira ancoragem (0 se só acumulou)
+                    result, round_lat = sent[0]
+                    round_gas_eth = result["gasETH"]
+                    round_tx = result["hash"]
 
             round_stage_times["publish_global_model_time_s"] = time.time() - _publish_t0
             round_stage_times["round_total_time_s"] = (
@@ -555,6 +743,7 @@ class BlockchainFLStrategy(fl.server.strategy.FedAvg):
                 blockchain_tx_time_s=round_stage_times["blockchain_tx_time_s"],
                 publish_global_model_time_s=round_stage_times["publish_global_model_time_s"],
                 round_total_time_s=round_stage_times["round_total_time_s"],
+                update_batch=update_batch,
             )
 
             _mode = ("full" if USE_IPFS and USE_ONCHAIN else
@@ -0,0 +1,266 @@
+"""Índice de matching de trainers em memória, sincronizado pelos eventos do DAO.
+
+`onchain_dao.match_trainers` paga um ``eth_call`` (e, no DAO, uma passagem
+pelos índices on-chain) por consulta. Para um serviço de matching do lado do
+requester, `TrainerIndex` mantém uma cópia local:
+
+- bootstrap: ``getTrainersRange`` (owners + contratos, em páginas) e o
+  ``getProfile()`` de cada Trainer via Multicall (ou lote JSON-RPC), tudo
+  fixado num mesmo bloco;
+- atualização: segue ``TrainerRegistered`` e ``TrainerTagsChanged`` a partir
+  desse bloco (`sync`); se o hash do último bloco sincronizado mudar (reorg,
+  ``evm_revert``, nó reiniciado), refaz o bootstrap;
+- consultas (`query`) respondidas por índices invertidos — tag-hash → owners,
+  bucket de rating → owners, spec (cpu/processor) → owners — intersectando do
+  menor para o maior conjunto; mesmo critério de ``DAO.matchTrainers`` e
+  resultados na ordem de registro (a da varredura ``matchTrainersScan``);
+- `staleness_blocks()` informa quantos blocos o índice está atrás do head.
+
+    idx = trainer_index_from_env()
+    idx.query(tags=["cuda"], min_rating=5, limit=5, max_staleness=2)
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from eth_utils import keccak
+from web3 import Web3
+
+from .chain import contract, get_web3
+from .events import EventRegistry
+from .multicall import Multicall, multicall_from_env
+
+# Mesmo bucketing de DAO.ratingBucket (largura 10, teto 10).
+RATING_BUCKET_WIDTH = 10
+MAX_RATING_BUCKET = 10
+
+TRAINER_EVENTS = ("TrainerRegistered", "TrainerTagsChanged")
+
+
+def rating_bucket(rating: int) -> int:
+    if rating <= 0:
+        return 0
+    return min(rating // RATING_BUCKET_WIDTH, MAX_RATING_BUCKET)
+
+
+def tag_hash(tag: str) -> bytes:
+    return keccak(text=tag)
+
+
+def _hex(value: Any) -> str:
+    text = value.hex() if hasattr(value, "hex") and not isinstance(value, str) else str(value)
+    return text if text.startswith("0x") else "0x" + text
+
+
+class TrainerIndex:
+    def __init__(
+        self,
+        w3: Web3,
+        dao_address: str,
+        dao_abi: list,
+        trainer_abi: list,
+        *,
+        multicall: Optional[Multicall] = None,
+        chunk_size: int = 2000,
+        confirmations: int = 0,
+    ):
+        self.w3 = w3
+        self.dao = contract(w3, dao_address, dao_abi)
+        self._trainer = w3.eth.contract(abi=trainer_abi)
+        self.mc = multicall or multicall_from_env(w3)
+        self.chunk_size = chunk_size
+        self.confirmations = confirmations
+        self._events = EventRegistry(dao_abi, names=TRAINER_EVENTS, address=self.dao.address)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.block = -1
+        self._block_hash: Optional[str] = None
+        self.order: Dict[str, int] = {}          # owner -> posição de registro
+        self.contracts: Dict[str, str] = {}      # owner -> contrato Trainer
+        self.ratings: Dict[str, int] = {}
+        self.tags: Dict[str, Set[bytes]] = {}    # owner -> tag hashes
+        self.by_tag: Dict[bytes, Set[str]] = {}
+        self.by_bucket: Dict[int, Set[str]] = {}
+        self.by_spec: Dict[str, Set[str]] = {}   # cpu/processor -> owners
+
+    # ------------------------------------------------------------ manutenção
+    def _add_trainer(self, owner: str, contract: str, profile) -> None:
+        rating, tags, spec = profile
+        processor, _ram, cpu = spec
+        owner = Web3.to_checksum_address(owner)
+        if owner in self.order:
+            return
+        self.order[owner] = len(self.order)
+        self.contracts[owner] = Web3.to_checksum_address(contract)
+        self.ratings[owner] = int(rating)
+        self.by_bucket.setdefault(rating_bucket(int(rating)), set()).add(owner)
+        for value in {cpu, processor}:
+            self.by_spec.setdefault(value, set()).add(owner)
+        self._set_tags(owner, [tag_hash(t) for t in tags])
+
+    def _set_tags(self, owner: str, hashes: Iterable[bytes]) -> None:
+        for h in self.tags.get(owner, ()):
+            members = self.by_tag.get(h)
+            if members is not None:
+                members.discard(owner)
+                if not members:
+                    del self.by_tag[h]
+        new = {bytes(h) for h in hashes}
+        self.tags[owner] = new
+        for h in new:
+            self.by_tag.setdefault(h, set()).add(owner)
+
+    def _profiles(self, contracts: Sequence[str], block: int) -> List[tuple]:
+        return self.mc.call(
+            [self._trainer(address=c).functions.getProfile() for c in contracts],
+            block=block,
+            allow_failure=False,
+        )
+
+    def bootstrap(self, block: Optional[int] = None, page_size: int = 1000) -> int:
+        """Carrega todos os trainers registrados no bloco `block` (default: head)."""
+        self._reset()
+        if block is None:
+            block = self.w3.eth.block_number - self.confirmations
+        owners: List[str] = []
+        contracts: List[str] = []
+        while True:
+            o, c, total = self.dao.functions.getTrainersRange(len(owners), page_size).call(block_identifier=block)
+            owners.extend(o)
+            contracts.extend(c)
+            if not o or len(owners) >= total:
+                break
+        for owner, contract, profile in zip(owners, contracts, self._profiles(contracts, block)):
+            self._add_trainer(owner, contract, profile)
+        self._mark(block)
+        return len(owners)
+
+    def _mark(self, block: int) -> None:
+        self.block = block
+        self._block_hash = _hex(self.w3.eth.get_block(block)["hash"])
+
+    def sync(self, to_block: Optional[int] = None) -> Dict[str, int]:
+        """Aplica os eventos de trainer até `to_block` (default: head - confirmations)."""
+        head = self.w3.eth.block_number - self.confirmations
+        target = head if to_block is None else min(to_block, head)
+        if self.block < 0 or _hex(self.w3.eth.get_block(self.block)["hash"]) != self._block_hash:
+            n = self.bootstrap(target)
+            return {"bootstrap": n, "to_block": target, "events": 0}
+
+        stats = {"from_block": self.block + 1, "to_block": target, "events": 0}
+        cursor = self.block
+        while cursor < target:
+            end = min(cursor + self.chunk_size, target)
+            logs = self.w3.eth.get_logs({
+                "fromBlock": cursor + 1,
+                "toBlock": end,
+                "address": self.dao.address,
+                "topics": [self._events.topics()],
+            })
+            events = self._events.decode_logs(logs)
+            registered = [ev.args["trainerContract"] for ev in events if ev.event == "TrainerRegistered"]
+            profiles = dict(zip(registered, self._profiles(registered, end))) if registered else {}
+            for ev in events:
+                owner = ev.args["owner"]
+                if ev.event == "TrainerRegistered":
+                    contract = ev.args["trainerContract"]
+                    self._add_trainer(owner, contract, profiles[contract])
+                elif owner in self.order:
+                    self._set_tags(owner, ev.args["tagHashes"])
+            stats["events"] += len(events)
+            cursor = end
+        self._mark(target)
+        return stats
+
+    def staleness_blocks(self) -> int:
+        """Quantos blocos o índice está atrás do head do nó."""
+        return max(0, self.w3.eth.block_number - self.block)
+
+    # -------------------------------------------------------------- consulta
+    def query(
+        self,
+        tags: Sequence[str] = (),
+        min_rating: int = 0,
+        description: str = "",
+        limit: Optional[int] = None,
+        *,
+        max_staleness: Optional[int] = None,
+    ) -> List[str]:
+        """Owners que satisfazem os requisitos, na ordem de registro.
+
+        Com `max_staleness`, sincroniza antes se o índice estiver mais de
+        `max_staleness` blocos atrás do head.
+        """
+        if max_staleness is not None and self.staleness_blocks() > max_staleness:
+            self.sync()
+
+        sets: List[Set[str]] = []
+        for tag in tags:
+            members = self.by_tag.get(tag_hash(tag))
+            if not members:
+                return []
+            sets.append(members)
+        if description:
+            members = self.by_spec.get(description)
+            if not members:
+                return []
+            sets.append(members)
+        if min_rating > 0:
+            first = rating_bucket(min_rating)
+            buckets: Set[str] = set()
+            for b in range(first, MAX_RATING_BUCKET + 1):
+                buckets |= self.by_bucket.get(b, set())
+            sets.append(buckets)
+
+        if sets:
+            sets.sort(key=len)
+            result = set(sets[0])
+            for other in sets[1:]:
+                result &= other
+                if not result:
+                    return []
+            if min_rating > 0:
+                result = {o for o in result if self.ratings[o] >= min_rating}
+            ordered = sorted(result, key=self.order.__getitem__)
+        else:
+            ordered = list(self.order)
+        return ordered[:limit] if limit is not None else ordered
+
+    def query_requirements(self, requirements: Sequence[Any], **kwargs) -> List[str]:
+        """Mesma tupla ``JobRequirements`` de `onchain_dao.match_trainers`."""
+        description, _value, min_rating, tags, limit = requirements
+        return self.query(tags, int(min_rating), description, int(limit), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+
+def _load_abi(path: str) -> list:
+    data = json.loads(Path(path).read_text())
+    return data["abi"] if isinstance(data, dict) and "abi" in data else data
+
+
+def trainer_index_from_env(**kwargs) -> TrainerIndex:
+    """Monta um `TrainerIndex` a partir do .env (RPC_URL, DAO_ABI_PATH, TRAINER_ABI_PATH, DAO_ADDRESS)."""
+    from dotenv import load_dotenv
+    from .deployments import resolve_address
+
+    load_dotenv()
+    rpc_url = os.getenv("RPC_URL")
+    dao_abi_path = os.getenv("DAO_ABI_PATH")
+    trainer_abi_path = os.getenv("TRAINER_ABI_PATH", "artifacts/contracts/Trainer.sol/Trainer.json")
+    assert rpc_url and dao_abi_path, "Defina RPC_URL e DAO_ABI_PATH no .env"
+
+    w3 = get_web3(rpc_url)
+    dao_address = resolve_address(
+        os.getenv("DAO_ADDRESS"),
+        w3,
+        name="dao",
+        deployments_dir=os.getenv("DEPLOYMENTS_DIR", "deployments"),
+        ignition_dir=os.getenv("IGNITION_DIR", "ignition/deployments"),
+    )
+    return TrainerIndex(w3, dao_address, _load_abi(dao_abi_path), _load_abi(trainer_abi_path), **kwargs)
@@ -28,6 +28,19 @@ _SKIP_IPFS = _flag("SKIP_IPFS", False)
 USE_IPFS = _flag("USE_IPFS", default=not _SKIP_IPFS)
 USE_ONCHAIN = _flag("USE_ONCHAIN", default=True)
 
+# Modo de ancoragem dos updates de clientes (só vale com USE_ONCHAIN=true):
+#   client -> cada cliente envia seu próprio recordClientUpdate (N tx/round);
+#   batch  -> o cliente só reporta o content ref nas métricas do fit e o
+#             servidor ancora UMA raiz de Merkle por round
+#             (recordClientUpdateBatch), devolvendo a prova de inclusão a cada
+#             cliente no config do round seguinte.
+ANCHOR_MODE = os.getenv("ANCHOR_MODE", "client").strip().lower()
+if ANCHOR_MODE not in ("client", "batch"):
+    raise ValueError(f"ANCHOR_MODE inválido: {ANCHOR_MODE!r} (use 'client' ou 'batch')")
+# ANCHOR_MODE=client: o fit só envia a tx e devolve os pesos; os receipts são
+# confirmados em segundo plano e reportados no round seguinte (anchor_async.py).
+ANCHOR_ASYNC = _flag("ANCHOR_ASYNC", False)
+
 
 def set_seed(seed: int) -> None:
     """Fixa as sementes de random/numpy/torch para reprodutibilidade por-rep."""
@@ -13,6 +13,10 @@ três modos:
 Saída: ``{output_dir}/summary.json`` com mean/std por número de clientes,
 além das métricas brutas copiadas para ``{output_dir}/n{N}_rep{R}/``.
 
+Com ``--chain-snapshot`` (nó Hardhat/Anvil local) o job e as contas de
+cliente são preparados uma vez e a chain volta ao mesmo snapshot antes de
+cada run full (``flower_fl/chain_state.py``).
+
 Exemplo:
     python multi_run.py --clients-list 3,5 --rounds 3 --repetitions 3 --mode both
 """
@@ -122,6 +126,9 @@ def run_full(num_clients: int, rounds: int, seed: int, metrics_file: Path,
     for _v in ("OMP_NUM_THREADS", "MKL_NUM_THREADS",
                "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
         base_env.setdefault(_v, "1")
+    # Plano de partição (Dirichlet) calculado aqui, uma vez, e não por cliente.
+    from flower_fl.partition import prepare_for_clients as prepare_partition
+    prepare_partition(None, num_clients, seed)
 
     server_log = log_dir / "server.log"
     server = _spawn(
@@ -131,11 +138,17 @@ def run_full(num_clients: int, rounds: int, seed: int, metrics_file: Path,
     )
     _wait_for_server(server, server_log, timeout=60.0)
 
+    # Uma conta por NODE_ID (flower_fl/keypool.py): ancoragens concorrentes
+    # sem colisão de nonce.
+    from flower_fl.keypool import prepare_client_keys
+    client_keys = prepare_client_keys(num_clients, base_env)
+
     clients: List[subprocess.Popen] = []
     try:
         for i in range(num_clients):
             env = base_env.copy()
             env["NODE_ID"] = str(i)
+            env.update(client_keys.get(i, {}))
             clients.append(_spawn(
                 [PYTHON, "-m", "flower_fl.client"],
                 env=env,
@@ -169,6 +182,8 @@ def run_baseline(num_clients: int, rounds: int, seed: int, metrics_file: Path,
     for _v in ("OMP_NUM_THREADS", "MKL_NUM_THREADS",
                "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
         base_env.setdefault(_v, "1")
+    from flower_fl.partition import prepare_for_clients as prepare_partition
+    prepare_partition(None, num_clients, seed)
 
     server_log = log_dir / "baseline_server.log"
     server = _spawn(
@@ -317,7 +332,15 @@ def main() -> int:
                         help="Repetições por configuração (mínimo 3 recomendado).")
     parser.add_argument("--mode", choices=["full", "baseline", "both"], default="both")
     parser.add_argument("--output-dir", type=str, default="results/multi_run")
+    parser.add_argument("--chain-snapshot", action="store_true",
+                        help="Nó local: cria/financia o job uma vez, tira um evm_snapshot e "
+                             "reverte antes de cada run full (flower_fl/chain_state.py).")
+    parser.add_argument("--sim-chain", action="store_true",
+                        help="CHAIN_SIM=true: gas/latência das txs do modelo calibrado "
+                             "(flower_fl/gas_model.py), sem minerar.")
     args = parser.parse_args()
+    if args.sim_chain:
+        os.environ["CHAIN_SIM"] = "true"  # run_full copia os.environ
 
     if args.repetitions < 1:
         parser.error("--repetitions deve ser >= 1")
@@ -357,6 +380,14 @@ def main() -> int:
         torch = None
         np = None
 
+    from flower_fl.dataset_cache import prepare_for_clients
+    prepare_for_clients()
+
+    chain_state = None
+    if args.chain_snapshot and "full" in modes_to_run and not args.sim_chain:
+        from flower_fl.chain_state import prepare_chain_state
+        chain_state = prepare_chain_state(max(clients_list), args.rounds)
+
     for n_clients in clients_list:
         for rep in range(1, args.repetitions + 1):
             seed = rep
@@ -373,6 +404,8 @@ def main() -> int:
                 _print_header(f" >> N={n_clients} rep={rep} mode={mode} seed={seed}")
                 if mode == "full":
                     target = sub / "server_metrics.json"
+                    if chain_state is not None:
+                        print(f"   evm_revert: {chain_state.revert():.1f}ms")
                     ok = run_full(n_clients, args.rounds, seed, target, log_sub)
                 else:
                     target = sub / "baseline_metrics.json"
@@ -396,6 +429,8 @@ def main() -> int:
             "rounds": args.rounds,
             "repetitions": args.repetitions,
             "modes": modes_to_run,
+            "chain_snapshot": chain_state.stats() if chain_state is not None else None,
+            "chain": "sim" if args.sim_chain else "real",
             "started": started,
             "finished": datetime.now().isoformat(),
         },
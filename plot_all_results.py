@@ -677,53 +677,57 @@ def plot_marketplace_gas(breakdown_path):
 
 
 def plot_matching_scalability(path):
-    """Escalabilidade do matchTrainers: gas e latencia vs numero de trainers.
+    """Escalabilidade do matching: gas e latencia vs numero de trainers.
 
     Le results/matching_load_test.json (gerado por scripts/load_test_matching.ts)
-    e contrasta dois regimes do loop de matching:
-      - best case (filtro vazio): early-exit apos `canditatesToReturn` matches,
-        gas/latencia ~constantes (nao dependem de N).
-      - worst case (filtro que nao casa): varredura completa -> O(n) real, o gas
-        cresce linearmente com o numero de trainers registrados.
+    e contrasta, para cada consulta, a varredura linear legada
+    (`matchTrainersScan`) com o caminho indexado (`matchTrainers`):
+      - no_filter: early-exit apos `canditatesToReturn` matches nos dois caminhos.
+      - rare_tag / min_rating_unmet: a varredura percorre todos os trainers
+        (O(n)); o indexado so a lista da tag rara / buckets de rating.
+    Linhas com erro (gas cap estourado) ficam de fora da curva.
     """
     data = load(path)
     if data is None:
         return
-    meas = sorted(data.get("measurements", []), key=lambda m: m["n_trainers"])
-    if not meas:
-        print("[skip] matching: sem measurements")
+    meas = [m for m in data.get("measurements", []) if m.get("time_ms") is not None]
+    if not meas or "path" not in meas[0]:
+        print("[skip] matching: sem measurements no formato scan/indexed")
         return
-    n = [m["n_trainers"] for m in meas]
-    gas_best = [int(m["gas_estimated_bestcase"]) for m in meas]
-    gas_worst = [int(m["gas_estimated_worstcase"]) for m in meas]
-    t_best = [float(m["time_ms_bestcase"]) for m in meas]
-    t_worst = [float(m["time_ms_worstcase"]) for m in meas]
 
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5.5))
+    queries = [q for q in ("no_filter", "rare_tag", "min_rating_unmet") if any(m["query"] == q for m in meas)]
+    colors = {"no_filter": "#2a9d8f", "rare_tag": "#e9c46a", "min_rating_unmet": "#e76f51"}
+    styles = {"scan": ("--", "^"), "indexed": ("-", "o")}
 
-    ax1.plot(n, gas_best, marker="o", color="#2a9d8f", label="best case (early-exit)")
-    ax1.plot(n, gas_worst, marker="^", color="#e76f51", label="worst case (full scan, O(n))")
-    ax1.set_title("matchTrainers gas vs number of trainers")
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5.5))
+    for q in queries:
+        for p in ("scan", "indexed"):
+            rows = sorted((m for m in meas if m["query"] == q and m["path"] == p), key=lambda m: m["n_trainers"])
+            if not rows:
+                continue
+            ls, mk = styles[p]
+            label = f"{q} ({p})"
+            with_gas = [m for m in rows if m.get("gas_estimated")]
+            ax1.plot([m["n_trainers"] for m in with_gas], [int(m["gas_estimated"]) for m in with_gas],
+                     linestyle=ls, marker=mk, color=colors[q], label=label)
+            ax2.plot([m["n_trainers"] for m in rows], [float(m["time_ms"]) for m in rows],
+                     linestyle=ls, marker=mk, color=colors[q], label=label)
+
+    ax1.set_title("Matching gas vs number of trainers")
     ax1.set_xlabel("Number of registered trainers")
     ax1.set_ylabel("Gas estimated")
-    ax1.set_xticks(n)
-    ax1.legend()
-    for xi, v in zip(n, gas_best):
-        ax1.annotate(f"{v:,}", (xi, v), textcoords="offset points", xytext=(0, -14), ha="center", fontsize=8)
-    for xi, v in zip(n, gas_worst):
-        ax1.annotate(f"{v:,}", (xi, v), textcoords="offset points", xytext=(0, 8), ha="center", fontsize=8)
-
-    ax2.plot(n, t_best, marker="o", color="#2a9d8f", label="best case (early-exit)")
-    ax2.plot(n, t_worst, marker="^", color="#e76f51", label="worst case (full scan)")
-    ax2.axhline(15, color="#264653", linestyle="--", linewidth=1.3, label="15 ms threshold")
-    ax2.set_title("matchTrainers latency vs number of trainers")
+    ax1.set_xscale("log")
+    ax1.set_yscale("log")
+    ax1.legend(fontsize=8)
+
+    ax2.axhline(15, color="#264653", linestyle=":", linewidth=1.3, label="15 ms threshold")
+    ax2.set_title("Matching latency vs number of trainers")
     ax2.set_xlabel("Number of registered trainers")
     ax2.set_ylabel("Latency (ms)")
-    ax2.set_xticks(n)
-    ax2.set_ylim(0, max(max(t_worst), 15) * 1.2)
-    ax2.legend()
+    ax2.set_xscale("log")
+    ax2.legend(fontsize=8)
 
-    fig.suptitle("Marketplace Matching Scalability (best-case O(1) vs worst-case O(n))", fontsize=15)
+    fig.suptitle("Marketplace Matching Scalability (linear scan vs indexed)", fontsize=15)
     fig.tight_layout()
     out = OUT / "matching_scalability.png"
     fig.savefig(out, bbox_inches="tight")
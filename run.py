@@ -255,6 +255,10 @@ class ExperimentRunner:
     def start_clients(self):
         print_header(f"FASE 4: INICIANDO {self.num_clients} CLIENTES FLOWER")
 
+        # Uma conta por NODE_ID para ancorar sem colisão de nonce (keypool).
+        from flower_fl.keypool import prepare_client_keys
+        client_keys = prepare_client_keys(self.num_clients)
+
         for i in range(self.num_clients):
             log_file = self.logs_dir / f"client_{i}_{self.timestamp}.log"
             log_handle = open(log_file, "w")
@@ -264,6 +268,7 @@ class ExperimentRunner:
             env = os.environ.copy()
             env["NODE_ID"] = str(i)
             env["NUM_NODES"] = str(self.num_clients)
+            env.update(client_keys.get(i, {}))
 
             client_process = subprocess.Popen(
                 [self.python_cmd, "-m", "flower_fl.client"],
@@ -142,6 +142,9 @@ def run_one(aggregator: str, num_clients: int, rounds: int, mu: float,
         base_env.setdefault(_v, "1")
 
     _wait_port_free(BASELINE_PORT)
+    # Plano de partição (Dirichlet) calculado aqui, uma vez, e não por cliente.
+    from flower_fl.partition import prepare_for_clients as prepare_partition
+    prepare_partition(dataset, num_clients, seed, alpha)
 
     server_log = log_dir / "server.log"
     server = _spawn([PYTHON, "-m", "flower_fl.baseline_runner"],
@@ -334,6 +337,9 @@ def main() -> int:
     aggregators = [a.strip().lower() for a in args.aggregators.split(",") if a.strip()]
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
+    from flower_fl.dataset_cache import prepare_for_clients
+    prepare_for_clients(args.dataset)
+
     started = datetime.now().isoformat()
     _print_header(f" SCALING  aggregators={aggregators}  N={clients_list}  "
                   f"rounds={args.rounds}  reps={args.repetitions}  mu={args.mu}")
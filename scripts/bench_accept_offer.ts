@@ -0,0 +1,145 @@
+/**
+ * scripts/bench_accept_offer.ts — Gas de `DAO.AcceptOffer` vs. backlog de
+ * ofertas pendentes do trainer.
+ *
+ * Para cada tamanho de backlog (BENCH_BACKLOGS, default 1,100,1000), faz
+ * deploy de um DAO novo, cria `n` ofertas pendentes para o mesmo trainer e
+ * aceita (a) a oferta mais recente — pior caso da antiga busca linear em
+ * `Trainer.deleteOffer`, que percorria `pendingOffersIDs` até achá-la — e
+ * (b) a mais antiga. Com o mapa id -> posição + swap-and-pop o gas deve ficar
+ * constante em n. Mede também o gas estimado de uma página de
+ * `getPendingOffersPage(0, 100)` vs. o `getPendingOffers()` completo.
+ *
+ * Uso:
+ *   npx hardhat run scripts/bench_accept_offer.ts --network localhost
+ *   BENCH_BACKLOGS=1,100,1000 npx hardhat run scripts/bench_accept_offer.ts
+ *
+ * Resultados salvos em `results/accept_offer_gas.json`. Para o número "antes",
+ * rode o mesmo script num checkout anterior a esta mudança (sem
+ * `getPendingOffersPage`, a medição da página fica `null`).
+ *
+ * Observações:
+ *   - Usa uma única carteira como requester E trainer (como
+ *     scripts/bench_pointer_calldata.ts).
+ */
+/// <reference types="hardhat/types" />
+import { mkdirSync, writeFileSync } from "node:fs";
+import { resolve } from "node:path";
+import { network } from "hardhat";
+import { keccak256, stringToBytes, type Hex } from "viem";
+
+const BACKLOGS = (process.env.BENCH_BACKLOGS ?? "1,100,1000")
+  .split(",")
+  .map((x) => parseInt(x.trim(), 10))
+  .filter((x) => Number.isFinite(x) && x > 0);
+
+type Measurement = {
+  pending_offers: number;
+  accepted: "newest" | "oldest";
+  gas_used: string;
+  page_gas_estimated: string | null;
+  full_list_gas_estimated: string | null;
+};
+
+async function main(): Promise<void> {
+  const connection = await network.connect();
+  const { viem } = connection;
+  const publicClient = await viem.getPublicClient();
+  const [wallet] = await viem.getWalletClients();
+  if (!wallet) {
+    throw new Error("Nenhuma carteira disponível na rede. Verifique a configuração.");
+  }
+  const me = wallet.account.address;
+  const wait = (hash: Hex) => publicClient.waitForTransactionReceipt({ hash });
+
+  const measurements: Measurement[] = [];
+  for (const n of BACKLOGS) {
+    const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+    await wait(await dao.write.registerTrainer(["Bench trainer", ["CPU", "16GB", "8 cores"]]));
+    await wait(await dao.write.registerRequester());
+
+    // n + 1 ofertas: a primeira aceitação deixa exatamente n pendentes para a segunda.
+    let last: Hex | undefined;
+    for (let i = 0; i <= n; i++) {
+      last = await dao.write.MakeOffer([
+        `Bench offer ${i}`,
+        keccak256(stringToBytes(`model-${i}`)),
+        keccak256(stringToBytes("endpoint")),
+        "0x",
+        1n,
+        3n,
+        me,
+      ]);
+      if ((i + 1) % 100 === 0) console.log(`  ... ${i + 1} ofertas`);
+    }
+    if (last) await wait(last);
+    const ids = await dao.read.getPendingOffers({ account: wallet.account });
+
+    let pageGas: string | null = null;
+    let fullGas: string | null = null;
+    try {
+      pageGas = (
+        await publicClient.estimateContractGas({
+          account: me,
+          address: dao.address,
+          abi: dao.abi,
+          functionName: "getPendingOffersPage",
+          args: [0n, 100n],
+        })
+      ).toString();
+    } catch {
+      pageGas = null;
+    }
+    try {
+      fullGas = (
+        await publicClient.estimateContractGas({
+          account: me,
+          address: dao.address,
+          abi: dao.abi,
+          functionName: "getPendingOffers",
+        })
+      ).toString();
+    } catch {
+      fullGas = null;
+    }
+
+    const newest = await wait(await dao.write.AcceptOffer([ids[ids.length - 1]]));
+    measurements.push({
+      pending_offers: n + 1,
+      accepted: "newest",
+      gas_used: newest.gasUsed.toString(),
+      page_gas_estimated: pageGas,
+      full_list_gas_estimated: fullGas,
+    });
+    const oldest = await wait(await dao.write.AcceptOffer([ids[0]]));
+    measurements.push({
+      pending_offers: n,
+      accepted: "oldest",
+      gas_used: oldest.gasUsed.toString(),
+      page_gas_estimated: pageGas,
+      full_list_gas_estimated: fullGas,
+    });
+    console.log(
+      `backlog=${n + 1}  AcceptOffer(newest)=${newest.gasUsed}  AcceptOffer(oldest)=${oldest.gasUsed}  ` +
+        `page(100)=${pageGas}  full=${fullGas}`,
+    );
+  }
+
+  const outDir = resolve("results");
+  mkdirSync(outDir, { recursive: true });
+  const outPath = resolve(outDir, "accept_offer_gas.json");
+  writeFileSync(
+    outPath,
+    JSON.stringify(
+      { network: connection.networkName, backlogs: BACKLOGS, measurements, timestamp: new Date().toISOString() },
+      null,
+      2,
+    ),
+  );
+  console.log(`\nResultados salvos em ${outPath}`);
+}
+
+main().catch((err) => {
+  console.error(err);
+  process.exitCode = 1;
+});
@@ -0,0 +1,283 @@
+/**
+ * scripts/bench_batch_anchoring.ts — Ancoragem por cliente vs. em lote (Merkle).
+ *
+ * Faz deploy de um DAO novo, cria um JobContract com muitos updates e, para
+ * cada N em {1, 2, 4, 8, 16, 32}, mede:
+ *   - per_client: N transações `recordClientUpdate` (uma por cliente, como o
+ *     `MNISTClient.fit` faz hoje), somando gas e wall clock;
+ *   - batch:      UMA `recordClientUpdateBatch` com a raiz de Merkle dos N
+ *     refs (o que o servidor faz com ANCHOR_MODE=batch).
+ * Também confere uma prova de inclusão on-chain via `verifyBatchedUpdate`.
+ *
+ * Uso:
+ *   npx hardhat run scripts/bench_batch_anchoring.ts --network localhost
+ *   BENCH_N_LIST=1,4,32 npx hardhat run scripts/bench_batch_anchoring.ts --network localhost
+ *
+ * Resultados salvos em `results/batch_anchoring_benchmark.json`.
+ *
+ * Observações:
+ *   - A árvore segue flower_fl/merkle.py: folha = keccak(keccak(ref)), pares
+ *     ordenados, nó ímpar sobe sem par.
+ *   - Os refs são `sha256:<hex>` sintéticos (mesmo tamanho do modo no_ipfs);
+ *     no lote o ponteiro é a lista de refs, uma por linha.
+ */
+/// <reference types="hardhat/types" />
+import { mkdirSync, readFileSync, writeFileSync } from "node:fs";
+import { resolve } from "node:path";
+import { network } from "hardhat";
+import {
+  concat,
+  createWalletClient,
+  decodeEventLog,
+  http,
+  keccak256,
+  parseEther,
+  stringToBytes,
+  stringToHex,
+  type Hex,
+} from "viem";
+import { generatePrivateKey, privateKeyToAccount } from "viem/accounts";
+import { hardhat as hardhatChain } from "viem/chains";
+
+const RPC_URL = process.env.LOCAL_RPC_URL ?? "http://127.0.0.1:8545";
+const N_LIST = (process.env.BENCH_N_LIST ?? "1,2,4,8,16,32")
+  .split(",")
+  .map((x) => parseInt(x.trim(), 10))
+  .filter((x) => Number.isFinite(x) && x > 0);
+
+type Measurement = {
+  n_clients: number;
+  per_client_gas_total: string;
+  per_client_txs: number;
+  per_client_wall_ms: number;
+  batch_gas_total: string;
+  batch_txs: number;
+  batch_wall_ms: number;
+  batch_calldata_bytes: number;
+  gas_ratio_batch_over_per_client: number;
+  proof_verified_onchain: boolean;
+};
+
+function leafOf(ref: string): Hex {
+  return keccak256(keccak256(stringToBytes(ref)));
+}
+
+function hashPair(a: Hex, b: Hex): Hex {
+  return a.toLowerCase() < b.toLowerCase() ? keccak256(concat([a, b])) : keccak256(concat([b, a]));
+}
+
+function buildLayers(leaves: Hex[]): Hex[][] {
+  const layers: Hex[][] = [leaves];
+  while (layers[layers.length - 1].length > 1) {
+    const level = layers[layers.length - 1];
+    const next: Hex[] = [];
+    for (let i = 0; i + 1 < level.length; i += 2) {
+      next.push(hashPair(level[i], level[i + 1]));
+    }
+    if (level.length % 2 === 1) {
+      next.push(level[level.length - 1]);
+    }
+    layers.push(next);
+  }
+  return layers;
+}
+
+function proofFor(layers: Hex[][], index: number): Hex[] {
+  const proof: Hex[] = [];
+  for (const level of layers.slice(0, -1)) {
+    const sibling = index ^ 1;
+    if (sibling < level.length) proof.push(level[sibling]);
+    index = Math.floor(index / 2);
+  }
+  return proof;
+}
+
+function syntheticRef(tag: string): string {
+  return "sha256:" + keccak256(stringToBytes(tag)).slice(2);
+}
+
+async function main(): Promise<void> {
+  if (N_LIST.length === 0) {
+    throw new Error(`BENCH_N_LIST inválido: '${process.env.BENCH_N_LIST}'`);
+  }
+
+  const connection = await network.connect();
+  const { viem } = connection;
+  const publicClient = await viem.getPublicClient();
+  const [requester] = await viem.getWalletClients();
+  if (!requester) {
+    throw new Error("Nenhuma carteira disponível na rede. Verifique a configuração.");
+  }
+
+  const daoAbi = JSON.parse(readFileSync(resolve("artifacts/contracts/DAO.sol/DAO.json"), "utf-8")).abi;
+  const jobAbi = JSON.parse(
+    readFileSync(resolve("artifacts/contracts/JobContract.sol/JobContract.json"), "utf-8"),
+  ).abi;
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+  const daoAddress = dao.address as `0x${string}`;
+  console.log(`DAO deployed at ${daoAddress}`);
+
+  // Trainer = conta nova financiada pelo requester (mesmo esquema do
+  // load_test_matching.ts: a rede localhost só expõe PRIVATE_KEY).
+  const trainerAcc = privateKeyToAccount(generatePrivateKey());
+  const fundHash = await requester.sendTransaction({ to: trainerAcc.address, value: parseEther("1") });
+  await publicClient.waitForTransactionReceipt({ hash: fundHash });
+  const trainer = createWalletClient({ account: trainerAcc, chain: hardhatChain, transport: http(RPC_URL) });
+
+  const wait = (hash: Hex) => publicClient.waitForTransactionReceipt({ hash });
+
+  await wait(
+    await trainer.writeContract({
+      address: daoAddress,
+      abi: daoAbi,
+      functionName: "registerTrainer",
+      args: ["Bench trainer", { processor: "CPU", ram: "16GB", cpu: "8 cores" }],
+    }),
+  );
+  await wait(
+    await requester.writeContract({ address: daoAddress, abi: daoAbi, functionName: "registerRequester", args: [] }),
+  );
+
+  const totalUpdates = BigInt(2 * N_LIST.reduce((a, b) => a + b, 0));
+  const valueByUpdate = 1n;
+  await wait(
+    await requester.writeContract({
+      address: daoAddress,
+      abi: daoAbi,
+      functionName: "MakeOffer",
+      args: [
+        "Bench batch anchoring",
+        keccak256(stringToBytes("model")),
+        keccak256(stringToBytes("endpoint")),
+        "0x",
+        valueByUpdate,
+        totalUpdates,
+        trainerAcc.address,
+      ],
+    }),
+  );
+
+  const pending = (await publicClient.readContract({
+    address: daoAddress,
+    abi: daoAbi,
+    functionName: "getPendingOffers",
+    account: trainerAcc.address,
+  })) as readonly bigint[];
+  const acceptRcpt = await wait(
+    await trainer.writeContract({
+      address: daoAddress,
+      abi: daoAbi,
+      functionName: "AcceptOffer",
+      args: [pending[pending.length - 1]],
+    }),
+  );
+  const created = decodeEventLog({ abi: daoAbi, data: acceptRcpt.logs[0].data, topics: acceptRcpt.logs[0].topics });
+  const jobAddress = (created.args as { job: `0x${string}` }).job;
+  console.log(`JobContract em ${jobAddress} (numberOfUpdates=${totalUpdates})`);
+
+  await wait(
+    await requester.writeContract({
+      address: daoAddress,
+      abi: daoAbi,
+      functionName: "signJobContract",
+      args: [jobAddress],
+      value: valueByUpdate * totalUpdates,
+    }),
+  );
+
+  const measurements: Measurement[] = [];
+  for (const n of N_LIST) {
+    // --- per_client: N tx recordClientUpdate ---
+    let perClientGas = 0n;
+    const t0 = performance.now();
+    for (let i = 0; i < n; i++) {
+      const ref = syntheticRef(`pc-${n}-${i}`);
+      const rcpt = await wait(
+        await requester.writeContract({
+          address: jobAddress,
+          abi: jobAbi,
+          functionName: "recordClientUpdate",
+          args: [keccak256(stringToBytes(ref)), stringToHex(ref)],
+        }),
+      );
+      perClientGas += rcpt.gasUsed;
+    }
+    const perClientMs = performance.now() - t0;
+
+    // --- batch: 1 tx recordClientUpdateBatch ---
+    const refs = Array.from({ length: n }, (_, i) => syntheticRef(`batch-${n}-${i}`));
+    const layers = buildLayers(refs.map(leafOf));
+    const root = layers[layers.length - 1][0];
+    const pointer = stringToHex(refs.join("\n"));
+    const t1 = performance.now();
+    const batchRcpt = await wait(
+      await requester.writeContract({
+        address: jobAddress,
+        abi: jobAbi,
+        functionName: "recordClientUpdateBatch",
+        args: [root, BigInt(n), pointer],
+      }),
+    );
+    const batchMs = performance.now() - t1;
+
+    const lastIdx = n - 1;
+    const verified = (await publicClient.readContract({
+      address: jobAddress,
+      abi: jobAbi,
+      functionName: "verifyBatchedUpdate",
+      args: [root, keccak256(stringToBytes(refs[lastIdx])), proofFor(layers, lastIdx)],
+    })) as boolean;
+
+    const m: Measurement = {
+      n_clients: n,
+      per_client_gas_total: perClientGas.toString(),
+      per_client_txs: n,
+      per_client_wall_ms: Number(perClientMs.toFixed(3)),
+      batch_gas_total: batchRcpt.gasUsed.toString(),
+      batch_txs: 1,
+      batch_wall_ms: Number(batchMs.toFixed(3)),
+      batch_calldata_bytes: (pointer.length - 2) / 2,
+      gas_ratio_batch_over_per_client: Number((Number(batchRcpt.gasUsed) / Number(perClientGas)).toFixed(4)),
+      proof_verified_onchain: verified,
+    };
+    measurements.push(m);
+    console.log(
+      `N=${n}  per_client gas=${m.per_client_gas_total} (${m.per_client_wall_ms}ms)  ` +
+        `batch gas=${m.batch_gas_total} (${m.batch_wall_ms}ms)  ratio=${m.gas_ratio_batch_over_per_client}  proof=${verified}`,
+    );
+  }
+
+  console.log("\nN  | gas per_client | gas batch | ms per_client | ms batch");
+  console.log("---|----------------|-----------|---------------|---------");
+  for (const r of measurements) {
+    console.log(
+      `${String(r.n_clients).padEnd(3)}| ${r.per_client_gas_total.padEnd(15)}| ${r.batch_gas_total.padEnd(10)}| ` +
+        `${String(r.per_client_wall_ms).padEnd(14)}| ${r.batch_wall_ms}`,
+    );
+  }
+
+  mkdirSync(resolve("results"), { recursive: true });
+  const outPath = resolve("results/batch_anchoring_benchmark.json");
+  writeFileSync(
+    outPath,
+    JSON.stringify(
+      {
+        dao_address: daoAddress,
+        job_address: jobAddress,
+        network: connection.networkName,
+        n_list: N_LIST,
+        measurements,
+        timestamp: new Date().toISOString(),
+      },
+      null,
+      2,
+    ),
+  );
+  console.log(`\nResultados salvos em ${outPath}`);
+}
+
+main().catch((err) => {
+  console.error(err);
+  process.exitCode = 1;
+});
@@ -0,0 +1,143 @@
+/**
+ * scripts/bench_batch_payouts.ts — Gas por job de `DAO.releaseJobPayments`
+ * (lote) vs. `DAO.releaseJobPayment` (uma tx por job).
+ *
+ * Para cada tamanho de lote (BENCH_PAYOUT_BATCHES, default 1,5,10,25,50,100),
+ * cria 2n jobs com saldo liberado (MakeOffer, AcceptOffer, signJobContract com
+ * o depósito e um recordClientUpdate) e paga n deles um a um e os outros n
+ * num único `releaseJobPayments`. Registra também um lote em que metade dos
+ * jobs está sem saldo (pulados pelo contrato).
+ *
+ * Uso:
+ *   npx hardhat run scripts/bench_batch_payouts.ts --network localhost
+ *   BENCH_PAYOUT_BATCHES=1,10,100 npx hardhat run scripts/bench_batch_payouts.ts
+ *
+ * Resultados salvos em `results/batch_payouts_gas.json`.
+ *
+ * Observações:
+ *   - Usa uma única carteira como requester E trainer (como
+ *     scripts/bench_marketplace_gas.ts); um único `signJobContract` (com o
+ *     depósito) já deixa o job Signed.
+ *   - O gas por job da tx avulsa inclui os 21000 de base de cada tx; no lote
+ *     a base é dividida por n.
+ */
+/// <reference types="hardhat/types" />
+import { mkdirSync, writeFileSync } from "node:fs";
+import { resolve } from "node:path";
+import { network } from "hardhat";
+import { keccak256, parseEventLogs, stringToBytes, zeroAddress, type Hex } from "viem";
+
+const BATCHES = (process.env.BENCH_PAYOUT_BATCHES ?? "1,5,10,25,50,100")
+  .split(",")
+  .map((x) => parseInt(x.trim(), 10))
+  .filter((x) => Number.isFinite(x) && x > 0);
+
+const VALUE_BY_UPDATE = 1_000_000_000_000n;
+const UPDATES = 3n;
+
+type Measurement = {
+  batch_size: number;
+  single_gas_total: string;
+  single_gas_per_job: number;
+  batch_gas: string;
+  batch_gas_per_job: number;
+  half_empty_batch_gas: string;
+};
+
+async function main(): Promise<void> {
+  const connection = await network.connect();
+  const { viem } = connection;
+  const publicClient = await viem.getPublicClient();
+  const [wallet] = await viem.getWalletClients();
+  if (!wallet) {
+    throw new Error("Nenhuma carteira disponível na rede. Verifique a configuração.");
+  }
+  const me = wallet.account.address;
+  const wait = (hash: Hex) => publicClient.waitForTransactionReceipt({ hash });
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+  await wait(await dao.write.registerTrainer(["Bench trainer", ["CPU", "16GB", "8 cores"]]));
+  await wait(await dao.write.registerRequester());
+
+  let seq = 0;
+  // Job assinado e depositado; com `funded`, um update registrado (saldo liberado).
+  const newJob = async (funded: boolean): Promise<Hex> => {
+    const i = seq++;
+    const made = await wait(
+      await dao.write.MakeOffer([
+        `Bench job ${i}`,
+        keccak256(stringToBytes(`model-${i}`)),
+        keccak256(stringToBytes("endpoint")),
+        "0x",
+        VALUE_BY_UPDATE,
+        UPDATES,
+        me,
+      ]),
+    );
+    const [offer] = parseEventLogs({ abi: dao.abi, logs: made.logs, eventName: "OfferMade" });
+    const accepted = await wait(await dao.write.AcceptOffer([offer.args.offerId]));
+    const [created] = parseEventLogs({ abi: dao.abi, logs: accepted.logs, eventName: "JobContractCreated" });
+    const job = created.args.job;
+    await wait(await dao.write.signJobContract([job], { value: VALUE_BY_UPDATE * UPDATES }));
+    if (funded) {
+      await wait(await dao.write.recordClientUpdate([job, keccak256(stringToBytes(`update-${i}`)), "0x"]));
+    }
+    return job;
+  };
+  const jobs = async (n: number, funded: (k: number) => boolean) => {
+    const out: Hex[] = [];
+    for (let k = 0; k < n; k++) out.push(await newJob(funded(k)));
+    return out;
+  };
+
+  const measurements: Measurement[] = [];
+  for (const n of BATCHES) {
+    const single = await jobs(n, () => true);
+    let singleGas = 0n;
+    for (const job of single) {
+      singleGas += (await wait(await dao.write.releaseJobPayment([job, zeroAddress]))).gasUsed;
+    }
+
+    const batched = await jobs(n, () => true);
+    const batch = await wait(await dao.write.releaseJobPayments([batched, zeroAddress]));
+    const { abi: jobAbi } = await viem.getContractAt("contracts/JobContract.sol:JobContract", batched[0]);
+    const paid = parseEventLogs({ abi: jobAbi, logs: batch.logs, eventName: "PayoutReleased" });
+    if (paid.length !== n) {
+      throw new Error(`lote de ${n}: ${paid.length} PayoutReleased`);
+    }
+
+    const mixed = await jobs(n, (k) => k % 2 === 0);
+    const halfEmpty = await wait(await dao.write.releaseJobPayments([mixed, zeroAddress]));
+
+    measurements.push({
+      batch_size: n,
+      single_gas_total: singleGas.toString(),
+      single_gas_per_job: Number(singleGas) / n,
+      batch_gas: batch.gasUsed.toString(),
+      batch_gas_per_job: Number(batch.gasUsed) / n,
+      half_empty_batch_gas: halfEmpty.gasUsed.toString(),
+    });
+    console.log(
+      `n=${n}  avulso/job=${(Number(singleGas) / n).toFixed(0)}  lote/job=${(Number(batch.gasUsed) / n).toFixed(0)}  ` +
+        `lote meio vazio=${halfEmpty.gasUsed}`,
+    );
+  }
+
+  const outDir = resolve("results");
+  mkdirSync(outDir, { recursive: true });
+  const outPath = resolve(outDir, "batch_payouts_gas.json");
+  writeFileSync(
+    outPath,
+    JSON.stringify(
+      { network: connection.networkName, batches: BATCHES, measurements, timestamp: new Date().toISOString() },
+      null,
+      2,
+    ),
+  );
+  console.log(`\nResultados salvos em ${outPath}`);
+}
+
+main().catch((err) => {
+  console.error(err);
+  process.exitCode = 1;
+});
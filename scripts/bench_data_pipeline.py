@@ -0,0 +1,125 @@
+"""Benchmark: amostras/s em `MNISTClient.fit` por DATASET_MODE.
+
+Compara o caminho original (``loader``: Subset + ToTensor/Normalize por
+amostra num DataLoader) com o tensor pré-processado (``tensor``:
+`datasets.TensorBatchLoader`). Para cada modo cria um cliente (sem IPFS e sem
+on-chain, só o treino local), roda ``--rounds`` fits de ``--epochs`` épocas a
+partir dos mesmos parâmetros iniciais e lê ``samples_per_s`` das métricas do
+fit. O primeiro fit de cada modo é aquecimento e fica fora da mediana.
+
+Com ``--prefetch`` (lista de PREFETCH_BATCHES, ver prefetch.py), cada modo
+roda também com o prefetch em thread; ``data_wait_ms_mean`` (espera do treino
+pelo próximo batch) mostra quanto da preparação ficou sobreposta ao treino.
+
+Saída: results/data_pipeline_benchmark.json
+
+Uso:
+  python scripts/bench_data_pipeline.py --dataset mnist --num-nodes 3 --rounds 4
+  python scripts/bench_data_pipeline.py --dataset cifar10 --model resnet18 --modes tensor
+  python scripts/bench_data_pipeline.py --modes loader,mmap --prefetch 0,2,4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+load_dotenv()
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Amostras/s no fit por DATASET_MODE")
+    p.add_argument("--dataset", type=str, default=os.getenv("DATASET", "mnist"))
+    p.add_argument("--model", type=str, default=os.getenv("MODEL", "mnistnet"))
+    p.add_argument("--modes", type=str, default="loader,tensor")
+    p.add_argument("--node-id", type=int, default=0)
+    p.add_argument("--num-nodes", type=int, default=3)
+    p.add_argument("--rounds", type=int, default=4, help="Fits por modo (o 1º é aquecimento).")
+    p.add_argument("--epochs", type=int, default=1)
+    p.add_argument("--prefetch", type=str, default="0", help="Profundidades de PREFETCH_BATCHES (0 = serial).")
+    p.add_argument("--output", type=Path, default=Path("results/data_pipeline_benchmark.json"))
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    # Antes do import do cliente: as flags são lidas no import.
+    os.environ.update({
+        "DATASET": args.dataset,
+        "MODEL": args.model,
+        "USE_IPFS": "false",
+        "USE_ONCHAIN": "false",
+        "MALICIOUS": "false",
+    })
+    from flower_fl.client import MNISTClient
+    from flower_fl.utils import set_seed
+
+    results = {}
+    initial = None
+    depths = [int(d) for d in args.prefetch.split(",") if d.strip()]
+    runs = [(m.strip(), d) for m in args.modes.split(",") if m.strip() for d in depths]
+    for mode, depth in runs:
+        label = mode if depth == 0 else f"{mode}+prefetch{depth}"
+        os.environ["DATASET_MODE"] = mode
+        os.environ["PREFETCH_BATCHES"] = str(depth)
+        set_seed(int(os.getenv("SEED", "42")))
+        t0 = time.perf_counter()
+        client = MNISTClient(node_id=args.node_id, num_nodes=args.num_nodes)
+        setup_s = time.perf_counter() - t0
+        if initial is None:
+            initial = client.get_parameters({})
+        rates, waits = [], []
+        for r in range(1, args.rounds + 1):
+            _, _, metrics = client.fit(initial, {"server_round": r, "epochs": args.epochs})
+            rates.append(metrics["samples_per_s"])
+            waits.append(metrics["data_wait_ms_mean"])
+            print(f"[{label}] fit {r}: {metrics['samples_per_s']:.0f} amostras/s "
+                  f"({metrics['train_samples']} amostras em {metrics['train_time']:.2f}s, "
+                  f"espera {metrics['data_wait_ms_mean']:.2f} ms/batch)")
+        steady = rates[1:] or rates
+        results[label] = {
+            "mode": mode,
+            "prefetch": depth,
+            "setup_s": setup_s,
+            "samples_per_s": rates,
+            "samples_per_s_median": statistics.median(steady),
+            "data_wait_ms_mean": waits,
+            "data_wait_ms_median": statistics.median(waits[1:] or waits),
+        }
+
+    print(f"\n{'modo':<22}{'setup (s)':>12}{'amostras/s (mediana)':>24}{'espera ms/batch':>18}")
+    for label, r in results.items():
+        print(f"{label:<22}{r['setup_s']:>12.2f}{r['samples_per_s_median']:>24.0f}"
+              f"{r['data_wait_ms_median']:>18.2f}")
+    if "loader" in results and "tensor" in results:
+        speedup = results["tensor"]["samples_per_s_median"] / results["loader"]["samples_per_s_median"]
+        print(f"speedup tensor/loader: {speedup:.2f}x")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "dataset": args.dataset,
+        "model": args.model,
+        "node_id": args.node_id,
+        "num_nodes": args.num_nodes,
+        "epochs": args.epochs,
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"\nJSON: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,156 @@
+"""Benchmark: startup e memória dos clientes por DATASET_MODE, em função de N.
+
+Para cada N de ``--clients-list`` e cada modo de ``--modes``, sobe N
+processos (como os drivers sobem os clientes) que carregam a própria
+partição com `datasets.load_dataset` e percorrem uma época do treino, e
+mede:
+
+  startup_s   — do spawn até a partição pronta (import do torch incluso);
+  load_s      — só o `load_dataset` dentro do processo;
+  rss_mb      — VmRSS de cada processo, somado (conta páginas compartilhadas
+                uma vez POR processo);
+  pss_mb      — Pss (/proc/<pid>/smaps_rollup), somado: páginas
+                compartilhadas divididas entre quem as mapeia — a memória
+                de fato ocupada no host.
+
+Todos os N ficam vivos até o último medir. No modo ``mmap`` o cache
+(dataset_cache.py) é montado antes, uma vez, e o tempo entra como
+``preprocess_s``.
+
+Saída: results/dataset_cache_benchmark.json
+
+Uso:
+  python scripts/bench_dataset_cache.py --dataset mnist --clients-list 1,8,32
+  python scripts/bench_dataset_cache.py --dataset cifar10 --modes loader,mmap
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+load_dotenv()
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Startup/RSS dos clientes por DATASET_MODE vs N")
+    p.add_argument("--dataset", type=str, default=os.getenv("DATASET", "mnist"))
+    p.add_argument("--modes", type=str, default="loader,tensor,mmap")
+    p.add_argument("--clients-list", type=str, default="1,4,8,16,32")
+    p.add_argument("--alpha", type=float, default=float(os.getenv("DIRICHLET_ALPHA", "0.5")))
+    p.add_argument("--output", type=Path, default=Path("results/dataset_cache_benchmark.json"))
+    p.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return p.parse_args()
+
+
+def _proc_kb(path: str, field: str) -> float:
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return float(line.split()[1])
+    except OSError:
+        pass
+    return 0.0
+
+
+def child(args: argparse.Namespace) -> int:
+    """Processo de cliente: carrega a partição, percorre uma época, reporta e espera."""
+    t0 = time.perf_counter()
+    from flower_fl.datasets import load_dataset
+
+    trainloader, _ = load_dataset(args.dataset, int(os.environ["NODE_ID"]), int(os.environ["NUM_NODES"]),
+                                  alpha=args.alpha)
+    load_s = time.perf_counter() - t0
+    for _ in trainloader:
+        pass
+    print(json.dumps({
+        "load_s": load_s,
+        "rss_kb": _proc_kb("/proc/self/status", "VmRSS"),
+        "pss_kb": _proc_kb("/proc/self/smaps_rollup", "Pss"),
+    }), flush=True)
+    sys.stdin.read()  # fica vivo até o driver fechar o stdin
+    return 0
+
+
+def run(mode: str, n: int, args: argparse.Namespace) -> Dict[str, Any]:
+    env = os.environ.copy()
+    env.update({"DATASET_MODE": mode, "NUM_NODES": str(n), "OMP_NUM_THREADS": "1"})
+    procs = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        procs.append(subprocess.Popen(
+            [sys.executable, __file__, "--child", "--dataset", args.dataset, "--alpha", str(args.alpha)],
+            env={**env, "NODE_ID": str(i)}, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True, cwd=ROOT,
+        ))
+    reports: List[Dict[str, float]] = []
+    for p in procs:
+        line = p.stdout.readline()
+        if not line:
+            raise RuntimeError(f"cliente ({mode}, N={n}) terminou sem reportar (código {p.wait()})")
+        reports.append({**json.loads(line), "startup_s": time.perf_counter() - t0})
+    for p in procs:
+        p.stdin.close()
+        p.wait()
+    return {
+        "clients": n,
+        "startup_s_mean": sum(r["startup_s"] for r in reports) / n,
+        "startup_s_max": max(r["startup_s"] for r in reports),
+        "load_s_mean": sum(r["load_s"] for r in reports) / n,
+        "rss_mb_total": sum(r["rss_kb"] for r in reports) / 1024,
+        "pss_mb_total": sum(r["pss_kb"] for r in reports) / 1024,
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    if args.child:
+        return child(args)
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    clients_list = [int(x) for x in args.clients_list.split(",") if x.strip()]
+    preprocess_s = None
+    if "mmap" in modes:
+        from flower_fl.dataset_cache import build_cache
+
+        t0 = time.perf_counter()
+        build_cache(args.dataset)
+        preprocess_s = time.perf_counter() - t0
+
+    rows: List[Dict[str, Any]] = []
+    print(f"{'modo':<8}{'N':>4}{'startup médio (s)':>19}{'startup máx (s)':>17}{'RSS total (MB)':>16}{'PSS total (MB)':>16}")
+    for mode in modes:
+        for n in clients_list:
+            r = {"mode": mode, **run(mode, n, args)}
+            rows.append(r)
+            print(f"{mode:<8}{n:>4}{r['startup_s_mean']:>19.2f}{r['startup_s_max']:>17.2f}"
+                  f"{r['rss_mb_total']:>16.0f}{r['pss_mb_total']:>16.0f}")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "dataset": args.dataset,
+        "alpha": args.alpha,
+        "preprocess_s": preprocess_s,
+        "results": rows,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"\nJSON: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,224 @@
+"""Microbenchmark: decodificação de logs do DAO (offerId / endereço do job).
+
+Gera, sem nó, receipts sintéticos de MakeOffer e AcceptOffer (logs
+``OfferMade`` / ``JobContractCreated`` codificados a partir do ABI, mais um
+log de outro contrato por receipt, como o ``FundsLocked`` de um job) e mede
+a vazão (logs/s) de três decodificadores sobre os MESMOS logs:
+
+  legacy_try_all   — o caminho antigo de ``extract_offer_id_from_logs``: um
+                     contrato por evento do ABI a cada receipt, tentando todos
+                     contra cada log;
+  web3_by_topic    — ``contract.events[nome]().process_log`` despachado por
+                     topic0 (o que o indexer fazia);
+  registry         — ``flower_fl.events.EventRegistry`` (topic0 -> decoder
+                     pré-montado), devolvendo registros tipados.
+
+e confere que os três extraem os mesmos offerIds / endereços.
+
+Saída: results/log_decode_benchmark.json
+
+Uso:
+  python scripts/bench_log_decoding.py --receipts 2000
+  python scripts/bench_log_decoding.py --dao-abi artifacts/contracts/DAO.sol/DAO.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+from eth_abi import encode as abi_encode
+from eth_account import Account
+from eth_utils import event_abi_to_log_topic
+from eth_utils.abi import collapse_if_tuple
+from hexbytes import HexBytes
+from web3 import Web3
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from flower_fl.events import EventRegistry, JobContractCreated, OfferMade
+
+load_dotenv()
+
+
+def _load_abi(path: str) -> list:
+    data = json.loads(Path(path).read_text())
+    return data["abi"] if isinstance(data, dict) and "abi" in data else data
+
+
+def _encode_log(item: Dict[str, Any], values: Dict[str, Any], address: str, tx: int, index: int) -> Dict[str, Any]:
+    topics = [HexBytes(event_abi_to_log_topic(item))]
+    data_types, data_values = [], []
+    for inp in item["inputs"]:
+        typ = collapse_if_tuple(inp)
+        if inp.get("indexed"):
+            topics.append(HexBytes(abi_encode([typ], [values[inp["name"]]])))
+        else:
+            data_types.append(typ)
+            data_values.append(values[inp["name"]])
+    return {
+        "address": address,
+        "topics": topics,
+        "data": HexBytes(abi_encode(data_types, data_values)),
+        "transactionHash": HexBytes(tx.to_bytes(32, "big")),
+        "blockNumber": tx,
+        "logIndex": index,
+        "blockHash": HexBytes(b"\x00" * 32),
+        "transactionIndex": 0,
+        "removed": False,
+    }
+
+
+def synth_receipts(dao_abi: list, dao: str, n: int) -> List[List[Dict[str, Any]]]:
+    events = {item["name"]: item for item in dao_abi if item.get("type") == "event"}
+    other = {  # log de outro contrato no mesmo receipt (ex.: FundsLocked do job)
+        "type": "event", "name": "FundsLocked", "anonymous": False,
+        "inputs": [{"name": "amount", "type": "uint256", "indexed": False}],
+    }
+    requester, trainer = Account.create().address, Account.create().address
+    receipts = []
+    for i in range(n):
+        job = Account.create().address
+        if i % 2 == 0:
+            logs = [_encode_log(events["OfferMade"], {"offerId": i, "requester": requester, "trainer": trainer}, dao, i, 0)]
+        else:
+            logs = [
+                _encode_log(other, {"amount": i}, job, i, 0),
+                _encode_log(events["JobContractCreated"],
+                            {"job": job, "offerId": i, "requester": requester, "trainer": trainer}, dao, i, 1),
+            ]
+        receipts.append(logs)
+    return receipts
+
+
+def legacy_try_all(w3: Web3, dao_abi: list, dao: str, receipts) -> List[Any]:
+    out = []
+    for logs in receipts:
+        decoders = [w3.eth.contract(abi=[item]).events[item["name"]]
+                    for item in dao_abi if item.get("type") == "event"]
+        found = None
+        for log in logs:
+            if log["address"].lower() != dao.lower():
+                continue
+            for dec in decoders:
+                try:
+                    ev = dec().process_log(log)
+                except Exception:
+                    continue
+                found = ev["args"].get("job") or int(ev["args"]["offerId"])
+                break
+            if found is not None:
+                break
+        out.append(found)
+    return out
+
+
+def web3_by_topic(w3: Web3, dao_abi: list, dao: str, receipts) -> List[Any]:
+    contract = w3.eth.contract(address=dao, abi=dao_abi)
+    decoders = {
+        bytes(event_abi_to_log_topic(item)): contract.events[item["name"]]()
+        for item in dao_abi if item.get("type") == "event"
+    }
+    out = []
+    for logs in receipts:
+        found = None
+        for log in logs:
+            dec = decoders.get(bytes(log["topics"][0]))
+            if dec is None or log["address"].lower() != dao.lower():
+                continue
+            args = dec.process_log(log)["args"]
+            found = args.get("job") or int(args["offerId"])
+            break
+        out.append(found)
+    return out
+
+
+def registry(reg: EventRegistry, receipts) -> List[Any]:
+    out = []
+    for logs in receipts:
+        found = None
+        for rec in reg.records(logs):
+            if isinstance(rec, JobContractCreated):
+                found = rec.job
+            elif isinstance(rec, OfferMade):
+                found = rec.offer_id
+            if found is not None:
+                break
+        out.append(found)
+    return out
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Microbenchmark de decodificação de logs")
+    p.add_argument("--dao-abi", type=str,
+                   default=os.getenv("DAO_ABI_PATH", "artifacts/contracts/DAO.sol/DAO.json"))
+    p.add_argument("--receipts", type=int, default=2000)
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--output", type=Path, default=Path("results/log_decode_benchmark.json"))
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    dao_abi = _load_abi(args.dao_abi)
+    dao = Account.create().address
+    w3 = Web3()
+    receipts = synth_receipts(dao_abi, dao, args.receipts)
+    n_logs = sum(len(r) for r in receipts)
+
+    t0 = time.perf_counter()
+    reg = EventRegistry(dao_abi, address=dao)
+    build_s = time.perf_counter() - t0
+
+    variants = {
+        "legacy_try_all": lambda: legacy_try_all(w3, dao_abi, dao, receipts),
+        "web3_by_topic": lambda: web3_by_topic(w3, dao_abi, dao, receipts),
+        "registry": lambda: registry(reg, receipts),
+    }
+    rows, reference = [], None
+    for name, fn in variants.items():
+        samples = []
+        for _ in range(args.repeats):
+            t0 = time.perf_counter()
+            result = fn()
+            samples.append(time.perf_counter() - t0)
+        if reference is None:
+            reference = result
+        median = statistics.median(samples)
+        rows.append({
+            "method": name,
+            "n_receipts": len(receipts),
+            "n_logs": n_logs,
+            "median_s": median,
+            "logs_per_s": n_logs / median if median > 0 else 0.0,
+            "matches_legacy": result == reference,
+        })
+        print(f"{name:<15} {rows[-1]['logs_per_s']:12.0f} logs/s  ok={rows[-1]['matches_legacy']}")
+
+    base = rows[0]["median_s"]
+    for row in rows:
+        row["speedup"] = base / row["median_s"] if row["median_s"] > 0 else 0.0
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        "timestamp": datetime.now().isoformat(),
+        "dao_abi": args.dao_abi,
+        "registry_build_s": build_s,
+        "repeats": args.repeats,
+        "results": rows,
+    }, indent=2))
+    print(f"\nJSON: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+/**
+ * scripts/bench_marketplace_gas.ts — Gas por operação do marketplace
+ * (registerRequester, registerTrainer, MakeOffer, AcceptOffer,
+ * signJobContract) com Trainer/Requester/JobContract criados como clones
+ * EIP-1167, comparado a um breakdown "antes".
+ *
+ * O "antes" é um `results/marketplace_gas_breakdown.json` gerado por
+ * `python -m flower_fl.deploy_job` num checkout anterior aos clones (mesmos
+ * nomes de operação); informe outro caminho com BEFORE_GAS_FILE. Sem o
+ * arquivo, só o "depois" é registrado.
+ *
+ * Uso:
+ *   npx hardhat run scripts/bench_marketplace_gas.ts --network localhost
+ *
+ * Resultados salvos em `results/marketplace_gas_clones.json`.
+ *
+ * Observações:
+ *   - Usa uma única carteira como requester E trainer (como
+ *     scripts/bench_pointer_calldata.ts); com o mesmo signer nos dois papéis,
+ *     um único `signJobContract` (com o depósito) já deixa o job Signed.
+ *   - O deploy do DAO fica mais caro (implanta as três implementações uma
+ *     vez); o custo entra no relatório como `deployDAO`.
+ */
+/// <reference types="hardhat/types" />
+import { existsSync, mkdirSync, readFileSync, writeFileSync } from "node:fs";
+import { resolve } from "node:path";
+import { network } from "hardhat";
+import { decodeEventLog, keccak256, stringToBytes, type Hex } from "viem";
+
+const BEFORE_FILE = process.env.BEFORE_GAS_FILE ?? "results/marketplace_gas_breakdown.json";
+
+async function main(): Promise<void> {
+  const connection = await network.connect();
+  const { viem } = connection;
+  const publicClient = await viem.getPublicClient();
+  const [wallet] = await viem.getWalletClients();
+  if (!wallet) {
+    throw new Error("Nenhuma carteira disponível na rede. Verifique a configuração.");
+  }
+  const me = wallet.account.address;
+  const gas = async (hash: Hex) => (await publicClient.waitForTransactionReceipt({ hash })).gasUsed;
+
+  const after: Record<string, bigint> = {};
+
+  const { contract: dao, deploymentTransaction } = await viem.sendDeploymentTransaction("contracts/DAO.sol:DAO", []);
+  after.deployDAO = await gas(deploymentTransaction.hash);
+
+  after.registerRequester = await gas(await dao.write.registerRequester());
+  after.registerTrainer = await gas(await dao.write.registerTrainer(["Treinador de IA", ["Processador Exemplo", "16GB", "8 Cores"]]));
+  after.MakeOffer = await gas(
+    await dao.write.MakeOffer([
+      "Treinamento de modelo de imagem",
+      keccak256(stringToBytes("bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi")),
+      keccak256(stringToBytes("0.0.0.0:8080")),
+      "0x",
+      1_000_000_000_000_000n,
+      3n,
+      me,
+    ]),
+  );
+  const pending = await dao.read.getPendingOffers({ account: wallet.account });
+  const acceptHash = await dao.write.AcceptOffer([pending[pending.length - 1]]);
+  const acceptRcpt = await publicClient.waitForTransactionReceipt({ hash: acceptHash });
+  after.AcceptOffer = acceptRcpt.gasUsed;
+  const created = decodeEventLog({ abi: dao.abi, data: acceptRcpt.logs[0].data, topics: acceptRcpt.logs[0].topics });
+  const jobAddress = (created.args as { job: `0x${string}` }).job;
+  after["signJobContract+fund"] = await gas(
+    await dao.write.signJobContract([jobAddress], { value: 3_000_000_000_000_000n }),
+  );
+
+  let before: Record<string, number> | null = null;
+  if (existsSync(resolve(BEFORE_FILE))) {
+    const data = JSON.parse(readFileSync(resolve(BEFORE_FILE), "utf-8"));
+    before = {};
+    for (const op of data.operations ?? []) before[op.operation] = Number(op.gas_used);
+  }
+
+  const rows = Object.entries(after).map(([operation, gasAfter]) => {
+    const gasBefore = before?.[operation] ?? null;
+    return {
+      operation,
+      gas_before: gasBefore,
+      gas_after: Number(gasAfter),
+      reduction_pct: gasBefore ? Number((100 * (1 - Number(gasAfter) / gasBefore)).toFixed(1)) : null,
+    };
+  });
+  console.table(rows);
+
+  const outDir = resolve("results");
+  mkdirSync(outDir, { recursive: true });
+  const outPath = resolve(outDir, "marketplace_gas_clones.json");
+  writeFileSync(
+    outPath,
+    JSON.stringify(
+      {
+        network: connection.networkName,
+        dao_address: dao.address,
+        job_address: jobAddress,
+        before_file: before ? BEFORE_FILE : null,
+        operations: rows,
+        timestamp: new Date().toISOString(),
+      },
+      null,
+      2,
+    ),
+  );
+  console.log(`\nResultados salvos em ${outPath}`);
+}
+
+main().catch((err) => {
+  console.error(err);
+  process.exitCode = 1;
+});
@@ -0,0 +1,152 @@
+"""Benchmark: snapshot de status de N JobContracts — eth_call por getter vs. Multicall vs. lote JSON-RPC.
+
+Para cada job lê ``Status``, ``latestModelHash``, ``lockedAmount`` e
+``availableAmount`` (4 × N leituras) de três formas:
+
+  sequential    — um ``eth_call`` síncrono por getter (caminho antigo);
+  multicall     — ``Multicall.aggregate`` (contracts/Multicall.sol);
+  jsonrpc_batch — um POST JSON-RPC em lote com todos os ``eth_call``.
+
+e confere que as três devolvem o mesmo snapshot. Se o nó tiver menos jobs que
+``--jobs`` (em JOB_ADDRS/--job-addrs), cria os que faltam com a carteira do
+.env atuando como requester E trainer (MakeOffer + AcceptOffer).
+
+Saída: results/multicall_snapshot_benchmark.json
+
+Uso:
+  npx hardhat run scripts/deploy-dao.ts --network localhost
+  python scripts/bench_multicall_snapshot.py --jobs 100 --repeats 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from flower_fl import onchain_dao, onchain_job
+from flower_fl.multicall import JOB_STATUS_GETTERS, Multicall, job_status_snapshot, resolve_multicall_address
+
+
+def _ensure_jobs(existing: List[str], n: int) -> List[str]:
+    jobs = list(existing[:n])
+    if len(jobs) >= n:
+        return jobs
+    me = onchain_dao.acct.address
+    participants = onchain_dao.get_participant_contracts([me])[me]
+    if participants[0] == onchain_dao.ZERO_ADDRESS:
+        onchain_dao.register_requester()
+    if participants[1] == onchain_dao.ZERO_ADDRESS:
+        onchain_dao.register_trainer("Bench trainer", ("CPU", "16GB", "8 cores"))
+    print(f"Criando {n - len(jobs)} jobs...")
+    while len(jobs) < n:
+        r_offer = onchain_dao.make_offer(
+            description=f"bench multicall {len(jobs)}",
+            model_cid=f"bench-model-{len(jobs)}",
+            value_by_update_wei=1,
+            number_of_updates=3,
+            trainer_addr=me,
+            server_endpoint="0.0.0.0:8080",
+        )
+        offer_id = onchain_dao.extract_offer_id_from_logs(r_offer["logs"])
+        job = onchain_dao.extract_job_address_from_logs(onchain_dao.accept_offer(int(offer_id))["logs"])
+        if not job:
+            raise RuntimeError("JobContractCreated não encontrado nos logs de AcceptOffer")
+        jobs.append(job)
+    return jobs
+
+
+def _sequential_snapshot(jobs) -> list:
+    rows = []
+    for job in jobs:
+        row = {"address": job.address}
+        for name in JOB_STATUS_GETTERS:
+            row[name] = getattr(job.functions, name)().call()
+        if isinstance(row["latestModelHash"], (bytes, bytearray)):
+            row["latestModelHash"] = "0x" + bytes(row["latestModelHash"]).hex()
+        rows.append(row)
+    return rows
+
+
+def _time(fn, repeats: int):
+    samples = []
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    return result, samples
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark de snapshot de status via Multicall")
+    p.add_argument("--jobs", type=int, default=100)
+    p.add_argument("--job-addrs", type=str, default=os.getenv("JOB_ADDRS", ""))
+    p.add_argument("--repeats", type=int, default=5)
+    p.add_argument("--output", type=Path, default=Path("results/multicall_snapshot_benchmark.json"))
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    w3 = onchain_job.w3
+    existing = [a.strip() for a in args.job_addrs.split(",") if a.strip()]
+    addrs = _ensure_jobs(existing, args.jobs)
+    jobs = [onchain_job._job(a) for a in addrs]
+
+    mc_address = resolve_multicall_address(w3)
+    if not mc_address:
+        print("!!! Multicall não implantado (rode scripts/deploy-dao.ts); medindo só o lote JSON-RPC.")
+    variants = {"sequential": lambda: _sequential_snapshot(jobs)}
+    if mc_address:
+        mc = Multicall(w3, mc_address)
+        variants["multicall"] = lambda: job_status_snapshot(mc, jobs)
+    batch = Multicall(w3, None)
+    variants["jsonrpc_batch"] = lambda: job_status_snapshot(batch, jobs)
+
+    rows = []
+    reference = None
+    for name, fn in variants.items():
+        snapshot, samples = _time(fn, args.repeats)
+        if reference is None:
+            reference = snapshot
+        rows.append({
+            "method": name,
+            "n_jobs": len(jobs),
+            "n_reads": len(jobs) * len(JOB_STATUS_GETTERS),
+            "median_s": statistics.median(samples),
+            "min_s": min(samples),
+            "samples_s": samples,
+            "matches_sequential": snapshot == reference,
+        })
+        print(f"{name:<14} median={rows[-1]['median_s'] * 1000:9.2f} ms  "
+              f"ok={rows[-1]['matches_sequential']}")
+
+    base = rows[0]["median_s"]
+    for row in rows:
+        row["speedup"] = base / row["median_s"] if row["median_s"] > 0 else 0.0
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        "timestamp": datetime.now().isoformat(),
+        "rpc_url": onchain_job.RPC_URL,
+        "multicall_address": mc_address,
+        "getters": list(JOB_STATUS_GETTERS),
+        "repeats": args.repeats,
+        "results": rows,
+    }, indent=2))
+    print(f"\nJSON: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
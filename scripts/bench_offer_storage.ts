@@ -0,0 +1,99 @@
+/**
+ * scripts/bench_offer_storage.ts — Gas de `DAO.MakeOffer` e `DAO.AcceptOffer`
+ * vs. tamanho dos metadados cifrados da oferta.
+ *
+ * Antes, `MakeOffer` gravava o `DataTypes.Offer` inteiro (inclusive
+ * `description` e `encryptedMetadata`) em `Trainer.pendingOffers` e
+ * `AcceptOffer` lia tudo de volta e copiava de novo para o storage do
+ * JobContract — custo linear no tamanho dos metadados, duas vezes. Agora a
+ * oferta guarda só `payloadHash` e o conteúdo vai no evento `OfferPayload`:
+ * `MakeOffer` cresce só com o calldata/log e `AcceptOffer` fica constante.
+ *
+ * Para cada tamanho (OFFER_METADATA_SIZES, default 0,256,1024,4096,8192
+ * bytes), cria uma oferta com metadados aleatórios desse tamanho e a aceita.
+ *
+ * Uso:
+ *   npx hardhat run scripts/bench_offer_storage.ts --network localhost
+ *   OFFER_METADATA_SIZES=0,1024,16384 npx hardhat run scripts/bench_offer_storage.ts
+ *
+ * Resultados salvos em `results/offer_storage_gas.json`. Para o número
+ * "antes", rode o mesmo script num checkout anterior a esta mudança.
+ *
+ * Observações:
+ *   - Usa uma única carteira como requester E trainer (como
+ *     scripts/bench_accept_offer.ts).
+ */
+/// <reference types="hardhat/types" />
+import { randomBytes } from "node:crypto";
+import { mkdirSync, writeFileSync } from "node:fs";
+import { resolve } from "node:path";
+import { network } from "hardhat";
+import { bytesToHex, keccak256, stringToBytes, type Hex } from "viem";
+
+const SIZES = (process.env.OFFER_METADATA_SIZES ?? "0,256,1024,4096,8192")
+  .split(",")
+  .map((x) => parseInt(x.trim(), 10))
+  .filter((x) => Number.isFinite(x) && x >= 0);
+
+type Measurement = {
+  metadata_bytes: number;
+  make_offer_gas: string;
+  accept_offer_gas: string;
+};
+
+async function main(): Promise<void> {
+  const connection = await network.connect();
+  const { viem } = connection;
+  const publicClient = await viem.getPublicClient();
+  const [wallet] = await viem.getWalletClients();
+  if (!wallet) {
+    throw new Error("Nenhuma carteira disponível na rede. Verifique a configuração.");
+  }
+  const me = wallet.account.address;
+  const wait = (hash: Hex) => publicClient.waitForTransactionReceipt({ hash });
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+  await wait(await dao.write.registerTrainer(["Bench trainer", ["CPU", "16GB", "8 cores"]]));
+  await wait(await dao.write.registerRequester());
+
+  const measurements: Measurement[] = [];
+  for (const size of SIZES) {
+    const made = await wait(
+      await dao.write.MakeOffer([
+        `Bench offer ${size}`,
+        keccak256(stringToBytes(`model-${size}`)),
+        keccak256(stringToBytes("endpoint")),
+        bytesToHex(randomBytes(size)),
+        1n,
+        3n,
+        me,
+      ]),
+    );
+    const ids = await dao.read.getPendingOffers({ account: wallet.account });
+    const accepted = await wait(await dao.write.AcceptOffer([ids[ids.length - 1]]));
+    measurements.push({
+      metadata_bytes: size,
+      make_offer_gas: made.gasUsed.toString(),
+      accept_offer_gas: accepted.gasUsed.toString(),
+    });
+    console.log(`metadata=${size} B  MakeOffer=${made.gasUsed}  AcceptOffer=${accepted.gasUsed}`);
+  }
+
+  const outDir = resolve("results");
+  mkdirSync(outDir, { recursive: true });
+  const outPath = resolve(outDir, "offer_storage_gas.json");
+  writeFileSync(
+    outPath,
+    JSON.stringify(
+      { network: connection.networkName, sizes: SIZES, measurements, timestamp: new Date().toISOString() },
+      null,
+      2,
+    ),
+  );
+  console.log(`\nResultados salvos em ${outPath}`);
+}
+
+main().catch((err) => {
+  console.error(err);
+  process.exitCode = 1;
+});
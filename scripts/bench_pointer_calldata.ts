@@ -0,0 +1,178 @@
+/**
+ * scripts/bench_pointer_calldata.ts — Calldata e gas dos ponteiros on-chain,
+ * UTF-8 (legado) vs. formato binário compacto (flower_fl/cid_codec.py).
+ *
+ * Para cada tipo de ref (CIDv0 `Qm…`, CIDv1 `bafy…`, `sha256:<hex>`) e cada
+ * codificação, envia `publishGlobalModel` e `recordClientUpdate` num
+ * JobContract novo e registra os bytes de calldata da tx, o `gasUsed` e,
+ * em redes OP (hardhatOp), o `l1Fee`/`l1GasUsed` do receipt quando o nó os
+ * expõe — é o custo de calldata que domina em rollups.
+ *
+ * Uso (rodar nas duas redes):
+ *   npx hardhat run scripts/bench_pointer_calldata.ts --network localhost
+ *   npx hardhat run scripts/bench_pointer_calldata.ts --network hardhatOp
+ *
+ * Resultados salvos em `results/pointer_calldata_<rede>.json`.
+ *
+ * Observações:
+ *   - Usa uma única carteira como requester E trainer (o DAO permite os dois
+ *     registros para o mesmo endereço), então funciona tanto no nó HTTP
+ *     (só PRIVATE_KEY) quanto nas redes edr-simulated.
+ *   - Um `publishGlobalModel` de aquecimento é enviado antes das medições para
+ *     que o SSTORE frio de `latestModelHash` não distorça a primeira linha.
+ */
+/// <reference types="hardhat/types" />
+import { mkdirSync, writeFileSync } from "node:fs";
+import { resolve } from "node:path";
+import { network } from "hardhat";
+import { bytesToHex, concat, decodeEventLog, hexToBytes, keccak256, stringToBytes, stringToHex, type Hex } from "viem";
+
+const B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz";
+const B32 = "abcdefghijklmnopqrstuvwxyz234567";
+
+function b58encode(data: Uint8Array): string {
+  let num = BigInt(bytesToHex(data));
+  let out = "";
+  while (num > 0n) {
+    out = B58[Number(num % 58n)] + out;
+    num /= 58n;
+  }
+  for (const byte of data) {
+    if (byte !== 0) break;
+    out = "1" + out;
+  }
+  return out;
+}
+
+function b32encode(data: Uint8Array): string {
+  let bits = 0;
+  let acc = 0;
+  let out = "";
+  for (const byte of data) {
+    acc = ((acc << 8) | byte) & 0xffff;
+    bits += 8;
+    while (bits >= 5) {
+      bits -= 5;
+      out += B32[(acc >> bits) & 0x1f];
+    }
+  }
+  if (bits > 0) out += B32[(acc << (5 - bits)) & 0x1f];
+  return out;
+}
+
+type RefKind = "cidv0" | "cidv1" | "sha256";
+
+// Mesmo formato de flower_fl/cid_codec.py.
+function makeRef(kind: RefKind, digest: Hex): { text: string; compact: Hex } {
+  if (kind === "sha256") {
+    return { text: "sha256:" + digest.slice(2), compact: concat(["0x00", digest]) };
+  }
+  if (kind === "cidv0") {
+    const mh = concat(["0x1220", digest]);
+    return { text: b58encode(hexToBytes(mh)), compact: mh };
+  }
+  const cid = concat(["0x01701220", digest]);
+  return { text: "b" + b32encode(hexToBytes(cid)), compact: cid };
+}
+
+type Measurement = {
+  operation: "publishGlobalModel" | "recordClientUpdate";
+  ref_kind: RefKind;
+  encoding: "utf8" | "compact";
+  pointer_bytes: number;
+  calldata_bytes: number;
+  gas_used: string;
+  l1_fee: string | null;
+  l1_gas_used: string | null;
+};
+
+async function main(): Promise<void> {
+  const connection = await network.connect();
+  const { viem } = connection;
+  const publicClient = await viem.getPublicClient();
+  const [wallet] = await viem.getWalletClients();
+  if (!wallet) {
+    throw new Error("Nenhuma carteira disponível na rede. Verifique a configuração.");
+  }
+  const me = wallet.account.address;
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+  const wait = (hash: Hex) => publicClient.waitForTransactionReceipt({ hash });
+
+  await wait(await dao.write.registerTrainer(["Bench trainer", ["CPU", "16GB", "8 cores"]]));
+  await wait(await dao.write.registerRequester());
+  await wait(
+    await dao.write.MakeOffer([
+      "Bench pointer calldata",
+      keccak256(stringToBytes("model")),
+      keccak256(stringToBytes("endpoint")),
+      "0x",
+      1n,
+      100n,
+      me,
+    ]),
+  );
+  const pending = await dao.read.getPendingOffers({ account: wallet.account });
+  const acceptRcpt = await wait(await dao.write.AcceptOffer([pending[pending.length - 1]]));
+  const created = decodeEventLog({ abi: dao.abi, data: acceptRcpt.logs[0].data, topics: acceptRcpt.logs[0].topics });
+  const jobAddress = (created.args as { job: `0x${string}` }).job;
+  await wait(await dao.write.signJobContract([jobAddress], { value: 100n }));
+
+  const job = await viem.getContractAt("contracts/JobContract.sol:JobContract", jobAddress);
+  await wait(await job.write.publishGlobalModel([keccak256(stringToBytes("warmup")), "0x"]));
+
+  const measurements: Measurement[] = [];
+  let counter = 0;
+  for (const kind of ["cidv0", "cidv1", "sha256"] as RefKind[]) {
+    for (const encoding of ["utf8", "compact"] as const) {
+      for (const operation of ["publishGlobalModel", "recordClientUpdate"] as const) {
+        const ref = makeRef(kind, keccak256(stringToBytes(`ref-${counter++}`)));
+        const pointer = encoding === "utf8" ? stringToHex(ref.text) : ref.compact;
+        const cidHash = keccak256(stringToBytes(ref.text));
+        const hash = await job.write[operation]([cidHash, pointer]);
+        const rcpt = (await wait(hash)) as typeof acceptRcpt & { l1Fee?: bigint; l1GasUsed?: bigint };
+        const tx = await publicClient.getTransaction({ hash });
+
+        const m: Measurement = {
+          operation,
+          ref_kind: kind,
+          encoding,
+          pointer_bytes: (pointer.length - 2) / 2,
+          calldata_bytes: (tx.input.length - 2) / 2,
+          gas_used: rcpt.gasUsed.toString(),
+          l1_fee: rcpt.l1Fee !== undefined ? rcpt.l1Fee.toString() : null,
+          l1_gas_used: rcpt.l1GasUsed !== undefined ? rcpt.l1GasUsed.toString() : null,
+        };
+        measurements.push(m);
+        console.log(
+          `${operation.padEnd(19)} ${kind.padEnd(7)} ${encoding.padEnd(8)} ` +
+            `pointer=${m.pointer_bytes}B calldata=${m.calldata_bytes}B gas=${m.gas_used}` +
+            (m.l1_fee !== null ? ` l1Fee=${m.l1_fee}` : ""),
+        );
+      }
+    }
+  }
+
+  const outDir = resolve("results");
+  mkdirSync(outDir, { recursive: true });
+  const outPath = resolve(outDir, `pointer_calldata_${connection.networkName}.json`);
+  writeFileSync(
+    outPath,
+    JSON.stringify(
+      {
+        network: connection.networkName,
+        job_address: jobAddress,
+        measurements,
+        timestamp: new Date().toISOString(),
+      },
+      null,
+      2,
+    ),
+  );
+  console.log(`\nResultados salvos em ${outPath}`);
+}
+
+main().catch((err) => {
+  console.error(err);
+  process.exitCode = 1;
+});
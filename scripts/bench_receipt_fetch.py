@@ -0,0 +1,122 @@
+"""Benchmark: coleta de receipts sequencial vs. JSON-RPC em lote concorrente.
+
+Compara o caminho antigo de `e2e_scaling_experiment._sum_gas_from_receipts`
+(um ``eth_getTransactionReceipt`` síncrono por tx) com `flower_fl.receipts`
+(batch + asyncio com concorrência limitada) sobre o MESMO conjunto de hashes,
+e confere que as duas versões devolvem a mesma tupla
+``(gas_used_total, gas_eth_total, missing)``.
+
+Os hashes vêm dos JSONs de métricas informados (``--metrics``, aceita glob)
+ou, na falta deles, das txs dos últimos ``--blocks`` blocos do nó local.
+
+Saída: results/receipt_fetch_benchmark.json
+
+Uso:
+  python scripts/bench_receipt_fetch.py --blocks 2000
+  python scripts/bench_receipt_fetch.py --metrics "results/e2e_scaling/raw/*/server_metrics.json"
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from dotenv import load_dotenv
+from web3 import Web3
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from flower_fl.chain import get_web3
+from flower_fl.receipts import sum_gas
+from scripts.e2e_scaling_experiment import _collect_tx_hashes, _sum_gas_from_receipts_sequential
+
+
+load_dotenv()
+
+
+def _hashes_from_metrics(pattern: str) -> List[str]:
+    hashes: List[str] = []
+    for path in sorted(glob.glob(pattern)):
+        hashes.extend(_collect_tx_hashes(json.loads(Path(path).read_text())))
+    return list(dict.fromkeys(hashes))
+
+
+def _hashes_from_chain(w3: Web3, blocks: int) -> List[str]:
+    head = w3.eth.block_number
+    hashes: List[str] = []
+    for n in range(max(0, head - blocks + 1), head + 1):
+        for tx in w3.eth.get_block(n)["transactions"]:
+            hashes.append(tx.hex() if hasattr(tx, "hex") else str(tx))
+    return hashes
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark de coleta de receipts")
+    p.add_argument("--metrics", type=str, default="", help="glob de server_metrics.json")
+    p.add_argument("--blocks", type=int, default=1000, help="últimos N blocos (sem --metrics)")
+    p.add_argument("--batch-sizes", type=str, default="1,25,100")
+    p.add_argument("--concurrency", type=str, default="1,4,8,16")
+    p.add_argument("--output", type=Path, default=Path("results/receipt_fetch_benchmark.json"))
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    rpc_url = os.getenv("RPC_URL", "").strip()
+    if not rpc_url:
+        raise RuntimeError("RPC_URL nao encontrado no ambiente/.env")
+    w3 = get_web3(rpc_url)
+    if not w3.is_connected():
+        raise RuntimeError("Nao foi possivel conectar ao RPC. Hardhat esta no ar?")
+
+    hashes = _hashes_from_metrics(args.metrics) if args.metrics else _hashes_from_chain(w3, args.blocks)
+    if not hashes:
+        print("Nenhuma tx encontrada.")
+        return 1
+    print(f"{len(hashes)} tx hashes ({'metrics' if args.metrics else f'últimos {args.blocks} blocos'})")
+
+    t0 = time.perf_counter()
+    reference = _sum_gas_from_receipts_sequential(w3, hashes)
+    seq_s = time.perf_counter() - t0
+    print(f"sequencial           : {seq_s:8.3f}s  -> {reference}")
+
+    rows = []
+    for batch_size in [int(x) for x in args.batch_sizes.split(",") if x.strip()]:
+        for conc in [int(x) for x in args.concurrency.split(",") if x.strip()]:
+            t0 = time.perf_counter()
+            result = sum_gas(rpc_url, hashes, batch_size=batch_size, concurrency=conc)
+            elapsed = time.perf_counter() - t0
+            same = result[0] == reference[0] and result[2] == reference[2]
+            rows.append({
+                "batch_size": batch_size,
+                "concurrency": conc,
+                "time_s": elapsed,
+                "speedup": seq_s / elapsed if elapsed > 0 else 0.0,
+                "matches_sequential": same,
+            })
+            print(f"batch={batch_size:<4} conc={conc:<3}: {elapsed:8.3f}s  "
+                  f"speedup={rows[-1]['speedup']:6.1f}x  ok={same}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        "timestamp": datetime.now().isoformat(),
+        "rpc_url": rpc_url,
+        "n_tx": len(hashes),
+        "sequential_time_s": seq_s,
+        "sequential_result": list(reference),
+        "results": rows,
+    }, indent=2))
+    print(f"\nJSON: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,158 @@
+"""Benchmark: latência de espera de receipt (polling vs newHeads por WebSocket).
+
+Envia ``--txs`` transferências simples da PRIVATE_KEY, uma por vez, e mede do
+envio até o receipt em mãos com quatro esperas:
+
+  legacy      — ``Web3(HTTPProvider)`` novo, sem pool compartilhado, e
+                ``wait_for_transaction_receipt`` padrão (polling de 0,1 s),
+                como onchain_dao/onchain_job faziam;
+  poll        — `flower_fl.chain.ReceiptWaiter` em polling (``--poll-s``),
+                sobre o Web3 compartilhado (sessão com pool keep-alive);
+  poll_fast   — idem com ``--poll-fast-s``;
+  ws          — ``newHeads`` por WebSocket (RPC_WS_URL ou o RPC_URL com ws://).
+
+Com automine (default do ``npx hardhat node``) o receipt já existe quando o
+envio retorna e as esperas só diferem no custo das chamadas; ``--interval-ms``
+troca para mineração por intervalo (``evm_setAutomine false`` +
+``evm_setIntervalMining``), o cenário em que o intervalo de polling aparece, e
+restaura o automine no fim.
+
+Saída: results/receipt_wait_benchmark.json (p50/p90/p99 por modo)
+
+Uso:
+  python scripts/bench_receipt_wait.py --txs 50 --interval-ms 1000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from dotenv import load_dotenv
+from eth_account import Account
+from web3 import Web3
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from flower_fl.chain import ReceiptWaiter, get_web3
+
+load_dotenv()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class Sender:
+    """Transferências de 1 wei com nonce local (uma por vez)."""
+
+    def __init__(self, w3: Web3, account):
+        self.w3 = w3
+        self.account = account
+        self.to = Account.create().address
+        self.nonce = w3.eth.get_transaction_count(account.address, "pending")
+        self.chain_id = w3.eth.chain_id
+
+    def send(self) -> str:
+        gas_price = self.w3.eth.gas_price
+        tx = {
+            "to": self.to, "value": 1, "gas": 21_000, "nonce": self.nonce,
+            "maxFeePerGas": gas_price * 2, "maxPriorityFeePerGas": 1, "chainId": self.chain_id,
+        }
+        self.nonce += 1
+        return self.w3.eth.send_raw_transaction(self.account.sign_transaction(tx).rawTransaction).hex()
+
+
+def measure(sender: Sender, wait: Callable[[str], object], n: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        wait(sender.send())
+        samples.append(time.perf_counter() - t0)
+    return {
+        "n": n,
+        "mean_s": statistics.fmean(samples),
+        "p50_s": _percentile(samples, 0.50),
+        "p90_s": _percentile(samples, 0.90),
+        "p99_s": _percentile(samples, 0.99),
+        "max_s": max(samples),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Latência de espera de receipt (poll vs newHeads)")
+    p.add_argument("--txs", type=int, default=50, help="txs por modo")
+    p.add_argument("--interval-ms", type=int, default=0, help="mineração por intervalo (0 = automine)")
+    p.add_argument("--poll-s", type=float, default=0.1)
+    p.add_argument("--poll-fast-s", type=float, default=0.02)
+    p.add_argument("--modes", type=str, default="legacy,poll,poll_fast,ws")
+    p.add_argument("--output", type=Path, default=Path("results/receipt_wait_benchmark.json"))
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    rpc_url = os.getenv("RPC_URL", "").strip()
+    if not rpc_url:
+        raise RuntimeError("RPC_URL nao encontrado no ambiente/.env")
+    w3 = get_web3(rpc_url)
+    if not w3.is_connected():
+        raise RuntimeError("Nao foi possivel conectar ao RPC. Hardhat esta no ar?")
+    sender = Sender(w3, Account.from_key(os.environ["PRIVATE_KEY"]))
+
+    if args.interval_ms > 0:
+        w3.provider.make_request("evm_setAutomine", [False])
+        w3.provider.make_request("evm_setIntervalMining", [args.interval_ms])
+
+    rows = []
+    try:
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            if mode == "legacy":
+                legacy = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": 60}))
+                wait = legacy.eth.wait_for_transaction_receipt
+            elif mode in ("poll", "poll_fast"):
+                waiter = ReceiptWaiter(w3, "poll", poll_latency=args.poll_s if mode == "poll" else args.poll_fast_s)
+                wait = waiter.wait
+            elif mode == "ws":
+                waiter = ReceiptWaiter(w3, "ws")
+                if not waiter.ws_connected:
+                    print(f"{mode:<10} pulado: WebSocket indisponível em {waiter.ws_url}")
+                    continue
+                wait = waiter.wait
+            else:
+                raise SystemExit(f"modo desconhecido: {mode}")
+            row = {"mode": mode, **measure(sender, wait, args.txs)}
+            rows.append(row)
+            print(f"{mode:<10} p50={row['p50_s'] * 1000:8.1f}ms  p90={row['p90_s'] * 1000:8.1f}ms  "
+                  f"p99={row['p99_s'] * 1000:8.1f}ms")
+    finally:
+        if args.interval_ms > 0:
+            w3.provider.make_request("evm_setIntervalMining", [0])
+            w3.provider.make_request("evm_setAutomine", [True])
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        "timestamp": datetime.now().isoformat(),
+        "rpc_url": rpc_url,
+        "interval_ms": args.interval_ms,
+        "poll_s": args.poll_s,
+        "poll_fast_s": args.poll_fast_s,
+        "results": rows,
+    }, indent=2))
+    print(f"\nJSON: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+"""Benchmark: matching via índice em memória (flower_fl.trainer_index) vs. DAO.matchTrainers.
+
+Implanta um DAO novo (bytecode do artefato) no nó Hardhat local, registra
+trainers sintéticos em thresholds (default 100, 1000, 10000) e, a cada
+threshold, mede a latência por consulta de:
+
+  onchain_indexed — ``eth_call`` de ``DAO.matchTrainers``;
+  onchain_scan    — ``eth_call`` de ``DAO.matchTrainersScan`` (legado);
+  offchain_index  — ``TrainerIndex.query`` (já sincronizado).
+
+Também registra o tempo de bootstrap/sync do índice e a staleness (em
+blocos) antes e depois de um ``sync`` com um registro novo pendente. Tags
+sintéticas como em scripts/load_test_matching.ts: pares recebem "cuda", 1 a
+cada 100 recebe "gpu-a100".
+
+Saída: results/trainer_index_benchmark.json
+
+Uso (com ``npx hardhat node`` rodando e ``npx hardhat compile`` feito):
+  python scripts/bench_trainer_index.py --thresholds 100,1000,10000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from dotenv import load_dotenv
+from eth_account import Account
+from web3 import Web3
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from flower_fl.chain import get_web3, wait_for_receipt
+from flower_fl.multicall import multicall_from_env
+from flower_fl.trainer_index import TrainerIndex
+
+load_dotenv()
+
+RARE_EVERY = 100
+CANDIDATES = 5
+QUERIES: Dict[str, tuple] = {
+    # (description, valueByUpdate, minRating, tags, canditatesToReturn)
+    "no_filter": ("", 0, 0, [], CANDIDATES),
+    "common_tag": ("", 0, 0, ["cuda"], CANDIDATES),
+    "rare_tag": ("", 0, 0, ["gpu-a100"], CANDIDATES),
+    "common_and_rare": ("", 0, 0, ["cuda", "gpu-a100"], CANDIDATES),
+    "min_rating_unmet": ("", 0, 11, [], CANDIDATES),
+}
+
+
+def _artifact(name: str) -> dict:
+    return json.loads((ROOT / f"artifacts/contracts/{name}.sol/{name}.json").read_text())
+
+
+def _tags_for(i: int) -> List[str]:
+    tags = ["cuda"] if i % 2 == 0 else []
+    if i % RARE_EVERY == RARE_EVERY - 1:
+        tags.append("gpu-a100")
+    return tags
+
+
+class Registrar:
+    """Registra trainers sintéticos com contas novas (uma por trainer)."""
+
+    def __init__(self, w3: Web3, dao, trainer_abi: list):
+        self.w3 = w3
+        self.dao = dao
+        self.trainer = w3.eth.contract(abi=trainer_abi)
+        self.chain_id = w3.eth.chain_id
+        self.count = 0
+
+    def _send(self, acct, fn, nonce: int, gas: int) -> bytes:
+        gas_price = self.w3.eth.gas_price
+        tx = fn.build_transaction({
+            "from": acct.address,
+            "nonce": nonce,
+            "gas": gas,
+            "maxFeePerGas": gas_price * 2,
+            "maxPriorityFeePerGas": 1,
+            "chainId": self.chain_id,
+        })
+        return self.w3.eth.send_raw_transaction(acct.sign_transaction(tx).rawTransaction)
+
+    def register(self, n: int, batch: int = 250) -> None:
+        while n > 0:
+            size = min(batch, n)
+            accounts = [Account.create() for _ in range(size)]
+            for a in accounts:
+                self.w3.provider.make_request("hardhat_setBalance", [a.address, hex(10 ** 17)])
+            hashes = []
+            for k, a in enumerate(accounts):
+                i = self.count + k
+                spec = (f"CPU-{i}", "16GB", "8 cores")
+                hashes.append(self._send(a, self.dao.functions.registerTrainer(f"Trainer sintético {i}", spec), 0, 3_000_000))
+            wait_for_receipt(hashes[-1], w3=self.w3)
+            tagged = [(a, _tags_for(self.count + k)) for k, a in enumerate(accounts)]
+            tagged = [(a, t) for a, t in tagged if t]
+            hashes = []
+            for a, tags in tagged:
+                contract = self.dao.functions.trainers(a.address).call()
+                fn = self.trainer(address=contract).functions.setTags(tags)
+                hashes.append(self._send(a, fn, 1, 800_000))
+            if hashes:
+                wait_for_receipt(hashes[-1], w3=self.w3)
+            self.count += size
+            n -= size
+            print(f"  ... {self.count} trainers registrados")
+
+
+def _median_ms(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark do índice de matching off-chain")
+    p.add_argument("--thresholds", type=str, default="100,1000,10000")
+    p.add_argument("--repeats", type=int, default=20)
+    p.add_argument("--output", type=Path, default=Path("results/trainer_index_benchmark.json"))
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    rpc_url = os.getenv("RPC_URL", "").strip()
+    if not rpc_url:
+        raise RuntimeError("RPC_URL nao encontrado no ambiente/.env")
+    w3 = get_web3(rpc_url, timeout=120)
+    deployer = Account.from_key(os.environ["PRIVATE_KEY"])
+
+    dao_art, trainer_art = _artifact("DAO"), _artifact("Trainer")
+    factory = w3.eth.contract(abi=dao_art["abi"], bytecode=dao_art["bytecode"])
+    tx = factory.constructor().build_transaction({
+        "from": deployer.address,
+        "nonce": w3.eth.get_transaction_count(deployer.address),
+        "chainId": w3.eth.chain_id,
+    })
+    rcpt = wait_for_receipt(
+        w3.eth.send_raw_transaction(deployer.sign_transaction(tx).rawTransaction), w3=w3
+    )
+    dao = w3.eth.contract(address=rcpt.contractAddress, abi=dao_art["abi"])
+    print(f"DAO implantado em {dao.address}")
+
+    registrar = Registrar(w3, dao, trainer_art["abi"])
+    index = TrainerIndex(w3, dao.address, dao_art["abi"], trainer_art["abi"], multicall=multicall_from_env(w3))
+    print(f"Bulk reads via {index.mc.mode}")
+
+    rows = []
+    thresholds = sorted(int(x) for x in args.thresholds.split(",") if x.strip())
+    for target in thresholds:
+        registrar.register(target - registrar.count)
+
+        t0 = time.perf_counter()
+        sync_stats = index.sync()
+        sync_s = time.perf_counter() - t0
+
+        # Staleness: um registro novo fica pendente até o próximo sync.
+        registrar.register(1)
+        stale_before = index.staleness_blocks()
+        t0 = time.perf_counter()
+        index.sync()
+        incremental_sync_s = time.perf_counter() - t0
+        stale_after = index.staleness_blocks()
+
+        for name, req in QUERIES.items():
+            row = {"n_trainers": len(index), "query": name}
+            offchain = index.query_requirements(req)
+            row["offchain_index_ms"] = _median_ms(lambda: index.query_requirements(req), args.repeats)
+            for label, fn_name in (("onchain_indexed", "matchTrainers"), ("onchain_scan", "matchTrainersScan")):
+                fn = getattr(dao.functions, fn_name)(req)
+                try:
+                    onchain = [a for a in fn.call() if int(a, 16) != 0]
+                    row[f"{label}_ms"] = _median_ms(fn.call, max(3, args.repeats // 4))
+                    row[f"{label}_agrees"] = sorted(onchain) == sorted(offchain) if len(offchain) < CANDIDATES else None
+                except Exception as exc:  # varredura acima do gas cap do eth_call
+                    row[f"{label}_ms"] = None
+                    row[f"{label}_error"] = str(exc).splitlines()[0]
+            if row.get("onchain_indexed_ms"):
+                row["speedup_vs_onchain_indexed"] = row["onchain_indexed_ms"] / max(row["offchain_index_ms"], 1e-9)
+            row.update(
+                sync_s=sync_s,
+                sync_mode="bootstrap" if "bootstrap" in sync_stats else "incremental",
+                incremental_sync_s=incremental_sync_s,
+                staleness_before_sync=stale_before,
+                staleness_after_sync=stale_after,
+            )
+            rows.append(row)
+            print(f"N={row['n_trainers']:<6} {name:<17} off={row['offchain_index_ms']:.4f}ms "
+                  f"on={row.get('onchain_indexed_ms')}ms scan={row.get('onchain_scan_ms')}ms")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({
+        "timestamp": datetime.now().isoformat(),
+        "rpc_url": rpc_url,
+        "dao_address": dao.address,
+        "bulk_read_mode": index.mc.mode,
+        "repeats": args.repeats,
+        "results": rows,
+    }, indent=2))
+    print(f"\nJSON: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
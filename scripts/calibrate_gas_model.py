@@ -0,0 +1,215 @@
+"""Calibração e validação do modelo de gas da chain simulada (flower_fl/gas_model.py).
+
+Mede no nó local o gas de cada operação de ancoragem para vários tamanhos de
+payload e ajusta ``gas = a + b * bytes_de_calldata`` por operação:
+
+  publishGlobalModel        (servidor, ANCHOR_POLICY / checkpoints)
+  recordClientUpdate        (clientes, ANCHOR_MODE=client)
+  recordClientUpdateBatch   (servidor, ANCHOR_MODE=batch; --batch-sizes)
+
+Cada operação roda num job novo (deploy_job), para que a primeira chamada
+registre o custo ``cold`` (primeira escrita do job) e as demais o ``warm``.
+Num nó Hardhat/Anvil a chain é revertida ao fim (``evm_snapshot`` tirado
+antes dos deploys) e o JOB_ADDR/JOB_ADDRS do .env voltam aos valores de
+antes; em outra rede os jobs de calibração ficam.
+
+Validação: o modelo é ajustado de novo só com metade dos tamanhos e avaliado
+na outra metade (erro absoluto/relativo por operação). ``--compare REAL SIM``
+compara ainda o total_gas_eth de dois server_metrics.json da mesma
+configuração — um com a chain real, outro com CHAIN_SIM=true.
+
+Saídas: results/gas_model.json (GAS_MODEL_FILE) e
+results/gas_model_validation.json
+
+Uso:
+  python scripts/calibrate_gas_model.py --sizes 0,34,46,71,128,512,2048 --reps 3
+  python multi_run.py --mode full --clients-list 50 --rounds 20 --sim-chain
+  python scripts/calibrate_gas_model.py --validate-only \\
+      --compare results/real/server_metrics.json results/sim/server_metrics.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+load_dotenv()
+os.environ["CHAIN_SIM"] = "false"  # a calibração mede a chain real
+# Os deploys de calibração não sobrescrevem o breakdown do marketplace.
+os.environ["MARKETPLACE_GAS_FILE"] = os.devnull
+
+from flower_fl.gas_model import DEFAULT_MODEL_FILE, GasModel, calldata_bytes, validate
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Calibração do modelo de gas (CHAIN_SIM)")
+    p.add_argument("--sizes", type=str, default="0,34,46,71,128,256,512,1024,2048",
+                   help="Tamanhos de payload (bytes) medidos por operação.")
+    p.add_argument("--reps", type=int, default=3)
+    p.add_argument("--batch-sizes", type=str, default="4,16")
+    p.add_argument("--output", type=Path, default=Path(os.getenv("GAS_MODEL_FILE", DEFAULT_MODEL_FILE)))
+    p.add_argument("--validation", type=Path, default=Path("results/gas_model_validation.json"))
+    p.add_argument("--samples", type=Path, default=Path("results/gas_model_samples.json"),
+                   help="Amostras medidas (reusadas por --validate-only).")
+    p.add_argument("--validate-only", action="store_true",
+                   help="Não envia txs: reusa --samples e --output.")
+    p.add_argument("--compare", nargs=2, action="append", default=[], metavar=("REAL", "SIM"),
+                   help="Par de server_metrics.json (chain real, CHAIN_SIM) a comparar.")
+    return p.parse_args()
+
+
+def _measure(oj, job_addr: str, operation: str, fn) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    r = oj._wait(oj._broadcast(fn))
+    latency = time.perf_counter() - t0
+    if r["status"] != 1:
+        raise RuntimeError(f"{operation} revertida: {r['hash']}")
+    return {
+        "operation": operation,
+        "job": job_addr,
+        "calldata_bytes": calldata_bytes(fn),
+        "gas_used": int(r["gasUsed"]),
+        "gas_price_wei": int(round(r["gasETH"] * 1e18 / r["gasUsed"])),
+        "latency_s": latency,
+    }
+
+
+def calibrate(sizes: List[int], reps: int, batch_sizes: List[int]) -> List[Dict[str, Any]]:
+    from dotenv import dotenv_values, find_dotenv, set_key
+
+    from flower_fl.chain_state import ChainStateManager
+
+    state = ChainStateManager()
+    env_file = find_dotenv(usecwd=True)
+    saved = {k: v for k, v in dotenv_values(env_file).items() if k in ("JOB_ADDR", "JOB_ADDRS")}
+    snapshot = state._rpc("evm_snapshot") if state.supported else None
+    if snapshot is None:
+        print("[calibração] nó sem evm_snapshot: os jobs de calibração ficam na chain")
+
+    samples: List[Dict[str, Any]] = []
+    try:
+        plan = [
+            ("publishGlobalModel", 1, lambda job, h, payload: job.functions.publishGlobalModel(h, payload)),
+            ("recordClientUpdate", len(sizes) * reps,
+             lambda job, h, payload: job.functions.recordClientUpdate(h, payload)),
+        ] + [
+            ("recordClientUpdateBatch", bs * len(sizes) * reps,
+             lambda job, h, payload, bs=bs: job.functions.recordClientUpdateBatch(h, bs, payload))
+            for bs in batch_sizes
+        ]
+        oj = None
+        for operation, capacity, build in plan:
+            job_addr = state.deploy_job(capacity)
+            if oj is None:
+                from flower_fl import onchain_job as oj  # import tardio: depois do 1º deploy
+            job = oj._job(job_addr)
+            first = True
+            for _ in range(reps):
+                for size in sizes:
+                    s = _measure(oj, job_addr, operation, build(job, os.urandom(32), os.urandom(size)))
+                    s["cold"], first = first, False
+                    s["payload_bytes"] = size
+                    samples.append(s)
+            print(f"[calibração] {operation:<24} job={job_addr}  "
+                  f"{sum(1 for s in samples if s['job'] == job_addr)} amostras")
+    finally:
+        if snapshot is not None:
+            state._rpc("evm_revert", [snapshot])
+            print("[calibração] chain revertida ao estado anterior")
+            for key, value in saved.items():
+                set_key(env_file, key, value)
+                os.environ[key] = value
+    return samples
+
+
+def _compare_runs(real: Path, sim: Path) -> Dict[str, Any]:
+    r = json.loads(real.read_text())
+    s = json.loads(sim.read_text())
+    g_real = float(r.get("total_gas_eth", 0.0) or 0.0)
+    g_sim = float(s.get("total_gas_eth", 0.0) or 0.0)
+
+    def _ops(data):
+        out: Dict[str, int] = {}
+        for g in data.get("gas_breakdown", []):
+            out[g["operation"]] = out.get(g["operation"], 0) + 1
+        return out
+
+    return {
+        "real": str(real),
+        "sim": str(sim),
+        "real_total_gas_eth": g_real,
+        "sim_total_gas_eth": g_sim,
+        "rel_error": abs(g_sim - g_real) / g_real if g_real else None,
+        "real_ops": _ops(r),
+        "sim_ops": _ops(s),
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    batch_sizes = [int(x) for x in args.batch_sizes.split(",") if x.strip()]
+
+    if args.validate_only:
+        samples = json.loads(args.samples.read_text())
+        model = GasModel.load(args.output)
+    else:
+        samples = calibrate(sizes, args.reps, batch_sizes)
+        args.samples.parent.mkdir(parents=True, exist_ok=True)
+        args.samples.write_text(json.dumps(samples, indent=2))
+        model = GasModel.fit(
+            samples,
+            calibrated_at=datetime.now().isoformat(),
+            rpc_url=os.getenv("RPC_URL"),
+            store_update_hashes=os.getenv("STORE_UPDATE_HASHES", "true"),
+            sizes=sizes,
+            batch_sizes=batch_sizes,
+        )
+        model.save(args.output)
+        print(f"Modelo: {args.output}  (gas price {model.gas_price_wei / 1e9:.3f} gwei, "
+              f"{len(model.latencies_s)} latências)")
+
+    # Held-out: ajusta com os tamanhos de índice par, avalia nos ímpares.
+    ordered = sorted({s["payload_bytes"] for s in samples})
+    train_sizes = set(ordered[0::2])
+    train = [s for s in samples if s["payload_bytes"] in train_sizes or s["cold"]]
+    test = [s for s in samples if s["payload_bytes"] not in train_sizes and not s["cold"]]
+    report: Dict[str, Any] = {
+        "timestamp": datetime.now().isoformat(),
+        "model": str(args.output),
+        "in_sample": validate(model, samples),
+        "held_out": validate(GasModel.fit(train), test) if test else {},
+        "held_out_sizes": sorted({s["payload_bytes"] for s in test}),
+        "runs": [_compare_runs(Path(a), Path(b)) for a, b in args.compare],
+    }
+
+    print(f"\n{'operação':<26}{'n':>5}{'erro médio (gas)':>18}{'erro máx (gas)':>16}{'erro rel máx':>14}")
+    for label, rows in (("in-sample", report["in_sample"]), ("held-out", report["held_out"])):
+        print(f"-- {label}")
+        for op, v in rows.items():
+            print(f"{op:<26}{v['n']:>5}{v['mean_abs_error_gas']:>18.1f}{v['max_abs_error_gas']:>16.0f}"
+                  f"{v['max_rel_error'] * 100:>13.2f}%")
+    for run in report["runs"]:
+        rel = run["rel_error"]
+        print(f"run real={run['real_total_gas_eth']:.8f} ETH  sim={run['sim_total_gas_eth']:.8f} ETH  "
+              f"erro={rel * 100 if rel is not None else float('nan'):.2f}%")
+
+    args.validation.parent.mkdir(parents=True, exist_ok=True)
+    args.validation.write_text(json.dumps(report, indent=2))
+    print(f"\nJSON: {args.validation}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -48,6 +48,28 @@ async function main() {
 
   writeFileSync(filePath, JSON.stringify(payload, null, 2), { encoding: "utf-8" });
   console.log(format("Saved deployment info to %s", filePath));
+
+  // Multicall (leituras em massa — flower_fl/multicall.py o descobre por este arquivo)
+  const multicall = await viem.deployContract("contracts/Multicall.sol:Multicall", []);
+  console.log("Multicall deployed at:", multicall.address);
+
+  const multicallPath = join(outDir, `multicall-${chain}.json`);
+  writeFileSync(
+    multicallPath,
+    JSON.stringify(
+      {
+        multicall: multicall.address,
+        chainId: Number(chain),
+        network: connection.networkName,
+        deployer: wallet.account.address,
+        timestamp: new Date().toISOString(),
+      },
+      null,
+      2,
+    ),
+    { encoding: "utf-8" },
+  );
+  console.log(format("Saved deployment info to %s", multicallPath));
 }
 
 main().catch((err) => {
@@ -14,6 +14,18 @@ Saidas:
 Uso:
   python scripts/e2e_scaling_experiment.py \
       --clients-list 2,4,8,16,32 --rounds 3 --repetitions 1
+
+  # ancoragem em lote (uma raiz de Merkle por round, tx do servidor):
+  python scripts/e2e_scaling_experiment.py --anchor-mode batch
+
+  # gas lido do indexador SQLite (flower_fl/indexer.py) em vez de 1 receipt/tx:
+  python scripts/e2e_scaling_experiment.py --index-db results/events.sqlite
+
+  # no Hardhat local: job/contas preparados uma vez, evm_revert antes de cada run
+  python scripts/e2e_scaling_experiment.py --repetitions 3 --chain-snapshot
+
+  # chain simulada (flower_fl/gas_model.py): gas do modelo calibrado, sem minerar
+  python scripts/e2e_scaling_experiment.py --clients-list 32,64,128 --sim-chain
 """
 
 from __future__ import annotations
@@ -35,6 +47,9 @@ ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from flower_fl.chain import get_web3
+from flower_fl.gas_model import ledger_gas
+from flower_fl.receipts import sum_gas
 from multi_run import _extract_run_stats, run_full
 
 
@@ -59,6 +74,9 @@ def _collect_tx_hashes(metrics: Dict) -> List[str]:
         tx = r.get("tx_hash")
         if tx:
             hashes.append(str(tx))
+        btx = r.get("update_batch_tx_hash")
+        if btx:
+            hashes.append(str(btx))
         for c in (r.get("client_metrics") or []):
             ctx = c.get("tx_hash")
             if ctx:
@@ -73,7 +91,36 @@ def _collect_tx_hashes(metrics: Dict) -> List[str]:
     return uniq
 
 
+def _count_dropped_anchors(metrics: Dict, n_clients: int) -> int:
+    """Âncoras de cliente perdidas: N por rodada menos as confirmadas.
+
+    Usa ``anchor_ok`` das client_metrics; métricas antigas (sem o campo) e
+    ANCHOR_ASYNC contam pela presença do tx_hash, e as falhas confirmadas
+    depois (``anchor_failed``, reportado em rounds seguintes) são somadas.
+    """
+    dropped = 0
+    for r in metrics.get("rounds", []):
+        if int(r.get("round", 0)) <= 0:
+            continue
+        ok = 0
+        for c in (r.get("client_metrics") or []):
+            flag = c.get("anchor_ok")
+            ok += int(flag == 1) if flag is not None else int(bool(c.get("tx_hash")))
+            dropped += int(c.get("anchor_failed", 0) or 0)
+        dropped += max(0, n_clients - ok)
+    return dropped
+
+
 def _sum_gas_from_receipts(w3: Web3, tx_hashes: List[str]) -> Tuple[int, float, int]:
+    """Soma o gas dos receipts via JSON-RPC em lote, com concorrência limitada.
+
+    Ver flower_fl/receipts.py; `_sum_gas_from_receipts_sequential` mantém o
+    caminho antigo (1 eth_getTransactionReceipt por vez) para comparação.
+    """
+    return sum_gas(w3.provider.endpoint_uri, tx_hashes)
+
+
+def _sum_gas_from_receipts_sequential(w3: Web3, tx_hashes: List[str]) -> Tuple[int, float, int]:
     gas_used_total = 0
     gas_eth_total = 0.0
     missing = 0
@@ -89,6 +136,14 @@ def _sum_gas_from_receipts(w3: Web3, tx_hashes: List[str]) -> Tuple[int, float,
     return gas_used_total, gas_eth_total, missing
 
 
+def _sum_gas_from_index(indexer, w3: Web3, tx_hashes: List[str]) -> Tuple[int, float, int]:
+    """Gas a partir do índice SQLite; só as tx ausentes do índice vão ao RPC."""
+    indexer.sync()
+    gas_used, gas_eth, rest = indexer.gas_lookup(tx_hashes)
+    r_used, r_eth, missing = _sum_gas_from_receipts(w3, rest)
+    return gas_used + r_used, gas_eth + r_eth, missing
+
+
 def _load_setup_gas_eth(path: Path) -> float:
     if not path.exists():
         return 0.0
@@ -113,23 +168,57 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--repetitions", type=int, default=1)
     p.add_argument("--output-dir", type=Path, default=Path("results/e2e_scaling"))
     p.add_argument("--setup-breakdown", type=Path, default=Path("results/marketplace_gas_breakdown.json"))
+    p.add_argument("--anchor-mode", choices=["client", "batch"], default=None,
+                   help="ANCHOR_MODE repassado a server/clientes (default: o do ambiente).")
+    p.add_argument("--index-db", type=Path, default=None,
+                   help="Banco do indexador de eventos (flower_fl/indexer.py) usado para o gas.")
+    p.add_argument("--chain-snapshot", action="store_true",
+                   help="Nó local: cria/financia o job uma vez, tira um evm_snapshot e reverte "
+                        "antes de cada run (flower_fl/chain_state.py).")
+    p.add_argument("--sim-chain", action="store_true",
+                   help="CHAIN_SIM=true: gas/latência do modelo calibrado; gas somado do ledger simulado.")
     return p.parse_args()
 
 
 def main() -> int:
     args = parse_args()
     clients_list = [int(x.strip()) for x in args.clients_list.split(",") if x.strip()]
+    if args.anchor_mode:
+        # run_full copia os.environ para server e clientes.
+        os.environ["ANCHOR_MODE"] = args.anchor_mode
+    anchor_mode = os.getenv("ANCHOR_MODE", "client")
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    ledger = None
+    if args.sim_chain:
+        ledger = args.output_dir / "sim_ledger.jsonl"
+        ledger.unlink(missing_ok=True)
+        os.environ["CHAIN_SIM"] = "true"
+        os.environ["SIM_CHAIN_LEDGER"] = str(ledger)
 
     rpc_url = os.getenv("RPC_URL", "").strip()
     if not rpc_url:
         raise RuntimeError("RPC_URL nao encontrado no ambiente/.env")
-    w3 = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": 60}))
-    if not w3.is_connected():
+    w3 = get_web3(rpc_url)
+    if ledger is None and not w3.is_connected():
         raise RuntimeError("Nao foi possivel conectar ao RPC. Hardhat esta no ar?")
 
+    from flower_fl.dataset_cache import prepare_for_clients
+    prepare_for_clients()
+
+    # Antes do setup_gas: um job novo reescreve o breakdown do marketplace.
+    chain_state = None
+    if args.chain_snapshot and ledger is None:
+        from flower_fl.chain_state import prepare_chain_state
+        chain_state = prepare_chain_state(max(clients_list), args.rounds)
+
     setup_gas_eth = _load_setup_gas_eth(args.setup_breakdown)
 
-    args.output_dir.mkdir(parents=True, exist_ok=True)
+    indexer = None
+    if args.index_db is not None:
+        from flower_fl.indexer import indexer_from_env
+        indexer = indexer_from_env(args.index_db)
+
     raw_dir = args.output_dir / "raw"
     raw_dir.mkdir(parents=True, exist_ok=True)
 
@@ -144,14 +233,30 @@ def main() -> int:
             "gas_training_used": [],
             "gas_with_setup_eth": [],
             "missing_receipts": [],
+            "dropped_anchors": [],
+            "gas_lookup_s": [],
         }
         for n in clients_list
     }
 
     print("\n" + "=" * 82)
-    print(f" E2E SCALING  N={clients_list} rounds={args.rounds} reps={args.repetitions}")
+    print(f" E2E SCALING  N={clients_list} rounds={args.rounds} reps={args.repetitions} "
+          f"anchor={anchor_mode}")
     print("=" * 82)
 
+    job_addr = os.getenv("JOB_ADDR", "").strip()
+    if anchor_mode == "client" and job_addr and chain_state is None and ledger is None:
+        from flower_fl.onchain_job import job_remaining_updates
+        try:
+            remaining = job_remaining_updates(job_addr)
+        except Exception as e:
+            remaining = None
+            print(f"[WARN] remainingUpdates({job_addr}) falhou: {e}")
+        needed = max(clients_list) * args.rounds * args.repetitions
+        if remaining is not None and remaining < needed:
+            print(f"[WARN] job {job_addr} aceita mais {remaining} updates, a maior série precisa de "
+                  f"{needed}: recrie o job com JOB_NUMBER_OF_UPDATES maior")
+
     for n in clients_list:
         for rep in range(1, args.repetitions + 1):
             seed = rep
@@ -162,6 +267,8 @@ def main() -> int:
             log_dir = Path("logs/e2e_scaling") / tag
 
             print(f"\n>> run {tag} ...")
+            if chain_state is not None:
+                print(f"   evm_revert: {chain_state.revert():.1f}ms")
             t0 = time.perf_counter()
             ok = run_full(n, args.rounds, seed, metrics_file, log_dir)
             t1 = time.perf_counter()
@@ -181,7 +288,15 @@ def main() -> int:
                 )
                 continue
             tx_hashes = _collect_tx_hashes(metrics)
-            gas_used, gas_eth, missing = _sum_gas_from_receipts(w3, tx_hashes)
+            _gas_t0 = time.perf_counter()
+            if ledger is not None:
+                gas_used, gas_eth, missing = ledger_gas(ledger, tx_hashes)
+            elif indexer is not None:
+                gas_used, gas_eth, missing = _sum_gas_from_index(indexer, w3, tx_hashes)
+            else:
+                gas_used, gas_eth, missing = _sum_gas_from_receipts(w3, tx_hashes)
+            gas_lookup_s = time.perf_counter() - _gas_t0
+            dropped = _count_dropped_anchors(metrics, n) if anchor_mode == "client" else 0
 
             updates = n * args.rounds
             throughput_updates = float(updates / wall) if wall > 0 else 0.0
@@ -195,6 +310,8 @@ def main() -> int:
             runs[str(n)]["gas_training_used"].append(float(gas_used))
             runs[str(n)]["gas_with_setup_eth"].append(float(setup_gas_eth + gas_eth))
             runs[str(n)]["missing_receipts"].append(float(missing))
+            runs[str(n)]["dropped_anchors"].append(float(dropped))
+            runs[str(n)]["gas_lookup_s"].append(float(gas_lookup_s))
 
             print(
                 "   "
@@ -202,7 +319,9 @@ def main() -> int:
                 f"thr_updates={throughput_updates:.3f}/s | "
                 f"gas_train={gas_eth:.8f} ETH | "
                 f"acc={stats['final_accuracy']:.4f} | "
-                f"missing_receipts={missing}"
+                f"missing_receipts={missing} | "
+                f"dropped_anchors={dropped} | "
+                f"gas_lookup={gas_lookup_s * 1000:.1f}ms ({len(tx_hashes)} tx)"
             )
 
     rows = []
@@ -223,6 +342,8 @@ def main() -> int:
                 "mean_gas_training_used": _mean(runs[k]["gas_training_used"]),
                 "mean_gas_with_setup_eth": _mean(runs[k]["gas_with_setup_eth"]),
                 "mean_missing_receipts": _mean(runs[k]["missing_receipts"]),
+                "mean_dropped_anchors": _mean(runs[k]["dropped_anchors"]),
+                "mean_gas_lookup_s": _mean(runs[k]["gas_lookup_s"]),
             }
         )
 
@@ -235,6 +356,9 @@ def main() -> int:
             "repetitions": args.repetitions,
             "setup_breakdown": str(args.setup_breakdown),
             "setup_gas_eth": setup_gas_eth,
+            "anchor_mode": anchor_mode,
+            "gas_source": "sim_ledger" if ledger is not None else "index" if indexer is not None else "receipts",
+            "chain_snapshot": chain_state.stats() if chain_state is not None else None,
         },
         "results": rows,
     }
@@ -258,6 +382,8 @@ def main() -> int:
                 "mean_gas_training_used",
                 "mean_gas_with_setup_eth",
                 "mean_missing_receipts",
+                "mean_dropped_anchors",
+                "mean_gas_lookup_s",
             ],
         )
         writer.writeheader()
@@ -272,7 +398,8 @@ def main() -> int:
             f"N={r['clients']:>2} | time={r['mean_total_time_s']:.2f}s | "
             f"thr={r['mean_throughput_updates_s']:.3f} upd/s | "
             f"gas={r['mean_gas_training_eth']:.8f} ETH | "
-            f"acc={r['mean_accuracy']:.4f}"
+            f"acc={r['mean_accuracy']:.4f} | "
+            f"dropped={r['mean_dropped_anchors']:.1f}"
         )
 
     print(f"\nJSON: {json_out}")
@@ -1,30 +1,39 @@
 /**
- * scripts/load_test_matching.ts — Stress-test do `matchTrainers` do contrato DAO.
+ * scripts/load_test_matching.ts — Stress-test do matching de trainers do DAO:
+ * `matchTrainersScan` (varredura linear legada) vs. `matchTrainers` (índices
+ * tag-hash -> trainers e buckets de rating).
  *
  * Faz deploy de um DAO novo na rede `localhost` (Hardhat node), registra N
- * trainers sintéticos progressivamente em thresholds (10, 50, 100, 500, …)
- * e mede para cada threshold:
- *   - wall clock de `matchTrainers` (view function, via `readContract`)
+ * trainers sintéticos progressivamente em thresholds (10, 50, 100, 500, 1000,
+ * 2000, 5000) e, para cada threshold e cada consulta de `QUERIES`, mede nos
+ * dois caminhos:
+ *   - wall clock da chamada (view, via `readContract`)
  *   - gas estimado da mesma chamada (via `estimateContractGas`).
  *
+ * Tags sintéticas: trainers pares recebem "cuda"; 1 a cada `RARE_EVERY`
+ * recebe também "gpu-a100" (via `Trainer.setTags`, que atualiza o índice do
+ * DAO). O rating inicial é 10 para todos, então `minRating=11` não casa
+ * ninguém — pior caso da varredura.
+ *
  * Uso:
- *   npx hardhat run scripts/load_test_matching.ts --network localhost          # default N=100
- *   npx hardhat run scripts/load_test_matching.ts --network localhost 500      # N=500
+ *   npx hardhat run scripts/load_test_matching.ts --network localhost                   # default N=100
+ *   LOAD_TEST_N=5000 npx hardhat run scripts/load_test_matching.ts --network localhost  # N=5000
  *
  * Resultados salvos em `results/matching_load_test.json`.
  *
  * Observações:
  *   - Cada trainer precisa ser um endereço distinto (o DAO usa msg.sender e
  *     bloqueia re-registro). O script gera contas aleatórias com
- *     `generatePrivateKey()` e as financia a partir do funder principal.
- *   - Para N grande (≥ 500) o tempo total domina o funding/registro; a
- *     medição de matchTrainers em si fica rápida (é uma view).
+ *     `generatePrivateKey()` e as financia via `hardhat_setBalance` (ou, se o
+ *     nó não suportar, com uma transferência do funder principal).
+ *   - Para N grande a varredura pode estourar o gas cap de `eth_call`/
+ *     `eth_estimateGas`; a linha é registrada com `error` em vez de abortar.
  */
 /// <reference types="hardhat/types" />
 import { mkdirSync, readFileSync, writeFileSync } from "node:fs";
 import { resolve } from "node:path";
 import { network } from "hardhat";
-import { createWalletClient, http, parseEther } from "viem";
+import { createWalletClient, http, parseEther, toHex, zeroAddress } from "viem";
 import { generatePrivateKey, privateKeyToAccount } from "viem/accounts";
 import { hardhat as hardhatChain } from "viem/chains";
 
@@ -33,13 +42,43 @@ const RPC_URL = process.env.LOCAL_RPC_URL ?? "http://127.0.0.1:8545";
 // args (process.argv[2] is "run"), so prefer the LOAD_TEST_N env var.
 const N_RAW = process.env.LOAD_TEST_N ?? process.argv[2] ?? "100";
 const N_MAX = parseInt(N_RAW, 10);
-const DEFAULT_THRESHOLDS = [10, 50, 100, 500];
+const DEFAULT_THRESHOLDS = [10, 50, 100, 500, 1000, 2000, 5000];
+const RARE_EVERY = 100;
+const CANDIDATES = 5n;
+
+type Requirements = {
+  description: string;
+  valueByUpdate: bigint;
+  minRating: bigint;
+  tags: string[];
+  canditatesToReturn: bigint;
+};
+
+const QUERIES: Record<string, Requirements> = {
+  no_filter: { description: "", valueByUpdate: 0n, minRating: 0n, tags: [], canditatesToReturn: CANDIDATES },
+  common_tag: { description: "", valueByUpdate: 0n, minRating: 0n, tags: ["cuda"], canditatesToReturn: CANDIDATES },
+  rare_tag: { description: "", valueByUpdate: 0n, minRating: 0n, tags: ["gpu-a100"], canditatesToReturn: CANDIDATES },
+  common_and_rare: {
+    description: "",
+    valueByUpdate: 0n,
+    minRating: 0n,
+    tags: ["cuda", "gpu-a100"],
+    canditatesToReturn: CANDIDATES,
+  },
+  min_rating_unmet: { description: "", valueByUpdate: 0n, minRating: 11n, tags: [], canditatesToReturn: CANDIDATES },
+};
+
+const PATHS = { scan: "matchTrainersScan", indexed: "matchTrainers" } as const;
 
 type Measurement = {
   n_trainers: number;
-  time_ms: number;
-  gas_estimated: string;
-  matched_count: number;
+  query: string;
+  path: keyof typeof PATHS;
+  time_ms: number | null;
+  gas_estimated: string | null;
+  matched_count: number | null;
+  results_agree: boolean | null;
+  error?: string;
 };
 
 function buildThresholds(nMax: number): number[] {
@@ -51,9 +90,16 @@ function buildThresholds(nMax: number): number[] {
   return Array.from(set).sort((a, b) => a - b);
 }
 
+function tagsFor(i: number): string[] {
+  const tags: string[] = [];
+  if (i % 2 === 0) tags.push("cuda");
+  if (i % RARE_EVERY === RARE_EVERY - 1) tags.push("gpu-a100");
+  return tags;
+}
+
 async function main(): Promise<void> {
   if (!Number.isFinite(N_MAX) || N_MAX <= 0) {
-    throw new Error(`Argumento N inválido: '${process.argv[2]}'`);
+    throw new Error(`Argumento N inválido: '${N_RAW}'`);
   }
 
   const connection = await network.connect();
@@ -64,10 +110,10 @@ async function main(): Promise<void> {
     throw new Error("Nenhuma carteira disponível na rede. Verifique a configuração.");
   }
 
-  // Carrega ABI do artefato compilado (não tenta tipos gerados).
-  const artifactPath = resolve("artifacts/contracts/DAO.sol/DAO.json");
-  const daoArtifact = JSON.parse(readFileSync(artifactPath, "utf-8"));
-  const daoAbi = daoArtifact.abi as unknown[];
+  // Carrega ABIs dos artefatos compilados (não tenta tipos gerados).
+  const daoAbi = JSON.parse(readFileSync(resolve("artifacts/contracts/DAO.sol/DAO.json"), "utf-8")).abi as unknown[];
+  const trainerAbi = JSON.parse(readFileSync(resolve("artifacts/contracts/Trainer.sol/Trainer.json"), "utf-8"))
+    .abi as unknown[];
 
   console.log(`Deploying DAO (funder=${funder.account.address})...`);
   const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
@@ -77,28 +123,30 @@ async function main(): Promise<void> {
   const thresholds = buildThresholds(N_MAX);
   console.log(`Thresholds: ${thresholds.join(", ")}  (N_MAX=${N_MAX})`);
 
-  const requirements = {
-    description: "",
-    valueByUpdate: 0n,
-    minRating: 0n,
-    tags: [] as string[],
-    canditatesToReturn: 5n,
-  };
+  let useSetBalance = true;
+  async function fund(address: `0x${string}`): Promise<void> {
+    if (useSetBalance) {
+      try {
+        await publicClient.request({
+          method: "hardhat_setBalance" as never,
+          params: [address, toHex(parseEther("0.05"))] as never,
+        });
+        return;
+      } catch {
+        useSetBalance = false;
+      }
+    }
+    const fundHash = await funder.sendTransaction({ to: address, value: parseEther("0.05") });
+    await publicClient.waitForTransactionReceipt({ hash: fundHash });
+  }
 
   const measurements: Measurement[] = [];
   let registered = 0;
 
   for (const target of thresholds) {
     while (registered < target) {
-      const pk = generatePrivateKey();
-      const acc = privateKeyToAccount(pk);
-
-      // Funda a conta com ETH suficiente para 1 tx de registro.
-      const fundHash = await funder.sendTransaction({
-        to: acc.address,
-        value: parseEther("0.05"),
-      });
-      await publicClient.waitForTransactionReceipt({ hash: fundHash });
+      const acc = privateKeyToAccount(generatePrivateKey());
+      await fund(acc.address);
 
       const trainerClient = createWalletClient({
         account: acc,
@@ -120,6 +168,23 @@ async function main(): Promise<void> {
         ],
       });
       await publicClient.waitForTransactionReceipt({ hash: txHash });
+
+      const tags = tagsFor(registered);
+      if (tags.length > 0) {
+        const trainerContract = (await publicClient.readContract({
+          address: daoAddress,
+          abi: daoAbi as never,
+          functionName: "trainers",
+          args: [acc.address],
+        })) as `0x${string}`;
+        const tagsHash = await trainerClient.writeContract({
+          address: trainerContract,
+          abi: trainerAbi as never,
+          functionName: "setTags",
+          args: [tags],
+        });
+        await publicClient.waitForTransactionReceipt({ hash: tagsHash });
+      }
       registered++;
 
       if (registered % 25 === 0) {
@@ -127,41 +192,76 @@ async function main(): Promise<void> {
       }
     }
 
-    // Mede matchTrainers (view).
-    const tStart = performance.now();
-    const matched = (await publicClient.readContract({
-      address: daoAddress,
-      abi: daoAbi as never,
-      functionName: "matchTrainers",
-      args: [requirements],
-    })) as readonly `0x${string}`[];
-    const elapsedMs = performance.now() - tStart;
-
-    const gas = await publicClient.estimateContractGas({
-      account: funder.account.address,
-      address: daoAddress,
-      abi: daoAbi as never,
-      functionName: "matchTrainers",
-      args: [requirements],
-    });
-
-    const m: Measurement = {
-      n_trainers: target,
-      time_ms: Number(elapsedMs.toFixed(3)),
-      gas_estimated: gas.toString(),
-      matched_count: matched.length,
-    };
-    measurements.push(m);
-    console.log(`N=${target}  time=${m.time_ms}ms  gas=${m.gas_estimated}  matched=${m.matched_count}`);
+    for (const [query, requirements] of Object.entries(QUERIES)) {
+      const matchedByPath: Partial<Record<keyof typeof PATHS, string[]>> = {};
+      const rows: Measurement[] = [];
+
+      for (const [path, functionName] of Object.entries(PATHS) as [keyof typeof PATHS, string][]) {
+        const m: Measurement = {
+          n_trainers: target,
+          query,
+          path,
+          time_ms: null,
+          gas_estimated: null,
+          matched_count: null,
+          results_agree: null,
+        };
+        try {
+          const tStart = performance.now();
+          const matched = (await publicClient.readContract({
+            address: daoAddress,
+            abi: daoAbi as never,
+            functionName,
+            args: [requirements],
+          })) as readonly `0x${string}`[];
+          m.time_ms = Number((performance.now() - tStart).toFixed(3));
+          matchedByPath[path] = matched.filter((a) => a !== zeroAddress).map((a) => a.toLowerCase());
+          m.matched_count = matchedByPath[path]!.length;
+
+          const gas = await publicClient.estimateContractGas({
+            account: funder.account.address,
+            address: daoAddress,
+            abi: daoAbi as never,
+            functionName,
+            args: [requirements],
+          });
+          m.gas_estimated = gas.toString();
+        } catch (err) {
+          m.error = (err as Error).message.split("\n")[0];
+        }
+        rows.push(m);
+      }
+
+      // Conjuntos só são comparáveis quando nenhum caminho truncou em `canditatesToReturn`.
+      const { scan, indexed } = matchedByPath;
+      if (scan && indexed && scan.length < Number(CANDIDATES) && indexed.length < Number(CANDIDATES)) {
+        const agree = scan.length === indexed.length && scan.every((a) => indexed.includes(a));
+        for (const r of rows) r.results_agree = agree;
+      }
+      for (const m of rows) {
+        measurements.push(m);
+        console.log(
+          `N=${target} ${query.padEnd(16)} ${m.path.padEnd(7)} time=${m.time_ms}ms gas=${m.gas_estimated} ` +
+            `matched=${m.matched_count}` +
+            (m.error ? `  ERROR: ${m.error}` : ""),
+        );
+      }
+    }
   }
 
   // Tabela final
-  console.log("\nN trainers | tempo (ms) | gas estimado");
-  console.log("-----------|------------|-------------");
-  for (const r of measurements) {
-    console.log(
-      `${String(r.n_trainers).padEnd(11)}| ${String(r.time_ms).padEnd(11)}| ${r.gas_estimated}`,
-    );
+  console.log("\nN trainers | consulta         | scan (ms / gas)          | indexed (ms / gas)");
+  console.log("-----------|------------------|--------------------------|-------------------------");
+  for (const target of thresholds) {
+    for (const query of Object.keys(QUERIES)) {
+      const cell = (path: keyof typeof PATHS) => {
+        const r = measurements.find((x) => x.n_trainers === target && x.query === query && x.path === path);
+        return r && r.time_ms !== null ? `${r.time_ms} / ${r.gas_estimated ?? "n/a"}` : "erro";
+      };
+      console.log(
+        `${String(target).padEnd(11)}| ${query.padEnd(17)}| ${cell("scan").padEnd(25)}| ${cell("indexed")}`,
+      );
+    }
   }
 
   mkdirSync(resolve("results"), { recursive: true });
@@ -173,11 +273,15 @@ async function main(): Promise<void> {
         dao_address: daoAddress,
         n_max: N_MAX,
         thresholds,
+        queries: Object.fromEntries(
+          Object.entries(QUERIES).map(([k, q]) => [k, { ...q, minRating: q.minRating.toString() }]),
+        ),
+        rare_every: RARE_EVERY,
         measurements,
         funder: funder.account.address,
         timestamp: new Date().toISOString(),
       },
-      null,
+      (_key, value) => (typeof value === "bigint" ? value.toString() : value),
       2,
     ),
   );
@@ -160,6 +160,10 @@ def run_security_experiment(
         client_cmd = [PYTHON, "-m", "flower_fl.client"]
         baseline = False
 
+    # Plano de partição (Dirichlet) calculado aqui, uma vez, e não por cliente.
+    from flower_fl.partition import prepare_for_clients as prepare_partition
+    prepare_partition(None, num_clients, seed)
+
     server_log = log_dir / "server.log"
     server = _spawn(server_cmd, env=base_env, log_path=server_log)
     _wait_for_server(server, server_log, timeout=60.0)
@@ -278,6 +282,9 @@ def main() -> int:
     output_dir.mkdir(parents=True, exist_ok=True)
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
+    from flower_fl.dataset_cache import prepare_for_clients
+    prepare_for_clients()
+
     started = datetime.now().isoformat()
     _print_header(
         f" SECURITY EXP  mode={args.mode}  N={args.clients}  rounds={args.rounds}  "
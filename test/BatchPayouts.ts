@@ -0,0 +1,126 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+
+import { network } from "hardhat";
+import { decodeEventLog, keccak256, stringToBytes, zeroAddress } from "viem";
+
+describe("DAO batched job payouts", async function () {
+  const { viem } = await network.connect();
+  const publicClient = await viem.getPublicClient();
+  const [deployer, requester, trainer, payee, stranger] = await viem.getWalletClients();
+
+  if (!deployer || !requester || !trainer || !payee || !stranger) {
+    throw new Error("wallet clients not available");
+  }
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+  const daoAsRequester = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: requester },
+  });
+  const daoAsTrainer = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: trainer },
+  });
+  const daoAsStranger = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: stranger },
+  });
+
+  await daoAsTrainer.write.registerTrainer(["Trainer", ["Proc", "16GB", "8 cores"]]);
+  await daoAsRequester.write.registerRequester();
+
+  const value = 1000n;
+  const updates = 3n;
+  let created = 0;
+
+  // Oferta aceita -> job; `deposit` = signJobContract do requester (trava o escrow).
+  const makeJob = async (deposit: boolean, recorded: number) => {
+    const n = created++;
+    await daoAsRequester.write.MakeOffer([
+      `Payout job ${n}`,
+      keccak256(stringToBytes(`model-${n}`)),
+      keccak256(stringToBytes("endpoint")),
+      "0x",
+      value,
+      updates,
+      trainer.account.address,
+    ]);
+    const [offerId] = await daoAsTrainer.read.getPendingOffers({ account: trainer.account });
+    const receipt = await publicClient.waitForTransactionReceipt({
+      hash: await daoAsTrainer.write.AcceptOffer([offerId]),
+    });
+    const event = decodeEventLog({ abi: dao.abi, data: receipt.logs[0].data, topics: receipt.logs[0].topics });
+    const address = (event.args as { job: `0x${string}` }).job;
+    if (deposit) {
+      await daoAsRequester.write.signJobContract([address], { value: value * updates });
+    }
+    const job = await viem.getContractAt("contracts/JobContract.sol:JobContract", address, {
+      client: { wallet: requester },
+    });
+    for (let i = 0; i < recorded; i++) {
+      await job.write.recordClientUpdate([keccak256(stringToBytes(`sha256:${n}-${i}`)), "0x"]);
+    }
+    return job;
+  };
+
+  const funded = await makeJob(true, 2);
+  const empty = await makeJob(true, 0);
+  const unfunded = await makeJob(false, 1);
+
+  const payouts = (job: { address: `0x${string}` }) =>
+    publicClient.getContractEvents({
+      address: job.address,
+      abi: funded.abi,
+      eventName: "PayoutReleased",
+      fromBlock: 0n,
+    });
+
+  it("pays funded jobs and skips empty or under-funded ones", async function () {
+    const batch = [funded.address, empty.address, unfunded.address] as const;
+    const { result } = await daoAsRequester.simulate.releaseJobPayments([batch, payee.account.address], {
+      account: requester.account,
+    });
+    assert.deepEqual(result, [1n, 2n * value]);
+
+    const before = await publicClient.getBalance({ address: payee.account.address });
+    await daoAsRequester.write.releaseJobPayments([batch, payee.account.address]);
+    const after = await publicClient.getBalance({ address: payee.account.address });
+    assert.equal(after - before, 2n * value);
+
+    const events = await payouts(funded);
+    assert.equal(events.length, 1);
+    assert.equal(events[0].args.to?.toLowerCase(), payee.account.address.toLowerCase());
+    assert.equal(events[0].args.value, 2n * value);
+    assert.equal((await payouts(empty)).length, 0);
+    assert.equal((await payouts(unfunded)).length, 0);
+
+    assert.equal(await funded.read.availableAmount(), 0n);
+    assert.equal(await funded.read.lockedAmount(), value);
+    assert.equal(await unfunded.read.availableAmount(), value);
+  });
+
+  it("reverts the whole batch on an unauthorized caller or unknown job", async function () {
+    const pending = await makeJob(true, 1);
+    await assert.rejects(
+      daoAsStranger.write.releaseJobPayments([[pending.address], payee.account.address]),
+      /Unauthorized release/,
+    );
+    await assert.rejects(
+      daoAsRequester.write.releaseJobPayments([[pending.address, stranger.account.address], payee.account.address]),
+      /Job Contract not found/,
+    );
+    assert.equal(await pending.read.availableAmount(), value);
+    assert.equal((await payouts(pending)).length, 0);
+  });
+
+  it("pays the job's trainer when the recipient is the zero address", async function () {
+    const job = await makeJob(true, 3);
+    const trainerAddr = await job.read.trainerAddr();
+    const before = await publicClient.getBalance({ address: trainerAddr });
+    await daoAsRequester.write.releaseJobPayments([[job.address], zeroAddress]);
+    const after = await publicClient.getBalance({ address: trainerAddr });
+    assert.equal(after - before, updates * value);
+
+    const events = await payouts(job);
+    assert.equal(events.length, 1);
+    assert.equal(events[0].args.to?.toLowerCase(), trainerAddr.toLowerCase());
+  });
+});
@@ -0,0 +1,145 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+
+import { network } from "hardhat";
+import { concat, decodeEventLog, keccak256, stringToBytes, stringToHex, type Hex } from "viem";
+
+// Mesma árvore de flower_fl/merkle.py: folha = keccak(keccak(ref)), pares
+// ordenados, nó ímpar sobe sem par.
+function leafOf(ref: string): Hex {
+  return keccak256(keccak256(stringToBytes(ref)));
+}
+
+function hashPair(a: Hex, b: Hex): Hex {
+  return a.toLowerCase() < b.toLowerCase() ? keccak256(concat([a, b])) : keccak256(concat([b, a]));
+}
+
+function buildLayers(leaves: Hex[]): Hex[][] {
+  const layers: Hex[][] = [leaves];
+  while (layers[layers.length - 1].length > 1) {
+    const level = layers[layers.length - 1];
+    const next: Hex[] = [];
+    for (let i = 0; i + 1 < level.length; i += 2) next.push(hashPair(level[i], level[i + 1]));
+    if (level.length % 2 === 1) next.push(level[level.length - 1]);
+    layers.push(next);
+  }
+  return layers;
+}
+
+function proofFor(layers: Hex[][], index: number): Hex[] {
+  const proof: Hex[] = [];
+  for (const level of layers.slice(0, -1)) {
+    if ((index ^ 1) < level.length) proof.push(level[index ^ 1]);
+    index = Math.floor(index / 2);
+  }
+  return proof;
+}
+
+describe("JobContract batched client updates", async function () {
+  const connection = await network.connect();
+  const { viem } = connection;
+  const publicClient = await viem.getPublicClient();
+  const [deployer, requester, trainer] = await viem.getWalletClients();
+
+  if (!deployer || !requester || !trainer) {
+    throw new Error("wallet clients not available");
+  }
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", [], {
+    client: { wallet: deployer },
+  });
+  const daoAsRequester = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: requester },
+  });
+  const daoAsTrainer = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: trainer },
+  });
+
+  await daoAsTrainer.write.registerTrainer(["Trainer", ["Proc", "16GB", "8 cores"]]);
+  await daoAsRequester.write.registerRequester();
+  await daoAsRequester.write.MakeOffer([
+    "Batch job",
+    keccak256(stringToBytes("model")),
+    keccak256(stringToBytes("endpoint")),
+    "0x",
+    1n,
+    5n,
+    trainer.account.address,
+  ]);
+  const [offerId] = await daoAsTrainer.read.getPendingOffers({ account: trainer.account });
+  const acceptHash = await daoAsTrainer.write.AcceptOffer([offerId]);
+  const acceptReceipt = await publicClient.waitForTransactionReceipt({ hash: acceptHash });
+  const created = decodeEventLog({
+    abi: dao.abi,
+    data: acceptReceipt.logs[0].data,
+    topics: acceptReceipt.logs[0].topics,
+  });
+  const jobAddress = (created.args as { job: `0x${string}` }).job;
+  await daoAsRequester.write.signJobContract([jobAddress], { value: 5n });
+
+  const job = await viem.getContractAt("contracts/JobContract.sol:JobContract", jobAddress);
+  const jobAsRequester = await viem.getContractAt("contracts/JobContract.sol:JobContract", jobAddress, {
+    client: { wallet: requester },
+  });
+
+  const refs = ["sha256:aa", "sha256:bb", "sha256:cc"];
+  const layers = buildLayers(refs.map(leafOf));
+  const root = layers[layers.length - 1][0];
+
+  it("credits updatesDone by the batch size in one transaction", async function () {
+    const hash = await daoAsRequester.write.recordClientUpdateBatch([
+      jobAddress,
+      root,
+      BigInt(refs.length),
+      stringToHex(refs.join("\n")),
+    ]);
+    const receipt = await publicClient.waitForTransactionReceipt({ hash });
+    const event = decodeEventLog({ abi: job.abi, data: receipt.logs[0].data, topics: receipt.logs[0].topics });
+
+    assert.equal(event.eventName, "ClientUpdateBatchRecorded");
+    const args = event.args as { merkleRoot: Hex; batchSize: bigint; updatesDone: bigint; escrowedAmount: bigint };
+    assert.equal(args.merkleRoot, root);
+    assert.equal(args.batchSize, 3n);
+    assert.equal(args.updatesDone, 3n);
+    assert.equal(args.escrowedAmount, 3n);
+    assert.equal(await job.read.availableAmount(), 3n);
+  });
+
+  it("verifies inclusion proofs against the anchored root", async function () {
+    for (let i = 0; i < refs.length; i++) {
+      const ok = await job.read.verifyBatchedUpdate([root, keccak256(stringToBytes(refs[i])), proofFor(layers, i)]);
+      assert.equal(ok, true);
+    }
+    const forged = await job.read.verifyBatchedUpdate([
+      root,
+      keccak256(stringToBytes("sha256:dd")),
+      proofFor(layers, 0),
+    ]);
+    assert.equal(forged, false);
+  });
+
+  it("rejects replayed roots and batches beyond the remaining updates", async function () {
+    await assert.rejects(
+      daoAsRequester.write.recordClientUpdateBatch([jobAddress, root, 1n, "0x"]),
+    );
+    const other = buildLayers(["sha256:01", "sha256:02", "sha256:03"].map(leafOf));
+    await assert.rejects(
+      daoAsRequester.write.recordClientUpdateBatch([jobAddress, other[other.length - 1][0], 3n, "0x"]),
+    );
+  });
+
+  // Documentado em recordClientUpdateBatch: só a raiz passa por
+  // `receivedUpdate`; quem monta o lote (o servidor) deduplica as folhas.
+  it("credits a root that re-batches an already recorded ref", async function () {
+    const ref = "sha256:ee";
+    const cidHash = keccak256(stringToBytes(ref));
+    await jobAsRequester.write.recordClientUpdate([cidHash, "0x"]);
+    await assert.rejects(jobAsRequester.write.recordClientUpdate([cidHash, "0x"]), /Update already recorded/);
+
+    const rebatched = buildLayers([leafOf(ref)]);
+    const rebatchedRoot = rebatched[rebatched.length - 1][0];
+    await daoAsRequester.write.recordClientUpdateBatch([jobAddress, rebatchedRoot, 1n, stringToHex(ref)]);
+    assert.equal(await job.read.remainingUpdates(), 0n);
+    assert.equal(await job.read.verifyBatchedUpdate([rebatchedRoot, cidHash, []]), true);
+  });
+});
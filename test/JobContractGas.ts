@@ -0,0 +1,111 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+
+import { network } from "hardhat";
+import { decodeEventLog, keccak256, stringToBytes, stringToHex, type Hex } from "viem";
+
+// Tetos de regressão de gas (gasUsed da tx, offerMaker chamando o job
+// diretamente, ponteiro CIDv0 UTF-8 de 46 bytes). Essas chamadas rodam a cada
+// round para cada cliente; subir um teto exige justificar no PR.
+const GAS_BUDGET = {
+  recordClientUpdateFirst: 115_000n,
+  recordClientUpdateNext: 100_000n,
+  recordClientUpdateEventsOnly: 75_000n,
+  publishGlobalModelFirst: 65_000n,
+  publishGlobalModelNext: 45_000n,
+};
+
+const POINTER = stringToHex("QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG");
+
+describe("JobContract gas regression", async function () {
+  const { viem } = await network.connect();
+  const publicClient = await viem.getPublicClient();
+  const [deployer, requester, trainer] = await viem.getWalletClients();
+
+  if (!deployer || !requester || !trainer) {
+    throw new Error("wallet clients not available");
+  }
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+  const daoAsRequester = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: requester },
+  });
+  const daoAsTrainer = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: trainer },
+  });
+  await daoAsTrainer.write.registerTrainer(["Trainer", ["Proc", "16GB", "8 cores"]]);
+  await daoAsRequester.write.registerRequester();
+
+  let offers = 0;
+  async function newJob() {
+    await daoAsRequester.write.MakeOffer([
+      `Gas job ${offers}`,
+      keccak256(stringToBytes(`model-${offers++}`)),
+      keccak256(stringToBytes("endpoint")),
+      "0x",
+      1n,
+      10n,
+      trainer.account.address,
+    ]);
+    const pending = await daoAsTrainer.read.getPendingOffers({ account: trainer.account });
+    const rcpt = await publicClient.waitForTransactionReceipt({
+      hash: await daoAsTrainer.write.AcceptOffer([pending[pending.length - 1]]),
+    });
+    const created = decodeEventLog({ abi: dao.abi, data: rcpt.logs[0].data, topics: rcpt.logs[0].topics });
+    const jobAddress = (created.args as { job: `0x${string}` }).job;
+    await daoAsRequester.write.signJobContract([jobAddress], { value: 10n });
+    await daoAsTrainer.write.signJobContract([jobAddress]);
+    return viem.getContractAt("contracts/JobContract.sol:JobContract", jobAddress, {
+      client: { wallet: requester },
+    });
+  }
+
+  const gasOf = async (hash: Hex) => (await publicClient.waitForTransactionReceipt({ hash })).gasUsed;
+  const measured: Record<string, bigint> = {};
+
+  it("keeps recordClientUpdate and publishGlobalModel under budget", async function () {
+    const job = await newJob();
+    measured.recordClientUpdateFirst = await gasOf(
+      await job.write.recordClientUpdate([keccak256(stringToBytes("u0")), POINTER]),
+    );
+    measured.recordClientUpdateNext = await gasOf(
+      await job.write.recordClientUpdate([keccak256(stringToBytes("u1")), POINTER]),
+    );
+    measured.publishGlobalModelFirst = await gasOf(
+      await job.write.publishGlobalModel([keccak256(stringToBytes("g1")), POINTER]),
+    );
+    measured.publishGlobalModelNext = await gasOf(
+      await job.write.publishGlobalModel([keccak256(stringToBytes("g2")), POINTER]),
+    );
+    assert.equal(await job.read.clientUpdateHashes([1n]), keccak256(stringToBytes("u1")));
+
+    const eventsOnly = await newJob();
+    await eventsOnly.write.setStoreUpdateHashes([false]);
+    measured.recordClientUpdateEventsOnly = await gasOf(
+      await eventsOnly.write.recordClientUpdate([keccak256(stringToBytes("u0")), POINTER]),
+    );
+    assert.equal(await eventsOnly.read.receivedUpdate([keccak256(stringToBytes("u0"))]), true);
+    await assert.rejects(eventsOnly.write.recordClientUpdate([keccak256(stringToBytes("u0")), POINTER]));
+    await assert.rejects(eventsOnly.write.setStoreUpdateHashes([true]));
+
+    console.table(
+      Object.entries(measured).map(([op, gas]) => ({ op, gas_used: gas.toString(), budget: GAS_BUDGET[op as keyof typeof GAS_BUDGET].toString() })),
+    );
+    for (const [op, gas] of Object.entries(measured)) {
+      assert.ok(gas <= GAS_BUDGET[op as keyof typeof GAS_BUDGET], `${op}: ${gas} > ${GAS_BUDGET[op as keyof typeof GAS_BUDGET]}`);
+    }
+    assert.ok(measured.recordClientUpdateEventsOnly + 15_000n < measured.recordClientUpdateFirst);
+  });
+
+  it("keeps packed amounts consistent through payout", async function () {
+    const job = await newJob();
+    assert.equal(await job.read.lockedAmount(), 10n);
+    await job.write.recordClientUpdate([keccak256(stringToBytes("p0")), POINTER]);
+    await job.write.recordClientUpdate([keccak256(stringToBytes("p1")), POINTER]);
+    assert.equal(await job.read.availableAmount(), 2n);
+
+    await daoAsTrainer.write.releaseJobPayment([job.address, trainer.account.address]);
+    assert.equal(await job.read.availableAmount(), 0n);
+    assert.equal(await job.read.lockedAmount(), 8n);
+  });
+});
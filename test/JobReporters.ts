@@ -0,0 +1,92 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+
+import { network } from "hardhat";
+import { decodeEventLog, keccak256, stringToBytes, stringToHex } from "viem";
+
+describe("JobContract per-client reporters", async function () {
+  const connection = await network.connect();
+  const { viem } = connection;
+  const publicClient = await viem.getPublicClient();
+  const [deployer, requester, trainer, client1, client2] = await viem.getWalletClients();
+
+  if (!deployer || !requester || !trainer || !client1 || !client2) {
+    throw new Error("wallet clients not available");
+  }
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", [], {
+    client: { wallet: deployer },
+  });
+  const daoAsRequester = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: requester },
+  });
+  const daoAsTrainer = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: trainer },
+  });
+
+  await daoAsTrainer.write.registerTrainer(["Trainer", ["Proc", "16GB", "8 cores"]]);
+  await daoAsRequester.write.registerRequester();
+  await daoAsRequester.write.MakeOffer([
+    "Reporter job",
+    keccak256(stringToBytes("model")),
+    keccak256(stringToBytes("endpoint")),
+    "0x",
+    1n,
+    4n,
+    trainer.account.address,
+  ]);
+  const [offerId] = await daoAsTrainer.read.getPendingOffers({ account: trainer.account });
+  const acceptHash = await daoAsTrainer.write.AcceptOffer([offerId]);
+  const acceptReceipt = await publicClient.waitForTransactionReceipt({ hash: acceptHash });
+  const created = decodeEventLog({
+    abi: dao.abi,
+    data: acceptReceipt.logs[0].data,
+    topics: acceptReceipt.logs[0].topics,
+  });
+  const jobAddress = (created.args as { job: `0x${string}` }).job;
+  await daoAsRequester.write.signJobContract([jobAddress], { value: 4n });
+
+  const asWallet = (wallet: typeof requester) =>
+    viem.getContractAt("contracts/JobContract.sol:JobContract", jobAddress, { client: { wallet } });
+  const job = await asWallet(requester);
+  const jobAsClient1 = await asWallet(client1);
+  const jobAsClient2 = await asWallet(client2);
+  const jobAsTrainer = await asWallet(trainer);
+
+  it("only lets the offer maker manage reporters", async function () {
+    await assert.rejects(jobAsTrainer.write.setReporters([[client1.account.address], true]), /Only offer maker/);
+    await job.write.setReporters([[client1.account.address], true]);
+    assert.equal(await job.read.isReporter([client1.account.address]), true);
+    assert.equal(await job.read.isReporter([client2.account.address]), false);
+  });
+
+  it("accepts updates signed by registered client keys only", async function () {
+    await jobAsClient1.write.recordClientUpdate([keccak256(stringToBytes("sha256:c1")), stringToHex("c1")]);
+    await assert.rejects(
+      jobAsClient2.write.recordClientUpdate([keccak256(stringToBytes("sha256:c2")), stringToHex("c2")]),
+      /Not authorized/,
+    );
+    assert.equal(await job.read.remainingUpdates(), 3n);
+  });
+
+  it("does not let reporters publish the global model or record batches", async function () {
+    await assert.rejects(
+      jobAsClient1.write.publishGlobalModel([keccak256(stringToBytes("sha256:global")), "0x"]),
+      /Not authorized/,
+    );
+    await assert.rejects(
+      jobAsClient1.write.recordClientUpdateBatch([keccak256(stringToBytes("root")), 3n, "0x"]),
+      /Not authorized/,
+    );
+    assert.equal(await job.read.latestModelHash(), `0x${"00".repeat(32)}`);
+    assert.equal(await job.read.remainingUpdates(), 3n);
+  });
+
+  it("revokes reporters", async function () {
+    await job.write.setReporters([[client1.account.address], false]);
+    await assert.rejects(
+      jobAsClient1.write.recordClientUpdate([keccak256(stringToBytes("sha256:c1b")), "0x"]),
+      /Not authorized/,
+    );
+  });
+});
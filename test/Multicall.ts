@@ -0,0 +1,61 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+
+import { network } from "hardhat";
+import { decodeFunctionResult, encodeFunctionData, zeroAddress } from "viem";
+
+describe("Multicall bulk reads", async function () {
+  const { viem } = await network.connect();
+  const [deployer, trainer] = await viem.getWalletClients();
+
+  if (!deployer || !trainer) {
+    throw new Error("wallet clients not available");
+  }
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+  const multicall = await viem.deployContract("contracts/Multicall.sol:Multicall", []);
+  const daoAsTrainer = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: trainer },
+  });
+  await daoAsTrainer.write.registerTrainer(["Trainer", ["Proc", "16GB", "8 cores"]]);
+
+  const lookup = (fn: "trainers" | "requesters", account: `0x${string}`) => ({
+    target: dao.address,
+    allowFailure: false,
+    callData: encodeFunctionData({ abi: dao.abi, functionName: fn, args: [account] }),
+  });
+
+  it("aggregates view calls across accounts in one eth_call", async function () {
+    const results = await multicall.read.aggregate([
+      [
+        lookup("trainers", trainer.account.address),
+        lookup("requesters", trainer.account.address),
+        lookup("trainers", deployer.account.address),
+      ],
+    ]);
+    const decoded = results.map((r, i) => {
+      assert.equal(r.success, true);
+      return decodeFunctionResult({
+        abi: dao.abi,
+        functionName: i === 1 ? "requesters" : "trainers",
+        data: r.returnData,
+      });
+    });
+    assert.notEqual(decoded[0], zeroAddress);
+    assert.equal(decoded[0], await dao.read.trainers([trainer.account.address]));
+    assert.equal(decoded[1], zeroAddress);
+    assert.equal(decoded[2], zeroAddress);
+  });
+
+  it("reports failures only where allowFailure is set", async function () {
+    const reverting = {
+      target: dao.address,
+      allowFailure: true,
+      callData: encodeFunctionData({ abi: dao.abi, functionName: "getPendingOffers" }),
+    };
+    const [result] = await multicall.read.aggregate([[reverting]]);
+    assert.equal(result.success, false);
+
+    await assert.rejects(multicall.read.aggregate([[{ ...reverting, allowFailure: false }]]));
+  });
+});
@@ -0,0 +1,55 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+
+import { network } from "hardhat";
+import { encodeAbiParameters, keccak256, parseEventLogs, stringToBytes, type Hex } from "viem";
+
+describe("Offer payload commitment", async function () {
+  const { viem } = await network.connect();
+  const publicClient = await viem.getPublicClient();
+  const [wallet] = await viem.getWalletClients();
+  if (!wallet) {
+    throw new Error("wallet client not available");
+  }
+  const me = wallet.account.address;
+  const wait = (hash: Hex) => publicClient.waitForTransactionReceipt({ hash });
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+  await wait(await dao.write.registerTrainer(["Trainer", ["CPU", "16GB", "8 cores"]]));
+  await wait(await dao.write.registerRequester());
+
+  it("stores only the hash and carries description/metadata in OfferPayload", async function () {
+    const description = "Job description";
+    const metadata = ("0x" + "ab".repeat(2048)) as Hex;
+    const made = await wait(
+      await dao.write.MakeOffer([
+        description,
+        keccak256(stringToBytes("model")),
+        keccak256(stringToBytes("endpoint")),
+        metadata,
+        1n,
+        3n,
+        me,
+      ]),
+    );
+    const expected = keccak256(
+      encodeAbiParameters([{ type: "string" }, { type: "bytes" }], [description, metadata]),
+    );
+
+    const [payload] = parseEventLogs({ abi: dao.abi, logs: made.logs, eventName: "OfferPayload" });
+    assert.ok(payload);
+    assert.equal(payload.args.payloadHash, expected);
+    assert.equal(payload.args.description, description);
+    assert.equal(payload.args.encryptedMetadata, metadata);
+
+    const offer = await dao.read.getOfferDetails([payload.args.offerId], { account: wallet.account });
+    assert.equal(offer.payloadHash, expected);
+
+    const accepted = await wait(await dao.write.AcceptOffer([payload.args.offerId]));
+    const [created] = parseEventLogs({ abi: dao.abi, logs: accepted.logs, eventName: "JobContractCreated" });
+    assert.ok(created);
+    const job = await viem.getContractAt("contracts/JobContract.sol:JobContract", created.args.job);
+    assert.equal(await job.read.offerPayloadHash(), expected);
+    assert.equal(await job.read.offerId(), payload.args.offerId);
+  });
+});
@@ -0,0 +1,75 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+
+import { network } from "hardhat";
+import { keccak256, maxUint256, stringToBytes } from "viem";
+
+describe("Trainer pending offers", async function () {
+  const { viem } = await network.connect();
+  const [deployer, requester, trainer] = await viem.getWalletClients();
+
+  if (!deployer || !requester || !trainer) {
+    throw new Error("wallet clients not available");
+  }
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+  const daoAsRequester = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: requester },
+  });
+  const daoAsTrainer = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+    client: { wallet: trainer },
+  });
+
+  await daoAsTrainer.write.registerTrainer(["Trainer", ["Proc", "16GB", "8 cores"]]);
+  await daoAsRequester.write.registerRequester();
+  for (let i = 0; i < 7; i++) {
+    await daoAsRequester.write.MakeOffer([
+      `Offer ${i}`,
+      keccak256(stringToBytes(`model-${i}`)),
+      keccak256(stringToBytes("endpoint")),
+      "0x",
+      1n,
+      3n,
+      trainer.account.address,
+    ]);
+  }
+
+  const pending = async () =>
+    [...(await daoAsTrainer.read.getPendingOffers({ account: trainer.account }))].sort((a, b) => Number(a - b));
+
+  it("pages through pending offers", async function () {
+    const all = await pending();
+    assert.equal(all.length, 7);
+
+    const paged: bigint[] = [];
+    for (let offset = 0n; ; offset += 3n) {
+      const [ids, total] = await daoAsTrainer.read.getPendingOffersPage([offset, 3n], { account: trainer.account });
+      assert.equal(total, 7n);
+      if (ids.length === 0) break;
+      paged.push(...ids);
+    }
+    assert.deepEqual(paged.sort((a, b) => Number(a - b)), all);
+  });
+
+  it("clamps a page whose limit would overflow offset + limit", async function () {
+    const [ids, total] = await daoAsTrainer.read.getPendingOffersPage([2n, maxUint256], { account: trainer.account });
+    assert.equal(total, 7n);
+    assert.equal(ids.length, 5);
+  });
+
+  it("removes accepted offers from any position", async function () {
+    await daoAsTrainer.write.AcceptOffer([2n]);
+    await daoAsTrainer.write.AcceptOffer([6n]);
+    await daoAsTrainer.write.AcceptOffer([0n]);
+    assert.deepEqual(await pending(), [1n, 3n, 4n, 5n]);
+
+    await daoAsTrainer.write.AcceptOffer([5n]);
+    await daoAsTrainer.write.AcceptOffer([1n]);
+    await daoAsTrainer.write.AcceptOffer([4n]);
+    await daoAsTrainer.write.AcceptOffer([3n]);
+    assert.deepEqual(await pending(), []);
+    const [ids, total] = await daoAsTrainer.read.getPendingOffersPage([0n, 10n], { account: trainer.account });
+    assert.equal(ids.length, 0);
+    assert.equal(total, 0n);
+  });
+});
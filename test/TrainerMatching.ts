@@ -0,0 +1,103 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+
+import { network } from "hardhat";
+import { zeroAddress } from "viem";
+
+describe("DAO indexed trainer matching", async function () {
+  const { viem } = await network.connect();
+  const wallets = await viem.getWalletClients();
+  const [deployer, ...trainerWallets] = wallets;
+  const pool = trainerWallets.slice(0, 4);
+
+  if (!deployer || pool.length < 4) {
+    throw new Error("wallet clients not available");
+  }
+
+  const dao = await viem.deployContract("contracts/DAO.sol:DAO", []);
+  const tagsByTrainer = [["cuda"], ["cuda", "gpu-a100"], [], ["gpu-a100"]];
+
+  for (const [i, wallet] of pool.entries()) {
+    const daoAs = await viem.getContractAt("contracts/DAO.sol:DAO", dao.address, {
+      client: { wallet },
+    });
+    await daoAs.write.registerTrainer([`Trainer ${i}`, [`CPU-${i}`, "16GB", "8 cores"]]);
+    if (tagsByTrainer[i].length > 0) {
+      const trainerAddr = await dao.read.trainers([wallet.account.address]);
+      const trainer = await viem.getContractAt("contracts/Trainer.sol:Trainer", trainerAddr, {
+        client: { wallet },
+      });
+      await trainer.write.setTags([tagsByTrainer[i]]);
+    }
+  }
+
+  const requirements = (tags: string[], minRating = 0n, description = "") => ({
+    description,
+    valueByUpdate: 0n,
+    minRating,
+    tags,
+    canditatesToReturn: 10n,
+  });
+
+  const matched = async (fn: "matchTrainers" | "matchTrainersScan", req: ReturnType<typeof requirements>) =>
+    (await dao.read[fn]([req])).filter((a) => a !== zeroAddress).map((a) => a.toLowerCase()).sort();
+
+  const queries = [
+    requirements([]),
+    requirements(["cuda"]),
+    requirements(["cuda", "gpu-a100"]),
+    requirements(["gpu-a100"], 10n),
+    requirements([], 11n),
+    requirements(["cuda"], 0n, "CPU-1"),
+    requirements(["unknown"]),
+  ];
+
+  it("returns the same trainers as the linear scan", async function () {
+    for (const req of queries) {
+      assert.deepEqual(await matched("matchTrainers", req), await matched("matchTrainersScan", req));
+    }
+    assert.equal((await matched("matchTrainers", requirements(["gpu-a100"]))).length, 2);
+  });
+
+  it("keeps the tag index current when tags change", async function () {
+    const wallet = pool[1];
+    const trainerAddr = await dao.read.trainers([wallet.account.address]);
+    const trainer = await viem.getContractAt("contracts/Trainer.sol:Trainer", trainerAddr, {
+      client: { wallet },
+    });
+    await trainer.write.setTags([["tpu"]]);
+
+    assert.equal(await dao.read.trainersWithTag(["gpu-a100"]), 1n);
+    assert.equal(await dao.read.trainersWithTag(["tpu"]), 1n);
+    assert.deepEqual(await matched("matchTrainers", requirements(["tpu"])), [wallet.account.address.toLowerCase()]);
+    for (const req of queries) {
+      assert.deepEqual(await matched("matchTrainers", req), await matched("matchTrainersScan", req));
+    }
+  });
+
+  it("streams matches with a cursor and bounded scans", async function () {
+    const total = await dao.read.trainersCount();
+    for (const req of queries) {
+      const streamed: string[] = [];
+      let cursor = 0n;
+      while (cursor < total) {
+        const [matches, next] = await dao.read.matchTrainersFrom([req, cursor, 1n]);
+        assert.ok(next > cursor && next <= cursor + 1n);
+        streamed.push(...matches.map((a) => a.toLowerCase()));
+        cursor = next;
+      }
+      assert.deepEqual(streamed.sort(), await matched("matchTrainersScan", req));
+    }
+
+    const [owners, contracts, count] = await dao.read.getTrainersRange([1n, 2n]);
+    assert.equal(count, total);
+    assert.equal(owners.length, 2);
+    assert.equal(contracts[0], await dao.read.trainers([owners[0]]));
+    const [tail] = await dao.read.getTrainersRange([total, 10n]);
+    assert.equal(tail.length, 0);
+  });
+
+  it("rejects index updates that do not come from a trainer contract", async function () {
+    await assert.rejects(dao.write.onTrainerTagsChanged([pool[0].account.address, [], []]));
+  });
+});